@@ -15,6 +15,92 @@ class Settings:
     # Database settings
     DATABASE_URL = f"sqlite+aiosqlite:///{DATA_DIR}/edu-quiz.db"
     
+    # SQLite pragmas applied to every new connection (see app.db).
+    # "default" mirrors SQLite's built-in settings, "performance" lets readers
+    # run alongside a writer (WAL) and trades fsync-per-commit for throughput.
+    SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "performance")
+    SQLITE_PROFILES = {
+        "default": {
+            "busy_timeout": 0,
+            "journal_mode": "DELETE",
+            "synchronous": "FULL",
+            "cache_size": -2000,
+            "mmap_size": 0,
+            "temp_store": "DEFAULT",
+        },
+        "performance": {
+            "busy_timeout": 5000,
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -64000,  # 64 MiB
+            "mmap_size": 268435456,  # 256 MiB
+            "temp_store": "MEMORY",
+        },
+    }
+    
+    # Connection pools (see app.db). All mutating transactions share one writer
+    # connection, so SQLite never sees two writers; sessions wait for it in
+    # FIFO order for up to WRITE_QUEUE_TIMEOUT seconds. GET endpoints use a
+    # separate pool of read-only connections that WAL lets run alongside it.
+    READ_POOL_SIZE = int(os.getenv("READ_POOL_SIZE", "8"))
+    WRITE_QUEUE_TIMEOUT = float(os.getenv("WRITE_QUEUE_TIMEOUT", "30"))
+    
+    # Group commit for quiz results (see app.services.result_writer): submissions
+    # arriving within RESULT_BATCH_DELAY_MS share one transaction
+    RESULT_BATCH_DELAY_MS = float(os.getenv("RESULT_BATCH_DELAY_MS", "5"))
+    RESULT_BATCH_MAX = int(os.getenv("RESULT_BATCH_MAX", "500"))
+    
+    # Item analysis keeps the attempt matrices of this many quizzes in memory
+    ITEM_ANALYSIS_CACHE_QUIZZES = int(os.getenv("ITEM_ANALYSIS_CACHE_QUIZZES", "32"))
+    
+    # Result exports stream rows in keyset batches of this size
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    
+    # Quiz search ranks at most this many matching texts (the newest ones)
+    SEARCH_MAX_MATCHES = int(os.getenv("SEARCH_MAX_MATCHES", "1000"))
+    
+    # AI quiz generations kept for reuse, least recently used are evicted
+    GENERATION_CACHE_MAX_ENTRIES = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "500"))
+    
+    # Estimated Jaccard similarity (of question and answer shingles) from which
+    # a question counts as a near-duplicate of a question bank entry
+    QUESTION_BANK_DUPLICATE_THRESHOLD = float(os.getenv("QUESTION_BANK_DUPLICATE_THRESHOLD", "0.7"))
+    # Questions fingerprinted per transaction by the background bank indexer;
+    # index a large existing bank up front with python -m app.db.quiz_bank index
+    QUESTION_BANK_INDEX_LIMIT = int(os.getenv("QUESTION_BANK_INDEX_LIMIT", "1000"))
+    
+    # Idempotency-Key support on expensive POST endpoints: keys are kept for
+    # IDEMPOTENCY_KEY_TTL seconds, a request still in progress after
+    # IDEMPOTENCY_LOCK_TIMEOUT is considered dead, and a retry waits up to
+    # IDEMPOTENCY_WAIT_TIMEOUT for a request running in another worker
+    IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", str(24 * 60 * 60)))
+    IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "600"))
+    IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "60"))
+    
+    # AI calls share AI_MAX_CONCURRENCY upstream slots (see
+    # app.services.ai_scheduler). Explanations have priority over queued quiz
+    # generations, which may use at most AI_GENERATION_CONCURRENCY slots so
+    # students are not stuck behind an admin's batch
+    AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+    AI_EXPLANATION_CONCURRENCY = int(os.getenv("AI_EXPLANATION_CONCURRENCY", "8"))
+    AI_GENERATION_CONCURRENCY = int(os.getenv("AI_GENERATION_CONCURRENCY", "2"))
+    
+    # Model routing (see app.services.ai_routing). AI_MODELS lists
+    # name:input_price:output_price (USD per 1M tokens) in order of preference;
+    # a call uses the first model within the task's cost target whose observed
+    # p95 latency over the last AI_LATENCY_WINDOW seconds meets its p95 target.
+    # Output limits are sized to the work: a generation may produce
+    # AI_GENERATION_BASE_TOKENS + AI_GENERATION_TOKENS_PER_QUESTION per question
+    AI_MODELS = os.getenv("AI_MODELS", "gpt-4.1:2.0:8.0,gpt-4.1-mini:0.4:1.6")
+    AI_LATENCY_WINDOW = float(os.getenv("AI_LATENCY_WINDOW", "600"))
+    AI_EXPLANATION_P95_TARGET = float(os.getenv("AI_EXPLANATION_P95_TARGET", "4"))
+    AI_EXPLANATION_MAX_COST = float(os.getenv("AI_EXPLANATION_MAX_COST", "0.005"))
+    AI_EXPLANATION_MAX_TOKENS = int(os.getenv("AI_EXPLANATION_MAX_TOKENS", "150"))
+    AI_GENERATION_P95_TARGET = float(os.getenv("AI_GENERATION_P95_TARGET", "60"))
+    AI_GENERATION_MAX_COST = float(os.getenv("AI_GENERATION_MAX_COST", "0.05"))
+    AI_GENERATION_BASE_TOKENS = int(os.getenv("AI_GENERATION_BASE_TOKENS", "100"))
+    AI_GENERATION_TOKENS_PER_QUESTION = int(os.getenv("AI_GENERATION_TOKENS_PER_QUESTION", "200"))
+    
     # Security settings
     SECRET_KEY = "changethissecretkey"  # Change this in production!
     ALGORITHM = "HS256"
@@ -20,8 +20,27 @@ class Settings(BaseSettings):
     # CORS settings
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:5173"]
     
+    # Rate limiting settings
+    RATE_LIMIT_ENABLED: bool = True
+    
+    # Shared state for rate limits and caches: "memory://" (per process) or
+    # "sqlite:///path/to/state.db" (shared by all workers on the host)
+    SHARED_STATE_URL: str = "memory://"
+    SHARED_STATE_MAX_KEYS: int = 100000
+    
     # OpenAI settings
     OPENAI_API_KEY: str = ""
+    # OpenAI-compatible endpoint, e.g. http://127.0.0.1:8001/v1 for the fake
+    # server of benchmarks.fake_openai; empty for the OpenAI API
+    OPENAI_BASE_URL: str = ""
+    
+    # Key of the offline bundle digests and signatures. Without it the bundle
+    # endpoints answer 503. It must be the same in every worker and survive
+    # restarts, or bundles already downloaded stop validating.
+    BUNDLE_SIGNING_KEY: str = ""
+    
+    # Seconds a generated answer explanation is kept in the shared state cache
+    EXPLANATION_CACHE_TTL: int = 60 * 60 * 24
     
     # Debug mode
     DEBUG: bool = True
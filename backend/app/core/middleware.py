@@ -1,110 +1,316 @@
-from fastapi import Request, Response, HTTPException, status
-import time
-from typing import Dict, List, Optional, Callable
-import asyncio
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from fastapi.responses import JSONResponse
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from jose import JWTError, jwt
+from starlette.types import ASGIApp, Receive, Scope, Send
 import logging
 
+from ..db.query_counter import count_queries
+from .config import settings
+from .shared_state import MemoryStateBackend, SharedStateBackend
+
 logger = logging.getLogger(__name__)
 
 class RateLimiter:
-    """Rate limiter implementation using token bucket algorithm"""
-    
-    def __init__(self, rate: float, per: float, burst: int = 1):
+    """Rate limiter implementation using the generic cell rate algorithm (GCRA)
+
+    Each key is tracked with a single timestamp - its theoretical arrival time
+    (TAT) - kept in a SharedStateBackend. Without an explicit backend the limiter
+    uses a private MemoryStateBackend capped at ``max_keys`` keys, so memory
+    stays bounded no matter how many distinct clients hit the endpoint.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        per: float,
+        burst: int = 1,
+        max_keys: int = 10000,
+        backend: Optional[SharedStateBackend] = None,
+        namespace: str = ""
+    ):
         """
         Initialize rate limiter
-        
+
         Args:
             rate: Number of requests allowed per time period
             per: Time period in seconds
-            burst: Maximum token bucket size (allows bursts of requests)
+            burst: Maximum number of requests allowed in a single burst
+            max_keys: Hard cap on the number of tracked keys (private backend only)
+            backend: Shared state backend, e.g. to share limits between workers
+            namespace: Prefix separating this limiter's keys in a shared backend
         """
         self.rate = rate
         self.per = per
         self.burst = burst
-        self.tokens = burst
-        self.updated_at = time.monotonic()
-        self.lock = asyncio.Lock()
-    
-    async def acquire(self) -> bool:
+        self.max_keys = max_keys
+        self.backend = backend if backend is not None else MemoryStateBackend(max_keys=max_keys)
+        self.namespace = namespace
+        # Time between two requests at the sustained rate
+        self.emission_interval = per / rate
+        # How far ahead of "now" the TAT may run before requests are rejected
+        self.tolerance = self.emission_interval * burst
+
+    def __len__(self) -> int:
+        return len(self.backend)
+
+    def check(self, key: str = "global", now: Optional[float] = None) -> float:
+        """
+        Try to consume one request for the given key
+
+        Args:
+            key: Bucket key (client IP, user ID, ...)
+            now: Current monotonic time, only honoured by the memory backend
+
+        Returns:
+            0.0 if the request is allowed, otherwise the number of seconds
+            the caller has to wait before retrying
+        """
+        if now is not None and isinstance(self.backend, MemoryStateBackend):
+            return self.backend.rate_limit(
+                self.namespace + key, self.emission_interval, self.tolerance, now=now
+            )
+        return self.backend.rate_limit(self.namespace + key, self.emission_interval, self.tolerance)
+
+    async def acquire(self, key: str = "global") -> bool:
         """
         Try to acquire a token
-        
+
+        Args:
+            key: Bucket key
+
         Returns:
             True if token was acquired, False otherwise
         """
-        async with self.lock:
-            now = time.monotonic()
-            elapsed = now - self.updated_at
-            
-            # Add tokens based on elapsed time
-            self.tokens = min(
-                self.burst,
-                self.tokens + elapsed * (self.rate / self.per)
-            )
-            self.updated_at = now
-            
-            # Check if we have enough tokens
-            if self.tokens >= 1:
-                self.tokens -= 1
-                return True
-            else:
-                return False
+        return self.check(key) == 0.0
+
+
+class RateLimitRule:
+    """Rate limit settings for a single path pattern"""
+
+    def __init__(
+        self,
+        pattern: str,
+        limits: Dict[str, Any],
+        backend: Optional[SharedStateBackend] = None
+    ):
+        """
+        Initialize rule
+
+        Args:
+            pattern: Exact path, prefix ending with ``*`` or route template
+                with ``{param}`` placeholders
+            limits: Rule settings (rate, per, burst, key, methods, max_keys)
+            backend: Shared state backend for the rule's limiter
+        """
+        self.pattern = pattern
+        self.methods = frozenset(m.upper() for m in limits.get("methods", ["POST"]))
+        self.key = limits.get("key", "user")
+        if self.key not in ("global", "client", "user"):
+            raise ValueError(f"Invalid rate limit key strategy: {self.key}")
+        self.limiter = RateLimiter(
+            rate=limits.get("rate", 5),
+            per=limits.get("per", 60),
+            burst=limits.get("burst", 1),
+            max_keys=limits.get("max_keys", 10000),
+            backend=backend,
+            namespace=f"rl:{pattern}:"
+        )
+
+
+def _normalize_path(path: str) -> str:
+    """Strip the trailing slash so "/api/v1/quizzes/" matches "/api/v1/quizzes" """
+    if len(path) > 1 and path.endswith("/"):
+        return path[:-1]
+    return path
+
+
+def _template_to_regex(template: str) -> "re.Pattern[str]":
+    """Compile a route template such as "/quizzes/{quiz_id}/results" to a regex"""
+    parts = re.split(r"(\{[^}/]+\})", template)
+    regex = "".join("[^/]+" if part.startswith("{") else re.escape(part) for part in parts)
+    return re.compile(f"^{regex}$")
 
 
-class RateLimitingMiddleware(BaseHTTPMiddleware):
-    """Middleware for rate limiting specific endpoints"""
-    
+class RateLimitingMiddleware:
+    """Middleware for rate limiting specific endpoints
+
+    Implemented as a plain ASGI middleware: requests that are not rate limited
+    are handed to the wrapped app untouched, so streaming responses and SSE
+    pass through without extra tasks or buffering.
+    """
+
     def __init__(
         self,
-        app,
-        rate_limits: Dict[str, Dict[str, float]] = None
+        app: ASGIApp,
+        rate_limits: Dict[str, Dict[str, Any]] = None,
+        enabled: bool = True,
+        backend: Optional[SharedStateBackend] = None
     ):
         """
         Initialize middleware
-        
+
         Args:
-            app: FastAPI application
-            rate_limits: Dictionary mapping endpoint paths to rate limit settings
+            app: Wrapped ASGI application
+            rate_limits: Dictionary mapping path patterns to rate limit settings.
+                Patterns may be exact paths, prefixes ending with ``*`` or route
+                templates with ``{param}`` placeholders.
                 Example: {
-                    "/api/v1/quizzes": {"rate": 5, "per": 60, "burst": 10}
+                    "/api/v1/quizzes": {"rate": 5, "per": 60, "burst": 10},
+                    "/api/v1/quizzes/{quiz_id}/check-answer": {"rate": 30, "per": 60, "key": "user"},
+                    "/api/v1/auth/*": {"rate": 3, "per": 60, "key": "client"}
                 }
+                Supported keys: rate, per, burst, max_keys, methods (default ["POST"])
+                and key - "user" (per authenticated user, falling back to the
+                client IP), "client" (per client IP) or "global" (single bucket).
+            enabled: Set to False to let every request through
+            backend: Shared state backend holding the buckets of every rule.
+                When omitted each rule keeps its own in-process buckets
+                (capped at the rule's max_keys).
         """
-        super().__init__(app)
-        self.rate_limiters: Dict[str, Dict[str, RateLimiter]] = {}
-        
+        self.app = app
+        self.enabled = enabled
+        self.exact_rules: Dict[str, RateLimitRule] = {}
+        self.template_rules: List[Tuple["re.Pattern[str]", RateLimitRule]] = []
+        self.prefix_rules: List[Tuple[str, RateLimitRule]] = []
+        self.methods = frozenset()
+
         # Configure rate limiters for paths
-        if rate_limits:
-            for path, limits in rate_limits.items():
-                self.rate_limiters[path] = {}
-                self.rate_limiters[path]["global"] = RateLimiter(
-                    rate=limits.get("rate", 5),
-                    per=limits.get("per", 60),
-                    burst=limits.get("burst", 1)
-                )
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        for pattern, limits in (rate_limits or {}).items():
+            rule = RateLimitRule(pattern, limits, backend=backend)
+            self.methods |= rule.methods
+            if pattern.endswith("*"):
+                self.prefix_rules.append((pattern[:-1], rule))
+            elif "{" in pattern:
+                self.template_rules.append((_template_to_regex(_normalize_path(pattern)), rule))
+            else:
+                self.exact_rules[_normalize_path(pattern)] = rule
+
+        # Longest prefix wins
+        self.prefix_rules.sort(key=lambda item: len(item[0]), reverse=True)
+
+    def match(self, method: str, path: str) -> Optional[RateLimitRule]:
+        """
+        Find the rate limit rule for a request
+
+        Args:
+            method: HTTP method
+            path: Request path
+
+        Returns:
+            Matching rule or None if the request is not rate limited
+        """
+        if method not in self.methods:
+            return None
+
+        path = _normalize_path(path)
+        rule = self.exact_rules.get(path)
+        if rule is None:
+            for regex, candidate in self.template_rules:
+                if regex.match(path):
+                    rule = candidate
+                    break
+        if rule is None:
+            for prefix, candidate in self.prefix_rules:
+                if path.startswith(prefix):
+                    rule = candidate
+                    break
+
+        if rule is None or method not in rule.methods:
+            return None
+        return rule
+
+    def get_key(self, rule: RateLimitRule, scope: Scope) -> str:
+        """Build the bucket key for a request according to the rule strategy"""
+        if rule.key == "global":
+            return "global"
+
+        if rule.key == "user":
+            authorization = next(
+                (value for name, value in scope["headers"] if name == b"authorization"),
+                None
+            )
+            if authorization and authorization[:7].lower() == b"bearer ":
+                try:
+                    payload = jwt.decode(
+                        authorization[7:].decode("latin-1"),
+                        settings.SECRET_KEY,
+                        algorithms=[settings.ALGORITHM]
+                    )
+                    username = payload.get("sub")
+                    if username:
+                        return f"user:{username}"
+                except JWTError:
+                    # Invalid tokens are rejected later by the endpoint, count them per client
+                    pass
+
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        return f"client:{client_ip}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request with rate limiting"""
-        # Check if path is rate limited
-        path = request.url.path
-        method = request.method
-        
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
         # Only apply rate limiting to specific endpoints
-        if method == "POST" and path in self.rate_limiters:
-            # Try to get client IP for per-client rate limiting (future extension)
-            client_ip = request.client.host if request.client else "unknown"
-            
-            # For now, we're just using global rate limiting
-            limiter = self.rate_limiters[path]["global"]
-            
-            # Try to acquire a token
-            if not await limiter.acquire():
-                logger.warning(f"Rate limit exceeded for {path} from {client_ip}")
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Rate limit exceeded. Please try again later."
-                )
-        
-        # Process the request
-        response = await call_next(request)
-        return response 
\ No newline at end of file
+        rule = self.match(scope["method"], scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = self.get_key(rule, scope)
+        retry_after = rule.limiter.check(key)
+        if retry_after > 0:
+            logger.warning(f"Rate limit exceeded for {rule.pattern} by {key}")
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Rate limit exceeded. Please try again later."},
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+
+class QueryCountMiddleware:
+    """Middleware reporting the SQL statements of each request in response headers
+
+    Adds X-DB-Query-Count, X-DB-Query-Time-Ms and a Server-Timing "db" entry
+    (shown by the browser dev tools). The headers are sent before the body,
+    so statements run while a streaming response is sent are not included.
+    Statements of the group-commit buffers count for the request that started
+    the batch.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Initialize middleware
+
+        Args:
+            app: Wrapped ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Count the statements of the request and add the headers"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as stats:
+            async def send_with_headers(message) -> None:
+                if message["type"] == "http.response.start":
+                    milliseconds = f"{stats.seconds * 1000:.2f}"
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-query-count", str(stats.count).encode()),
+                        (b"x-db-query-time-ms", milliseconds.encode()),
+                        (b"server-timing", f'db;dur={milliseconds};desc="{stats.count} queries"'.encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_headers)
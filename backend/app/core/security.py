@@ -6,7 +6,7 @@ from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from passlib.context import CryptContext
 
-from ..db import get_db
+from ..db import get_read_db
 from ..crud.user import get_user_by_username
 from ..core.config import settings
 from ..schemas.token import Token
@@ -60,7 +60,7 @@ async def authenticate_user(db: AsyncSession, username: str, password: str):
         return False
     return user
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_read_db)):
     """
     Verify JWT token and return current user
     """
@@ -0,0 +1,307 @@
+"""
+Key/value state shared between worker processes.
+
+Used by the rate limiter (GCRA timestamps) and by application caches so that
+running uvicorn with several workers does not multiply limits or warm every
+cache once per process.
+
+Backends:
+- MemoryStateBackend: process-local, LRU bounded. Default for a single worker
+  and the local fake for tests (share one instance between several "workers").
+- SQLiteStateBackend: a WAL-mode SQLite file shared by all workers on a host,
+  every update runs in its own IMMEDIATE transaction.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SharedStateBackend(ABC):
+    """Interface for state shared between workers
+
+    Methods are synchronous and expected to be cheap (in-memory or a single
+    local SQLite transaction), so they can be called from the event loop.
+    """
+
+    @abstractmethod
+    def rate_limit(self, key: str, emission_interval: float, tolerance: float) -> float:
+        """
+        Atomically run one GCRA step for the given key
+
+        Args:
+            key: Bucket key
+            emission_interval: Seconds between two requests at the sustained rate
+            tolerance: How far the theoretical arrival time may run ahead of now
+
+        Returns:
+            0.0 if the request is allowed, otherwise seconds to wait before retrying
+        """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get a cached value
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Stored value or None if missing or expired
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        Store a cached value
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time to live in seconds, None to keep until evicted
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Remove a cached value
+
+        Args:
+            key: Cache key
+        """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of tracked entries"""
+
+
+class MemoryStateBackend(SharedStateBackend):
+    """Process-local backend with LRU/TTL eviction and a hard key cap
+
+    Rate limit buckets are stored as a single float (the theoretical arrival
+    time) per key, cache values as (value, expires_at) pairs.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        """
+        Initialize backend
+
+        Args:
+            max_keys: Hard cap on the number of rate limit keys and cache entries (each)
+        """
+        self.max_keys = max_keys
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self._values: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tats) + len(self._values)
+
+    def rate_limit(
+        self,
+        key: str,
+        emission_interval: float,
+        tolerance: float,
+        now: Optional[float] = None
+    ) -> float:
+        if now is None:
+            now = time.monotonic()
+
+        tats = self._tats
+        tat = tats.get(key)
+        if tat is None or tat < now:
+            tat = now
+
+        # Relative to now: now + interval - tolerance may round above now
+        wait = (tat - now) + emission_interval - tolerance
+        if wait > 0:
+            return wait
+
+        new_tat = tat + emission_interval
+        is_new = key not in tats
+        tats[key] = new_tat
+        tats.move_to_end(key)
+        if is_new:
+            self._evict(tats, now, lambda tat: tat)
+        return 0.0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._values[key]
+            return None
+        self._values.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        now = time.monotonic()
+        expires_at = now + ttl if ttl is not None else float("inf")
+        self._values[key] = (value, expires_at)
+        self._values.move_to_end(key)
+        self._evict(self._values, now, lambda entry: entry[1])
+
+    def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    def _evict(self, entries: OrderedDict, now: float, expires_at) -> None:
+        """Drop expired entries from the LRU end and enforce the key cap"""
+        # Entries past their expiry are indistinguishable from unknown keys (TTL)
+        while entries:
+            oldest_key, oldest = next(iter(entries.items()))
+            if expires_at(oldest) > now:
+                break
+            del entries[oldest_key]
+        # Hard memory cap: forget the least recently used entries
+        while len(entries) > self.max_keys:
+            entries.popitem(last=False)
+
+
+class SQLiteStateBackend(SharedStateBackend):
+    """Backend storing state in a WAL-mode SQLite file shared by all workers"""
+
+    # Purge expired rows every N writes
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str, busy_timeout_ms: int = 2000):
+        """
+        Initialize backend
+
+        Args:
+            path: Path to the SQLite file (created if missing)
+            busy_timeout_ms: How long to wait for another worker holding the write lock
+        """
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the connection lazily, and again after a fork"""
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS shared_state ("
+                " key TEXT PRIMARY KEY,"
+                " value,"
+                " expires_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _write(self, operation) -> Any:
+        """Run an operation inside an IMMEDIATE transaction"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = operation(conn)
+                self._writes += 1
+                if self._writes % self.PURGE_EVERY == 0:
+                    conn.execute("DELETE FROM shared_state WHERE expires_at <= ?", (time.time(),))
+                conn.execute("COMMIT")
+                return result
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT COUNT(*) FROM shared_state WHERE expires_at > ?", (time.time(),)
+            ).fetchone()
+        return row[0]
+
+    def rate_limit(self, key: str, emission_interval: float, tolerance: float) -> float:
+        def operation(conn: sqlite3.Connection) -> float:
+            # Wall clock, since monotonic clocks are not comparable across processes
+            now = time.time()
+            row = conn.execute("SELECT value FROM shared_state WHERE key = ?", (key,)).fetchone()
+            tat = row[0] if row is not None and row[0] > now else now
+
+            # Relative to now: now + interval - tolerance may round above now
+            wait = (tat - now) + emission_interval - tolerance
+            if wait > 0:
+                return wait
+
+            new_tat = tat + emission_interval
+
+            conn.execute(
+                "INSERT INTO shared_state (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                (key, new_tat, new_tat)
+            )
+            return 0.0
+
+        return self._write(operation)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM shared_state WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else float("inf")
+        self._write(lambda conn: conn.execute(
+            "INSERT INTO shared_state (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+            (key, value, expires_at)
+        ))
+
+    def delete(self, key: str) -> None:
+        self._write(lambda conn: conn.execute("DELETE FROM shared_state WHERE key = ?", (key,)))
+
+
+def create_state_backend(url: str, max_keys: int = 10000) -> SharedStateBackend:
+    """
+    Create a backend from a URL
+
+    Args:
+        url: "memory://" or "sqlite:///path/to/state.db"
+        max_keys: Key cap for the memory backend
+
+    Returns:
+        Configured backend
+
+    Raises:
+        ValueError: If the URL scheme is not supported
+    """
+    if url == "memory://":
+        return MemoryStateBackend(max_keys=max_keys)
+    if url.startswith("sqlite:///"):
+        return SQLiteStateBackend(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported shared state URL: {url}")
+
+
+_state_backend: Optional[SharedStateBackend] = None
+
+
+def get_state_backend() -> SharedStateBackend:
+    """Get the application-wide backend configured by SHARED_STATE_URL"""
+    global _state_backend
+    if _state_backend is None:
+        _state_backend = create_state_backend(settings.SHARED_STATE_URL, settings.SHARED_STATE_MAX_KEYS)
+        logger.info(f"Using shared state backend {type(_state_backend).__name__}")
+    return _state_backend
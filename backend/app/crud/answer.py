@@ -1,9 +1,11 @@
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import delete
 
 from ..models.answer import Answer
+from ..models.question import Question
+from ..models.quiz import Quiz
 from ..schemas.answer import AnswerCreate, AnswerUpdate, AnswerCreateOrUpdate
 
 async def create_answer(
@@ -144,6 +146,41 @@ async def check_answer(
     
     return is_correct, correct_answer.id
 
+async def get_answer_key(
+    db: AsyncSession,
+    quiz_id: int
+) -> Optional[Tuple[str, Dict[int, Dict[int, bool]]]]:
+    """
+    Get the answer key of a quiz with one query, without loading ORM objects
+    
+    Args:
+        db: Database session
+        quiz_id: ID of the quiz
+        
+    Returns:
+        Tuple (quiz status, {question_id: {answer_id: is_correct}}) or None if the quiz does not exist
+    """
+    query = (
+        select(Quiz.status, Question.id, Answer.id, Answer.is_correct)
+        .select_from(Quiz)
+        .outerjoin(Question, Question.quiz_id == Quiz.id)
+        .outerjoin(Answer, Answer.question_id == Question.id)
+        .where(Quiz.id == quiz_id)
+    )
+    result = await db.execute(query)
+    rows = result.all()
+    if not rows:
+        return None
+    
+    answer_key: Dict[int, Dict[int, bool]] = {}
+    for _, question_id, answer_id, is_correct in rows:
+        if question_id is None:
+            continue
+        answers = answer_key.setdefault(question_id, {})
+        if answer_id is not None:
+            answers[answer_id] = bool(is_correct)
+    return rows[0][0], answer_key
+
 async def update_answer(
     db: AsyncSession,
     *,
@@ -151,7 +188,10 @@ async def update_answer(
     answer_data: AnswerUpdate
 ) -> Optional[Answer]:
     """
-    Update an answer
+    Update an answer, without flushing
+    
+    An answer already in the session is updated without a query. The
+    change is written with the next flush, together with other updates.
     
     Args:
         db: Database session
@@ -161,14 +201,11 @@ async def update_answer(
     Returns:
         Updated answer object or None if not found
     """
-    query = select(Answer).where(Answer.id == answer_id)
-    result = await db.execute(query)
-    answer = result.scalars().first()
+    answer = await db.get(Answer, answer_id)
     
     if answer:
         answer.text = answer_data.text
         answer.is_correct = answer_data.is_correct
-        await db.flush()
         
     return answer
 
@@ -0,0 +1,187 @@
+from sqlalchemy import select, func, insert, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..db.raw_rows import fetch_tuples
+from ..models.answer_attempt import AnswerAttempt
+from ..models.question import Question
+from ..models.quiz import Quiz
+from ..models.result_history import ResultHistory
+
+
+async def create_attempts(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Append answer attempts, without committing
+    
+    Args:
+        db: Database session
+        rows: Dicts with user_id, quiz_id, question_id, answer_id and is_correct
+    """
+    await db.execute(insert(AnswerAttempt), rows)
+
+
+async def get_quiz_score(db: AsyncSession, user_id: int, quiz_id: int) -> Optional[Tuple[int, int, int]]:
+    """
+    Score a student's quiz from the recorded attempts with one aggregate query
+    
+    Only attempts checked after the student's previous submission of the quiz
+    count, and of those the first attempt per question: check-answer reveals
+    the correct answer, so re-checking a question until it is right must not
+    raise the score. The window starts above the last_attempt_id stored with
+    the previous result_history row (attempt ids, not timestamps, which only
+    have whole seconds), so a retake is scored on its own answers. Questions
+    without an attempt score 0.
+    
+    Args:
+        db: Database session
+        user_id: ID of the student
+        quiz_id: ID of the quiz
+        
+    Returns:
+        (score, max_score, last_attempt_id) tuple, last_attempt_id being the
+        highest attempt id of the student for the quiz (0 if none) to store
+        with the result, or None if the quiz does not exist
+    """
+    window_start = (
+        select(func.coalesce(func.max(ResultHistory.last_attempt_id), 0))
+        .where(ResultHistory.user_id == user_id, ResultHistory.quiz_id == quiz_id)
+        .scalar_subquery()
+    )
+    first_attempts = (
+        select(func.min(AnswerAttempt.id))
+        .where(
+            AnswerAttempt.user_id == user_id,
+            AnswerAttempt.quiz_id == quiz_id,
+            AnswerAttempt.id > window_start
+        )
+        .group_by(AnswerAttempt.question_id)
+    )
+    score = (
+        select(func.coalesce(func.sum(AnswerAttempt.is_correct), 0))
+        .where(AnswerAttempt.id.in_(first_attempts))
+        .scalar_subquery()
+    )
+    question_count = (
+        select(func.count(Question.id))
+        .where(Question.quiz_id == Quiz.id)
+        .scalar_subquery()
+    )
+    last_attempt_id = (
+        select(func.coalesce(func.max(AnswerAttempt.id), 0))
+        .where(AnswerAttempt.user_id == user_id, AnswerAttempt.quiz_id == quiz_id)
+        .scalar_subquery()
+    )
+    query = select(score, question_count, last_attempt_id).where(Quiz.id == quiz_id)
+    
+    result = await db.execute(query)
+    row = result.first()
+    return (row[0], row[1], row[2]) if row is not None else None
+
+
+async def get_last_attempt_ids(db: AsyncSession, pairs: List[Tuple[int, int]]) -> Dict[Tuple[int, int], int]:
+    """
+    Find the highest attempt id of each student and quiz
+    
+    Args:
+        db: Database session
+        pairs: (user_id, quiz_id) tuples
+        
+    Returns:
+        {(user_id, quiz_id): highest attempt id}, pairs without attempts are missing
+    """
+    if not pairs:
+        return {}
+    query = (
+        select(AnswerAttempt.user_id, AnswerAttempt.quiz_id, func.max(AnswerAttempt.id))
+        .where(tuple_(AnswerAttempt.user_id, AnswerAttempt.quiz_id).in_(pairs))
+        .group_by(AnswerAttempt.user_id, AnswerAttempt.quiz_id)
+    )
+    result = await db.execute(query)
+    return {(user_id, quiz_id): max_id for user_id, quiz_id, max_id in result.all()}
+
+
+async def has_attempt(db: AsyncSession, user_id: int, quiz_id: int, question_id: int, answer_id: int) -> bool:
+    """
+    Check whether a student has selected an answer to a question
+    
+    Args:
+        db: Database session
+        user_id: ID of the student
+        quiz_id: ID of the quiz
+        question_id: ID of the question
+        answer_id: ID of the selected answer
+        
+    Returns:
+        True if at least one such attempt is recorded
+    """
+    query = select(
+        select(AnswerAttempt.id)
+        .where(
+            AnswerAttempt.user_id == user_id,
+            AnswerAttempt.quiz_id == quiz_id,
+            AnswerAttempt.question_id == question_id,
+            AnswerAttempt.answer_id == answer_id
+        )
+        .exists()
+    )
+    result = await db.execute(query)
+    return bool(result.scalar())
+
+
+
+async def get_attempt_watermark(db: AsyncSession, quiz_id: int) -> Tuple[int, int]:
+    """
+    Count the attempts of a quiz and find the newest one
+    
+    Args:
+        db: Database session
+        quiz_id: ID of the quiz
+        
+    Returns:
+        (attempt count, highest attempt id or 0)
+    """
+    # Separate subqueries: SQLite answers a lone max() with one index seek
+    count = select(func.count()).where(AnswerAttempt.quiz_id == quiz_id).scalar_subquery()
+    max_id = select(func.max(AnswerAttempt.id)).where(AnswerAttempt.quiz_id == quiz_id).scalar_subquery()
+    result = await db.execute(select(count, func.coalesce(max_id, 0)))
+    count, max_id = result.one()
+    return count, max_id
+
+
+async def get_attempt_columns(
+    db: AsyncSession,
+    quiz_id: int,
+    after_id: int = 0,
+    up_to_id: Optional[int] = None
+) -> List[Tuple[int, int, int, int, int]]:
+    """
+    Read the attempts of a quiz as plain tuples, oldest first
+    
+    Used to load the attempt matrix in one read. Rows come straight from the
+    DBAPI cursor: building a Row object per attempt costs more than the
+    query itself for quizzes with 100k attempts.
+    
+    Args:
+        db: Database session
+        quiz_id: ID of the quiz
+        after_id: Only return attempts with a higher id (incremental reads)
+        up_to_id: Only return attempts up to this id, None for no limit
+        
+    Returns:
+        (id, user_id, question_id, answer_id or -1 if deleted, is_correct) tuples
+    """
+    query = (
+        select(
+            AnswerAttempt.id,
+            AnswerAttempt.user_id,
+            AnswerAttempt.question_id,
+            func.coalesce(AnswerAttempt.answer_id, -1),
+            AnswerAttempt.is_correct
+        )
+        .where(AnswerAttempt.quiz_id == quiz_id, AnswerAttempt.id > after_id)
+        .order_by(AnswerAttempt.id)
+    )
+    if up_to_id is not None:
+        query = query.where(AnswerAttempt.id <= up_to_id)
+    
+    return await fetch_tuples(db, query)
@@ -0,0 +1,125 @@
+import json
+import re
+import unicodedata
+from datetime import datetime, timezone
+from sqlalchemy import select, delete, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..models.generation_cache import GenerationCache
+
+
+def _now() -> datetime:
+    """Naive UTC time with microseconds; func.now() on SQLite only has whole seconds"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def normalize_topic(topic: str) -> str:
+    """
+    Normalize a quiz topic for cache lookups
+    
+    Unicode is normalized (NFKC) and lowercased, punctuation dropped and
+    whitespace collapsed, so "Ułamki", " ułamki " and "Ułamki!" share an
+    entry. Diacritics are kept: they distinguish Polish words.
+    
+    Args:
+        topic: Topic as entered by the admin
+        
+    Returns:
+        Cache key of the topic
+    """
+    text = unicodedata.normalize("NFKC", topic).lower()
+    return " ".join(re.findall(r"[^\W_]+", text))
+
+
+async def get_cached_generation(
+    db: AsyncSession,
+    topic_key: str,
+    level_id: int,
+    question_count: int
+) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Look up a cached generation and mark it as used, without committing
+    
+    Args:
+        db: Database session
+        topic_key: Normalized topic (see normalize_topic)
+        level_id: ID of the level
+        question_count: Number of questions
+        
+    Returns:
+        (title, questions_data) tuple, or None on a cache miss
+    """
+    result = await db.execute(
+        update(GenerationCache)
+        .where(
+            GenerationCache.topic_key == topic_key,
+            GenerationCache.level_id == level_id,
+            GenerationCache.question_count == question_count
+        )
+        .values(hit_count=GenerationCache.hit_count + 1, last_used_at=_now())
+        .returning(GenerationCache.title, GenerationCache.questions_data)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return row.title, json.loads(row.questions_data)
+
+
+async def store_generation(
+    db: AsyncSession,
+    topic_key: str,
+    level_id: int,
+    question_count: int,
+    title: str,
+    questions_data: List[Dict[str, Any]],
+    max_entries: Optional[int] = None
+) -> None:
+    """
+    Store a generation, replacing an older one for the same key, and evict
+    the least recently used entries beyond max_entries, without committing
+    
+    Args:
+        db: Database session
+        topic_key: Normalized topic (see normalize_topic)
+        level_id: ID of the level
+        question_count: Number of questions
+        title: Generated title
+        questions_data: Validated questions with answers
+        max_entries: Cache size, defaults to settings.GENERATION_CACHE_MAX_ENTRIES
+    """
+    payload = json.dumps(questions_data, ensure_ascii=False)
+    now = _now()
+    statement = sqlite_insert(GenerationCache).values(
+        topic_key=topic_key,
+        level_id=level_id,
+        question_count=question_count,
+        title=title,
+        questions_data=payload,
+        created_at=now,
+        last_used_at=now
+    )
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=["topic_key", "level_id", "question_count"],
+        set_={
+            "title": statement.excluded.title,
+            "questions_data": statement.excluded.questions_data,
+            "hit_count": 0,
+            "created_at": statement.excluded.created_at,
+            "last_used_at": statement.excluded.last_used_at,
+        }
+    ))
+    
+    # Keep the max_entries most recently used entries
+    kept = (
+        select(GenerationCache.id)
+        .order_by(GenerationCache.last_used_at.desc(), GenerationCache.id.desc())
+        .limit(max_entries or settings.GENERATION_CACHE_MAX_ENTRIES)
+    )
+    await db.execute(
+        delete(GenerationCache)
+        .where(GenerationCache.id.not_in(kept))
+        .execution_options(synchronize_session=False)
+    )
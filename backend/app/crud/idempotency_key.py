@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, update, and_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from ..models.idempotency_key import IdempotencyKey
+
+
+async def claim_key(
+    db: AsyncSession,
+    user_id: int,
+    key: str,
+    endpoint: str,
+    request_hash: str,
+    now: datetime,
+    lock_timeout: float
+) -> bool:
+    """
+    Claim an idempotency key for a new request, without committing
+    
+    A new key is inserted as in progress. An existing key is only taken over
+    if its request has been in progress longer than lock_timeout (the
+    process running it died); expired keys are removed with purge_keys.
+    
+    Args:
+        db: Write session
+        user_id: ID of the user sending the request
+        key: Idempotency-Key header value
+        endpoint: Method and route of the request
+        request_hash: Fingerprint of the request
+        now: Current time (naive UTC)
+        lock_timeout: Seconds after which an in-progress claim is abandoned
+        
+    Returns:
+        True if the caller owns the key and must do the work
+    """
+    values = {
+        "user_id": user_id,
+        "key": key,
+        "endpoint": endpoint,
+        "request_hash": request_hash,
+        "status": "in_progress",
+        "response_body": None,
+        "created_at": now,
+    }
+    statement = sqlite_insert(IdempotencyKey).values(**values)
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id", "key"],
+        set_={column: getattr(statement.excluded, column) for column in values if column not in ("user_id", "key")},
+        where=and_(
+            IdempotencyKey.status == "in_progress",
+            IdempotencyKey.created_at < now - timedelta(seconds=lock_timeout)
+        )
+    ).returning(IdempotencyKey.id)
+    result = await db.execute(statement)
+    return result.first() is not None
+
+
+async def get_key(db: AsyncSession, user_id: int, key: str) -> Optional[IdempotencyKey]:
+    """
+    Get an idempotency key
+    
+    Args:
+        db: Database session
+        user_id: ID of the user
+        key: Idempotency-Key header value
+        
+    Returns:
+        The key or None if it does not exist
+    """
+    result = await db.execute(
+        select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+    )
+    return result.scalars().first()
+
+
+async def complete_key(db: AsyncSession, user_id: int, key: str, response_body: str) -> None:
+    """
+    Store the response of a finished request, without committing
+    
+    Args:
+        db: Write session
+        user_id: ID of the user
+        key: Idempotency-Key header value
+        response_body: JSON response
+    """
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .values(status="completed", response_body=response_body)
+    )
+
+
+async def release_key(db: AsyncSession, user_id: int, key: str) -> None:
+    """
+    Drop an in-progress key after its request failed, without committing
+    
+    Args:
+        db: Write session
+        user_id: ID of the user
+        key: Idempotency-Key header value
+    """
+    await db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status == "in_progress"
+        )
+    )
+
+
+async def purge_keys(db: AsyncSession, before: datetime) -> int:
+    """
+    Delete keys created before a point in time, without committing
+    
+    Args:
+        db: Write session
+        before: Cutoff (naive UTC)
+        
+    Returns:
+        Number of keys deleted
+    """
+    result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < before))
+    return result.rowcount
@@ -1,7 +1,7 @@
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import delete
+from sqlalchemy import delete, inspect
 from sqlalchemy.orm import selectinload
 
 from ..models.question import Question
@@ -89,6 +89,32 @@ async def get_questions_by_quiz(
     result = await db.execute(query)
     return result.scalars().all()
 
+async def get_questions_by_quizzes(
+    db: AsyncSession,
+    quiz_ids: List[int]
+) -> List[Question]:
+    """
+    Get all questions of several quizzes
+    
+    Args:
+        db: Database session
+        quiz_ids: IDs of the quizzes
+        
+    Returns:
+        List of question objects with answers, ordered by quiz ID and question ID
+    """
+    if not quiz_ids:
+        return []
+    query = (
+        select(Question)
+        .options(selectinload(Question.answers))
+        .where(Question.quiz_id.in_(quiz_ids))
+        .order_by(Question.quiz_id, Question.id)
+    )
+    
+    result = await db.execute(query)
+    return result.scalars().all()
+
 async def update_question(
     db: AsyncSession,
     *,
@@ -96,7 +122,13 @@ async def update_question(
     question_data: QuestionUpdate
 ) -> Optional[Question]:
     """
-    Update a question and its answers
+    Update a question and its answers, without flushing
+    
+    A question already in the session (e.g. loaded with its answers by
+    get_questions_by_quiz) is updated without any query; otherwise the
+    question and its answers take one query each. The changes are written
+    with the next flush, so the updates of several questions are sent as one
+    executemany per table.
     
     Args:
         db: Database session
@@ -106,9 +138,7 @@ async def update_question(
     Returns:
         Updated question object or None if not found
     """
-    query = select(Question).where(Question.id == question_id)
-    result = await db.execute(query)
-    question = result.scalars().first()
+    question = await db.get(Question, question_id)
     
     if not question:
         return None
@@ -116,22 +146,20 @@ async def update_question(
     # Update question
     question.text = question_data.text
     
-    # Update answers
+    # Update answers, matched by ID among the answers of this question
+    if "answers" in inspect(question).unloaded:
+        answer_query = select(Answer).where(Answer.question_id == question_id)
+        answers = (await db.execute(answer_query)).scalars().all()
+    else:
+        answers = question.answers
+    answers_by_id = {answer.id: answer for answer in answers}
     for answer_data in question_data.answers:
-        # Find answer by ID
-        answer_query = select(Answer).where(
-            Answer.id == answer_data.id,
-            Answer.question_id == question_id
-        )
-        answer_result = await db.execute(answer_query)
-        answer = answer_result.scalars().first()
-        
+        answer = answers_by_id.get(answer_data.id)
         if answer:
             # Update existing answer
             answer.text = answer_data.text
             answer.is_correct = answer_data.is_correct
     
-    await db.flush()
     return question
 
 async def delete_question(
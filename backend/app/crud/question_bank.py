@@ -0,0 +1,125 @@
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Iterable, List, Sequence, Tuple
+
+from ..models.answer import Answer
+from ..models.question import Question
+from ..models.question_bank import QuestionBucket, QuestionFingerprint
+from ..models.quiz import Quiz
+
+
+async def get_unindexed_questions(db: AsyncSession, limit: int) -> List[Tuple[int, str, str, int]]:
+    """
+    Get questions of published quizzes that have no fingerprint yet
+
+    Args:
+        db: Database session
+        limit: Maximum number of questions
+
+    Returns:
+        (question_id, question text, answer text, is_correct) rows, ordered by
+        question ID; a question has one row per answer (answer columns are
+        None for a question without answers)
+    """
+    missing = (
+        select(Question.id)
+        .join(Quiz, Quiz.id == Question.quiz_id)
+        .outerjoin(QuestionFingerprint, QuestionFingerprint.question_id == Question.id)
+        .where(Quiz.status == "published", QuestionFingerprint.question_id.is_(None))
+        .order_by(Question.id)
+        .limit(limit)
+        .subquery()
+    )
+    query = (
+        select(Question.id, Question.text, Answer.text, Answer.is_correct)
+        .join(missing, missing.c.id == Question.id)
+        .outerjoin(Answer, Answer.question_id == Question.id)
+        .order_by(Question.id, Answer.id)
+    )
+    result = await db.execute(query)
+    return result.tuples().all()
+
+
+async def add_fingerprints(db: AsyncSession, fingerprints: Iterable[Tuple[int, bytes, Sequence[int]]]) -> None:
+    """
+    Store question fingerprints with their LSH buckets, without committing
+
+    Args:
+        db: Database session
+        fingerprints: (question_id, signature, buckets) tuples
+    """
+    fingerprint_rows = []
+    bucket_rows = []
+    for question_id, signature, buckets in fingerprints:
+        fingerprint_rows.append({"question_id": question_id, "signature": signature})
+        bucket_rows.extend({"bucket": bucket, "question_id": question_id} for bucket in set(buckets))
+    if not fingerprint_rows:
+        return
+
+    connection = await db.connection()
+    await connection.execute(insert(QuestionFingerprint.__table__), fingerprint_rows)
+    await connection.execute(insert(QuestionBucket.__table__), bucket_rows)
+
+
+async def get_bucket_members(db: AsyncSession, buckets: Sequence[int]) -> List[Tuple[int, int]]:
+    """
+    Get the questions in LSH buckets
+
+    Args:
+        db: Database session
+        buckets: Bucket keys
+
+    Returns:
+        (bucket, question_id) rows
+    """
+    if not buckets:
+        return []
+    query = select(QuestionBucket.bucket, QuestionBucket.question_id).where(QuestionBucket.bucket.in_(buckets))
+    result = await db.execute(query)
+    return result.tuples().all()
+
+
+async def get_fingerprints(db: AsyncSession, question_ids: Sequence[int]) -> List[Tuple[int, bytes]]:
+    """
+    Get the signatures of questions
+
+    Args:
+        db: Database session
+        question_ids: IDs of the questions
+
+    Returns:
+        (question_id, signature) rows of the questions that have a fingerprint
+    """
+    if not question_ids:
+        return []
+    query = select(QuestionFingerprint.question_id, QuestionFingerprint.signature).where(
+        QuestionFingerprint.question_id.in_(question_ids)
+    )
+    result = await db.execute(query)
+    return result.tuples().all()
+
+
+async def get_bank_questions(db: AsyncSession, question_ids: Sequence[int]) -> List[Question]:
+    """
+    Get questions of published quizzes with their answers
+
+    Args:
+        db: Database session
+        question_ids: IDs of the questions
+
+    Returns:
+        Questions found, in the order of question_ids; questions of draft
+        quizzes are left out
+    """
+    if not question_ids:
+        return []
+    query = (
+        select(Question)
+        .options(selectinload(Question.answers))
+        .join(Quiz, Quiz.id == Question.quiz_id)
+        .where(Question.id.in_(question_ids), Quiz.status == "published")
+    )
+    result = await db.execute(query)
+    by_id = {question.id: question for question in result.scalars().all()}
+    return [by_id[question_id] for question_id in question_ids if question_id in by_id]
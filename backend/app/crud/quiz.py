@@ -1,10 +1,14 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 
+from ..db.raw_rows import fetch_tuples
 from ..models.quiz import Quiz
 from ..models.question import Question
+from ..models.answer import Answer
+from ..models.level import Level
 from ..schemas.quiz import QuizCreate
 
 async def create_quiz(
@@ -142,4 +146,96 @@ async def remove_quiz(db: AsyncSession, quiz_id: int) -> Optional[Quiz]:
         await db.flush()
         await db.commit()
         
-    return quiz 
\ No newline at end of file
+    return quiz
+
+async def get_quiz_tree_batch(
+    db: AsyncSession,
+    *,
+    after_id: int = 0,
+    limit: int = 500,
+    status: Optional[str] = None
+) -> List[Tuple]:
+    """
+    Get the next batch of quizzes with their questions and answers as flat rows
+    
+    Keyset pagination on quizzes.id; the questions and answers of the whole
+    batch are read in the same query. Rows come straight from the DBAPI
+    cursor, a batch holds thousands of answer rows.
+    
+    Args:
+        db: Database session
+        after_id: Only return quizzes with a higher id
+        limit: Maximum number of quizzes in the batch
+        status: Filter by status
+        
+    Returns:
+        (quiz_id, title, status, level_code, question_id, question_text, answer_text, is_correct)
+        tuples ordered by quiz, question and answer id
+    """
+    quiz_ids = select(Quiz.id).where(Quiz.id > after_id)
+    if status is not None:
+        quiz_ids = quiz_ids.where(Quiz.status == status)
+    quiz_ids = quiz_ids.order_by(Quiz.id).limit(limit)
+    
+    query = (
+        select(
+            Quiz.id, Quiz.title, Quiz.status, Level.code,
+            Question.id, Question.text, Answer.text, Answer.is_correct
+        )
+        .join(Level, Level.id == Quiz.level_id)
+        .outerjoin(Question, Question.quiz_id == Quiz.id)
+        .outerjoin(Answer, Answer.question_id == Question.id)
+        .where(Quiz.id.in_(quiz_ids.scalar_subquery()))
+        .order_by(Quiz.id, Question.id, Answer.id)
+    )
+    
+    return await fetch_tuples(db, query)
+
+async def bulk_create_quizzes(
+    db: AsyncSession,
+    quizzes: List[Dict[str, Any]]
+) -> List[int]:
+    """
+    Insert quizzes with their questions and answers in three bulk statements, without committing
+    
+    The statements run on the session's connection as Core multi-row inserts
+    (the ORM bulk path sends every row separately). RETURNING does not keep
+    the parameter order on SQLite, but new rowids grow with every inserted
+    row, so the sorted IDs are in input order.
+    
+    Args:
+        db: Database session
+        quizzes: Dicts with title, level_id, creator_id, status and
+            questions ([{"text": ..., "answers": [{"text": ..., "is_correct": ...}]}])
+        
+    Returns:
+        IDs of the created quizzes, in input order
+    """
+    if not quizzes:
+        return []
+    
+    connection = await db.connection()
+    quiz_ids = sorted((await connection.execute(
+        insert(Quiz.__table__).returning(Quiz.__table__.c.id),
+        [
+            {key: quiz[key] for key in ("title", "level_id", "creator_id", "status")}
+            for quiz in quizzes
+        ]
+    )).scalars())
+    
+    questions = [
+        (question, quiz_id)
+        for quiz, quiz_id in zip(quizzes, quiz_ids)
+        for question in quiz["questions"]
+    ]
+    question_ids = sorted((await connection.execute(
+        insert(Question.__table__).returning(Question.__table__.c.id),
+        [{"text": question["text"], "quiz_id": quiz_id} for question, quiz_id in questions]
+    )).scalars())
+    
+    await connection.execute(insert(Answer.__table__), [
+        {"text": answer["text"], "is_correct": int(answer["is_correct"]), "question_id": question_id}
+        for (question, _), question_id in zip(questions, question_ids)
+        for answer in question["answers"]
+    ])
+    return quiz_ids
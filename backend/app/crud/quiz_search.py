@@ -0,0 +1,74 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+
+from ..config import settings
+from ..models.quiz import Quiz
+from ..models.quiz_search import quiz_search, quiz_search_table
+
+
+async def search_quizzes(
+    db: AsyncSession,
+    expression: str,
+    *,
+    status: Optional[str] = None,
+    level_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 20,
+    max_matches: Optional[int] = None
+) -> List[Tuple[Quiz, float, int, str]]:
+    """
+    Find quizzes whose title, questions or answers match an FTS5 expression
+
+    Index rows are ranked with bm25 (titles weighted highest) and grouped
+    per quiz; a quiz ranks by its best matching row. SQLite returns the
+    rowid and text of the row holding the min() aggregate, so snippets need
+    no second query.
+
+    Only the newest max_matches index rows are ranked. FTS5 reads the rowids
+    of a term cheaply, but computing bm25 per row dominates for words found
+    in a large part of the bank; selective queries are not affected.
+
+    Args:
+        db: Database session
+        expression: FTS5 MATCH expression
+        status: Filter by quiz status
+        level_id: Filter by level
+        skip: Number of quizzes to skip
+        limit: Maximum number of quizzes to return
+        max_matches: Index rows to rank, defaults to settings.SEARCH_MAX_MATCHES
+
+    Returns:
+        (quiz, score, rowid, text) tuples of the best matching index row per
+        quiz, best first; lower scores are better
+    """
+    matches = (
+        select(
+            quiz_search.c.quiz_id,
+            quiz_search.c.rank,
+            quiz_search.c.rowid,
+            func.coalesce(quiz_search.c.title, quiz_search.c.question, quiz_search.c.answer).label("text")
+        )
+        .where(quiz_search_table.op("MATCH")(expression))
+        .order_by(quiz_search.c.rowid.desc())
+        .limit(max_matches or settings.SEARCH_MAX_MATCHES)
+        .subquery()
+    )
+    hits = (
+        select(matches.c.quiz_id, func.min(matches.c.rank).label("score"), matches.c.rowid, matches.c.text)
+        .group_by(matches.c.quiz_id)
+        .subquery()
+    )
+    query = (
+        select(Quiz, hits.c.score, hits.c.rowid, hits.c.text)
+        .join(hits, hits.c.quiz_id == Quiz.id)
+        .order_by(hits.c.score, Quiz.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    if status is not None:
+        query = query.where(Quiz.status == status)
+    if level_id is not None:
+        query = query.where(Quiz.level_id == level_id)
+    result = await db.execute(query)
+    return result.tuples().all()
@@ -0,0 +1,160 @@
+from sqlalchemy import select, func, delete, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+
+from ..models.quiz import Quiz
+from ..models.quiz_stats import QuizStats, HISTOGRAM_BUCKETS
+from ..models.result import Result
+from ..models.result_history import ResultHistory
+
+COUNTER_COLUMNS = ["attempt_count", "score_sum", "score_sq_sum", "max_score_sum"] + [
+    f"bucket_{i}" for i in range(HISTOGRAM_BUCKETS)
+]
+
+
+def score_bucket(score: int, max_score: int) -> int:
+    """
+    Histogram bucket of a score
+    
+    Args:
+        score: Achieved score
+        max_score: Maximum score
+        
+    Returns:
+        Bucket index, a full score falls into the last bucket and a result
+        without a maximum score into the first
+    """
+    if max_score <= 0:
+        return 0
+    return min(score * HISTOGRAM_BUCKETS // max_score, HISTOGRAM_BUCKETS - 1)
+
+
+async def add_results(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Add submitted results to the running quiz statistics, without committing
+    
+    The rows are aggregated per quiz and merged with one
+    INSERT ... ON CONFLICT(quiz_id) DO UPDATE SET column = column + excluded.column.
+    
+    Args:
+        db: Database session
+        rows: Dicts with quiz_id, score and max_score
+    """
+    deltas: Dict[int, Dict[str, int]] = {}
+    for row in rows:
+        delta = deltas.setdefault(row["quiz_id"], dict.fromkeys(COUNTER_COLUMNS, 0))
+        delta["attempt_count"] += 1
+        delta["score_sum"] += row["score"]
+        delta["score_sq_sum"] += row["score"] * row["score"]
+        delta["max_score_sum"] += row["max_score"]
+        delta[f"bucket_{score_bucket(row['score'], row['max_score'])}"] += 1
+    
+    if not deltas:
+        return
+    
+    statement = sqlite_insert(QuizStats).values([
+        {"quiz_id": quiz_id, **delta} for quiz_id, delta in deltas.items()
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[QuizStats.quiz_id],
+        set_={
+            **{
+                column: getattr(QuizStats, column) + getattr(statement.excluded, column)
+                for column in COUNTER_COLUMNS
+            },
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(statement)
+
+
+async def get_quiz_stats(db: AsyncSession, quiz_id: int) -> Optional[QuizStats]:
+    """
+    Get the statistics of a quiz with a single primary key lookup
+    
+    Args:
+        db: Database session
+        quiz_id: ID of the quiz
+        
+    Returns:
+        QuizStats (empty if no result was submitted yet), None if the quiz does not exist
+    """
+    query = (
+        select(Quiz.id, QuizStats)
+        .outerjoin(QuizStats, QuizStats.quiz_id == Quiz.id)
+        .where(Quiz.id == quiz_id)
+    )
+    row = (await db.execute(query)).first()
+    if row is None:
+        return None
+    if row.QuizStats is None:
+        return QuizStats(quiz_id=quiz_id, **dict.fromkeys(COUNTER_COLUMNS, 0))
+    return row.QuizStats
+
+
+async def backfill_history(db: AsyncSession) -> int:
+    """
+    Copy results that predate result_history into it, without committing
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Number of copied results
+    """
+    missing = (
+        select(Result.user_id, Result.quiz_id, Result.score, Result.max_score, Result.created_at)
+        .where(
+            ~select(ResultHistory.id)
+            .where(ResultHistory.user_id == Result.user_id, ResultHistory.quiz_id == Result.quiz_id)
+            .exists()
+        )
+        .order_by(Result.id)
+    )
+    statement = sqlite_insert(ResultHistory).from_select(
+        ["user_id", "quiz_id", "score", "max_score", "created_at"], missing
+    )
+    result = await db.execute(statement)
+    return result.rowcount
+
+
+async def rebuild(db: AsyncSession, quiz_id: Optional[int] = None) -> int:
+    """
+    Recompute quiz statistics from result_history, without committing
+    
+    Args:
+        db: Database session
+        quiz_id: Rebuild only this quiz, all quizzes if None
+        
+    Returns:
+        Number of quizzes with statistics
+    """
+    # Same buckets as score_bucket()
+    bucket = case(
+        (
+            ResultHistory.max_score > 0,
+            func.min(ResultHistory.score * HISTOGRAM_BUCKETS // ResultHistory.max_score, HISTOGRAM_BUCKETS - 1),
+        ),
+        else_=0,
+    )
+    aggregate = select(
+        ResultHistory.quiz_id,
+        func.count(),
+        func.sum(ResultHistory.score),
+        func.sum(ResultHistory.score * ResultHistory.score),
+        func.sum(ResultHistory.max_score),
+        *(func.sum(case((bucket == i, 1), else_=0)) for i in range(HISTOGRAM_BUCKETS)),
+        func.now(),
+    ).group_by(ResultHistory.quiz_id)
+    
+    clear = delete(QuizStats)
+    if quiz_id is not None:
+        aggregate = aggregate.where(ResultHistory.quiz_id == quiz_id)
+        clear = clear.where(QuizStats.quiz_id == quiz_id)
+    
+    await db.execute(clear)
+    result = await db.execute(
+        sqlite_insert(QuizStats).from_select(["quiz_id", *COUNTER_COLUMNS, "updated_at"], aggregate)
+    )
+    return result.rowcount
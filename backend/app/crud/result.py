@@ -1,9 +1,14 @@
-from sqlalchemy import select
+from sqlalchemy import select, func, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
+from ..models.level import Level
+from ..models.quiz import Quiz
 from ..models.result import Result
-from ..schemas.result import ResultCreate
+from ..models.user import User
+from ..models.result_history import ResultHistory
 
 
 async def get_by_user_and_quiz(db: AsyncSession, user_id: int, quiz_id: int) -> Optional[Result]:
@@ -26,55 +31,132 @@ async def get_by_user_and_quiz(db: AsyncSession, user_id: int, quiz_id: int) ->
     return result.scalar_one_or_none()
 
 
-async def create_with_owner(
-    db: AsyncSession, 
-    obj_in: ResultCreate, 
-    user_id: int, 
-    quiz_id: int
-) -> Result:
+async def upsert_many(db: AsyncSession, rows: List[Dict[str, Any]]) -> List[Result]:
     """
-    Create a new result with owner
+    Insert or update many results in one statement, without committing
+    
+    Uses INSERT ... ON CONFLICT(user_id, quiz_id) DO UPDATE, so each student
+    keeps a single result per quiz. This is the "last result" projection of
+    result_history; call append_history in the same transaction.
+    
+    Args:
+        db: Database session
+        rows: Dicts with user_id, quiz_id, score and max_score, at most one per (user_id, quiz_id)
+        
+    Returns:
+        Stored results (in no particular order)
+    """
+    statement = sqlite_insert(Result).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[Result.user_id, Result.quiz_id],
+        set_={
+            "score": statement.excluded.score,
+            "max_score": statement.excluded.max_score,
+            "updated_at": func.now(),
+        },
+    )
+    result = await db.scalars(
+        statement.returning(Result),
+        execution_options={"populate_existing": True}
+    )
+    return list(result.all())
+
+
+async def append_history(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Append submitted results to the history, without committing
+    
+    Args:
+        db: Database session
+        rows: Dicts with user_id, quiz_id, score and max_score, in submission order
+    """
+    await db.execute(insert(ResultHistory), rows)
+
+
+async def get_history(
+    db: AsyncSession,
+    user_id: int,
+    quiz_id: int,
+    limit: int = 50
+) -> List[ResultHistory]:
+    """
+    Get a student's results for a quiz, newest first
     
     Args:
         db: Database session
-        obj_in: Result data
         user_id: ID of the user
         quiz_id: ID of the quiz
+        limit: Maximum number of rows to return
         
     Returns:
-        Created result
+        List of ResultHistory objects
     """
-    result = Result(
-        score=obj_in.score,
-        max_score=obj_in.max_score,
-        user_id=user_id,
-        quiz_id=quiz_id
+    query = (
+        select(ResultHistory)
+        .where(ResultHistory.user_id == user_id, ResultHistory.quiz_id == quiz_id)
+        .order_by(ResultHistory.id.desc())
+        .limit(limit)
     )
-    db.add(result)
-    await db.commit()
-    await db.refresh(result)
-    return result
+    result = await db.execute(query)
+    return list(result.scalars().all())
 
 
-async def update(
-    db: AsyncSession, 
-    db_obj: Result, 
-    obj_in: ResultCreate
-) -> Result:
+async def get_export_batch(
+    db: AsyncSession,
+    after_id: int = 0,
+    limit: int = 1000,
+    level_id: Optional[int] = None,
+    quiz_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> List[Tuple]:
     """
-    Update a result
+    Get the next batch of results for an export, joined with users, quizzes and levels
+    
+    Keyset pagination on results.id: every batch is a range seek on the
+    primary key, so the cost per batch stays the same however deep the export is.
     
     Args:
         db: Database session
-        db_obj: Existing result object
-        obj_in: Updated result data
+        after_id: Only return results with a higher id
+        limit: Maximum number of rows to return
+        level_id: Filter by quiz level
+        quiz_id: Filter by quiz
+        date_from: Only results submitted at or after this time
+        date_to: Only results submitted before this time
         
     Returns:
-        Updated result
+        (id, user_id, username, quiz_id, quiz_title, level_code, score, max_score, submitted_at)
+        tuples ordered by id
     """
-    db_obj.score = obj_in.score
-    db_obj.max_score = obj_in.max_score
+    query = (
+        select(
+            Result.id,
+            Result.user_id,
+            User.username,
+            Result.quiz_id,
+            Quiz.title,
+            Level.code,
+            Result.score,
+            Result.max_score,
+            Result.updated_at
+        )
+        .join(User, User.id == Result.user_id)
+        .join(Quiz, Quiz.id == Result.quiz_id)
+        .join(Level, Level.id == Quiz.level_id)
+        .where(Result.id > after_id)
+        .order_by(Result.id)
+        .limit(limit)
+    )
+    if level_id is not None:
+        query = query.where(Quiz.level_id == level_id)
+    if quiz_id is not None:
+        query = query.where(Result.quiz_id == quiz_id)
+    if date_from is not None:
+        query = query.where(Result.updated_at >= date_from)
+    if date_to is not None:
+        query = query.where(Result.updated_at < date_to)
     
-    await db.commit()
-    await db.refresh(db_obj)
-    return db_obj 
\ No newline at end of file
+    result = await db.execute(query)
+    return result.tuples().all()
+
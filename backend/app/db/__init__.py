@@ -1,23 +1,143 @@
 # DB package for database setup and session management
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 from app.models import Base
+from app.db.query_counter import QueryStats, count_queries
+from app.db.raw_rows import fetch_tuples
 from sqlalchemy import event
 
-# NOTE: DATABASE_URL must use an async driver, e.g., 'sqlite+aiosqlite:///...'
-engine = create_async_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # SQLite specific - needed for FastAPI
-)
+logger = logging.getLogger(__name__)
+
+# Values SQLite reports back for the symbolic pragma settings
+_PRAGMA_CODES = {
+    "synchronous": {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3},
+    "temp_store": {"DEFAULT": 0, "FILE": 1, "MEMORY": 2},
+}
+
+# Order matters: busy_timeout first so switching the journal mode can wait for locks
+_PRAGMA_ORDER = ["busy_timeout", "journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store"]
+
+
+def get_sqlite_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get a SQLite performance profile by name
+
+    Args:
+        name: Profile name, defaults to settings.SQLITE_PROFILE
+
+    Returns:
+        Mapping of pragma name to value
+
+    Raises:
+        ValueError: If the profile does not exist
+    """
+    name = name or settings.SQLITE_PROFILE
+    if name not in settings.SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile: {name}")
+    return settings.SQLITE_PROFILES[name]
+
 
-@event.listens_for(engine.sync_engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
+def apply_sqlite_profile(dbapi_connection, profile: Dict[str, Any]) -> None:
+    """
+    Apply foreign key enforcement and the profile pragmas to a DBAPI connection
+
+    Args:
+        dbapi_connection: Raw DBAPI connection (sqlite3 or the aiosqlite adapter)
+        profile: Mapping of pragma name to value
+    """
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
+    for pragma in _PRAGMA_ORDER:
+        if pragma in profile:
+            cursor.execute(f"PRAGMA {pragma}={profile[pragma]}")
     cursor.close()
 
+
+def check_sqlite_profile(applied: Dict[str, Any], profile: Dict[str, Any], in_memory: bool = False) -> List[str]:
+    """
+    Compare pragma values read back from SQLite with the expected profile
+
+    Args:
+        applied: Mapping of pragma name to the value SQLite reports
+        profile: Expected profile
+        in_memory: In-memory databases always use the "memory" journal mode
+
+    Returns:
+        List of human readable mismatches, empty if the profile is fully applied
+    """
+    mismatches = []
+    for pragma, expected in profile.items():
+        if pragma == "journal_mode" and in_memory:
+            continue
+        actual = applied.get(pragma)
+        if pragma in _PRAGMA_CODES:
+            expected = _PRAGMA_CODES[pragma][str(expected).upper()]
+        elif isinstance(expected, str):
+            expected = expected.lower()
+            actual = str(actual).lower()
+        if actual != expected:
+            mismatches.append(f"{pragma}: expected {expected}, got {actual}")
+    return mismatches
+
+
+def create_sqlite_engine(
+    url: str,
+    profile: Optional[Dict[str, Any]] = None,
+    read_only: bool = False,
+    **kwargs
+) -> AsyncEngine:
+    """
+    Create an async engine that applies a SQLite profile on every new connection
+
+    Args:
+        url: Database URL using an async driver, e.g. 'sqlite+aiosqlite:///...'
+        profile: Pragmas to apply, defaults to the configured profile
+        read_only: Reject writes on every connection (PRAGMA query_only)
+        **kwargs: Extra arguments for create_async_engine
+
+    Returns:
+        Configured async engine
+    """
+    profile = profile if profile is not None else get_sqlite_profile()
+    kwargs.setdefault("connect_args", {"check_same_thread": False})  # SQLite specific - needed for FastAPI
+    new_engine = create_async_engine(url, **kwargs)
+
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        apply_sqlite_profile(dbapi_connection, profile)
+        if read_only:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA query_only=ON")
+            cursor.close()
+
+    return new_engine
+
+
+# NOTE: DATABASE_URL must use an async driver, e.g., 'sqlite+aiosqlite:///...'
+# Single writer: one pooled connection, so mutating transactions queue for it
+# in the pool (FIFO) instead of racing for SQLite's lock and failing with
+# "database is locked". Sessions must commit promptly and not hold it across
+# slow I/O such as LLM calls.
+engine = create_sqlite_engine(
+    settings.DATABASE_URL,
+    pool_size=1,
+    max_overflow=0,
+    pool_timeout=settings.WRITE_QUEUE_TIMEOUT,
+)
+
+# Read pool: read-only connections for GET endpoints, they never take the write lock
+read_engine = create_sqlite_engine(
+    settings.DATABASE_URL,
+    read_only=True,
+    pool_size=settings.READ_POOL_SIZE,
+    max_overflow=0,
+)
+
 # Create session factory for async sessions
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -27,12 +147,68 @@ SessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+def _add_missing_columns(sync_conn) -> None:
+    """Add nullable model columns that an existing database file predates"""
+    for table in Base.metadata.sorted_tables:
+        existing = {row[1] for row in sync_conn.exec_driver_sql(f"PRAGMA table_info({table.name})")}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=sync_conn.dialect)
+                sync_conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                logger.info("Added column %s.%s", table.name, column.name)
+
+
 # Create all tables in the database (async, to be awaited from FastAPI startup)
 async def create_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+
+async def verify_sqlite_profile(db_engine: AsyncEngine = engine, profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Read back the pragmas of a pooled connection and log any deviation from the profile
+
+    Args:
+        db_engine: Engine to verify
+        profile: Expected profile, defaults to the configured profile
 
-async def get_db():
-    """Async dependency for getting a database session"""
+    Returns:
+        Mapping of pragma name to the value SQLite reports
+    """
+    profile = profile if profile is not None else get_sqlite_profile()
+    async with db_engine.connect() as conn:
+        def read_pragmas(sync_conn):
+            return {
+                pragma: sync_conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+                for pragma in _PRAGMA_ORDER
+            }
+        applied = await conn.run_sync(read_pragmas)
+
+    in_memory = db_engine.url.database in (None, "", ":memory:")
+    mismatches = check_sqlite_profile(applied, profile, in_memory=in_memory)
+    for mismatch in mismatches:
+        logger.warning(f"SQLite profile not fully applied - {mismatch}")
+    if not mismatches:
+        logger.info(f"SQLite profile applied: {applied}")
+    return applied
+
+async def get_write_db():
+    """Async dependency for a session on the single writer connection"""
     async with SessionLocal() as session:
         yield session
+
+async def get_read_db():
+    """Async dependency for a session on the read-only pool"""
+    async with ReadSessionLocal() as session:
+        yield session
+
+# Endpoints that did not declare their intent write through the single writer
+get_db = get_write_db
@@ -0,0 +1,76 @@
+"""
+SQL statement counting per request or block.
+
+Listeners on every Engine count the statements sent to the database and the
+time spent in the driver while a count_queries() block is active. The active
+counters live in a context variable, so concurrent requests are counted
+separately and work started from a counted block (tasks, the greenlets of
+the async engines) is included. An executemany counts as one statement.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_active: ContextVar[Tuple["QueryStats", ...]] = ContextVar("query_stats", default=())
+
+
+@dataclass
+class QueryStats:
+    """Statements run in a count_queries() block and their time in the driver"""
+    count: int = 0
+    seconds: float = 0.0
+    statements: List[str] = field(default_factory=list)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """
+    Count the SQL statements run in the block
+
+    Blocks can be nested; a statement is counted by every enclosing block.
+
+    Returns:
+        QueryStats updated while the block runs
+    """
+    stats = QueryStats()
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+def record_query(statement: str, seconds: float) -> None:
+    """
+    Count a statement in every active count_queries() block
+
+    Called by the cursor listeners below, and directly by code that runs
+    statements on a raw DBAPI cursor, which SQLAlchemy's events do not see.
+
+    Args:
+        statement: SQL text
+        seconds: Time spent in the driver
+    """
+    for stats in _active.get():
+        stats.count += 1
+        stats.seconds += seconds
+        stats.statements.append(statement)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _active.get():
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get("query_started")
+    if not _active.get() or not started:
+        return
+    record_query(statement, time.perf_counter() - started.pop())
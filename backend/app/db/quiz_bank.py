@@ -0,0 +1,134 @@
+"""
+Export and import the quiz bank as NDJSON, one quiz with its questions and answers per line.
+
+Quizzes refer to their level by code, so a file exported from one
+environment can be imported into another. Import validates every line,
+skips and reports invalid ones and writes the rest in chunked bulk
+transactions.
+
+Usage:
+    python -m app.db.quiz_bank export [--output quizzes.ndjson] [--status published]
+    python -m app.db.quiz_bank import quizzes.ndjson [--creator admin] [--chunk-size 1000] [--check-duplicates]
+    python -m app.db.quiz_bank index [--chunk-size 1000]
+
+index fingerprints all questions of published quizzes for near-duplicate
+detection. New questions are also indexed on the fly by AI quiz generation,
+a limited number at a time, so run it once on a large existing bank.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import Optional
+
+from sqlalchemy import select
+
+from app.db import ReadSessionLocal, SessionLocal, create_tables, engine, read_engine
+from app.models import User
+from app.services.question_bank import index_questions
+from app.services.quiz_transfer import ImportReport, export_quizzes, import_quizzes
+
+
+async def run_export(output: Optional[str], status: Optional[str], batch_size: int) -> None:
+    """Write the quiz bank to a file or stdout"""
+    stream = open(output, "w", encoding="utf-8") if output else sys.stdout
+    exported = 0
+    try:
+        async for chunk in export_quizzes(status=status, batch_size=batch_size):
+            stream.write(chunk)
+            exported += chunk.count("\n")
+    finally:
+        if output:
+            stream.close()
+    print(f"Exported {exported} quizzes.", file=sys.stderr)
+
+
+async def run_import(path: str, creator: str, chunk_size: int, check_duplicates: bool = False) -> ImportReport:
+    """Import a quiz bank file, reporting progress on stderr"""
+    async with ReadSessionLocal() as db:
+        creator_id = (await db.execute(select(User.id).where(User.username == creator))).scalar()
+    if creator_id is None:
+        raise SystemExit(f"Unknown user '{creator}'")
+
+    started = time.perf_counter()
+
+    def progress(report: ImportReport) -> None:
+        elapsed = time.perf_counter() - started
+        print(f"{report.imported} quizzes imported, {report.skipped} skipped ({elapsed:.1f} s)", file=sys.stderr)
+
+    with open(path, encoding="utf-8") as lines:
+        report = await import_quizzes(
+            lines, creator_id=creator_id, chunk_size=chunk_size, progress=progress, check_duplicates=check_duplicates
+        )
+
+    for number, message in report.errors[:20]:
+        print(f"line {number}: {message}", file=sys.stderr)
+    if len(report.errors) > 20:
+        print(f"... and {len(report.errors) - 20} more errors", file=sys.stderr)
+    print(
+        f"Imported {report.imported} quizzes, skipped {report.skipped} "
+        f"in {time.perf_counter() - started:.1f} s.",
+        file=sys.stderr
+    )
+    if check_duplicates:
+        print(f"{report.near_duplicates} imported questions were already in the question bank.", file=sys.stderr)
+    return report
+
+
+async def run_index(chunk_size: int) -> int:
+    """Fingerprint all unindexed bank questions, one transaction per chunk"""
+    started = time.perf_counter()
+    total = 0
+    while True:
+        async with SessionLocal() as db:
+            indexed = await index_questions(db, batch_size=chunk_size, limit=chunk_size)
+            await db.commit()
+        if not indexed:
+            break
+        total += indexed
+        print(f"{total} questions indexed ({time.perf_counter() - started:.1f} s)", file=sys.stderr)
+    print(f"Indexed {total} questions in {time.perf_counter() - started:.1f} s.", file=sys.stderr)
+    return total
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Make sure the tables exist and run the command"""
+    await create_tables()
+    try:
+        if args.command == "export":
+            await run_export(args.output, args.status, args.batch_size)
+        elif args.command == "index":
+            await run_index(args.chunk_size)
+        else:
+            await run_import(args.path, args.creator, args.chunk_size, args.check_duplicates)
+    finally:
+        await engine.dispose()
+        await read_engine.dispose()
+
+
+def main() -> None:
+    """Parse arguments and run export or import"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write all quizzes as NDJSON")
+    export_parser.add_argument("--output", "-o", default=None, help="Output file, stdout if omitted")
+    export_parser.add_argument("--status", choices=["draft", "published"], default=None, help="Only quizzes with this status")
+    export_parser.add_argument("--batch-size", type=int, default=500, help="Quizzes per query")
+
+    import_parser = commands.add_parser("import", help="Load quizzes from an NDJSON file")
+    import_parser.add_argument("path", help="NDJSON file")
+    import_parser.add_argument("--creator", default="admin", help="Username owning the imported quizzes")
+    import_parser.add_argument("--chunk-size", type=int, default=1000, help="Quizzes per transaction")
+    import_parser.add_argument(
+        "--check-duplicates", action="store_true", help="Count questions that are near-duplicates of question bank entries"
+    )
+
+    index_parser = commands.add_parser("index", help="Fingerprint published questions for near-duplicate detection")
+    index_parser.add_argument("--chunk-size", type=int, default=1000, help="Questions per transaction")
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
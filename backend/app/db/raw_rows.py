@@ -0,0 +1,45 @@
+"""
+Reads that return plain tuples straight from the DBAPI cursor.
+
+Building a SQLAlchemy Row per result row costs more than the query itself
+once a read returns tens of thousands of rows (the attempt matrix of item
+analysis, the quiz trees of an export batch). fetch_tuples() compiles a Core
+select for the session's connection and runs it on a raw cursor. SQLAlchemy's
+cursor events do not see that statement, so it is reported to the query
+counter here.
+"""
+import time
+from typing import List, Tuple
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .query_counter import record_query
+
+
+async def fetch_tuples(db: AsyncSession, query: Select) -> List[Tuple]:
+    """
+    Run a select on the session's connection and return its rows as tuples
+
+    Args:
+        db: Database session
+        query: Core select with positional (qmark) parameters once compiled
+
+    Returns:
+        Rows as plain tuples, in the order of the query
+    """
+    def fetch(connection) -> List[Tuple]:
+        compiled = query.compile(dialect=connection.dialect)
+        statement = str(compiled)
+        params = compiled.construct_params()
+        cursor = connection.connection.dbapi_connection.cursor()
+        started = time.perf_counter()
+        try:
+            cursor.execute(statement, [params[name] for name in compiled.positiontup])
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            record_query(statement, time.perf_counter() - started)
+
+    connection = await db.connection()
+    return await connection.run_sync(fetch)
@@ -0,0 +1,56 @@
+"""
+Rebuild the incrementally maintained quiz statistics.
+
+Results stored before result_history existed are copied into it first, then
+quiz_stats is recomputed from the history in one transaction on the writer
+connection. Run it after upgrading, or whenever the statistics look off.
+
+Usage:
+    python -m app.db.rebuild_stats [--quiz-id ID]
+"""
+import argparse
+import asyncio
+from typing import Optional
+
+from app.crud.quiz_stats import backfill_history, rebuild
+from app.db import SessionLocal, create_tables, engine
+
+
+async def rebuild_stats(quiz_id: Optional[int] = None, session_factory=SessionLocal) -> int:
+    """
+    Backfill result_history and recompute quiz_stats
+
+    Args:
+        quiz_id: Rebuild only this quiz, all quizzes if None
+        session_factory: Factory for write sessions
+
+    Returns:
+        Number of quizzes with statistics
+    """
+    async with session_factory() as db:
+        copied = await backfill_history(db)
+        rebuilt = await rebuild(db, quiz_id=quiz_id)
+        await db.commit()
+    print(f"Copied {copied} results into result_history, rebuilt statistics of {rebuilt} quizzes.")
+    return rebuilt
+
+
+async def run(quiz_id: Optional[int]) -> None:
+    """Make sure the tables exist and rebuild"""
+    await create_tables()
+    try:
+        await rebuild_stats(quiz_id)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Parse arguments and rebuild the statistics"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quiz-id", type=int, default=None, help="Rebuild a single quiz")
+    args = parser.parse_args()
+    asyncio.run(run(args.quiz_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""
+Generate a synthetic dataset for scale testing.
+
+Adds students, admins, quizzes across all levels with their questions and
+answers, and quiz results with their history, then rebuilds the search index
+and the quiz statistics. Everything is drawn from one seeded NumPy generator,
+so the same options give the same dataset on an empty database.
+
+- Quizzes are spread evenly over the levels. Their question count is uniform
+  between --questions MIN-MAX, and --published of them are published.
+- Students take published quizzes by popularity (Zipf-like with exponent
+  --popularity), about --results-per-student each. Scores are binomial, from
+  the student's ability and the quiz's difficulty.
+- --retakes of the results have an earlier attempt in result_history.
+- All synthetic users share the password --password (one bcrypt hash), so the
+  load tests can log in as student{i} and admin{i}.
+
+Rows are written with executemany in chunks of --chunk-size, one transaction
+per chunk. The secondary indexes of the loaded tables and the triggers on
+quizzes, questions and answers (search index and question bank) are suspended
+while loading; the indexes are built and the search index is rebuilt once at
+the end. The question bank is not fingerprinted; run
+python -m app.db.quiz_bank index afterwards if needed.
+
+Usage:
+    python -m app.db.synthetic [--seed 42] [--students 1000] [--admins 10] [--quizzes 1000]
+        [--questions 5-15] [--answers 4] [--results-per-student 20] [--retakes 0.1]
+        [--published 0.8] [--popularity 0.8] [--start 2025-01-01] [--days 365]
+        [--chunk-size 50000] [--prefix ""] [--password student123]
+
+Scale test dataset (100k quizzes, 2M answers, 10M results):
+    python -m app.db.synthetic --students 50000 --admins 100 --quizzes 100000 --questions 3-7 --results-per-student 200
+"""
+import argparse
+import asyncio
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import bcrypt
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.crud.quiz_stats import rebuild
+from app.db import SessionLocal, create_tables, engine
+from app.db.seed import seed_levels
+from app.models import Level
+from app.models.quiz_search import rebuild_search_index
+
+SYLLABLES = [c + v for c in "bcdfghjklmnprstwz" for v in "aeiouy"]
+VOCABULARY_SIZE = 5000
+SECONDS_PER_DAY = 24 * 60 * 60
+# Tables whose triggers are suspended during the load (indexes are
+# suspended on every table that is loaded)
+TRIGGER_TABLES = ("quizzes", "questions", "answers")
+_BCRYPT_ALPHABET = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+
+@dataclass
+class SyntheticSpec:
+    """Sizes and distributions of a synthetic dataset"""
+    seed: int = 42
+    students: int = 1000
+    admins: int = 10
+    quizzes: int = 1000
+    questions_min: int = 5
+    questions_max: int = 15
+    answers: int = 4
+    results_per_student: float = 20.0
+    retakes: float = 0.1
+    published: float = 0.8
+    popularity: float = 0.8
+    start: str = "2025-01-01"
+    days: int = 365
+    chunk_size: int = 50000
+    prefix: str = ""
+    password: str = "student123"
+
+
+class _Generator:
+    """Row generator of one dataset; every draw goes through one seeded NumPy generator"""
+
+    def __init__(self, spec: SyntheticSpec, level_ids: Sequence[int], offsets: Dict[str, int]):
+        self.spec = spec
+        self.rng = np.random.default_rng(spec.seed)
+        self.level_ids = np.asarray(level_ids)
+        self.offsets = offsets
+        self.start = np.datetime64(spec.start, "us")
+        self.vocabulary = np.array([
+            "".join(self.rng.choice(SYLLABLES, size=self.rng.integers(2, 5)))
+            for _ in range(VOCABULARY_SIZE)
+        ], dtype=object)
+        # Per quiz, filled by quiz_chunks: creation time (seconds after start),
+        # question count, difficulty and whether it is published
+        self.quiz_created = np.empty(spec.quizzes, dtype=np.int64)
+        self.quiz_questions = np.empty(spec.quizzes, dtype=np.int64)
+        self.quiz_difficulty = np.empty(spec.quizzes)
+        self.quiz_published = np.empty(spec.quizzes, dtype=bool)
+
+    def texts(self, count: int, min_words: int, max_words: int, suffix: str = "") -> List[str]:
+        """Pseudo-word texts of min_words to max_words words"""
+        lengths = self.rng.integers(min_words, max_words + 1, size=count)
+        words = self.vocabulary[self.rng.integers(0, VOCABULARY_SIZE, size=(count, max_words))]
+        return [" ".join(row[:length]) + suffix for row, length in zip(words, lengths)]
+
+    def timestamps(self, seconds: np.ndarray) -> List[str]:
+        """SQLAlchemy's SQLite DateTime strings of seconds after the start, with random microseconds"""
+        values = self.start + (seconds * 1_000_000 + self.rng.integers(0, 1_000_000, size=len(seconds))).astype("timedelta64[us]")
+        return np.char.replace(np.datetime_as_string(values, unit="us").astype(str), "T", " ").tolist()
+
+    def password_hash(self) -> str:
+        """bcrypt hash of the password with a salt drawn from the seed"""
+        salt_chars = self.rng.integers(0, 64, size=21)
+        salt = "".join(_BCRYPT_ALPHABET[i] for i in salt_chars) + ".Oeu"[int(self.rng.integers(0, 4))]
+        return bcrypt.hashpw(self.spec.password.encode(), f"$2b$12${salt}".encode()).decode()
+
+    def users(self) -> List[Tuple]:
+        """(id, username, hashed_password, role, is_active, created_at, updated_at) of admins, then students"""
+        spec = self.spec
+        hashed = self.password_hash()
+        created = self.timestamps(np.zeros(spec.admins + spec.students, dtype=np.int64))
+        names = [f"{spec.prefix}admin{i}" for i in range(spec.admins)]
+        names += [f"{spec.prefix}student{i}" for i in range(spec.students)]
+        roles = ["admin"] * spec.admins + ["student"] * spec.students
+        return [
+            (self.offsets["users"] + i, name, hashed, role, True, timestamp, timestamp)
+            for i, (name, role, timestamp) in enumerate(zip(names, roles, created))
+        ]
+
+    def quiz_chunks(self) -> Iterator[Tuple[List[Tuple], List[Tuple], List[Tuple]]]:
+        """Quiz, question and answer rows, chunked to about chunk_size answers"""
+        spec = self.spec
+        per_quiz = (spec.questions_min + spec.questions_max) / 2 * spec.answers
+        quizzes_per_chunk = max(1, int(spec.chunk_size / per_quiz))
+        question_id = self.offsets["questions"]
+        answer_id = self.offsets["answers"]
+
+        for first in range(0, spec.quizzes, quizzes_per_chunk):
+            count = min(quizzes_per_chunk, spec.quizzes - first)
+            created = self.rng.integers(0, spec.days * SECONDS_PER_DAY, size=count)
+            question_counts = self.rng.integers(spec.questions_min, spec.questions_max + 1, size=count)
+            published = self.rng.random(count) < spec.published
+            self.quiz_created[first:first + count] = created
+            self.quiz_questions[first:first + count] = question_counts
+            self.quiz_difficulty[first:first + count] = self.rng.beta(2, 2, size=count)
+            self.quiz_published[first:first + count] = published
+
+            quiz_ids = self.offsets["quizzes"] + first + np.arange(count)
+            levels = self.level_ids[self.rng.integers(0, len(self.level_ids), size=count)]
+            creators = self.offsets["users"] + self.rng.integers(0, max(spec.admins, 1), size=count)
+            timestamps = self.timestamps(created)
+            quizzes = list(zip(
+                quiz_ids.tolist(),
+                self.texts(count, 2, 5),
+                np.where(published, "published", "draft").tolist(),
+                levels.tolist(),
+                creators.tolist(),
+                timestamps,
+                timestamps,
+            ))
+
+            total_questions = int(question_counts.sum())
+            question_ids = question_id + np.arange(total_questions)
+            questions = list(zip(
+                question_ids.tolist(),
+                self.texts(total_questions, 5, 12, "?"),
+                np.repeat(quiz_ids, question_counts).tolist(),
+            ))
+            question_id += total_questions
+
+            total_answers = total_questions * spec.answers
+            correct = self.rng.integers(0, spec.answers, size=total_questions)
+            is_correct = (np.tile(np.arange(spec.answers), total_questions) == np.repeat(correct, spec.answers))
+            answers = list(zip(
+                (answer_id + np.arange(total_answers)).tolist(),
+                self.texts(total_answers, 1, 4),
+                is_correct.astype(int).tolist(),
+                np.repeat(question_ids, spec.answers).tolist(),
+            ))
+            answer_id += total_answers
+            yield quizzes, questions, answers
+
+    def result_chunks(self) -> Iterator[Tuple[List[Tuple], List[Tuple]]]:
+        """Result and result history rows, chunked to about chunk_size results; call after quiz_chunks"""
+        spec = self.spec
+        published = np.flatnonzero(self.quiz_published)
+        if len(published) == 0 or spec.students == 0 or spec.results_per_student <= 0:
+            return
+        # Zipf-like popularity over the published quizzes, in random order
+        ranks = self.rng.permutation(len(published))
+        cumulative = np.cumsum(1.0 / (ranks + 1.0) ** spec.popularity)
+        ability = self.rng.beta(5, 3, size=spec.students)
+        end = spec.days * SECONDS_PER_DAY
+        students_per_chunk = max(1, int(spec.chunk_size / spec.results_per_student))
+        result_id = self.offsets["results"]
+        history_id = self.offsets["result_history"]
+
+        for first in range(0, spec.students, students_per_chunk):
+            count = min(students_per_chunk, spec.students - first)
+            taken = self.rng.poisson(spec.results_per_student, size=count)
+            students = np.repeat(np.arange(first, first + count), taken)
+            picks = published[np.searchsorted(cumulative, self.rng.random(len(students)) * cumulative[-1])]
+            # One result per student and quiz, repeated picks are dropped
+            keys = np.unique(students * spec.quizzes + picks)
+            students, quizzes = keys // spec.quizzes, keys % spec.quizzes
+            total = len(keys)
+            if total == 0:
+                continue
+
+            skill, difficulty = ability[students], self.quiz_difficulty[quizzes]
+            p = skill * (1 - difficulty) / (skill * (1 - difficulty) + (1 - skill) * difficulty)
+            max_scores = self.quiz_questions[quizzes]
+            scores = self.rng.binomial(max_scores, p)
+            created = self.quiz_created[quizzes]
+            taken_at = created + (self.rng.random(total) * (end - created)).astype(np.int64)
+            user_ids = (self.offsets["users"] + spec.admins + students).tolist()
+            quiz_ids = (self.offsets["quizzes"] + quizzes).tolist()
+            timestamps = self.timestamps(taken_at)
+
+            retake = np.flatnonzero(self.rng.random(total) < spec.retakes)
+            earlier_at = created[retake] + (self.rng.random(len(retake)) * (taken_at[retake] - created[retake])).astype(np.int64)
+            earlier_scores = self.rng.binomial(max_scores[retake], p[retake] * 0.85)
+            # Earlier attempts get the lower history ids
+            history = [
+                (history_id + i, user_ids[j], quiz_ids[j], int(score), int(max_scores[j]), timestamp)
+                for i, (j, score, timestamp) in enumerate(zip(retake.tolist(), earlier_scores, self.timestamps(earlier_at)))
+            ]
+            history_id += len(history)
+            history += list(zip(
+                (history_id + np.arange(total)).tolist(), user_ids, quiz_ids, scores.tolist(), max_scores.tolist(), timestamps
+            ))
+            history_id += total
+
+            results = list(zip(
+                (result_id + np.arange(total)).tolist(), scores.tolist(), max_scores.tolist(), user_ids, quiz_ids,
+                timestamps, timestamps
+            ))
+            result_id += total
+            yield results, history
+
+
+_INSERTS = {
+    "users": "INSERT INTO users (id, username, hashed_password, role, is_active, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "quizzes": "INSERT INTO quizzes (id, title, status, level_id, creator_id, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "questions": "INSERT INTO questions (id, text, quiz_id) VALUES (?, ?, ?)",
+    "answers": "INSERT INTO answers (id, text, is_correct, question_id) VALUES (?, ?, ?, ?)",
+    "results": "INSERT INTO results (id, score, max_score, user_id, quiz_id, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "result_history": "INSERT INTO result_history (id, user_id, quiz_id, score, max_score, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+}
+
+
+async def generate(
+    spec: SyntheticSpec,
+    db_engine: AsyncEngine = engine,
+    session_factory=SessionLocal,
+    progress: Optional[Callable[[str, Dict[str, int]], None]] = None
+) -> Dict[str, int]:
+    """
+    Generate a synthetic dataset into an existing schema
+
+    Args:
+        spec: Sizes and distributions
+        db_engine: Engine of the database, writes go through its connection
+        session_factory: Factory for write sessions (levels and statistics)
+        progress: Called with a stage name and the row counts so far
+
+    Returns:
+        Number of rows inserted per table
+    """
+    async with session_factory() as db:
+        await seed_levels(db)
+        level_ids = (await db.execute(select(Level.id).order_by(Level.level))).scalars().all()
+
+    async with db_engine.begin() as conn:
+        offsets = {}
+        for table in _INSERTS:
+            offsets[table] = (await conn.exec_driver_sql(f"SELECT coalesce(max(id), 0) + 1 FROM {table}")).scalar()
+        # Named indexes only; the implicit ones of unique constraints can't be dropped
+        suspended = (await conn.exec_driver_sql(
+            f"SELECT type, name, sql FROM sqlite_master "
+            f"WHERE (type = 'trigger' AND tbl_name IN ({', '.join('?' * len(TRIGGER_TABLES))})) "
+            f"OR (type = 'index' AND sql IS NOT NULL AND tbl_name IN ({', '.join('?' * len(_INSERTS))}))",
+            (*TRIGGER_TABLES, *_INSERTS)
+        )).all()
+        for kind, name, _ in suspended:
+            await conn.exec_driver_sql(f"DROP {kind.upper()} {name}")
+
+    generator = _Generator(spec, level_ids, offsets)
+    counts = {table: 0 for table in _INSERTS}
+
+    async def insert(tables: Dict[str, List[Tuple]]) -> None:
+        async with db_engine.begin() as conn:
+            for table, rows in tables.items():
+                if rows:
+                    await conn.exec_driver_sql(_INSERTS[table], rows)
+                counts[table] += len(rows)
+
+    try:
+        await insert({"users": generator.users()})
+        for quizzes, questions, answers in generator.quiz_chunks():
+            await insert({"quizzes": quizzes, "questions": questions, "answers": answers})
+            if progress:
+                progress("quizzes", counts)
+        for results, history in generator.result_chunks():
+            await insert({"results": results, "result_history": history})
+            if progress:
+                progress("results", counts)
+    finally:
+        async with db_engine.begin() as conn:
+            for _, _, sql in suspended:
+                await conn.exec_driver_sql(sql)
+    if progress:
+        progress("indexes", counts)
+
+    async with db_engine.begin() as conn:
+        await conn.run_sync(rebuild_search_index)
+    if progress:
+        progress("search index", counts)
+    async with session_factory() as db:
+        await rebuild(db)
+        await db.commit()
+    if progress:
+        progress("statistics", counts)
+    async with db_engine.begin() as conn:
+        await conn.exec_driver_sql("PRAGMA optimize")
+    return counts
+
+
+def parse_range(value: str) -> Tuple[int, int]:
+    """Parse MIN-MAX or a single number"""
+    low, _, high = value.partition("-")
+    low, high = int(low), int(high or low)
+    if not 1 <= low <= high:
+        raise argparse.ArgumentTypeError(f"Invalid range '{value}', expected MIN-MAX with 1 <= MIN <= MAX")
+    return low, high
+
+
+async def run(spec: SyntheticSpec) -> None:
+    """Make sure the tables exist and generate the dataset, reporting progress on stderr"""
+    await create_tables()
+    started = time.perf_counter()
+
+    def progress(stage: str, counts: Dict[str, int]) -> None:
+        elapsed = time.perf_counter() - started
+        rows = ", ".join(f"{count} {table}" for table, count in counts.items() if count)
+        print(f"{stage}: {rows} ({elapsed:.1f} s)", file=sys.stderr)
+
+    try:
+        counts = await generate(spec, progress=progress)
+    finally:
+        await engine.dispose()
+    total = sum(counts.values())
+    elapsed = time.perf_counter() - started
+    print(f"Generated {total} rows in {elapsed:.1f} s ({total / elapsed:.0f} rows/s).", file=sys.stderr)
+
+
+def main() -> None:
+    """Parse arguments and generate the dataset"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    defaults = SyntheticSpec()
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--students", type=int, default=defaults.students)
+    parser.add_argument("--admins", type=int, default=defaults.admins)
+    parser.add_argument("--quizzes", type=int, default=defaults.quizzes)
+    parser.add_argument("--questions", type=parse_range, default=(defaults.questions_min, defaults.questions_max),
+                        help="Questions per quiz, MIN-MAX")
+    parser.add_argument("--answers", type=int, default=defaults.answers, help="Answers per question, one correct")
+    parser.add_argument("--results-per-student", type=float, default=defaults.results_per_student)
+    parser.add_argument("--retakes", type=float, default=defaults.retakes, help="Share of results with an earlier attempt")
+    parser.add_argument("--published", type=float, default=defaults.published, help="Share of published quizzes")
+    parser.add_argument("--popularity", type=float, default=defaults.popularity, help="Zipf exponent of quiz popularity")
+    parser.add_argument("--start", default=defaults.start, help="First day of the generated activity")
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size, help="Rows per executemany")
+    parser.add_argument("--prefix", default=defaults.prefix, help="Prefix of the usernames")
+    parser.add_argument("--password", default=defaults.password, help="Password of all generated users")
+    args = parser.parse_args()
+    if args.admins < 1 and args.quizzes:
+        parser.error("--admins must be at least 1 to create quizzes")
+
+    spec = SyntheticSpec(
+        seed=args.seed,
+        students=args.students,
+        admins=args.admins,
+        quizzes=args.quizzes,
+        questions_min=args.questions[0],
+        questions_max=args.questions[1],
+        answers=args.answers,
+        results_per_student=args.results_per_student,
+        retakes=args.retakes,
+        published=args.published,
+        popularity=args.popularity,
+        start=args.start,
+        days=args.days,
+        chunk_size=args.chunk_size,
+        prefix=args.prefix,
+        password=args.password,
+    )
+    asyncio.run(run(spec))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.db import create_tables, SessionLocal
+from app.db import create_tables, verify_sqlite_profile, SessionLocal, engine, read_engine
 from app.db.seed import seed_database
 from app.routers import debug
-from .core.middleware import RateLimitingMiddleware
-from .routers import quizzes, users, token, levels
+from .core.config import settings as core_settings
+from .core.middleware import QueryCountMiddleware, RateLimitingMiddleware
+from .core.shared_state import get_state_backend
+from .services.question_bank import bank_indexer
+from .routers import ai, quizzes, users, token, levels, results
+
+logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -30,20 +37,37 @@ app.add_middleware(
 app.add_middleware(
     RateLimitingMiddleware,
     rate_limits={
-        "/api/v1/quizzes": {"rate": 5, "per": 60, "burst": 5},  # 5 requests per minute, burst of 5
-        "/api/v1/auth/token": {"rate": 3, "per": 60, "burst": 3}  # 3 login attempts per minute, burst of 3
-    }
+        "/api/v1/quizzes": {"rate": 5, "per": 60, "burst": 5},  # 5 quiz generations per minute per admin, burst of 5
+        "/api/v1/auth/token": {"rate": 3, "per": 60, "burst": 3, "key": "client"}  # 3 login attempts per minute per client, burst of 3
+    },
+    enabled=core_settings.RATE_LIMIT_ENABLED,
+    backend=get_state_backend()
 )
 
+# Report the SQL statements and DB time of every request in debug mode
+if core_settings.DEBUG:
+    app.add_middleware(QueryCountMiddleware)
+
 # Initialize database tables and seed data on startup
 @app.on_event("startup")
 async def startup_db_client():
+    # Only the offline bundle endpoints need the key, they answer 503 without it
+    if not core_settings.BUNDLE_SIGNING_KEY:
+        logger.warning("BUNDLE_SIGNING_KEY is not set, offline quiz bundles are disabled")
+    
     await create_tables()
     print("Database tables created.")
     
+    # Check the SQLite performance profile really took effect (logs mismatches)
+    await verify_sqlite_profile(engine)
+    await verify_sqlite_profile(read_engine)
+    
     # Seed the database with initial data (async session, since seed_database is now async)
     async with SessionLocal() as db:
         await seed_database(db)
+    
+    # Fingerprint bank questions published while the server was down, in the background
+    bank_indexer.schedule()
 
 @app.get("/ping")
 def ping():
@@ -55,6 +79,8 @@ app.include_router(quizzes.router)
 app.include_router(users.router, prefix="/api/v1/users")
 app.include_router(token.router)
 app.include_router(levels.router)
+app.include_router(results.router)
+app.include_router(ai.router)
 
 # Import and include routers here for future scalability
 # from .routers import example_router
@@ -7,6 +7,13 @@ from .quiz import Quiz
 from .question import Question
 from .answer import Answer
 from .result import Result
+from .answer_attempt import AnswerAttempt
+from .result_history import ResultHistory
+from .quiz_stats import QuizStats
+from .generation_cache import GenerationCache
+from .question_bank import QuestionFingerprint, QuestionBucket
+from .idempotency_key import IdempotencyKey
+from . import quiz_search  # FTS5 index, created with the tables
 
 # Export all models
-__all__ = ['Base', 'User', 'Level', 'Quiz', 'Question', 'Answer', 'Result']
+__all__ = ['Base', 'User', 'Level', 'Quiz', 'Question', 'Answer', 'Result', 'AnswerAttempt', 'ResultHistory', 'QuizStats', 'GenerationCache', 'QuestionFingerprint', 'QuestionBucket', 'IdempotencyKey']
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, CheckConstraint, Index, func
+from .base import Base
+
+class AnswerAttempt(Base):
+    """Append-only record of every answer a student checked"""
+    __tablename__ = "answer_attempts"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
+    answer_id = Column(Integer, ForeignKey("answers.id", ondelete="SET NULL"), nullable=True)
+    is_correct = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        CheckConstraint("is_correct IN (0, 1)", name="check_attempt_is_correct"),
+        # Covers scoring: first attempt per question of a student in a quiz
+        Index("idx_answer_attempts_user_quiz", "user_id", "quiz_id", "question_id", "id"),
+        Index("idx_answer_attempts_quiz_id", "quiz_id"),
+    )
+    
+    def __repr__(self):
+        return f"<AnswerAttempt(id={self.id}, user_id={self.user_id}, question_id={self.question_id}, is_correct={self.is_correct})>"
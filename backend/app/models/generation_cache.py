@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint, func
+from .base import Base
+
+class GenerationCache(Base):
+    """Validated AI quiz generation, reusable for the same topic, level and question count
+    
+    Rows are evicted least recently used first once the cache is full.
+    """
+    __tablename__ = "generation_cache"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    topic_key = Column(String(256), nullable=False)  # normalized topic
+    level_id = Column(Integer, ForeignKey("levels.id", ondelete="CASCADE"), nullable=False)
+    question_count = Column(Integer, nullable=False)
+    title = Column(String(256), nullable=False)
+    questions_data = Column(Text, nullable=False)  # JSON: [{"text": ..., "answers": [{"text": ..., "is_correct": ...}]}]
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    last_used_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint("topic_key", "level_id", "question_count", name="uq_generation_cache_key"),
+        Index("idx_generation_cache_last_used", "last_used_at"),
+    )
+    
+    def __repr__(self):
+        return f"<GenerationCache(id={self.id}, topic_key='{self.topic_key}', level_id={self.level_id}, question_count={self.question_count})>"
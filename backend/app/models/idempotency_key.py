@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint, func
+from .base import Base
+
+class IdempotencyKey(Base):
+    """Outcome of a POST request sent with an Idempotency-Key header
+    
+    The row is claimed with status "in_progress" before the work starts and
+    holds the JSON response once it is "completed". Keys are scoped per user
+    and expire after settings.IDEMPOTENCY_KEY_TTL seconds.
+    """
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    key = Column(String(255), nullable=False)
+    endpoint = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # sha256 of endpoint and request body
+    status = Column(String(16), nullable=False)  # in_progress | completed
+    response_body = Column(Text, nullable=True)  # JSON, set when completed
+    created_at = Column(DateTime, nullable=False, default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+        Index("idx_idempotency_keys_created_at", "created_at"),
+    )
+    
+    def __repr__(self):
+        return f"<IdempotencyKey(id={self.id}, user_id={self.user_id}, key='{self.key}', status='{self.status}')>"
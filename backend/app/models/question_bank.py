@@ -0,0 +1,77 @@
+from sqlalchemy import BigInteger, Column, Integer, LargeBinary, ForeignKey, Index, event
+from .base import Base
+
+
+class QuestionFingerprint(Base):
+    """MinHash signature of a question of a published quiz (the question bank)
+
+    Rows are added in the background by app.services.question_bank.BankIndexer. The
+    triggers below drop the fingerprint when the question, its answers or
+    the status of its quiz change, so it is recomputed on the next run.
+    """
+    __tablename__ = "question_fingerprints"
+
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    signature = Column(LargeBinary, nullable=False)  # MINHASH_PERMUTATIONS little-endian uint32
+
+    def __repr__(self):
+        return f"<QuestionFingerprint(question_id={self.question_id})>"
+
+
+class QuestionBucket(Base):
+    """LSH bucket of a band of a question's signature
+
+    Questions sharing a bucket in any band are near-duplicate candidates.
+    """
+    __tablename__ = "question_buckets"
+
+    bucket = Column(BigInteger, primary_key=True)  # hash of the band number and its signature values
+    question_id = Column(
+        Integer, ForeignKey("question_fingerprints.question_id", ondelete="CASCADE"), primary_key=True
+    )
+
+    __table_args__ = (
+        Index("idx_question_buckets_question_id", "question_id"),
+        {"sqlite_with_rowid": False},
+    )
+
+    def __repr__(self):
+        return f"<QuestionBucket(bucket={self.bucket}, question_id={self.question_id})>"
+
+
+_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS questions_bank_update AFTER UPDATE OF text ON questions BEGIN
+        DELETE FROM question_fingerprints WHERE question_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS answers_bank_insert AFTER INSERT ON answers BEGIN
+        DELETE FROM question_fingerprints WHERE question_id = new.question_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS answers_bank_update AFTER UPDATE OF text, is_correct ON answers BEGIN
+        DELETE FROM question_fingerprints WHERE question_id = new.question_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS answers_bank_delete AFTER DELETE ON answers BEGIN
+        DELETE FROM question_fingerprints WHERE question_id = old.question_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quizzes_bank_unpublish AFTER UPDATE OF status ON quizzes
+    WHEN new.status != 'published' BEGIN
+        DELETE FROM question_fingerprints
+        WHERE question_id IN (SELECT id FROM questions WHERE quiz_id = new.id);
+    END
+    """,
+]
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_bank_triggers(target, connection, **kw) -> None:
+    """Create the triggers invalidating fingerprints of edited questions"""
+    for trigger in _TRIGGERS:
+        connection.exec_driver_sql(trigger)
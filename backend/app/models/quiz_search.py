@@ -0,0 +1,127 @@
+from sqlalchemy import event, literal_column
+from sqlalchemy.sql import column, table
+from .base import Base
+
+# FTS5 index over quiz titles, question texts and answer texts, one row per
+# source row with the text in the column of its kind. The rowid encodes the
+# source: id * 4 + kind, so the triggers update and delete index rows by
+# rowid instead of scanning the index.
+SEARCH_KIND_TITLE, SEARCH_KIND_QUESTION, SEARCH_KIND_ANSWER = range(3)
+SEARCH_KINDS = {
+    SEARCH_KIND_TITLE: "title",
+    SEARCH_KIND_QUESTION: "question",
+    SEARCH_KIND_ANSWER: "answer",
+}
+
+# Lightweight table construct for queries; the table itself is created by the DDL below
+quiz_search = table(
+    "quiz_search", column("rowid"), column("title"), column("question"), column("answer"),
+    column("quiz_id"), column("rank")
+)
+
+# Table-valued MATCH operand (quiz_search MATCH ...)
+quiz_search_table = literal_column("quiz_search")
+
+_CREATE_TABLE = """
+CREATE VIRTUAL TABLE quiz_search USING fts5(
+    title,
+    question,
+    answer,
+    quiz_id UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+# bm25 column weights: a match in the title counts more than one in a question or an answer
+_RANK = "INSERT INTO quiz_search(quiz_search, rank) VALUES ('rank', 'bm25(10.0, 2.0, 1.0)')"
+
+_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS quizzes_search_insert AFTER INSERT ON quizzes BEGIN
+        INSERT INTO quiz_search(rowid, title, quiz_id) VALUES (new.id * 4, new.title, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quizzes_search_update AFTER UPDATE OF title ON quizzes BEGIN
+        UPDATE quiz_search SET title = new.title WHERE rowid = new.id * 4;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quizzes_search_delete AFTER DELETE ON quizzes BEGIN
+        DELETE FROM quiz_search WHERE rowid = old.id * 4;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS questions_search_insert AFTER INSERT ON questions BEGIN
+        INSERT INTO quiz_search(rowid, question, quiz_id) VALUES (new.id * 4 + 1, new.text, new.quiz_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS questions_search_update AFTER UPDATE OF text, quiz_id ON questions BEGIN
+        UPDATE quiz_search SET question = new.text, quiz_id = new.quiz_id WHERE rowid = new.id * 4 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS questions_search_delete AFTER DELETE ON questions BEGIN
+        DELETE FROM quiz_search WHERE rowid = old.id * 4 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS answers_search_insert AFTER INSERT ON answers BEGIN
+        INSERT INTO quiz_search(rowid, answer, quiz_id)
+        VALUES (new.id * 4 + 2, new.text, (SELECT quiz_id FROM questions WHERE id = new.question_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS answers_search_update AFTER UPDATE OF text ON answers BEGIN
+        UPDATE quiz_search SET answer = new.text WHERE rowid = new.id * 4 + 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS answers_search_delete AFTER DELETE ON answers BEGIN
+        DELETE FROM quiz_search WHERE rowid = old.id * 4 + 2;
+    END
+    """,
+]
+
+_POPULATE = """
+INSERT INTO quiz_search(rowid, title, question, answer, quiz_id)
+SELECT id * 4, title, NULL, NULL, id FROM quizzes
+UNION ALL
+SELECT id * 4 + 1, NULL, text, NULL, quiz_id FROM questions
+UNION ALL
+SELECT answers.id * 4 + 2, NULL, NULL, answers.text, questions.quiz_id
+FROM answers JOIN questions ON questions.id = answers.question_id
+"""
+
+
+def rebuild_search_index(connection) -> None:
+    """
+    Re-create the content of the search index from the quiz tables
+
+    Args:
+        connection: Sync connection (use run_sync from async code)
+    """
+    connection.exec_driver_sql("DELETE FROM quiz_search")
+    connection.exec_driver_sql(_POPULATE)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_index(target, connection, **kw) -> None:
+    """Create the search index and its triggers; a new index on an existing database is filled once"""
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'quiz_search'"
+    ).first()
+    if not exists:
+        connection.exec_driver_sql(_CREATE_TABLE)
+        connection.exec_driver_sql(_RANK)
+        rebuild_search_index(connection)
+    for trigger in _TRIGGERS:
+        connection.exec_driver_sql(trigger)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def drop_search_index(target, connection, **kw) -> None:
+    """Drop the search index, the triggers go with their tables"""
+    connection.exec_driver_sql("DROP TABLE IF EXISTS quiz_search")
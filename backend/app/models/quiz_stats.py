@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, func
+from .base import Base
+
+# Score histogram: bucket i counts results with score/max_score in [i/10, (i+1)/10), 100% in the last one
+HISTOGRAM_BUCKETS = 10
+
+class QuizStats(Base):
+    """Running aggregate of all results submitted for a quiz
+    
+    Updated incrementally in the transaction that stores the results, so
+    reading the statistics of a quiz is a primary key lookup.
+    """
+    __tablename__ = "quiz_stats"
+
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    attempt_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Integer, nullable=False, default=0)
+    score_sq_sum = Column(Integer, nullable=False, default=0)
+    max_score_sum = Column(Integer, nullable=False, default=0)
+    bucket_0 = Column(Integer, nullable=False, default=0)
+    bucket_1 = Column(Integer, nullable=False, default=0)
+    bucket_2 = Column(Integer, nullable=False, default=0)
+    bucket_3 = Column(Integer, nullable=False, default=0)
+    bucket_4 = Column(Integer, nullable=False, default=0)
+    bucket_5 = Column(Integer, nullable=False, default=0)
+    bucket_6 = Column(Integer, nullable=False, default=0)
+    bucket_7 = Column(Integer, nullable=False, default=0)
+    bucket_8 = Column(Integer, nullable=False, default=0)
+    bucket_9 = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    
+    @property
+    def histogram(self):
+        """Result counts per score bucket"""
+        return [getattr(self, f"bucket_{i}") or 0 for i in range(HISTOGRAM_BUCKETS)]
+    
+    def __repr__(self):
+        return f"<QuizStats(quiz_id={self.quiz_id}, attempt_count={self.attempt_count})>"
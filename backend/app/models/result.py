@@ -3,7 +3,7 @@ from sqlalchemy.orm import relationship
 from .base import Base, TimestampMixin
 
 class Result(Base, TimestampMixin):
-    """Result model for storing quiz results"""
+    """Latest quiz result per student, projected from result_history"""
     __tablename__ = "results"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, func
+from .base import Base
+
+class ResultHistory(Base):
+    """Append-only record of every submitted quiz result
+    
+    Rows are only ever inserted, ordered by id, without a unique constraint.
+    The latest result per student and quiz is projected into `results`.
+    """
+    __tablename__ = "result_history"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Integer, nullable=False)
+    max_score = Column(Integer, nullable=False)
+    # Highest answer_attempts.id of the student for the quiz when the result
+    # was scored; the next submission only counts attempts above it
+    last_attempt_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        # Covers listing a student's attempts at a quiz, newest first
+        Index("idx_result_history_user_quiz", "user_id", "quiz_id", "id"),
+        Index("idx_result_history_quiz_id", "quiz_id"),
+    )
+    
+    def __repr__(self):
+        return f"<ResultHistory(id={self.id}, user_id={self.user_id}, quiz_id={self.quiz_id}, score={self.score}/{self.max_score})>"
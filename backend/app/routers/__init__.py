@@ -1,3 +1,3 @@
 # Routers package for API endpoints
 
-from . import debug, quizzes, users, token, levels
+from . import ai, debug, quizzes, users, token, levels, results
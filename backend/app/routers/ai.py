@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, status
+from typing import Dict
+
+from ..core.security import get_current_active_admin
+from ..models.user import User
+from ..services.ai_routing import model_router
+from ..services.ai_scheduler import ai_scheduler
+
+router = APIRouter(prefix="/api/v1/ai", tags=["ai"])
+
+@router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    summary="AI scheduler metrics",
+    description="Get the queue depth, running calls and wait times of the AI scheduler lanes and the observed latency per model of this process. Only admin users can access this endpoint."
+)
+async def get_ai_metrics(current_user: User = Depends(get_current_active_admin)) -> Dict:
+    """
+    Get AI scheduler metrics
+    
+    Per lane (explanation, generation): concurrency limit, running and queued
+    calls, calls started and the mean, p95 and max wait for a slot in seconds.
+    Under routing, per task the p95 target and per model the observed p95
+    seconds per unit of work the model router routes on.
+    Only admin users can access this endpoint.
+    """
+    return {**ai_scheduler.metrics(), "routing": model_router.metrics()}
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import inspect, text, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
+from app.db import get_read_db
 from app.models import User, Level, Quiz, Question, Answer, Result
 
 router = APIRouter(
@@ -13,7 +13,7 @@ router = APIRouter(
 )
 
 @router.get("/tables")
-async def get_tables(db: AsyncSession = Depends(get_db)):
+async def get_tables(db: AsyncSession = Depends(get_read_db)):
     """Get a list of all tables in the database"""
     # Get the connection directly from the engine
     async with db.bind.connect() as conn:
@@ -21,7 +21,7 @@ async def get_tables(db: AsyncSession = Depends(get_db)):
     return {"tables": tables}
 
 @router.get("/schema/{table_name}")
-async def get_schema(table_name: str, db: AsyncSession = Depends(get_db)):
+async def get_schema(table_name: str, db: AsyncSession = Depends(get_read_db)):
     """Get the schema of a specific table"""
     async with db.bind.connect() as conn:
         table_names = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
@@ -32,7 +32,7 @@ async def get_schema(table_name: str, db: AsyncSession = Depends(get_db)):
     return {"table": table_name, "columns": columns}
 
 @router.get("/data/{table_name}")
-async def get_table_data(table_name: str, limit: int = 10, db: AsyncSession = Depends(get_db)):
+async def get_table_data(table_name: str, limit: int = 10, db: AsyncSession = Depends(get_read_db)):
     """Get data from a specific table"""
     async with db.bind.connect() as conn:
         table_names = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
@@ -58,28 +58,28 @@ async def get_table_data(table_name: str, limit: int = 10, db: AsyncSession = De
 # Model-specific endpoints for more detailed information
 
 @router.get("/users")
-async def get_users(db: AsyncSession = Depends(get_db)):
+async def get_users(db: AsyncSession = Depends(get_read_db)):
     """Get all users"""
     result = await db.execute(select(User))
     users = result.scalars().all()
     return [{"id": user.id, "username": user.username, "role": user.role, "is_active": user.is_active} for user in users]
 
 @router.get("/levels")
-async def get_levels(db: AsyncSession = Depends(get_db)):
+async def get_levels(db: AsyncSession = Depends(get_read_db)):
     """Get all levels"""
     result = await db.execute(select(Level))
     levels = result.scalars().all()
     return [{"id": level.id, "code": level.code, "description": level.description, "level": level.level} for level in levels]
 
 @router.get("/quizzes")
-async def get_quizzes(db: AsyncSession = Depends(get_db)):
+async def get_quizzes(db: AsyncSession = Depends(get_read_db)):
     """Get all quizzes with basic information"""
     result = await db.execute(select(Quiz))
     quizzes = result.scalars().all()
     return [{"id": quiz.id, "title": quiz.title, "status": quiz.status, "level_id": quiz.level_id} for quiz in quizzes]
 
 @router.get("/quiz/{quiz_id}")
-async def get_quiz(quiz_id: int, db: AsyncSession = Depends(get_db)):
+async def get_quiz(quiz_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get detailed information about a specific quiz including questions and answers"""
     result = await db.execute(select(Quiz).filter(Quiz.id == quiz_id))
     quiz = result.scalar_one_or_none()
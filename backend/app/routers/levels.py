@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db import get_db
+from ..db import get_read_db
 from ..schemas.level import LevelRead
 from ..crud.level import get_levels
 from ..core.security import get_current_active_user, get_current_user
@@ -15,7 +15,7 @@ router = APIRouter(
 
 @router.get("/", response_model=List[LevelRead])
 async def read_levels(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -1,21 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Literal
 import logging
 
-from ..db import get_db
+from ..db import get_read_db, get_write_db
 from ..core.security import get_current_active_admin, get_current_active_user, get_current_active_student
 from ..services.quiz_service import QuizService
 from ..services.ai_quiz_generator import AIGenerationError
 from ..schemas.quiz import (
     QuizCreate, QuizGenerationResponse, QuizReadList, 
-    QuizReadDetail, QuizReadDetailStudent, QuizUpdate
+    QuizReadDetail, QuizReadDetailStudent, QuizUpdate, QuizBundle, QuizStatsRead,
+    QuizItemAnalysis, QuizSearchHit, BankQuestion
+)
+from ..schemas.question import (
+    AnswerCheckResponse, AnswerExplanationResponse, QuizGradeRequest, QuizGradeResponse
 )
-from ..schemas.question import AnswerCheckResponse
 from ..schemas.answer import AnswerCheck
-from ..schemas.result import ResultRead, ResultCreate
+from ..schemas.result import ResultRead, ResultCreate, ResultHistoryRead
 from ..models.user import User
 from ..crud.quiz import get_quizzes, remove_quiz
+from ..crud.answer_attempt import get_quiz_score
+from ..crud.result import get_history
+from ..services.result_writer import result_writer
+from ..services.idempotency import IdempotencyKeyInProgress, idempotency_store
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +31,185 @@ router = APIRouter(prefix="/api/v1/quizzes", tags=["quizzes"])
 # Initialize services
 quiz_service = QuizService()
 
+@router.get(
+    "/search",
+    response_model=List[QuizSearchHit],
+    status_code=status.HTTP_200_OK,
+    summary="Search quizzes",
+    description="Full-text search over quiz titles, question texts and answer texts, ranked by relevance. Admins can search all quizzes and filter by status, students only find published quizzes."
+)
+async def search_quizzes(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    status: Optional[Literal["draft", "published"]] = Query(None, description="Filter by status (admin only)"),
+    skip: int = Query(0, ge=0, description="Number of quizzes to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of quizzes to return"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Search quizzes
+    
+    - **q**: Search text, all words must match (the last one as a prefix)
+    - **status**: Filter by status (admin only)
+    - **skip**, **limit**: Pagination
+    
+    Each quiz is returned once, ranked by its best matching title, question
+    or answer, with a highlighted snippet of that text.
+    """
+    try:
+        return await quiz_service.search_quizzes(
+            db=db,
+            user=current_user,
+            text=q,
+            status=status,
+            skip=skip,
+            limit=limit
+        )
+    except Exception as e:
+        # Handle unexpected errors
+        logger.exception(f"Unexpected error during quiz search: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred"
+        )
+
+@router.get(
+    "/bank/questions",
+    response_model=List[BankQuestion],
+    status_code=status.HTTP_200_OK,
+    summary="Suggest question bank entries",
+    description="Offer existing questions of published quizzes for a new quiz, before generating it with AI. Only admin users can access this endpoint."
+)
+async def suggest_bank_questions(
+    topic: str = Query(..., min_length=1, max_length=200, description="Topic of the new quiz"),
+    level_id: int = Query(..., description="Level of the new quiz"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of questions to return"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_admin)
+):
+    """
+    Suggest question bank entries
+    
+    - **topic**: Topic of the new quiz, matched against published quizzes
+    - **level_id**: Level of the new quiz
+    - **limit**: Maximum number of questions
+    
+    Near-duplicates are left out. Pass the chosen IDs as `bank_question_ids`
+    to `POST /api/v1/quizzes`; only the remaining questions are generated.
+    """
+    try:
+        return await quiz_service.suggest_bank_questions(
+            db=db,
+            topic=topic,
+            level_id=level_id,
+            limit=limit
+        )
+    except Exception as e:
+        # Handle unexpected errors
+        logger.exception(f"Unexpected error while suggesting bank questions: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred"
+        )
+
+@router.get(
+    "/{quiz_id}/stats",
+    response_model=QuizStatsRead,
+    status_code=status.HTTP_200_OK,
+    summary="Get quiz statistics",
+    description="Get the number of submitted results, mean score, standard deviation and score histogram of a quiz. Only admin users can access this endpoint."
+)
+async def get_quiz_stats(
+    quiz_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_admin)
+):
+    """
+    Get aggregated results of a quiz
+    
+    - **quiz_id**: ID of the quiz
+    
+    Statistics are maintained incrementally with every submitted result,
+    so this is a single row lookup. Only admin users can access this endpoint.
+    """
+    try:
+        return await quiz_service.get_quiz_stats(db=db, quiz_id=quiz_id)
+    except HTTPException as e:
+        # Re-raise HTTP exceptions
+        raise e
+    except Exception as e:
+        # Handle unexpected errors
+        logger.exception(f"Unexpected error getting quiz statistics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred"
+        )
+
+@router.get(
+    "/{quiz_id}/item-analysis",
+    response_model=QuizItemAnalysis,
+    status_code=status.HTTP_200_OK,
+    summary="Get item analysis",
+    description="Get difficulty (p-value), point-biserial discrimination and answer selection rates of every question, computed over all recorded answer attempts. Only admin users can access this endpoint."
+)
+async def get_quiz_item_analysis(
+    quiz_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_admin)
+):
+    """
+    Get the item analysis of a quiz
+    
+    - **quiz_id**: ID of the quiz
+    
+    The first attempt of every student per question counts. Only admin
+    users can access this endpoint.
+    """
+    try:
+        return await quiz_service.get_item_analysis(db=db, quiz_id=quiz_id)
+    except HTTPException as e:
+        # Re-raise HTTP exceptions
+        raise e
+    except Exception as e:
+        # Handle unexpected errors
+        logger.exception(f"Unexpected error getting item analysis: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred"
+        )
+
+@router.get(
+    "/{quiz_id}/bundle",
+    response_model=QuizBundle,
+    status_code=status.HTTP_200_OK,
+    summary="Download an offline quiz bundle",
+    description="Get a signed bundle of a published quiz with salted hashes of the correct answers, so the client can give instant feedback offline. Submit the answers with POST /{quiz_id}/grade, passing the bundle's key_digest."
+)
+async def get_quiz_bundle(
+    quiz_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_student)
+):
+    """
+    Download a signed offline bundle of a quiz
+    
+    - **quiz_id**: ID of the quiz
+    
+    Only student users can use this endpoint.
+    """
+    try:
+        return await quiz_service.build_quiz_bundle(db=db, quiz_id=quiz_id)
+    except HTTPException:
+        # Re-raise HTTP exceptions from service
+        raise
+    except Exception as e:
+        # Handle unexpected errors
+        logger.exception(f"Unexpected error building bundle for quiz {quiz_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred"
+        )
+
 @router.get(
     "/{quiz_id}",
     status_code=status.HTTP_200_OK,
@@ -32,7 +218,7 @@ quiz_service = QuizService()
 )
 async def get_quiz(
     quiz_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -78,7 +264,7 @@ async def list_quizzes(
     sort_by: Literal["level", "title", "updated_at"] = Query("level", description="Field to sort by"),
     order: Literal["asc", "desc"] = Query("asc", description="Sort order"),
     status: Optional[Literal["draft", "published"]] = Query(None, description="Filter by status (admin only)"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -124,7 +310,9 @@ async def list_quizzes(
 )
 async def create_quiz(
     quiz_data: QuizCreate,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_active_admin)
 ):
     """
@@ -133,25 +321,50 @@ async def create_quiz(
     - **topic**: Topic of the quiz
     - **question_count**: Number of questions (5-20)
     - **level_id**: ID of the difficulty level
+    - **bank_question_ids**: Question bank entries to include (see `/bank/questions`)
+    - **Idempotency-Key** header: Retries with the same key create the quiz
+      only once; a retry during generation waits for it, a later one gets
+      the stored response (with `Idempotent-Replayed: true`)
     
     Only admin users can use this endpoint.
     """
 
     print(f"quiz_data========================: {quiz_data}")
+
+    async def generate():
+        try:
+            return await quiz_service.create_ai_quiz(
+                db=db,
+                quiz_data=quiz_data,
+                creator_id=current_user.id
+            )
+        finally:
+            # Hand the writer connection back before the response is stored
+            await db.rollback()
+
     try:
-        quiz = await quiz_service.create_ai_quiz(
-            db=db,
-            quiz_data=quiz_data,
-            creator_id=current_user.id
+        result = await idempotency_store.run(
+            key=idempotency_key,
+            user_id=current_user.id,
+            endpoint="POST /api/v1/quizzes",
+            payload=quiz_data,
+            work=generate
         )
-        return quiz
+        if result.replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return result.body
     except ValueError as e:
-        # Handle validation errors (e.g., invalid level_id)
+        # Handle validation errors (e.g., invalid level_id, reused idempotency key)
         logger.warning(f"Validation error during quiz creation: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=str(e)
         )
+    except IdempotencyKeyInProgress as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except AIGenerationError as e:
         # Handle AI generation errors
         logger.error(f"AI generation error: {str(e)}")
@@ -177,7 +390,7 @@ async def create_quiz(
 async def update_quiz(
     quiz_id: int,
     quiz_data: QuizUpdate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_active_admin)
 ):
     """
@@ -221,7 +434,7 @@ async def update_quiz(
 )
 async def delete_quiz(
     quiz_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: User = Depends(get_current_active_admin)
 ):
     """
@@ -263,7 +476,7 @@ async def delete_quiz(
 async def check_answer(
     quiz_id: int,
     answer_check_data: AnswerCheck,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_student)
 ):
     """
@@ -299,76 +512,198 @@ async def check_answer(
             detail="An unexpected error occurred"
         )
 
+@router.post(
+    "/{quiz_id}/grade",
+    response_model=QuizGradeResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Grade a whole quiz at once",
+    description="Grade all selected answers of a quiz in one request (exam mode) and store the result. Returns per-question correctness; explanations are fetched separately."
+)
+async def grade_quiz(
+    quiz_id: int,
+    grade_data: QuizGradeRequest,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_student)
+):
+    """
+    Grade all selected answers of a quiz at once
+    
+    - **quiz_id**: ID of the quiz
+    - **answers**: List of question_id / answer_id pairs, one per answered question
+    
+    Returns:
+    - **score** / **max_score**: Stored result, unanswered questions count as wrong
+    - **questions**: Correctness and correct_answer_id per answered question
+    
+    Only student users can use this endpoint.
+    """
+    try:
+        return await quiz_service.grade_quiz(
+            db=db,
+            quiz_id=quiz_id,
+            grade_data=grade_data,
+            current_user=current_user
+        )
+    except HTTPException:
+        # Re-raise HTTP exceptions from service
+        raise
+    except Exception as e:
+        # Handle unexpected errors
+        logger.exception(f"Unexpected error grading quiz {quiz_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred"
+        )
+
+@router.get(
+    "/{quiz_id}/questions/{question_id}/explanation",
+    response_model=AnswerExplanationResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get the explanation for an answer",
+    description="Get the AI-generated explanation for an answer the student has already given, e.g. after grading a whole quiz."
+)
+async def get_answer_explanation(
+    quiz_id: int,
+    question_id: int,
+    answer_id: int = Query(..., description="ID of the answer the student selected"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_student)
+):
+    """
+    Get the explanation for an answer the student has already given
+    
+    - **quiz_id**: ID of the quiz
+    - **question_id**: ID of the question
+    - **answer_id**: ID of the selected answer
+    
+    Only student users can use this endpoint.
+    """
+    try:
+        explanation = await quiz_service.explain_answer(
+            db=db,
+            quiz_id=quiz_id,
+            question_id=question_id,
+            answer_id=answer_id,
+            current_user=current_user
+        )
+        return AnswerExplanationResponse(
+            question_id=question_id,
+            answer_id=answer_id,
+            explanation=explanation
+        )
+    except HTTPException:
+        # Re-raise HTTP exceptions from service
+        raise
+    except Exception as e:
+        # Handle unexpected errors
+        logger.exception(f"Unexpected error explaining answer for quiz {quiz_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred"
+        )
+
 @router.post(
     "/{quiz_id}/results",
     response_model=ResultRead,
     status_code=status.HTTP_201_CREATED,
     summary="Submit quiz result",
-    description="Submit a student's result for a completed quiz. If the student has already completed this quiz, the existing result will be updated; otherwise, a new result will be created."
+    description="Submit a student's result for a completed quiz. The score is computed from the answers checked with check-answer. Every submission is kept in the result history; the returned result is the student's latest result for this quiz."
 )
 async def submit_quiz_result(
     quiz_id: int,
-    result_data: ResultCreate,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    result_data: Optional[ResultCreate] = None,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_student)
 ):
     """
     Submit a student's result for a completed quiz
     
     - **quiz_id**: ID of the completed quiz
-    - **result_data**: Score and max_score data
+    - **result_data**: Optional score and max_score computed by the client
+    - **Idempotency-Key** header: Retries with the same key add the result to
+      the history only once
+    
+    The score is computed on the server from the answers recorded by
+    check-answer (first attempt per question since the previous submission);
+    a client-provided score is only validated, never stored. The result is
+    written by the group-commit buffer and returned once it is committed.
     
     Only student users can use this endpoint.
     """
-    try:
-        # Get quiz to verify it exists
-        quiz = await quiz_service.get_quiz_by_id(db=db, quiz_id=quiz_id)
-        
-        # Verify that max_score matches the number of questions
-        question_count = len(quiz.questions)
-        if result_data.max_score != question_count:
+    async def submit():
+        # Score the quiz from the recorded attempts
+        quiz_score = await get_quiz_score(db=db, user_id=current_user.id, quiz_id=quiz_id)
+        if quiz_score is None:
             raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"max_score must match the number of questions ({question_count})"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Quiz not found"
             )
-        
-        # Verify that score is not greater than max_score
-        if result_data.score > result_data.max_score:
+        score, question_count, last_attempt_id = quiz_score
+        if question_count == 0:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail="score cannot be greater than max_score"
+                detail="Quiz has no questions"
             )
         
-        # Check if result already exists for this user and quiz
-        from ..crud import result as result_crud
-        existing_result = await result_crud.get_by_user_and_quiz(
-            db=db, 
-            user_id=current_user.id, 
-            quiz_id=quiz_id
-        )
+        if result_data is not None:
+            # Verify that max_score matches the number of questions
+            if result_data.max_score != question_count:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"max_score must match the number of questions ({question_count})"
+                )
+            
+            # Verify that score is not greater than max_score
+            if result_data.score > result_data.max_score:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="score cannot be greater than max_score"
+                )
+            
+            if result_data.score != score:
+                logger.info(
+                    f"Client score {result_data.score} for quiz {quiz_id} differs from "
+                    f"server score {score} (user {current_user.id})"
+                )
         
-        # Update or create result
-        if existing_result:
-            # Update existing result
-            updated_result = await result_crud.update(
-                db=db,
-                db_obj=existing_result,
-                obj_in=result_data
-            )
-            return updated_result
-        else:
-            # Create new result
-            new_result = await result_crud.create_with_owner(
-                db=db,
-                obj_in=result_data,
-                user_id=current_user.id,
-                quiz_id=quiz_id
-            )
-            return new_result
+        # Append to the history and update the latest result
+        result = await result_writer.submit(
+            user_id=current_user.id,
+            quiz_id=quiz_id,
+            score=score,
+            max_score=question_count,
+            last_attempt_id=last_attempt_id
+        )
+        return ResultRead.model_validate(result)
+
+    try:
+        result = await idempotency_store.run(
+            key=idempotency_key,
+            user_id=current_user.id,
+            endpoint="POST /api/v1/quizzes/{quiz_id}/results",
+            payload={"quiz_id": quiz_id, "result": result_data},
+            work=submit
+        )
+        if result.replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return result.body
             
     except HTTPException as e:
         # Re-raise HTTP exceptions
         raise e
+    except ValueError as e:
+        # Idempotency key reused for another submission
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except IdempotencyKeyInProgress as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except Exception as e:
         # Handle unexpected errors
         logger.exception(f"Unexpected error submitting quiz result: {str(e)}")
@@ -377,6 +712,36 @@ async def submit_quiz_result(
             detail="An unexpected error occurred"
         )
 
+@router.get(
+    "/{quiz_id}/results/history",
+    response_model=List[ResultHistoryRead],
+    status_code=status.HTTP_200_OK,
+    summary="Get result history",
+    description="Get all results the current student submitted for a quiz, newest first."
+)
+async def get_quiz_result_history(
+    quiz_id: int,
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of results to return"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_student)
+):
+    """
+    Get the current student's result history for a quiz
+    
+    - **quiz_id**: ID of the quiz
+    - **limit**: Maximum number of results to return (default 50)
+    
+    Only student users can use this endpoint.
+    """
+    try:
+        return await get_history(db=db, user_id=current_user.id, quiz_id=quiz_id, limit=limit)
+    except Exception as e:
+        logger.exception(f"Unexpected error getting result history: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred"
+        )
+
 # Additional endpoints for quiz operations can be added here
 # For example:
 # - GET / - Get list of quizzes
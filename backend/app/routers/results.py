@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Literal, Optional
+import logging
+
+from ..core.security import get_current_active_admin
+from ..models.user import User
+from ..services.result_export import iter_result_batches, stream_csv, stream_ndjson
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/results", tags=["results"])
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    summary="Export quiz results",
+    description="Stream the latest result of every student per quiz as CSV or NDJSON, optionally filtered by level, quiz and submission date. Only admin users can access this endpoint.",
+    responses={200: {"content": {"text/csv": {}, "application/x-ndjson": {}}}}
+)
+async def export_results(
+    format: Literal["csv", "ndjson"] = Query("csv", description="Export format"),
+    level_id: Optional[int] = Query(None, description="Filter by quiz level ID"),
+    quiz_id: Optional[int] = Query(None, description="Filter by quiz ID"),
+    date_from: Optional[datetime] = Query(None, description="Results submitted at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Results submitted before this time"),
+    current_user: User = Depends(get_current_active_admin)
+):
+    """
+    Export quiz results
+    
+    - **format**: csv (default) or ndjson
+    - **level_id**: Optional level filter
+    - **quiz_id**: Optional quiz filter
+    - **date_from** / **date_to**: Optional submission time range
+    
+    Rows are read in keyset batches and streamed as they are formatted, so
+    memory use does not grow with the size of the export.
+    Only admin users can access this endpoint.
+    """
+    if date_from is not None and date_to is not None and date_from >= date_to:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="date_from must be before date_to"
+        )
+    
+    batches = iter_result_batches(
+        level_id=level_id,
+        quiz_id=quiz_id,
+        date_from=date_from,
+        date_to=date_to
+    )
+    chunks = stream_csv(batches) if format == "csv" else stream_ndjson(batches)
+    logger.info(f"User {current_user.id} exporting results as {format}")
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="results.{format}"'}
+    )
@@ -5,7 +5,7 @@ from datetime import timedelta
 
 from ..core.security import authenticate_user, create_access_token
 from ..core.config import settings
-from ..db import get_db
+from ..db import get_read_db
 from ..schemas.token import Token
 
 router = APIRouter(
@@ -17,7 +17,7 @@ router = APIRouter(
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     OAuth2 compatible token login, get an access token for future requests
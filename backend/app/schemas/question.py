@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional, Union
-from .answer import AnswerCreate, AnswerRead, AnswerReadStudent, AnswerUpdate, AnswerCreateOrUpdate
+from .answer import AnswerCreate, AnswerRead, AnswerReadStudent, AnswerUpdate, AnswerCreateOrUpdate, AnswerCheck
+from .result import ResultRead
 
 class QuestionBase(BaseModel):
     """Base schema for question data"""
@@ -38,4 +39,35 @@ class AnswerCheckResponse(BaseModel):
     """Schema for the response when checking an answer"""
     is_correct: bool
     correct_answer_id: int
-    explanation: str 
\ No newline at end of file
+    explanation: str
+    
+class QuizGradeRequest(BaseModel):
+    """Schema for grading a whole quiz at once (exam mode)"""
+    answers: List[AnswerCheck] = Field(..., min_length=1, max_length=100)
+    # From an offline bundle: key_digest is rejected if the answer key changed
+    # since, salt and signature must be those of the same bundle
+    key_digest: Optional[str] = None
+    salt: Optional[str] = None
+    signature: Optional[str] = None
+    
+class QuestionGrade(BaseModel):
+    """Grading outcome of a single question"""
+    question_id: int
+    answer_id: int
+    is_correct: bool
+    correct_answer_id: int
+    
+class QuizGradeResponse(BaseModel):
+    """Schema for the response of whole-quiz grading, explanations are fetched separately"""
+    quiz_id: int
+    score: int
+    max_score: int
+    questions: List[QuestionGrade]
+    result: ResultRead
+    
+class AnswerExplanationResponse(BaseModel):
+    """Schema for a lazily generated answer explanation"""
+    question_id: int
+    answer_id: int
+    explanation: str
+
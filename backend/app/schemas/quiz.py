@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
 from .question import QuestionCreate, QuestionRead, QuestionReadStudent, QuestionUpdate, QuestionCreateOrUpdate
 
@@ -12,6 +12,9 @@ class QuizCreate(QuizBase):
     """Schema for quiz creation via AI generation"""
     topic: str
     question_count: int = Field(..., ge=5, le=20)
+    reuse_if_available: bool = Field(False, description="Clone a cached generation of the same topic, level and question count instead of calling the AI")
+    bypass_cache: bool = Field(False, description="Neither read nor store the generation cache")
+    bank_question_ids: List[int] = Field(default_factory=list, max_length=20, description="Questions of published quizzes to include; the AI only generates the remaining ones")
 
 class QuizUpdate(QuizBase):
     """Schema for quiz update"""
@@ -47,6 +50,74 @@ class QuizReadDetailStudent(QuizReadBase):
     """Schema for reading detailed quiz data - student view"""
     questions: List[QuestionReadStudent]
 
+class QuizSearchHit(BaseModel):
+    """Schema for a quiz found by full-text search"""
+    id: int
+    title: str
+    level_id: int
+    status: str
+    updated_at: datetime
+    score: float = Field(..., description="bm25 rank of the best matching text, lower is better")
+    matched_in: Literal["title", "question", "answer"]
+    snippet: str = Field(..., description="HTML-escaped excerpt of the best matching text, matches wrapped in <mark>")
+
+class QuizTransfer(BaseModel):
+    """Schema for one quiz in an NDJSON import/export file
+    
+    Refers to the level by code, since IDs differ between environments.
+    """
+    title: str = Field(..., min_length=3, max_length=256)
+    level: str
+    status: str = Field("draft", pattern="^(draft|published)$")
+    questions: List[QuestionCreate] = Field(..., min_length=1)
+
 class QuizGenerationResponse(QuizReadDetail):
     """Schema for the response when generating a quiz"""
-    pass 
\ No newline at end of file
+    from_cache: bool = False
+    from_bank: int = 0  # questions copied from the question bank
+    missing_questions: int = 0  # short of question_count after near-duplicates were dropped
+
+class BankQuestion(QuestionRead):
+    """Question bank entry, a question of a published quiz"""
+    quiz_id: int
+
+class QuizBundle(BaseModel):
+    """Signed quiz bundle for offline solving with client-side answer checks"""
+    quiz: QuizReadDetailStudent
+    salt: str
+    answer_hashes: Dict[int, str]  # question_id -> sha256("{salt}:{question_id}:{correct_answer_id}")
+    key_digest: str
+    issued_at: datetime
+    signature: str
+
+class QuizStatsRead(BaseModel):
+    """Schema for the aggregated results of a quiz"""
+    quiz_id: int
+    attempt_count: int
+    mean_score: Optional[float] = None
+    score_stddev: Optional[float] = None
+    mean_percent: Optional[float] = None
+    histogram: List[int] = Field(..., description="Result counts per 10% score bucket, full scores in the last one")
+    updated_at: Optional[datetime] = None
+
+class AnswerOptionStats(BaseModel):
+    """Schema for how often an answer was selected"""
+    answer_id: int
+    is_correct: bool
+    selection_rate: Optional[float] = Field(None, description="Share of the students answering the question who selected this answer")
+
+class QuestionItemStats(BaseModel):
+    """Schema for the item analysis of one question"""
+    question_id: int
+    responses: int = Field(..., description="Number of students who answered the question")
+    difficulty: Optional[float] = Field(None, description="Share of correct answers (p-value)")
+    discrimination: Optional[float] = Field(None, description="Point-biserial correlation with the rest score")
+    answers: List[AnswerOptionStats]
+
+class QuizItemAnalysis(BaseModel):
+    """Schema for the item analysis of a quiz"""
+    quiz_id: int
+    attempt_count: int
+    student_count: int
+    questions: List[QuestionItemStats]
+
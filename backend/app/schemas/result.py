@@ -17,4 +17,8 @@ class ResultRead(ResultBase):
     quiz_id: int
     created_at: datetime
     
-    model_config = ConfigDict(from_attributes=True) 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ResultHistoryRead(ResultRead):
+    """Schema for one entry of a student's result history"""
+    pass
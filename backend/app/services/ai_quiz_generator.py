@@ -1,9 +1,13 @@
+import asyncio
 import json
 import logging
+import time
 from typing import Dict, List, Optional, Tuple
 from openai import OpenAI, AsyncOpenAI
 
 from ..core.config import settings
+from .ai_routing import ModelRoute, model_router
+from .ai_scheduler import ai_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +19,9 @@ class AIQuizGeneratorService:
         self.api_key = openai_api_key or settings.OPENAI_API_KEY
         logger.info(f"OpenAI API key========================: {self.api_key}")
         print(f"OpenAI API key========================: {self.api_key}")
-        self.client = AsyncOpenAI(api_key=self.api_key)
-        self.sync_client = OpenAI(api_key=self.api_key)
+        base_url = settings.OPENAI_BASE_URL or None
+        self.client = AsyncOpenAI(api_key=self.api_key, base_url=base_url)
+        self.sync_client = OpenAI(api_key=self.api_key, base_url=base_url)
     
     async def generate_quiz(self, topic: str, question_count: int, level_data: Dict) -> Tuple[List, str]:
         """
@@ -31,22 +36,26 @@ class AIQuizGeneratorService:
             Tuple containing list of questions with answers and the quiz title
         """
         prompt = self._create_prompt(topic, question_count, level_data)
+        # Output limit and latency target scale with the number of questions
+        route = model_router.route("generation", prompt=prompt, units=question_count)
         
-        try:
-            # Try async call first
-            response = await self._call_openai_api(prompt)
-            parsed_data = self._parse_response(response)
-            return parsed_data
-        except Exception as e:
-            logger.warning(f"Async API call failed, trying synchronous fallback: {str(e)}")
+        # Queued generations give way to student explanations
+        async with ai_scheduler.slot("generation"):
             try:
-                # Fallback to synchronous call
-                response = self._call_openai_api_sync(prompt)
+                # Try async call first
+                response = await self._call_openai_api(prompt, route)
                 parsed_data = self._parse_response(response)
                 return parsed_data
             except Exception as e:
-                logger.error(f"Error generating quiz with AI: {str(e)}")
-                raise AIGenerationError(f"Failed to generate quiz: {str(e)}")
+                logger.warning(f"Async API call failed, trying synchronous fallback: {str(e)}")
+                try:
+                    # Fallback to synchronous call, off the event loop
+                    response = await asyncio.to_thread(self._call_openai_api_sync, prompt, route)
+                    parsed_data = self._parse_response(response)
+                    return parsed_data
+                except Exception as e:
+                    logger.error(f"Error generating quiz with AI: {str(e)}")
+                    raise AIGenerationError(f"Failed to generate quiz: {str(e)}")
     
     def _create_prompt(self, topic: str, question_count: int, level_data: Dict) -> str:
         """
@@ -95,65 +104,75 @@ class AIQuizGeneratorService:
         Each question MUST have exactly ONE correct answer (is_correct: true).
         """
     
-    async def _call_openai_api(self, prompt: str) -> str:
+    async def _call_openai_api(self, prompt: str, route: ModelRoute) -> str:
         """
         Call the OpenAI API to generate quiz content
         
         Args:
             prompt: The prompt to send to the API
+            route: Model and token limit chosen by the model router
             
         Returns:
             String containing the API response content
         """
+        started = time.monotonic()
         try:
             response = await self.client.chat.completions.create(
-                model="gpt-4.1",
+                model=route.model,
                 messages=[
                     {"role": "system", "content": "You are an educational quiz generator AI."},
                     {"role": "user", "content": prompt}
                 ],
                 timeout=120,
                 temperature=0.7,
-                max_tokens=3000,
+                max_tokens=route.max_tokens,
                 top_p=1.0,
                 frequency_penalty=0.0,
                 presence_penalty=0.0,
                 response_format={"type": "json_object"}
             )
-            return response.choices[0].message.content
+            content = response.choices[0].message.content
         except Exception as e:
+            model_router.record(route, time.monotonic() - started, failed=True)
             logger.exception("OpenAI API call failed")  # Logs full stack trace
             raise AIGenerationError(f"OpenAI API call failed: {str(e)}") from e
+        model_router.record(route, time.monotonic() - started)
+        return content
     
-    def _call_openai_api_sync(self, prompt: str) -> str:
+    def _call_openai_api_sync(self, prompt: str, route: ModelRoute) -> str:
         """
         Call the OpenAI API synchronously to generate quiz content
         
         Args:
             prompt: The prompt to send to the API
+            route: Model and token limit chosen by the model router
             
         Returns:
             String containing the API response content
         """
+        started = time.monotonic()
         try:
             response = self.sync_client.chat.completions.create(
-                model="gpt-4.1",
+                model=route.model,
                 messages=[
                     {"role": "system", "content": "You are an educational quiz generator AI."},
                     {"role": "user", "content": prompt}
                 ],
                 timeout=120,
                 temperature=0.7,
-                max_tokens=3000,
+                max_tokens=route.max_tokens,
                 top_p=1.0,
                 frequency_penalty=0.0,
                 presence_penalty=0.0,
                 response_format={"type": "json_object"}
             )
-            return response.choices[0].message.content
+            content = response.choices[0].message.content
         except Exception as e:
+            model_router.record(route, time.monotonic() - started, failed=True)
             logger.exception("Synchronous OpenAI API call failed")  # Logs full stack trace
             raise AIGenerationError(f"Synchronous OpenAI API call failed: {str(e)}") from e
+        model_router.record(route, time.monotonic() - started)
+        return content
     
     def _parse_response(self, response: str) -> Tuple[List, str]:
         """
@@ -0,0 +1,269 @@
+import logging
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Latency samples kept per model and task; older ones than
+# AI_LATENCY_WINDOW seconds are dropped as well
+_MAX_SAMPLES = 500
+# Below this many recent samples a model is assumed to meet the target, so
+# a model that was avoided gets measured again once its samples expire
+_MIN_SAMPLES = 20
+# A model failing more than this share of its recent calls (at least
+# _MIN_ERROR_CALLS of them) is skipped until the failures expire
+_MAX_ERROR_RATE = 0.5
+_MIN_ERROR_CALLS = 5
+# Rough prompt size estimate for the cost check
+_CHARS_PER_TOKEN = 4
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """Model with its price in USD per 1M tokens"""
+    name: str
+    input_price: float
+    output_price: float
+
+
+@dataclass(frozen=True)
+class TaskPolicy:
+    """Latency and cost targets and output budget of an AI task"""
+    p95_target: float  # seconds for the whole call
+    max_cost: float  # USD per call, prompt plus max_tokens
+    base_tokens: int  # output tokens independent of the size of the work
+    tokens_per_unit: int  # output tokens per unit of work (e.g. per question)
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """Model and output limit chosen for one AI call"""
+    task: str
+    model: str
+    max_tokens: int
+    units: int
+
+
+def parse_models(spec: str) -> List[ModelPrice]:
+    """
+    Parse the AI_MODELS setting
+
+    Args:
+        spec: Comma-separated name:input_price:output_price entries, in order
+            of preference (prices in USD per 1M tokens)
+
+    Returns:
+        Models in order of preference
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    models = []
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        try:
+            name, input_price, output_price = entry.strip().split(":")
+            models.append(ModelPrice(name, float(input_price), float(output_price)))
+        except ValueError:
+            raise ValueError(f"Invalid AI_MODELS entry '{entry}', expected name:input_price:output_price")
+    if not models:
+        raise ValueError("AI_MODELS must list at least one model")
+    return models
+
+
+def default_policies() -> Dict[str, TaskPolicy]:
+    """Task policies from the settings"""
+    return {
+        "explanation": TaskPolicy(
+            p95_target=settings.AI_EXPLANATION_P95_TARGET,
+            max_cost=settings.AI_EXPLANATION_MAX_COST,
+            base_tokens=settings.AI_EXPLANATION_MAX_TOKENS,
+            tokens_per_unit=0,
+        ),
+        "generation": TaskPolicy(
+            p95_target=settings.AI_GENERATION_P95_TARGET,
+            max_cost=settings.AI_GENERATION_MAX_COST,
+            base_tokens=settings.AI_GENERATION_BASE_TOKENS,
+            tokens_per_unit=settings.AI_GENERATION_TOKENS_PER_QUESTION,
+        ),
+    }
+
+
+class ModelRouter:
+    """Picks the model and output token limit of each AI call
+
+    The token limit is sized to the work (base_tokens + units *
+    tokens_per_unit), so a 5-question quiz does not reserve the budget of a
+    20-question one. Models are tried in order of preference; a model is
+    skipped if the call could cost more than the task's max_cost or if its
+    observed p95 latency, scaled to the units of the call, misses the task's
+    p95_target. Latency of successful calls is recorded per model and task
+    as seconds per unit over a sliding window, so a model that recovers is
+    used again. Failed calls are counted separately: a model that fails
+    fast (wrong name, bad key, connection refused) would otherwise look like
+    the quickest one. Models failing more than _MAX_ERROR_RATE of their
+    recent calls are skipped. If no model meets the target the fastest
+    affordable one is used.
+    """
+
+    def __init__(
+        self,
+        models: Optional[List[ModelPrice]] = None,
+        policies: Optional[Dict[str, TaskPolicy]] = None,
+        window: Optional[float] = None
+    ):
+        """
+        Initialize the router
+
+        Args:
+            models: Models in order of preference, defaults to settings.AI_MODELS
+            policies: Policy per task, defaults to the AI_EXPLANATION_* and
+                AI_GENERATION_* settings
+            window: Seconds latency samples are kept
+        """
+        self.models = models or parse_models(settings.AI_MODELS)
+        self.policies = policies or default_policies()
+        self.window = window if window is not None else settings.AI_LATENCY_WINDOW
+        self._samples: Dict[Tuple[str, str], Deque[Tuple[float, float]]] = defaultdict(
+            lambda: deque(maxlen=_MAX_SAMPLES)
+        )
+        # (time, failed) of every recent call, for the error rate
+        self._calls: Dict[Tuple[str, str], Deque[Tuple[float, bool]]] = defaultdict(
+            lambda: deque(maxlen=_MAX_SAMPLES)
+        )
+
+    def route(self, task: str, prompt: str = "", units: int = 1) -> ModelRoute:
+        """
+        Choose the model and token limit of a call
+
+        Args:
+            task: Name of the task policy (explanation, generation)
+            prompt: Prompt of the call, for the cost estimate
+            units: Size of the work in the task's units
+
+        Returns:
+            ModelRoute to call the API with and to pass to record
+
+        Raises:
+            ValueError: If the task has no policy
+        """
+        policy = self.policies.get(task)
+        if policy is None:
+            raise ValueError(f"No model routing policy for task '{task}'")
+        units = max(units, 1)
+        max_tokens = policy.base_tokens + units * policy.tokens_per_unit
+        prompt_tokens = len(prompt) // _CHARS_PER_TOKEN
+
+        affordable = [
+            model for model in self.models
+            if (prompt_tokens * model.input_price + max_tokens * model.output_price) / 1_000_000 <= policy.max_cost
+        ]
+        if not affordable:
+            affordable = [min(self.models, key=lambda model: model.output_price)]
+            logger.warning(f"No model fits the cost target of '{task}', using {affordable[0].name}")
+
+        healthy = [model for model in affordable if (self.error_rate(model.name, task) or 0.0) <= _MAX_ERROR_RATE]
+        if not healthy:
+            healthy = [min(affordable, key=lambda model: self.error_rate(model.name, task))]
+            logger.warning(f"Every model is failing for '{task}', using {healthy[0].name}")
+
+        fastest = None
+        for model in healthy:
+            p95 = self.p95(model.name, task)
+            if p95 is None or p95 * units <= policy.p95_target:
+                return ModelRoute(task=task, model=model.name, max_tokens=max_tokens, units=units)
+            if fastest is None or p95 < fastest[1]:
+                fastest = (model, p95)
+        logger.warning(
+            f"No model meets the p95 target of {policy.p95_target}s for '{task}' ({units} units), "
+            f"using {fastest[0].name}"
+        )
+        return ModelRoute(task=task, model=fastest[0].name, max_tokens=max_tokens, units=units)
+
+    def record(self, route: ModelRoute, seconds: float, failed: bool = False) -> None:
+        """
+        Record the outcome of a call, and its latency if it succeeded
+
+        Args:
+            route: Route the call was made with
+            seconds: Duration of the call
+            failed: Whether the call raised
+        """
+        now = time.monotonic()
+        self._calls[(route.model, route.task)].append((now, failed))
+        if not failed:
+            self._samples[(route.model, route.task)].append((now, seconds / route.units))
+
+    def p95(self, model: str, task: str) -> Optional[float]:
+        """
+        Observed p95 latency per unit of a model for a task
+
+        Args:
+            model: Name of the model
+            task: Name of the task
+
+        Returns:
+            Seconds per unit, or None with fewer than _MIN_SAMPLES recent samples
+        """
+        samples = self._recent(self._samples, model, task)
+        if len(samples) < _MIN_SAMPLES:
+            return None
+        latencies = sorted(latency for _, latency in samples)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def error_rate(self, model: str, task: str) -> Optional[float]:
+        """
+        Share of the recent calls of a model for a task that failed
+
+        Args:
+            model: Name of the model
+            task: Name of the task
+
+        Returns:
+            Failed share between 0 and 1, or None with fewer than _MIN_ERROR_CALLS recent calls
+        """
+        calls = self._recent(self._calls, model, task)
+        if len(calls) < _MIN_ERROR_CALLS:
+            return None
+        return sum(failed for _, failed in calls) / len(calls)
+
+    def _recent(self, series: Dict[Tuple[str, str], Deque], model: str, task: str) -> Deque:
+        """Drop the entries older than the window and return the rest"""
+        entries = series.get((model, task))
+        if entries is None:
+            return deque()
+        cutoff = time.monotonic() - self.window
+        while entries and entries[0][0] < cutoff:
+            entries.popleft()
+        return entries
+
+    def metrics(self) -> Dict:
+        """
+        Observed latency per task and model
+
+        Returns:
+            Per task: p95 target and, per model, the number of recent samples,
+            the p95 seconds per unit and the error rate (None until enough calls)
+        """
+        return {
+            task: {
+                "p95_target": policy.p95_target,
+                "models": {
+                    model.name: {
+                        "p95_per_unit": self.p95(model.name, task),
+                        "samples": len(self._samples.get((model.name, task), ())),
+                        "error_rate": self.error_rate(model.name, task),
+                    }
+                    for model in self.models
+                },
+            }
+            for task, policy in self.policies.items()
+        }
+
+
+model_router = ModelRouter()
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Wait times kept per lane for the percentiles in AIScheduler.metrics
+_WAIT_SAMPLES = 1000
+
+
+class _Lane:
+    """Queue and counters of one priority lane"""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.running = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.started = 0
+        self.waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.started += 1
+        self.waits.append(seconds)
+        self.max_wait = max(self.max_wait, seconds)
+
+
+class AIScheduler:
+    """Shares the upstream AI capacity between priority lanes
+
+    At most `capacity` AI calls run at once. Each lane has its own cap on
+    top of that, so bulk quiz generation can never take the slots students
+    need for explanations. When a slot frees up it goes to the highest
+    priority lane with queued calls that is below its cap: an explanation
+    queued after a batch of generations starts before them. Calls that are
+    already running are never interrupted.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, lanes: Optional[Dict[str, int]] = None):
+        """
+        Initialize the scheduler
+
+        Args:
+            capacity: Maximum number of AI calls running at once
+            lanes: Concurrency cap per lane, highest priority first
+        """
+        self.capacity = capacity or settings.AI_MAX_CONCURRENCY
+        if lanes is None:
+            lanes = {
+                "explanation": settings.AI_EXPLANATION_CONCURRENCY,
+                "generation": settings.AI_GENERATION_CONCURRENCY,
+            }
+        self._lanes = {name: _Lane(name, limit) for name, limit in lanes.items()}
+        self._running = 0
+
+    @asynccontextmanager
+    async def slot(self, lane: str) -> AsyncIterator[None]:
+        """
+        Wait for a slot of a lane and hold it for the duration of the block
+
+        Args:
+            lane: Name of the lane
+
+        Raises:
+            ValueError: If the lane does not exist
+        """
+        state = self._lanes.get(lane)
+        if state is None:
+            raise ValueError(f"Unknown AI scheduler lane '{lane}'")
+
+        queued_at = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted and cancelled in the same iteration: hand the slot on
+                self._release(state)
+            elif waiter in state.waiters:
+                state.waiters.remove(waiter)
+            raise
+
+        wait = time.monotonic() - queued_at
+        state.record_wait(wait)
+        if wait >= 1:
+            logger.info(f"AI call in lane '{lane}' waited {wait:.2f}s for a slot")
+        try:
+            yield
+        finally:
+            self._release(state)
+
+    def _dispatch(self) -> None:
+        """Hand free slots to queued calls, highest priority lane first"""
+        for state in self._lanes.values():
+            while state.waiters and state.running < state.limit and self._running < self.capacity:
+                waiter = state.waiters.popleft()
+                if waiter.done():
+                    continue
+                state.running += 1
+                self._running += 1
+                waiter.set_result(None)
+
+    def _release(self, state: _Lane) -> None:
+        """Free the slot of a finished call"""
+        state.running -= 1
+        self._running -= 1
+        self._dispatch()
+
+    def metrics(self) -> Dict:
+        """
+        Current queue depth and wait times
+
+        Returns:
+            Dict with capacity, running and per lane: limit, running, queued,
+            started and the mean, p95 and max wait in seconds (over the last
+            calls, max since start)
+        """
+        lanes = {}
+        for name, state in self._lanes.items():
+            waits = sorted(state.waits)
+            lanes[name] = {
+                "limit": state.limit,
+                "running": state.running,
+                "queued": sum(1 for waiter in state.waiters if not waiter.done()),
+                "started": state.started,
+                "wait_mean": sum(waits) / len(waits) if waits else 0.0,
+                "wait_p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                "wait_max": state.max_wait,
+            }
+        return {"capacity": self.capacity, "running": self._running, "lanes": lanes}
+
+
+ai_scheduler = AIScheduler()
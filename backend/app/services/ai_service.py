@@ -1,12 +1,22 @@
+import asyncio
 import logging
+import time
 from typing import Optional
 import os
 from openai import OpenAI, AsyncOpenAI
 
 from ..core.config import settings
+from .ai_routing import ModelRoute, model_router
+from .ai_scheduler import ai_scheduler
 
 logger = logging.getLogger(__name__)
 
+# Texts returned instead of an explanation when none could be generated;
+# callers show them to the student but must not cache them
+EXPLANATION_NOT_CONFIGURED = "Explanation not available. Please contact an administrator."
+EXPLANATION_FAILED = "Explanation not available due to an unexpected error."
+EXPLANATION_FALLBACKS = frozenset({EXPLANATION_NOT_CONFIGURED, EXPLANATION_FAILED})
+
 class AIService:
     """Service for AI-powered features"""
     
@@ -14,9 +24,9 @@ class AIService:
         """Initialize the AI service"""
         self.api_key = openai_api_key or settings.OPENAI_API_KEY
         logger.info(f"OpenAI API key: {self.api_key}")
-        self.client = AsyncOpenAI(api_key=self.api_key)
-        self.sync_client = OpenAI(api_key=self.api_key)
-        self.model = "gpt-4.1"
+        base_url = settings.OPENAI_BASE_URL or None
+        self.client = AsyncOpenAI(api_key=self.api_key, base_url=base_url)
+        self.sync_client = OpenAI(api_key=self.api_key, base_url=base_url)
         
         if not self.api_key:
             logger.warning("OPENAI_API_KEY not set in environment or settings")
@@ -42,13 +52,14 @@ class AIService:
             is_student_correct: Whether the student's answer was correct
             
         Returns:
-            Generated explanation text
+            Generated explanation text, or one of EXPLANATION_FALLBACKS if it
+            could not be generated
         """
         try:
             # Check if API key is available
             if not self.api_key:
                 logger.error("Cannot generate explanation: OPENAI_API_KEY not set")
-                return "Explanation not available. Please contact an administrator."
+                return EXPLANATION_NOT_CONFIGURED
             
             # Build the prompt based on whether the student was correct
             if is_student_correct:
@@ -74,64 +85,81 @@ class AIService:
                     f"Use simple language appropriate for the quiz level."
                 )
             
-            try:
-                # Try async call first
-                response = await self._call_openai_api(prompt)
-                return response.strip()
-            except Exception as e:
-                logger.warning(f"Async API call failed, trying synchronous fallback: {str(e)}")
+            route = model_router.route("explanation", prompt=prompt)
+            # Students wait for explanations: they run in the priority lane
+            async with ai_scheduler.slot("explanation"):
                 try:
-                    # Fallback to synchronous call
-                    response = self._call_openai_api_sync(prompt)
+                    # Try async call first
+                    response = await self._call_openai_api(prompt, route)
                     return response.strip()
                 except Exception as e:
-                    logger.error(f"Error generating explanation with AI: {str(e)}")
-                    return "Explanation not available due to an unexpected error."
+                    logger.warning(f"Async API call failed, trying synchronous fallback: {str(e)}")
+                    try:
+                        # Fallback to synchronous call, off the event loop
+                        response = await asyncio.to_thread(self._call_openai_api_sync, prompt, route)
+                        return response.strip()
+                    except Exception as e:
+                        logger.error(f"Error generating explanation with AI: {str(e)}")
+                        return EXPLANATION_FAILED
                 
         except Exception as e:
             logger.exception(f"Error generating explanation: {str(e)}")
-            return "Explanation not available due to an unexpected error."
+            return EXPLANATION_FAILED
     
-    async def _call_openai_api(self, prompt: str) -> str:
+    async def _call_openai_api(self, prompt: str, route: ModelRoute) -> str:
         """
         Call the OpenAI API to generate explanation
         
         Args:
             prompt: The prompt to send to the API
+            route: Model and token limit chosen by the model router
             
         Returns:
             String containing the API response content
         """
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an educational assistant explaining quiz answers."},
-                {"role": "user", "content": prompt}
-            ],
-            timeout=10.0,
-            temperature=0.7,
-            max_tokens=150
-        )
+        started = time.monotonic()
+        try:
+            response = await self.client.chat.completions.create(
+                model=route.model,
+                messages=[
+                    {"role": "system", "content": "You are an educational assistant explaining quiz answers."},
+                    {"role": "user", "content": prompt}
+                ],
+                timeout=10.0,
+                temperature=0.7,
+                max_tokens=route.max_tokens
+            )
+        except Exception:
+            model_router.record(route, time.monotonic() - started, failed=True)
+            raise
+        model_router.record(route, time.monotonic() - started)
         return response.choices[0].message.content
     
-    def _call_openai_api_sync(self, prompt: str) -> str:
+    def _call_openai_api_sync(self, prompt: str, route: ModelRoute) -> str:
         """
         Call the OpenAI API synchronously to generate explanation
         
         Args:
             prompt: The prompt to send to the API
+            route: Model and token limit chosen by the model router
             
         Returns:
             String containing the API response content
         """
-        response = self.sync_client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an educational assistant explaining quiz answers."},
-                {"role": "user", "content": prompt}
-            ],
-            timeout=10.0,
-            temperature=0.7,
-            max_tokens=150
-        )
+        started = time.monotonic()
+        try:
+            response = self.sync_client.chat.completions.create(
+                model=route.model,
+                messages=[
+                    {"role": "system", "content": "You are an educational assistant explaining quiz answers."},
+                    {"role": "user", "content": prompt}
+                ],
+                timeout=10.0,
+                temperature=0.7,
+                max_tokens=route.max_tokens
+            )
+        except Exception:
+            model_router.record(route, time.monotonic() - started, failed=True)
+            raise
+        model_router.record(route, time.monotonic() - started)
         return response.choices[0].message.content 
\ No newline at end of file
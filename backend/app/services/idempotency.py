@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from ..config import settings
+from ..crud.idempotency_key import claim_key, complete_key, get_key, purge_keys, release_key
+from ..db import ReadSessionLocal, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyKeyMismatch(ValueError):
+    """The key was already used for a different request"""
+
+
+class IdempotencyKeyInProgress(Exception):
+    """The request of the key is still running in another process"""
+
+
+@dataclass
+class IdempotentResponse:
+    """JSON response of an idempotent request"""
+    body: Any
+    replayed: bool  # stored response of an earlier request
+
+
+def request_hash(endpoint: str, payload: Any) -> str:
+    """
+    Fingerprint of a request, to detect a key reused for another request
+
+    Args:
+        endpoint: Method and route
+        payload: JSON-compatible request data
+
+    Returns:
+        Hex sha256 digest
+    """
+    data = json.dumps([endpoint, jsonable_encoder(payload)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """Runs expensive POST requests at most once per Idempotency-Key
+
+    The key is claimed in the idempotency_keys table before the work starts
+    and the JSON response is stored when it succeeds. A retry of a finished
+    request gets the stored response. A retry arriving while the work is
+    still running in this process awaits the same task; one arriving in
+    another worker polls the table. If the work fails the key is released,
+    so the next retry runs it again.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        read_session_factory=ReadSessionLocal,
+        ttl: Optional[float] = None,
+        lock_timeout: Optional[float] = None,
+        wait_timeout: Optional[float] = None,
+        poll_interval: float = 0.5
+    ):
+        """
+        Initialize the store
+
+        Args:
+            session_factory: Factory for write sessions
+            read_session_factory: Factory for read sessions, used while waiting
+            ttl: Seconds a key is kept
+            lock_timeout: Seconds after which an in-progress key is taken over
+            wait_timeout: Seconds a retry waits for a request running elsewhere
+            poll_interval: Seconds between checks while waiting
+        """
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory
+        self.ttl = ttl if ttl is not None else settings.IDEMPOTENCY_KEY_TTL
+        self.lock_timeout = lock_timeout if lock_timeout is not None else settings.IDEMPOTENCY_LOCK_TIMEOUT
+        self.wait_timeout = wait_timeout if wait_timeout is not None else settings.IDEMPOTENCY_WAIT_TIMEOUT
+        self.poll_interval = poll_interval
+        self._running: Dict[Tuple[int, str], Tuple[str, asyncio.Task]] = {}
+
+    async def run(
+        self,
+        key: Optional[str],
+        user_id: int,
+        endpoint: str,
+        payload: Any,
+        work: Callable[[], Awaitable[Any]]
+    ) -> IdempotentResponse:
+        """
+        Run a request once per key, or return the response of the earlier run
+
+        Args:
+            key: Idempotency-Key header value; without a key the work just runs
+            user_id: ID of the user, keys are scoped per user
+            endpoint: Method and route of the request
+            payload: JSON-compatible request data
+            work: Coroutine function doing the request, returns the response;
+                it must not hold the writer connection when it returns
+
+        Returns:
+            IdempotentResponse with the JSON-compatible response body
+
+        Raises:
+            IdempotencyKeyMismatch: If the key was used for a different request
+            IdempotencyKeyInProgress: If the request is still running elsewhere
+                after wait_timeout
+        """
+        if key is None:
+            return IdempotentResponse(body=jsonable_encoder(await work()), replayed=False)
+
+        fingerprint = request_hash(endpoint, payload)
+        deadline = asyncio.get_running_loop().time() + self.wait_timeout
+        while True:
+            running = self._running.get((user_id, key))
+            if running is not None:
+                if running[0] != fingerprint:
+                    raise IdempotencyKeyMismatch("Idempotency-Key was already used for a different request")
+                logger.info(f"Attaching to the running request of idempotency key '{key}'")
+                return IdempotentResponse(body=await asyncio.shield(running[1]), replayed=False)
+
+            if await self._claim(user_id, key, endpoint, fingerprint):
+                task = asyncio.ensure_future(self._execute(user_id, key, work))
+                self._running[(user_id, key)] = (fingerprint, task)
+                task.add_done_callback(lambda _: self._running.pop((user_id, key), None))
+                return IdempotentResponse(body=await asyncio.shield(task), replayed=False)
+
+            async with self.read_session_factory() as db:
+                stored = await get_key(db, user_id, key)
+            if stored is None:
+                # Released after a failure in the meantime, claim it again
+                continue
+            if stored.request_hash != fingerprint:
+                raise IdempotencyKeyMismatch("Idempotency-Key was already used for a different request")
+            if stored.status == "completed":
+                return IdempotentResponse(body=json.loads(stored.response_body), replayed=True)
+
+            if asyncio.get_running_loop().time() >= deadline:
+                raise IdempotencyKeyInProgress("A request with this Idempotency-Key is still in progress")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _claim(self, user_id: int, key: str, endpoint: str, fingerprint: str) -> bool:
+        """Purge expired keys and try to claim the key, in one short transaction"""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        async with self.session_factory() as db:
+            await purge_keys(db, now - timedelta(seconds=self.ttl))
+            claimed = await claim_key(
+                db,
+                user_id=user_id,
+                key=key,
+                endpoint=endpoint,
+                request_hash=fingerprint,
+                now=now,
+                lock_timeout=self.lock_timeout
+            )
+            await db.commit()
+        return claimed
+
+    async def _execute(self, user_id: int, key: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        """Do the work and store its response, or release the key if it fails"""
+        try:
+            body = jsonable_encoder(await work())
+        except BaseException:
+            async with self.session_factory() as db:
+                await release_key(db, user_id, key)
+                await db.commit()
+            raise
+        async with self.session_factory() as db:
+            await complete_key(db, user_id, key, json.dumps(body, ensure_ascii=False))
+            await db.commit()
+        return body
+
+
+idempotency_store = IdempotencyStore()
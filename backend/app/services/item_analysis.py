@@ -0,0 +1,210 @@
+import asyncio
+import itertools
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..crud.answer import get_answer_key
+from ..crud.answer_attempt import get_attempt_columns, get_attempt_watermark
+from ..schemas.quiz import AnswerOptionStats, QuestionItemStats, QuizItemAnalysis
+
+logger = logging.getLogger(__name__)
+
+# Columns of the attempt matrix
+ID, USER_ID, QUESTION_ID, ANSWER_ID, IS_CORRECT = range(5)
+
+
+@dataclass
+class AttemptMatrix:
+    """All attempts of one quiz as an (n, 5) int64 array, ordered by id
+
+    The last computed report is kept with the answer key it was computed for
+    and dropped whenever attempts are appended.
+    """
+    rows: np.ndarray = field(default_factory=lambda: np.empty((0, 5), dtype=np.int64))
+    analysis: Optional[QuizItemAnalysis] = None
+    answer_key: Optional[Dict[int, Dict[int, bool]]] = None
+
+    @property
+    def last_id(self) -> int:
+        return int(self.rows[-1, ID]) if len(self.rows) else 0
+
+    def append(self, new_rows: List[tuple]) -> None:
+        if new_rows:
+            values = np.fromiter(itertools.chain.from_iterable(new_rows), dtype=np.int64, count=5 * len(new_rows))
+            self.rows = np.concatenate([self.rows, values.reshape(-1, 5)])
+            self.analysis = None
+
+
+def _positions(ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Position of every value in the sorted ids array, -1 for unknown values (lookup table, no sort)"""
+    if len(ids) == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+    lookup = np.full(int(max(ids[-1], values.max(initial=0))) + 1, -1, dtype=np.int64)
+    lookup[ids] = np.arange(len(ids))
+    return lookup[np.maximum(values, 0)] if len(values) else np.empty(0, dtype=np.int64)
+
+
+def analyze(quiz_id: int, rows: np.ndarray, answer_key: Dict[int, Dict[int, bool]]) -> QuizItemAnalysis:
+    """
+    Compute the item analysis of a quiz from its attempt matrix
+
+    Only the first attempt of a student per question counts: check-answer
+    reveals the correct answer, so later re-checks say nothing about the
+    item. A student's total is the number of correctly answered questions.
+
+    Args:
+        quiz_id: ID of the quiz
+        rows: Attempt matrix, ordered by id
+        answer_key: {question_id: {answer_id: is_correct}} of the current questions
+
+    Returns:
+        QuizItemAnalysis with difficulty, discrimination and distractor rates per question
+    """
+    question_ids = np.array(sorted(answer_key), dtype=np.int64)
+    answer_ids = np.array(
+        sorted(answer_id for answers in answer_key.values() for answer_id in answers), dtype=np.int64
+    )
+
+    # Drop attempts of questions that were removed since
+    question_index = _positions(question_ids, rows[:, QUESTION_ID])
+    current = question_index >= 0
+    rows, question_index = rows[current], question_index[current]
+    attempt_count = len(rows)
+
+    present = np.zeros(int(rows[:, USER_ID].max(initial=0)) + 1, dtype=bool)
+    present[rows[:, USER_ID]] = True
+    users = np.flatnonzero(present)
+    user_index = _positions(users, rows[:, USER_ID])
+
+    # First attempt per (student, question): rows are ordered by id, keep the lowest
+    # position; the sentinel (one past the last row) marks unanswered questions
+    unanswered = len(rows)
+    first = np.full((len(users), len(question_ids)), unanswered, dtype=np.int64)
+    np.minimum.at(first, (user_index, question_index), np.arange(len(rows)))
+    answered = first < unanswered
+    first_rows = rows[first[answered]]
+
+    # Student x question matrix; unanswered questions count as wrong in the total
+    correct = np.zeros(answered.shape, dtype=np.float64)
+    correct[answered] = first_rows[:, IS_CORRECT]
+    total = correct.sum(axis=1)
+
+    # Point-biserial of each item against the rest score (total without the item),
+    # over the students who answered it
+    responses = answered.sum(axis=0)
+    rest = (total[:, None] - correct) * answered
+    with np.errstate(divide="ignore", invalid="ignore"):
+        difficulty = correct.sum(axis=0) / responses
+        mean_rest = rest.sum(axis=0) / responses
+        var_rest = (rest ** 2).sum(axis=0) / responses - mean_rest ** 2
+        covariance = (correct * rest).sum(axis=0) / responses - difficulty * mean_rest
+        discrimination = covariance / np.sqrt(difficulty * (1 - difficulty) * var_rest)
+
+    # Selection counts of every answer, one bincount over all questions
+    selected = _positions(answer_ids, first_rows[:, ANSWER_ID])
+    selections = np.bincount(selected[selected >= 0], minlength=len(answer_ids))
+    selection_count = dict(zip(answer_ids.tolist(), selections.tolist()))
+
+    questions = []
+    for j, question_id in enumerate(question_ids.tolist()):
+        count = int(responses[j])
+        questions.append(QuestionItemStats(
+            question_id=question_id,
+            responses=count,
+            difficulty=float(difficulty[j]) if count else None,
+            discrimination=float(discrimination[j]) if np.isfinite(discrimination[j]) else None,
+            answers=[
+                AnswerOptionStats(
+                    answer_id=answer_id,
+                    is_correct=is_correct,
+                    selection_rate=selection_count[answer_id] / count if count else None
+                )
+                for answer_id, is_correct in sorted(answer_key[question_id].items())
+            ]
+        ))
+
+    return QuizItemAnalysis(
+        quiz_id=quiz_id,
+        attempt_count=attempt_count,
+        student_count=len(users),
+        questions=questions
+    )
+
+
+class ItemAnalysisCache:
+    """Per-quiz attempt matrices kept in memory and topped up incrementally
+
+    On every request one aggregate query checks the attempt count and the
+    highest attempt id. New attempts are appended with a read of only the
+    rows above the cached id; if attempts disappeared (a question, student
+    or quiz was deleted) the matrix is reloaded. The statistics are
+    recomputed from the matrix only when attempts or the answer key changed.
+    """
+
+    def __init__(self, max_quizzes: Optional[int] = None):
+        """
+        Initialize the cache
+
+        Args:
+            max_quizzes: Number of quizzes kept in memory, least recently used are dropped
+        """
+        self.max_quizzes = max_quizzes or settings.ITEM_ANALYSIS_CACHE_QUIZZES
+        self._matrices: "OrderedDict[int, AttemptMatrix]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    def clear(self) -> None:
+        self._matrices.clear()
+
+    async def _refresh(self, db: AsyncSession, quiz_id: int) -> AttemptMatrix:
+        count, max_id = await get_attempt_watermark(db=db, quiz_id=quiz_id)
+        matrix = self._matrices.get(quiz_id)
+        if matrix is None or matrix.last_id > max_id:
+            matrix = AttemptMatrix()
+        if matrix.last_id < max_id:
+            matrix.append(await get_attempt_columns(
+                db=db, quiz_id=quiz_id, after_id=matrix.last_id, up_to_id=max_id
+            ))
+        if len(matrix.rows) != count:
+            # Cached attempts were deleted with their question, student or quiz
+            logger.info(f"Reloading item analysis data of quiz {quiz_id}")
+            matrix = AttemptMatrix()
+            matrix.append(await get_attempt_columns(db=db, quiz_id=quiz_id, up_to_id=max_id))
+
+        self._matrices[quiz_id] = matrix
+        self._matrices.move_to_end(quiz_id)
+        while len(self._matrices) > self.max_quizzes:
+            self._matrices.popitem(last=False)
+        return matrix
+
+    async def get(self, db: AsyncSession, quiz_id: int) -> Optional[QuizItemAnalysis]:
+        """
+        Get the item analysis of a quiz
+
+        Args:
+            db: Database session
+            quiz_id: ID of the quiz
+
+        Returns:
+            QuizItemAnalysis, or None if the quiz does not exist
+        """
+        key = await get_answer_key(db=db, quiz_id=quiz_id)
+        if key is None:
+            return None
+
+        answer_key = key[1]
+        async with self._lock:
+            matrix = await self._refresh(db, quiz_id)
+            if matrix.analysis is None or matrix.answer_key != answer_key:
+                matrix.analysis = analyze(quiz_id, matrix.rows, answer_key)
+                matrix.answer_key = answer_key
+            return matrix.analysis
+
+
+# Application-wide cache
+item_analysis_cache = ItemAnalysisCache()
@@ -0,0 +1,315 @@
+import asyncio
+import hashlib
+import logging
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..crud.question_bank import add_fingerprints, get_bucket_members, get_fingerprints, get_unindexed_questions
+from ..db import SessionLocal
+from .quiz_search import fold, search_terms
+
+logger = logging.getLogger(__name__)
+
+# MinHash signatures of MINHASH_PERMUTATIONS values, split into LSH_BANDS bands.
+# Two questions become candidates when all values of one band agree, which
+# happens for Jaccard similarity s with probability 1 - (1 - s^4)^16: about
+# 64% at 0.5 and over 99.9% at 0.8. Candidates are then verified on the
+# full signature.
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+ROWS_PER_BAND = MINHASH_PERMUTATIONS // LSH_BANDS
+SHINGLE_SIZE = 4
+
+# Universal hashing (a * x + b) mod p with a Mersenne prime; shingle hashes
+# are reduced to 31 bits so the products fit into uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(42)
+_A = _rng.integers(1, (1 << 31) - 1, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, (1 << 31) - 1, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+# Questions looked up per query; each adds LSH_BANDS bucket parameters
+_LOOKUP_CHUNK = 500
+
+
+@dataclass
+class NearDuplicate:
+    """Bank question most similar to a looked up question"""
+    question_id: int
+    similarity: float
+
+
+def question_shingles(question: Dict) -> List[str]:
+    """
+    Character shingles of a question and its answers
+
+    Texts are folded like the search index (case and diacritics ignored,
+    punctuation dropped). Answers are sorted, so their order does not
+    matter; which answer is correct does.
+
+    Args:
+        question: Dict with text and answers (text, is_correct)
+
+    Returns:
+        Distinct shingles of SHINGLE_SIZE characters
+    """
+    def normalize(text: str) -> str:
+        return " ".join(fold(term) for term in search_terms(text))
+
+    answers = sorted(
+        ("+" if answer["is_correct"] else "-") + normalize(answer["text"]) for answer in question["answers"]
+    )
+    text = " | ".join([normalize(question["text"])] + answers)
+    if len(text) <= SHINGLE_SIZE:
+        return [text]
+    return list({text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)})
+
+
+def signature(question: Dict) -> np.ndarray:
+    """
+    MinHash signature of a question
+
+    Args:
+        question: Dict with text and answers (text, is_correct)
+
+    Returns:
+        uint32 array of MINHASH_PERMUTATIONS values
+    """
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode()) & 0x7FFFFFFF for shingle in question_shingles(question)),
+        dtype=np.uint64
+    )
+    permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def signatures(questions: List[Dict]) -> List[np.ndarray]:
+    """MinHash signatures of several questions, see signature()"""
+    return [signature(question) for question in questions]
+
+
+def band_buckets(values: np.ndarray) -> List[int]:
+    """
+    LSH buckets of a signature, one per band
+
+    Args:
+        values: Signature from signature()
+
+    Returns:
+        Signed 64-bit bucket keys, distinct between bands
+    """
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = values[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(bytes([band]) + rows.astype("<u4").tobytes(), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def similarity(values: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """
+    Estimated Jaccard similarity of a signature and one or more others
+
+    Args:
+        values: Signature from signature()
+        others: Signature or 2-D array of signatures
+
+    Returns:
+        Share of equal signature values, per row of others
+    """
+    return (np.atleast_2d(others) == values).mean(axis=1)
+
+
+def to_bytes(values: np.ndarray) -> bytes:
+    """Serialize a signature for question_fingerprints.signature"""
+    return values.astype("<u4").tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    """Deserialize a signature from question_fingerprints.signature"""
+    return np.frombuffer(data, dtype="<u4").astype(np.uint32)
+
+
+def _fingerprints(rows: Sequence[Tuple[int, str, str, int]]) -> List[Tuple[int, bytes, List[int]]]:
+    """Fingerprints of the rows of get_unindexed_questions, one per question"""
+    fingerprints = []
+    for question_id, question_rows in groupby(rows, key=lambda row: row[0]):
+        question_rows = list(question_rows)
+        values = signature({
+            "text": question_rows[0][1],
+            "answers": [
+                {"text": text, "is_correct": is_correct}
+                for _, _, text, is_correct in question_rows if text is not None
+            ],
+        })
+        fingerprints.append((question_id, to_bytes(values), band_buckets(values)))
+    return fingerprints
+
+
+async def index_questions(db: AsyncSession, batch_size: int = 1000, limit: Optional[int] = None) -> int:
+    """
+    Fingerprint the questions of published quizzes missing from the bank, without committing
+
+    New, edited and newly published questions are picked up; the triggers of
+    the bank tables drop the fingerprints of edited and unpublished ones.
+
+    Args:
+        db: Write session
+        batch_size: Questions per query
+        limit: Stop after this many questions, all if None
+
+    Returns:
+        Number of questions fingerprinted
+    """
+    indexed = 0
+    while limit is None or indexed < limit:
+        rows = await get_unindexed_questions(db, batch_size if limit is None else min(batch_size, limit - indexed))
+        if not rows:
+            return indexed
+        # MinHash is CPU-bound, keep the event loop free while it runs
+        fingerprints = await asyncio.to_thread(_fingerprints, rows)
+        await add_fingerprints(db, fingerprints)
+        indexed += len(fingerprints)
+    return indexed
+
+
+async def find_near_duplicates(
+    db: AsyncSession,
+    questions: List[Dict],
+    threshold: Optional[float] = None,
+    question_signatures: Optional[List[np.ndarray]] = None
+) -> List[Optional[NearDuplicate]]:
+    """
+    Find the most similar bank question of each question
+
+    Candidates come from the LSH buckets (one query per chunk of questions)
+    and are verified on their full signatures. Only fingerprinted questions
+    are found, see index_questions.
+
+    Args:
+        db: Database session
+        questions: Dicts with text and answers (text, is_correct)
+        threshold: Minimum estimated Jaccard similarity, defaults to
+            settings.QUESTION_BANK_DUPLICATE_THRESHOLD
+        question_signatures: Signatures of the questions if already computed,
+            e.g. off the event loop with signatures()
+
+    Returns:
+        Per question, the best bank question at or above threshold, or None
+    """
+    threshold = threshold if threshold is not None else settings.QUESTION_BANK_DUPLICATE_THRESHOLD
+    values = question_signatures if question_signatures is not None else signatures(questions)
+    buckets = [band_buckets(question_values) for question_values in values]
+    matches: List[Optional[NearDuplicate]] = []
+    for start in range(0, len(questions), _LOOKUP_CHUNK):
+        chunk = buckets[start:start + _LOOKUP_CHUNK]
+        members = defaultdict(set)
+        for bucket, question_id in await get_bucket_members(db, [bucket for keys in chunk for bucket in keys]):
+            members[bucket].add(question_id)
+        candidates = [sorted(set().union(*(members.get(bucket, ()) for bucket in keys))) for keys in chunk]
+        stored = dict(await get_fingerprints(db, sorted(set().union(*candidates))))
+
+        for question_values, question_ids in zip(values[start:start + _LOOKUP_CHUNK], candidates):
+            question_ids = [question_id for question_id in question_ids if question_id in stored]
+            if not question_ids:
+                matches.append(None)
+                continue
+            scores = similarity(question_values, np.stack([from_bytes(stored[i]) for i in question_ids]))
+            best = int(scores.argmax())
+            matches.append(
+                NearDuplicate(question_ids[best], float(scores[best])) if scores[best] >= threshold else None
+            )
+    return matches
+
+
+def drop_near_duplicates(questions: List[Dict], threshold: Optional[float] = None) -> List[int]:
+    """
+    Pick questions that are not near-duplicates of an earlier one
+
+    Args:
+        questions: Dicts with text and answers (text, is_correct)
+        threshold: Minimum estimated Jaccard similarity of a duplicate, defaults
+            to settings.QUESTION_BANK_DUPLICATE_THRESHOLD
+
+    Returns:
+        Indexes of the questions kept, in order
+    """
+    threshold = threshold if threshold is not None else settings.QUESTION_BANK_DUPLICATE_THRESHOLD
+    kept: List[int] = []
+    kept_values: List[np.ndarray] = []
+    for index, question in enumerate(questions):
+        values = signature(question)
+        if kept_values and similarity(values, np.stack(kept_values)).max() >= threshold:
+            continue
+        kept.append(index)
+        kept_values.append(values)
+    return kept
+
+
+class BankIndexer:
+    """Fingerprints new bank questions in a background task, outside the requests
+
+    One run at a time per process; a run requested while one is going
+    starts again when it finishes, so questions published meanwhile are
+    picked up. Each chunk of QUESTION_BANK_INDEX_LIMIT questions is its own
+    transaction on the writer connection.
+    """
+
+    def __init__(self, session_factory=SessionLocal, chunk_size: Optional[int] = None):
+        """
+        Initialize the indexer
+
+        Args:
+            session_factory: Factory for write sessions
+            chunk_size: Questions per transaction
+        """
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size or settings.QUESTION_BANK_INDEX_LIMIT
+        self._task: Optional[asyncio.Task] = None
+        self._again = False
+
+    def schedule(self) -> None:
+        """Start indexing in the background unless a run is already going"""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            self._again = True
+            return
+        self._task = loop.create_task(self._run())
+
+    async def run(self) -> int:
+        """
+        Fingerprint all unindexed bank questions
+
+        Returns:
+            Number of questions fingerprinted
+        """
+        total = 0
+        while True:
+            async with self.session_factory() as db:
+                indexed = await index_questions(db, batch_size=self.chunk_size, limit=self.chunk_size)
+                await db.commit()
+            total += indexed
+            if indexed < self.chunk_size:
+                return total
+
+    async def _run(self) -> None:
+        """Index until no run is requested any more, errors are only logged"""
+        self._again = True
+        while self._again:
+            self._again = False
+            try:
+                indexed = await self.run()
+                if indexed:
+                    logger.info(f"Question bank: {indexed} questions indexed")
+            except Exception as e:
+                logger.error(f"Question bank indexing failed: {str(e)}")
+                return
+
+
+bank_indexer = BankIndexer()
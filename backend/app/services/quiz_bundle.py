@@ -0,0 +1,108 @@
+"""
+Offline quiz bundles with client-verifiable answer hashes.
+
+A bundle carries the student view of a quiz plus, per question, the salted
+hash sha256("{salt}:{question_id}:{answer_id}") of the correct answer. The
+frontend hashes the selected answer the same way for instant feedback
+without a server round trip. With a handful of answers per question the
+hashes are no secret from a determined student; the server never trusts
+the client and re-grades every submission against its own answer key.
+
+The key digest is an HMAC of the answer key. It lets the server detect a
+bundle built from an answer key that has since been edited. The signature
+covers the quiz, the salt and the key digest; the client sends the three
+back with its answers, so the server only accepts digests from bundles it
+issued. Both are keyed with BUNDLE_SIGNING_KEY, which every worker shares.
+"""
+import hashlib
+import hmac
+import secrets
+from typing import Dict, Optional
+
+from ..core.config import settings
+
+
+def signing_key() -> bytes:
+    """
+    Get the configured bundle signing key
+
+    Returns:
+        BUNDLE_SIGNING_KEY as bytes
+
+    Raises:
+        RuntimeError: If BUNDLE_SIGNING_KEY is not set
+    """
+    if not settings.BUNDLE_SIGNING_KEY:
+        raise RuntimeError("BUNDLE_SIGNING_KEY must be set to serve offline quiz bundles")
+    return settings.BUNDLE_SIGNING_KEY.encode()
+
+
+def answer_hash(salt: str, question_id: int, answer_id: int) -> str:
+    """
+    Hash an answer the way the frontend does
+
+    Args:
+        salt: Per-bundle salt
+        question_id: ID of the question
+        answer_id: ID of the answer
+
+    Returns:
+        Hex encoded SHA-256
+    """
+    return hashlib.sha256(f"{salt}:{question_id}:{answer_id}".encode()).hexdigest()
+
+
+def answer_key_digest(answer_key: Dict[int, Dict[int, bool]]) -> str:
+    """
+    Fingerprint an answer key, changes whenever a question or correct answer changes
+
+    Args:
+        answer_key: {question_id: {answer_id: is_correct}}
+
+    Returns:
+        Hex encoded HMAC-SHA256 keyed with BUNDLE_SIGNING_KEY (not reversible by clients)
+    """
+    canonical = ";".join(
+        f"{question_id}:{','.join(str(a) for a, is_correct in sorted(answers.items()) if is_correct)}"
+        for question_id, answers in sorted(answer_key.items())
+    )
+    return hmac.new(signing_key(), canonical.encode(), hashlib.sha256).hexdigest()
+
+
+def new_salt() -> str:
+    """Random salt for one bundle"""
+    return secrets.token_hex(16)
+
+
+def sign_bundle(quiz_id: int, salt: str, key_digest: str) -> str:
+    """
+    Sign a bundle
+
+    Args:
+        quiz_id: ID of the quiz
+        salt: Salt of the bundle
+        key_digest: Answer key digest of the bundle
+
+    Returns:
+        Hex encoded HMAC-SHA256 of the three values
+    """
+    message = f"{quiz_id}:{salt}:{key_digest}"
+    return hmac.new(signing_key(), message.encode(), hashlib.sha256).hexdigest()
+
+
+def verify_bundle(quiz_id: int, salt: Optional[str], key_digest: str, signature: Optional[str]) -> bool:
+    """
+    Check a bundle was issued by this server for the quiz
+
+    Args:
+        quiz_id: ID of the quiz
+        salt: Salt sent back by the client
+        key_digest: Answer key digest sent back by the client
+        signature: Signature sent back by the client
+
+    Returns:
+        True if the signature matches
+    """
+    if salt is None or signature is None:
+        return False
+    return hmac.compare_digest(sign_bundle(quiz_id, salt, key_digest), signature)
@@ -0,0 +1,87 @@
+import html
+import re
+import unicodedata
+from typing import List, Optional
+
+# Tokens as the unicode61 tokenizer of the search index splits them: runs of letters and digits
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def fold(token: str) -> str:
+    """Lowercase a token and strip its diacritics, like unicode61 with remove_diacritics 2"""
+    decomposed = unicodedata.normalize("NFD", token.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def search_terms(text: str) -> List[str]:
+    """
+    Split search text into words
+
+    Args:
+        text: Search text as typed by the user
+
+    Returns:
+        Words in input order, punctuation and operators dropped
+    """
+    return _TOKEN.findall(text)
+
+
+def match_expression(terms: List[str]) -> Optional[str]:
+    """
+    Build the FTS5 MATCH expression of search words
+
+    Every word is quoted, so nothing typed by the user is read as FTS5
+    syntax. All words must match; the last one also matches as a prefix,
+    for search-as-you-type.
+
+    Args:
+        terms: Words from search_terms
+
+    Returns:
+        MATCH expression, or None if there are no words
+    """
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+
+def make_snippet(text: str, terms: List[str], max_tokens: int = 12) -> str:
+    """
+    Highlight the search words in a matched text
+
+    The highlighting follows the index: words match case and diacritics
+    insensitively and the last one as a prefix. Long texts are cut to a
+    window of max_tokens words starting just before the first match.
+
+    Args:
+        text: Title, question or answer text that matched
+        terms: Words from search_terms
+        max_tokens: Maximum number of words in the snippet
+
+    Returns:
+        HTML-escaped snippet with matches wrapped in <mark>
+    """
+    exact = {fold(term) for term in terms[:-1]}
+    prefix = fold(terms[-1]) if terms else None
+
+    def matches(token: str) -> bool:
+        folded = fold(token)
+        return folded in exact or (prefix is not None and folded.startswith(prefix))
+
+    tokens = list(_TOKEN.finditer(text))
+    first = next((i for i, token in enumerate(tokens) if matches(token.group())), 0)
+    start = max(0, min(first - 2, len(tokens) - max_tokens))
+    end = min(len(tokens), start + max_tokens)
+
+    parts = ["…"] if start > 0 else []
+    position = tokens[start].start() if start > 0 else 0
+    for token in tokens[start:end]:
+        parts.append(html.escape(text[position:token.start()]))
+        word = html.escape(token.group())
+        parts.append(f"<mark>{word}</mark>" if matches(token.group()) else word)
+        position = token.end()
+    if end < len(tokens):
+        parts.append("…")
+    else:
+        parts.append(html.escape(text[position:]))
+    return "".join(parts)
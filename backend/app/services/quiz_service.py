@@ -1,13 +1,16 @@
+import asyncio
 import logging
+import math
+from datetime import datetime, timezone
 from typing import Dict, List, Optional, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import select, func, desc, asc
 from sqlalchemy.orm import joinedload, aliased, selectinload
 
-from ..crud.quiz import create_quiz, get_quiz, get_quizzes, update_quiz_status
+from ..crud.quiz import bulk_create_quizzes, create_quiz, get_quiz, get_quizzes, update_quiz_status
 from ..crud.question import (
-    create_question, get_questions_by_quiz, update_question, 
+    create_question, get_questions_by_quiz, get_questions_by_quizzes, update_question, 
     delete_question, delete_questions_by_ids
 )
 from ..crud.answer import (
@@ -15,27 +18,72 @@ from ..crud.answer import (
     delete_answer, delete_answers_by_ids
 )
 from ..crud.level import get_level
+from ..crud.answer import get_answer_key
+from ..crud.answer_attempt import has_attempt
+from ..crud.quiz_stats import get_quiz_stats
+from ..crud.quiz_search import search_quizzes
+from ..crud.generation_cache import get_cached_generation, normalize_topic, store_generation
+from ..crud.question_bank import get_bank_questions
 from ..models.quiz import Quiz
 from ..models.question import Question
 from ..models.answer import Answer
 from ..models.result import Result
 from ..models.level import Level
 from ..models.user import User
-from ..schemas.quiz import QuizCreate, QuizGenerationResponse, QuizReadList, QuizUpdate
-from ..schemas.question import QuestionCreate, QuestionCreateOrUpdate, AnswerCheckResponse
+from ..models.quiz_search import SEARCH_KINDS
+from ..schemas.quiz import (
+    QuizCreate, QuizGenerationResponse, QuizReadDetail, QuizReadList, QuizUpdate,
+    QuizBundle, QuizReadDetailStudent, QuizStatsRead, QuizItemAnalysis,
+    QuizSearchHit, BankQuestion
+)
+from ..schemas.question import (
+    QuestionCreate, QuestionCreateOrUpdate, AnswerCheckResponse,
+    QuizGradeRequest, QuizGradeResponse, QuestionGrade
+)
+from ..schemas.result import ResultRead
 from ..schemas.answer import AnswerCreate, AnswerCreateOrUpdate, AnswerCheck
 from ..services.ai_quiz_generator import AIQuizGeneratorService, AIGenerationError
-from ..services.ai_service import AIService
+from ..services.ai_service import EXPLANATION_FALLBACKS, AIService
+from ..services.result_writer import attempt_writer, result_writer
+from ..services.item_analysis import item_analysis_cache
+from ..services.quiz_bundle import answer_hash, answer_key_digest, new_salt, sign_bundle, verify_bundle
+from ..services.quiz_search import make_snippet, match_expression, search_terms
+from ..services.question_bank import bank_indexer, drop_near_duplicates, find_near_duplicates, signatures
+from ..core.config import settings
+from ..core.shared_state import get_state_backend
 from fastapi import HTTPException, status
 
 logger = logging.getLogger(__name__)
 
+
+def explanation_cache_key(question_id: int, answer_id: int) -> str:
+    """Shared state key of the cached explanation of an answer"""
+    return f"explanation:{question_id}:{answer_id}"
+
+
+def require_bundle_signing_key() -> None:
+    """
+    Make sure offline bundles can be signed and verified
+
+    Raises:
+        HTTPException: If BUNDLE_SIGNING_KEY is not set (503)
+    """
+    if not settings.BUNDLE_SIGNING_KEY:
+        logger.error("BUNDLE_SIGNING_KEY is not set, offline bundles are unavailable")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Offline quiz bundles are not available"
+        )
+
+
 class QuizService:
     """Service for quiz operations"""
     
     def __init__(self):
         """Initialize the quiz service"""
         self.ai_generator = AIQuizGeneratorService()
+        self.ai_service = AIService()
+        self.bank_indexer = bank_indexer
     
     async def get_quiz_by_id(self, db: AsyncSession, quiz_id: int) -> Quiz:
         """
@@ -189,16 +237,29 @@ class QuizService:
         """
         Create a quiz using AI generation
         
+        Generations are cached by normalized topic, level and question
+        count. With quiz_data.reuse_if_available a cached generation is
+        cloned into a new draft quiz without calling the AI; with
+        quiz_data.bypass_cache the cache is neither read nor updated.
+        
+        Questions selected from the question bank (quiz_data.bank_question_ids)
+        are copied into the quiz and the AI only generates the remaining ones.
+        Generated questions that are near-duplicates of a bank question are
+        replaced by it.
+        
         Args:
             db: Database session
             quiz_data: Quiz creation data
             creator_id: ID of the user creating the quiz
             
         Returns:
-            QuizGenerationResponse with the created quiz data
+            QuizGenerationResponse with the created quiz data, from_cache set
+            if it was cloned from the cache, from_bank counting the questions
+            copied from the bank and missing_questions the questions short of
+            question_count
             
         Raises:
-            ValueError: If level doesn't exist
+            ValueError: If level doesn't exist or the bank questions are invalid
             AIGenerationError: If AI generation fails
             SQLAlchemyError: If database operations fail
         """
@@ -216,13 +277,60 @@ class QuizService:
             "level": level.level
         }
         
-        try:
-            # Generate quiz content using AI
-            questions_data, title = await self.ai_generator.generate_quiz(
-                quiz_data.topic, 
-                quiz_data.question_count,
-                level_data
+        bank_questions = await self._load_bank_questions(db, quiz_data)
+        
+        topic_key = normalize_topic(quiz_data.topic)
+        use_cache = not quiz_data.bypass_cache and not bank_questions
+        if quiz_data.reuse_if_available and use_cache:
+            cached = await get_cached_generation(
+                db, topic_key=topic_key, level_id=level.id, question_count=quiz_data.question_count
             )
+            if cached is not None:
+                title, questions_data = cached
+                logger.info(f"Reusing cached generation for topic '{topic_key}' at level {level.id}")
+                quiz_ids = await bulk_create_quizzes(db, [{
+                    "title": title,
+                    "level_id": level.id,
+                    "creator_id": creator_id,
+                    "status": "draft",
+                    "questions": questions_data,
+                }])
+                await db.commit()
+                quiz_with_relations = await get_quiz(db, quiz_ids[0])
+                return self._generation_response(quiz_with_relations, from_cache=True)
+
+        # End the read transaction so the single writer connection is not
+        # held while waiting for the LLM
+        await db.rollback()
+        # Fingerprint newly published bank questions meanwhile, off the request
+        self.bank_indexer.schedule()
+
+        try:
+            title = quiz_data.title
+            generated_questions = []
+            remaining = quiz_data.question_count - len(bank_questions)
+            if remaining > 0:
+                # Generate quiz content using AI
+                questions_data, title = await self.ai_generator.generate_quiz(
+                    quiz_data.topic, 
+                    remaining,
+                    level_data
+                )
+                for q_data in questions_data:
+                    question_create = QuestionCreate(
+                        text=q_data["text"],
+                        answers=[
+                            AnswerCreate(
+                                text=a["text"],
+                                is_correct=a["is_correct"]
+                            ) for a in q_data["answers"]
+                        ]
+                    )
+                    generated_questions.append(question_create.model_dump())
+            
+            # Generated questions already in the bank are replaced by the
+            # validated bank version, then repeats within the quiz are dropped
+            questions, from_bank = await self._merge_with_bank(db, bank_questions, generated_questions)
             
             # Create quiz record - no need to start a new transaction
             # The session is likely already in a transaction from the router
@@ -235,22 +343,21 @@ class QuizService:
             )
             
             # Create questions and answers
-            for q_data in questions_data:
-                # Create question
-                question_create = QuestionCreate(
-                    text=q_data["text"],
-                    answers=[
-                        AnswerCreate(
-                            text=a["text"],
-                            is_correct=a["is_correct"]
-                        ) for a in q_data["answers"]
-                    ]
-                )
-                
-                question_obj = await create_question(
+            for question_data in questions:
+                await create_question(
                     db,
                     quiz_id=quiz_obj.id,
-                    question_data=question_create
+                    question_data=QuestionCreate.model_validate(question_data)
+                )
+            
+            if use_cache:
+                await store_generation(
+                    db,
+                    topic_key=topic_key,
+                    level_id=level_data["id"],
+                    question_count=quiz_data.question_count,
+                    title=title,
+                    questions_data=generated_questions
                 )
             
             # Explicitly commit the transaction to ensure all changes are persisted
@@ -259,7 +366,10 @@ class QuizService:
             # Get complete quiz with relationships for response
             quiz_with_relations = await get_quiz(db, quiz_obj.id)
             
-            return QuizGenerationResponse.model_validate(quiz_with_relations)
+            missing = max(quiz_data.question_count - len(questions), 0)
+            if missing:
+                logger.info(f"Quiz {quiz_obj.id} has {missing} questions fewer than requested")
+            return self._generation_response(quiz_with_relations, from_bank=from_bank, missing_questions=missing)
                 
         except AIGenerationError as e:
             logger.error(f"AI generation error: {str(e)}")
@@ -271,6 +381,100 @@ class QuizService:
             logger.error(f"Unexpected error during quiz creation: {str(e)}")
             raise 
 
+    async def _load_bank_questions(self, db: AsyncSession, quiz_data: QuizCreate) -> List[Dict]:
+        """
+        Load the bank questions selected for a new quiz
+        
+        Args:
+            db: Database session
+            quiz_data: Quiz creation data
+            
+        Returns:
+            Question dicts (text, answers) in the order selected
+            
+        Raises:
+            ValueError: If there are more questions than question_count or a
+                question is not in the bank
+        """
+        question_ids = list(dict.fromkeys(quiz_data.bank_question_ids))
+        if not question_ids:
+            return []
+        if len(question_ids) > quiz_data.question_count:
+            raise ValueError("More bank questions selected than question_count")
+        
+        questions = await get_bank_questions(db, question_ids)
+        missing = set(question_ids) - {question.id for question in questions}
+        if missing:
+            raise ValueError(f"Questions {sorted(missing)} are not in the question bank")
+        return [self._bank_question_data(question) for question in questions]
+    
+    @staticmethod
+    def _bank_question_data(question: Question) -> Dict:
+        """Copyable data of a bank question"""
+        return QuestionCreate(
+            text=question.text,
+            answers=[AnswerCreate(text=a.text, is_correct=bool(a.is_correct)) for a in question.answers]
+        ).model_dump()
+    
+    async def _merge_with_bank(
+        self,
+        db: AsyncSession,
+        bank_questions: List[Dict],
+        generated_questions: List[Dict]
+    ) -> Tuple[List[Dict], int]:
+        """
+        Combine selected bank questions with generated ones
+        
+        Generated questions with a near-duplicate in the bank are replaced
+        by the bank question, then near-duplicates within the quiz are
+        dropped, so the quiz may end up with fewer questions. The input lists
+        are not modified. Only fingerprinted bank questions are found, see
+        BankIndexer.
+        
+        Args:
+            db: Write session
+            bank_questions: Selected bank questions
+            generated_questions: Validated AI questions
+            
+        Returns:
+            (questions, number of questions from the bank)
+        """
+        questions = bank_questions + generated_questions
+        in_bank = [True] * len(bank_questions) + [False] * len(generated_questions)
+        if generated_questions:
+            # Hash before the lookup takes the writer connection, off the event loop
+            values = await asyncio.to_thread(signatures, generated_questions)
+            matches = await find_near_duplicates(db, generated_questions, question_signatures=values)
+            found = {
+                question.id: question
+                for question in await get_bank_questions(db, [match.question_id for match in matches if match])
+            }
+            for i, match in enumerate(matches, start=len(bank_questions)):
+                if match is not None and match.question_id in found:
+                    questions[i] = self._bank_question_data(found[match.question_id])
+                    in_bank[i] = True
+        
+        kept = drop_near_duplicates(questions)
+        if len(kept) < len(questions):
+            logger.info(f"Dropped {len(questions) - len(kept)} near-duplicate questions")
+        return [questions[i] for i in kept], sum(in_bank[i] for i in kept)
+    
+    @staticmethod
+    def _generation_response(
+        quiz: Quiz,
+        from_cache: bool = False,
+        from_bank: int = 0,
+        missing_questions: int = 0
+    ) -> QuizGenerationResponse:
+        """Response of a created quiz with its provenance"""
+        detail = QuizReadDetail.model_validate(quiz)
+        return QuizGenerationResponse(
+            **detail.model_dump(),
+            from_cache=from_cache,
+            from_bank=from_bank,
+            missing_questions=missing_questions
+        )
+
     async def update_quiz(
         self,
         db: AsyncSession,
@@ -316,6 +520,9 @@ class QuizService:
                 detail=f"Level with ID {quiz_data.level_id} not found"
             )
         
+        # Cached explanations are built from these, snapshot them before the edit
+        explained_before = self._explained_content(quiz)
+        
         try:
             # Start transaction
             # Update basic quiz properties
@@ -325,9 +532,10 @@ class QuizService:
             if quiz_data.status:
                 quiz.status = quiz_data.status
             
-            # Get existing questions for this quiz
+            # Get existing questions for this quiz, with their answers
             existing_questions = await get_questions_by_quiz(db, quiz_id)
             existing_question_ids = {q.id for q in existing_questions}
+            existing_answers = {q.id: q.answers for q in existing_questions}
             
             # Track question IDs from the update request
             update_question_ids = {q.id for q in quiz_data.questions if q.id is not None}
@@ -342,7 +550,9 @@ class QuizService:
             for question_data in quiz_data.questions:
                 if question_data.id is not None:
                     # Update existing question
-                    await self.update_question_with_answers(db, question_data)
+                    await self.update_question_with_answers(
+                        db, question_data, existing_answers.get(question_data.id)
+                    )
                 else:
                     # Create new question
                     await self.create_question_with_answers(db, quiz_id, question_data)
@@ -350,8 +560,11 @@ class QuizService:
             await db.flush()
             await db.commit()
             
-            # Reload the quiz with all updated relationships
+            # Reload the quiz with all updated relationships; the loaded
+            # collections still hold deleted questions and answers
+            db.expire_all()
             updated_quiz = await get_quiz(db, quiz_id)
+            self._drop_stale_explanations(explained_before, self._explained_content(updated_quiz))
             return updated_quiz
             
         except SQLAlchemyError as e:
@@ -361,23 +574,58 @@ class QuizService:
                 detail="An error occurred while updating the quiz"
             )
 
+    @staticmethod
+    def _explained_content(quiz: Quiz) -> Dict[int, Tuple]:
+        """Per question, everything its cached explanations were generated from"""
+        return {
+            question.id: (
+                quiz.title,
+                quiz.level_id,
+                question.text,
+                tuple(sorted((answer.id, answer.text, bool(answer.is_correct)) for answer in question.answers)),
+            )
+            for question in quiz.questions
+        }
+    
+    @staticmethod
+    def _drop_stale_explanations(before: Dict[int, Tuple], after: Dict[int, Tuple]) -> None:
+        """
+        Remove the cached explanations of questions whose content changed or that were deleted
+        
+        Args:
+            before: _explained_content of the quiz before the update
+            after: _explained_content of the quiz after the update
+        """
+        cache = get_state_backend()
+        for question_id, content in before.items():
+            if after.get(question_id) == content:
+                continue
+            for answer_id, _, _ in content[3]:
+                cache.delete(explanation_cache_key(question_id, answer_id))
+    
     async def update_question_with_answers(
         self,
         db: AsyncSession,
-        question_data: QuestionCreateOrUpdate
+        question_data: QuestionCreateOrUpdate,
+        existing_answers: Optional[List[Answer]] = None
     ) -> Question:
         """
         Update a question and manage its answers (update, create, delete)
         
+        Updates are not flushed, the caller flushes once for all questions.
+        
         Args:
             db: Database session
             question_data: Question data with answers
+            existing_answers: Current answers of the question if already
+                loaded, saves a query per question
             
         Returns:
             Updated question
         """
         # Get existing answers for this question
-        existing_answers = await get_answers_by_question(db, question_data.id)
+        if existing_answers is None:
+            existing_answers = await get_answers_by_question(db, question_data.id)
         existing_answer_ids = {a.id for a in existing_answers}
         
         # Track answer IDs from the update request
@@ -523,14 +771,22 @@ class QuizService:
         # Check if the selected answer is correct
         is_correct = selected_answer.is_correct
         
+        # Record the attempt for server-side scoring, committed before the slow AI call
+        await attempt_writer.record(
+            user_id=current_user.id,
+            quiz_id=quiz_id,
+            question_id=question.id,
+            answer_id=selected_answer.id,
+            is_correct=is_correct
+        )
+        
         # Get the level description for the AI explanation
         level_result = await db.execute(select(Level).where(Level.id == quiz.level_id))
         level = level_result.scalar_one_or_none()
         level_description = level.description if level else "Standard"
         
         # Generate explanation with AI
-        ai_service = AIService()
-        explanation = await ai_service.generate_explanation(
+        explanation = await self.ai_service.generate_explanation(
             quiz_title=quiz.title,
             quiz_level=level_description,
             question_text=question.text,
@@ -544,4 +800,420 @@ class QuizService:
             is_correct=is_correct,
             correct_answer_id=correct_answer.id,
             explanation=explanation
-        ) 
\ No newline at end of file
+        )
+
+    async def grade_quiz(
+        self,
+        db: AsyncSession,
+        quiz_id: int,
+        grade_data: QuizGradeRequest,
+        current_user: User
+    ) -> QuizGradeResponse:
+        """
+        Grade all selected answers of a quiz at once and store the result
+        
+        The answers are checked against the answer key in one pass, recorded
+        as attempts and the result is saved through the group-commit buffers.
+        No explanations are generated here; they are fetched lazily with
+        explain_answer.
+        
+        Args:
+            db: Database session (read only)
+            quiz_id: ID of the quiz
+            grade_data: Selected answer per question
+            current_user: Current user (must be a student)
+            
+        Returns:
+            QuizGradeResponse with per-question correctness and the stored result
+            
+        Raises:
+            HTTPException: If user is not a student (403), quiz not found or not
+                published (404), quiz without questions, answers that do not
+                belong to the quiz or an invalid bundle signature (422), a
+                bundle built from an edited answer key (409), or bundle
+                answers without a configured signing key (503)
+        """
+        if current_user.role != "student":
+            logger.warning(f"User {current_user.id} with role {current_user.role} attempted to grade quiz")
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only students can grade quizzes"
+            )
+        
+        key = await get_answer_key(db, quiz_id)
+        if key is None or key[0] != "published":
+            logger.warning(f"Attempt to grade missing or unpublished quiz {quiz_id}")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Quiz not found or not published"
+            )
+        _, answer_key = key
+        if not answer_key:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Quiz has no questions"
+            )
+        
+        # Answers from an offline bundle must come from a bundle this server
+        # issued for the quiz and match the key the bundle was built from
+        if grade_data.key_digest is not None:
+            require_bundle_signing_key()
+        if grade_data.key_digest is not None and not verify_bundle(
+            quiz_id, grade_data.salt, grade_data.key_digest, grade_data.signature
+        ):
+            logger.warning(f"Bundle with an invalid signature submitted for quiz {quiz_id} by user {current_user.id}")
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="The bundle signature is invalid"
+            )
+        if grade_data.key_digest is not None and grade_data.key_digest != answer_key_digest(answer_key):
+            logger.info(f"Stale bundle submitted for quiz {quiz_id} by user {current_user.id}")
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="The quiz has changed since it was downloaded, please download it again"
+            )
+        
+        # Grade every answer in one pass over the key
+        grades = []
+        seen_questions = set()
+        for selected in grade_data.answers:
+            answers = answer_key.get(selected.question_id)
+            if answers is None or selected.question_id in seen_questions:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Question {selected.question_id} is not part of this quiz or answered twice"
+                )
+            if selected.answer_id not in answers:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Answer {selected.answer_id} does not belong to question {selected.question_id}"
+                )
+            correct_answer_id = next((a for a, is_correct in answers.items() if is_correct), None)
+            if correct_answer_id is None:
+                logger.error(f"No correct answer found for question {selected.question_id}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Question has no correct answer defined"
+                )
+            seen_questions.add(selected.question_id)
+            grades.append(QuestionGrade(
+                question_id=selected.question_id,
+                answer_id=selected.answer_id,
+                is_correct=answers[selected.answer_id],
+                correct_answer_id=correct_answer_id
+            ))
+        
+        # Unanswered questions count as wrong
+        score = sum(grade.is_correct for grade in grades)
+        max_score = len(answer_key)
+        
+        # Persist the attempts, then the result, each group-committed with other students
+        await attempt_writer.record_many(
+            user_id=current_user.id,
+            quiz_id=quiz_id,
+            attempts=[(g.question_id, g.answer_id, g.is_correct) for g in grades]
+        )
+        result = await result_writer.submit(
+            user_id=current_user.id,
+            quiz_id=quiz_id,
+            score=score,
+            max_score=max_score
+        )
+        
+        return QuizGradeResponse(
+            quiz_id=quiz_id,
+            score=score,
+            max_score=max_score,
+            questions=grades,
+            result=ResultRead.model_validate(result)
+        )
+
+    async def explain_answer(
+        self,
+        db: AsyncSession,
+        quiz_id: int,
+        question_id: int,
+        answer_id: int,
+        current_user: User
+    ) -> str:
+        """
+        Get the AI explanation for an answer the student already gave
+        
+        Explanations only depend on the question and the selected answer, so
+        they are cached in the shared state backend and generated once per
+        answer for the whole class.
+        
+        Args:
+            db: Database session (read only)
+            quiz_id: ID of the quiz
+            question_id: ID of the question
+            answer_id: ID of the answer the student selected
+            current_user: Current user (must be a student)
+            
+        Returns:
+            Explanation text
+            
+        Raises:
+            HTTPException: If the question or answer is not found (404) or the
+                student has not answered the question with this answer yet (403)
+        """
+        query = (
+            select(Quiz.title, Quiz.status, Level.description, Question.text)
+            .join(Question, Question.quiz_id == Quiz.id)
+            .outerjoin(Level, Level.id == Quiz.level_id)
+            .where(Quiz.id == quiz_id, Question.id == question_id)
+        )
+        row = (await db.execute(query)).first()
+        if row is None or row.status != "published":
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Question not found in this quiz"
+            )
+        
+        answers = await get_answers_by_question(db, question_id)
+        selected_answer = next((a for a in answers if a.id == answer_id), None)
+        correct_answer = next((a for a in answers if a.is_correct), None)
+        if selected_answer is None or correct_answer is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Answer not found for this question"
+            )
+        
+        # Explanations reveal the correct answer: only after the student answered
+        if not await has_attempt(db, current_user.id, quiz_id, question_id, answer_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Answer the question before requesting an explanation"
+            )
+        
+        cache = get_state_backend()
+        cache_key = explanation_cache_key(question_id, answer_id)
+        explanation = cache.get(cache_key)
+        if explanation is None:
+            is_correct = bool(selected_answer.is_correct)
+            explanation = await self.ai_service.generate_explanation(
+                quiz_title=row.title,
+                quiz_level=row.description or "Standard",
+                question_text=row.text,
+                correct_answer_text=correct_answer.text,
+                student_answer_text=None if is_correct else selected_answer.text,
+                is_student_correct=is_correct
+            )
+            # A failed generation is retried on the next request, not served for the whole TTL
+            if explanation not in EXPLANATION_FALLBACKS:
+                cache.set(cache_key, explanation, ttl=settings.EXPLANATION_CACHE_TTL)
+        
+        return explanation
+
+    async def build_quiz_bundle(
+        self,
+        db: AsyncSession,
+        quiz_id: int
+    ) -> QuizBundle:
+        """
+        Build a signed offline bundle of a published quiz
+        
+        Args:
+            db: Database session
+            quiz_id: ID of the quiz
+            
+        Returns:
+            QuizBundle with the student view, salted correct-answer hashes,
+            the answer key digest and a server signature
+            
+        Raises:
+            HTTPException: If quiz not found or not published (404), a
+                question has no correct answer (500), or no signing key is
+                configured (503)
+        """
+        require_bundle_signing_key()
+        quiz = await self.get_quiz_by_id(db=db, quiz_id=quiz_id)
+        if quiz.status != "published":
+            logger.warning(f"Attempt to download bundle of unpublished quiz {quiz_id}")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Quiz not found or not published"
+            )
+        
+        answer_key = {
+            question.id: {answer.id: bool(answer.is_correct) for answer in question.answers}
+            for question in quiz.questions
+        }
+        
+        salt = new_salt()
+        answer_hashes = {}
+        for question_id, answers in answer_key.items():
+            correct_answer_id = next((a for a, is_correct in answers.items() if is_correct), None)
+            if correct_answer_id is None:
+                logger.error(f"No correct answer found for question {question_id}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Question has no correct answer defined"
+                )
+            answer_hashes[str(question_id)] = answer_hash(salt, question_id, correct_answer_id)
+        
+        key_digest = answer_key_digest(answer_key)
+        return QuizBundle(
+            quiz=QuizReadDetailStudent.model_validate(quiz),
+            salt=salt,
+            answer_hashes=answer_hashes,
+            key_digest=key_digest,
+            issued_at=datetime.now(timezone.utc),
+            signature=sign_bundle(quiz.id, salt, key_digest)
+        )
+
+    async def get_quiz_stats(
+        self,
+        db: AsyncSession,
+        quiz_id: int
+    ) -> QuizStatsRead:
+        """
+        Get the aggregated results of a quiz
+        
+        Reads the incrementally maintained quiz_stats row, no scan over results.
+        
+        Args:
+            db: Database session
+            quiz_id: ID of the quiz
+            
+        Returns:
+            QuizStatsRead with attempt count, mean, standard deviation and histogram
+            
+        Raises:
+            HTTPException: If quiz not found (404)
+        """
+        stats = await get_quiz_stats(db=db, quiz_id=quiz_id)
+        if stats is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Quiz not found"
+            )
+        
+        count = stats.attempt_count
+        mean_score = score_stddev = mean_percent = None
+        if count:
+            mean_score = stats.score_sum / count
+            # Population standard deviation from the running sums
+            score_stddev = math.sqrt(max(stats.score_sq_sum / count - mean_score ** 2, 0.0))
+            if stats.max_score_sum:
+                mean_percent = 100 * stats.score_sum / stats.max_score_sum
+        
+        return QuizStatsRead(
+            quiz_id=quiz_id,
+            attempt_count=count,
+            mean_score=mean_score,
+            score_stddev=score_stddev,
+            mean_percent=mean_percent,
+            histogram=stats.histogram,
+            updated_at=stats.updated_at
+        )
+
+    async def get_item_analysis(
+        self,
+        db: AsyncSession,
+        quiz_id: int
+    ) -> QuizItemAnalysis:
+        """
+        Get the item analysis of a quiz over all recorded answer attempts
+        
+        Args:
+            db: Database session
+            quiz_id: ID of the quiz
+            
+        Returns:
+            QuizItemAnalysis with difficulty, discrimination and distractor
+            selection rates per question
+            
+        Raises:
+            HTTPException: If quiz not found (404)
+        """
+        analysis = await item_analysis_cache.get(db=db, quiz_id=quiz_id)
+        if analysis is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Quiz not found"
+            )
+        return analysis
+
+    async def search_quizzes(
+        self,
+        db: AsyncSession,
+        user: User,
+        text: str,
+        status: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[QuizSearchHit]:
+        """
+        Full-text search over quiz titles, questions and answers
+        
+        Args:
+            db: Database session
+            user: Current user, students only find published quizzes
+            text: Search text; all words must match, the last one as a prefix
+            status: Filter by status (admin only)
+            skip: Number of quizzes to skip
+            limit: Maximum number of quizzes to return
+            
+        Returns:
+            Matching quizzes, best first, each with a highlighted snippet of
+            its best matching text
+        """
+        terms = search_terms(text)
+        expression = match_expression(terms)
+        if expression is None:
+            return []
+        
+        if user.role == "student":
+            status = "published"
+        
+        hits = await search_quizzes(db=db, expression=expression, status=status, skip=skip, limit=limit)
+        
+        results = []
+        for quiz, score, rowid, matched_text in hits:
+            results.append(QuizSearchHit(
+                id=quiz.id,
+                title=quiz.title,
+                level_id=quiz.level_id,
+                status=quiz.status,
+                updated_at=quiz.updated_at,
+                score=score,
+                matched_in=SEARCH_KINDS[rowid % 4],
+                snippet=make_snippet(matched_text, terms)
+            ))
+        return results
+    
+    async def suggest_bank_questions(
+        self,
+        db: AsyncSession,
+        topic: str,
+        level_id: int,
+        limit: int = 20
+    ) -> List[BankQuestion]:
+        """
+        Offer existing questions for a new quiz before generating it
+        
+        Published quizzes of the level are searched for the topic words (see
+        search_quizzes); their questions are returned best matching quiz
+        first, without near-duplicates. Pass the chosen IDs as
+        bank_question_ids when creating the quiz.
+        
+        Args:
+            db: Database session
+            topic: Topic of the new quiz
+            level_id: Level of the new quiz
+            limit: Maximum number of questions
+            
+        Returns:
+            Bank questions with their answers
+        """
+        expression = match_expression(search_terms(topic))
+        if expression is None:
+            return []
+        
+        hits = await search_quizzes(db=db, expression=expression, status="published", level_id=level_id, limit=limit)
+        rank = {quiz.id: position for position, (quiz, _, _, _) in enumerate(hits)}
+        questions = sorted(await get_questions_by_quizzes(db, list(rank)), key=lambda question: rank[question.quiz_id])
+        
+        kept = drop_near_duplicates([self._bank_question_data(question) for question in questions])
+        return [BankQuestion.model_validate(questions[i]) for i in kept[:limit]]
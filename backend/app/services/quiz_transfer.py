@@ -0,0 +1,181 @@
+import json
+import logging
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from ..crud.quiz import bulk_create_quizzes, get_quiz_tree_batch
+from ..db import ReadSessionLocal, SessionLocal
+from ..models.level import Level
+from ..schemas.quiz import QuizTransfer
+from .question_bank import find_near_duplicates, index_questions
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a quiz import"""
+    imported: int = 0
+    skipped: int = 0
+    near_duplicates: int = 0  # imported questions already in the question bank, with check_duplicates
+    errors: List[Tuple[int, str]] = field(default_factory=list)  # (line number, message)
+
+
+def _quiz_lines(rows: List[Tuple]) -> Iterable[str]:
+    """Group the flat rows of one batch into one JSON line per quiz"""
+    for (_, title, status, level), quiz_rows in groupby(rows, key=lambda row: row[:4]):
+        questions = []
+        for question_id, answer_rows in groupby(quiz_rows, key=lambda row: row[4]):
+            if question_id is None:
+                continue
+            answer_rows = list(answer_rows)
+            questions.append({
+                "text": answer_rows[0][5],
+                "answers": [
+                    {"text": row[6], "is_correct": bool(row[7])} for row in answer_rows if row[6] is not None
+                ],
+            })
+        yield json.dumps(
+            {"title": title, "level": level, "status": status, "questions": questions},
+            ensure_ascii=False
+        ) + "\n"
+
+
+async def export_quizzes(
+    status: Optional[str] = None,
+    batch_size: int = 500,
+    session_factory=ReadSessionLocal
+) -> AsyncIterator[str]:
+    """
+    Stream all quizzes as NDJSON, one quiz with its questions and answers per line
+
+    Args:
+        status: Only export quizzes with this status
+        batch_size: Quizzes per query (keyset pagination on quizzes.id)
+        session_factory: Factory for read sessions
+
+    Yields:
+        One chunk of lines per batch
+    """
+    after_id = 0
+    while True:
+        async with session_factory() as db:
+            rows = await get_quiz_tree_batch(db, after_id=after_id, limit=batch_size, status=status)
+        if not rows:
+            return
+        yield "".join(_quiz_lines(rows))
+        after_id = rows[-1][0]
+
+
+def _error_message(error: ValueError) -> str:
+    """Short message for a rejected line, the first pydantic error with its location"""
+    if isinstance(error, ValidationError):
+        first = error.errors()[0]
+        location = ".".join(str(part) for part in first["loc"])
+        return f"{location}: {first['msg']}" if location else first["msg"]
+    return str(error)
+
+
+def parse_quiz_line(line: str, levels: Dict[str, int]) -> QuizTransfer:
+    """
+    Validate one NDJSON line
+
+    Args:
+        line: JSON object of a quiz
+        levels: Level IDs by code
+
+    Returns:
+        Validated quiz
+
+    Raises:
+        ValueError: If the line is not a valid quiz (pydantic ValidationError included)
+    """
+    quiz = QuizTransfer.model_validate_json(line)
+    if quiz.level not in levels:
+        raise ValueError(f"Unknown level '{quiz.level}'")
+    for number, question in enumerate(quiz.questions, start=1):
+        if sum(answer.is_correct for answer in question.answers) != 1:
+            raise ValueError(f"Question {number} must have exactly one correct answer")
+    return quiz
+
+
+async def import_quizzes(
+    lines: Iterable[str],
+    creator_id: int,
+    chunk_size: int = 1000,
+    session_factory=SessionLocal,
+    progress: Optional[Callable[[ImportReport], None]] = None,
+    check_duplicates: bool = False
+) -> ImportReport:
+    """
+    Import quizzes from NDJSON lines in chunked bulk transactions
+
+    Lines are validated with the QuizTransfer/QuestionCreate/AnswerCreate
+    schemas; invalid lines are skipped and reported. Every chunk of valid
+    quizzes is written with three bulk INSERTs and one commit, so the writer
+    connection is only held for the duration of one chunk.
+
+    With check_duplicates the questions of every chunk are looked up in the
+    question bank before they are written and near-duplicates are counted;
+    they are imported all the same. Published quizzes of earlier chunks are
+    part of the bank by then.
+
+    Args:
+        lines: NDJSON lines, e.g. an open file
+        creator_id: ID of the admin owning the imported quizzes
+        chunk_size: Quizzes per transaction
+        session_factory: Factory for write sessions
+        progress: Called with the running report after every chunk
+        check_duplicates: Count imported questions that are near-duplicates of bank questions
+
+    Returns:
+        ImportReport with counts and per-line errors
+    """
+    report = ImportReport()
+    async with session_factory() as db:
+        levels = dict((await db.execute(select(Level.code, Level.id))).tuples().all())
+
+    async def flush(chunk: List[dict]) -> None:
+        async with session_factory() as db:
+            if check_duplicates:
+                await index_questions(db)
+                questions = [question for quiz in chunk for question in quiz["questions"]]
+                matches = await find_near_duplicates(db, questions)
+                report.near_duplicates += sum(match is not None for match in matches)
+            await bulk_create_quizzes(db, chunk)
+            await db.commit()
+        report.imported += len(chunk)
+        if progress is not None:
+            progress(report)
+
+    chunk: List[dict] = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            quiz = parse_quiz_line(line, levels)
+        except ValueError as e:
+            message = _error_message(e)
+            report.skipped += 1
+            report.errors.append((number, message))
+            logger.warning(f"Skipping quiz on line {number}: {message}")
+            continue
+
+        chunk.append({
+            "title": quiz.title,
+            "level_id": levels[quiz.level],
+            "creator_id": creator_id,
+            "status": quiz.status,
+            "questions": [question.model_dump() for question in quiz.questions],
+        })
+        if len(chunk) >= chunk_size:
+            await flush(chunk)
+            chunk = []
+
+    if chunk:
+        await flush(chunk)
+    return report
@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+
+from ..config import settings
+from ..crud.result import get_export_batch
+from ..db import ReadSessionLocal
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = [
+    "result_id", "user_id", "username", "quiz_id", "quiz_title",
+    "level", "score", "max_score", "submitted_at",
+]
+
+
+async def iter_result_batches(
+    level_id: Optional[int] = None,
+    quiz_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+    session_factory=ReadSessionLocal
+) -> AsyncIterator[List[Tuple]]:
+    """
+    Iterate over all matching results in keyset batches
+
+    Every batch is read with its own short-lived read session, so a long
+    export neither keeps a pooled connection nor a read snapshot open while
+    the client is downloading. Only one batch is held in memory at a time.
+
+    Args:
+        level_id: Filter by quiz level
+        quiz_id: Filter by quiz
+        date_from: Only results submitted at or after this time
+        date_to: Only results submitted before this time
+        batch_size: Rows per query, defaults to settings.EXPORT_BATCH_SIZE
+        session_factory: Factory for read sessions
+
+    Yields:
+        Lists of export rows (see crud.result.get_export_batch)
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    after_id = 0
+    while True:
+        async with session_factory() as db:
+            rows = await get_export_batch(
+                db,
+                after_id=after_id,
+                limit=batch_size,
+                level_id=level_id,
+                quiz_id=quiz_id,
+                date_from=date_from,
+                date_to=date_to
+            )
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+        after_id = rows[-1][0]
+
+
+async def stream_csv(batches: AsyncIterator[List[Tuple]]) -> AsyncIterator[str]:
+    """
+    Format export batches as CSV with a header row, one chunk per batch
+
+    Args:
+        batches: Batches from iter_result_batches
+
+    Yields:
+        CSV text chunks
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            row[:-1] + (row[-1].isoformat() if row[-1] is not None else "",) for row in rows
+        )
+        yield buffer.getvalue()
+
+
+async def stream_ndjson(batches: AsyncIterator[List[Tuple]]) -> AsyncIterator[str]:
+    """
+    Format export batches as newline-delimited JSON, one chunk per batch
+
+    Args:
+        batches: Batches from iter_result_batches
+
+    Yields:
+        NDJSON text chunks
+    """
+    async for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=datetime.isoformat, ensure_ascii=False) + "\n"
+            for row in rows
+        )
@@ -0,0 +1,245 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..crud.answer_attempt import create_attempts, get_last_attempt_ids
+from ..crud.quiz_stats import add_results
+from ..crud.result import append_history, upsert_many
+from ..db import SessionLocal
+from ..models.result import Result
+
+logger = logging.getLogger(__name__)
+
+class GroupCommitBuffer(ABC):
+    """Write-behind buffer that group-commits rows arriving at the same time
+
+    Rows are collected for a few milliseconds and stored in a single
+    transaction, so a whole class answering at once costs one commit instead
+    of one per student. Every caller is answered only after the commit of its
+    batch returned. Subclasses implement _store.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        max_delay: Optional[float] = None,
+        max_batch: Optional[int] = None
+    ):
+        """
+        Initialize the buffer
+
+        Args:
+            session_factory: Factory for write sessions
+            max_delay: Seconds to wait for more rows before writing a batch
+            max_batch: Maximum number of rows per transaction
+        """
+        self.session_factory = session_factory
+        self.max_delay = max_delay if max_delay is not None else settings.RESULT_BATCH_DELAY_MS / 1000
+        self.max_batch = max_batch or settings.RESULT_BATCH_MAX
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def _enqueue(self, row: Dict[str, Any]) -> Any:
+        """
+        Queue a row and wait until its batch is committed
+
+        Args:
+            row: Column values
+
+        Returns:
+            Value produced by _store for this row
+
+        Raises:
+            SQLAlchemyError: If the batch could not be written
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+
+        if self._flusher is None or self._flusher.done() or self._flusher.get_loop() is not loop:
+            self._flusher = loop.create_task(self._run())
+
+        return await future
+
+    async def _run(self) -> None:
+        """Write batches until no rows are left"""
+        await asyncio.sleep(self.max_delay)
+        while self._pending:
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            await self._write(batch)
+
+    async def _write(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """
+        Store one batch in a single transaction and resolve its waiters
+
+        If the batch cannot be committed, every row is retried in its own
+        transaction, so a single bad row only fails its own caller.
+
+        Args:
+            batch: Pending (row, future) pairs
+        """
+        rows = [row for row, _ in batch]
+        try:
+            async with self.session_factory() as session:
+                values = await self._store(session, rows)
+                await session.commit()
+        except Exception as e:
+            if len(batch) > 1:
+                logger.warning(
+                    f"Failed to write batch of {len(batch)} rows in {type(self).__name__}, "
+                    f"retrying row by row: {str(e)}"
+                )
+                for pending in batch:
+                    await self._write([pending])
+                return
+            logger.error(f"Failed to write row in {type(self).__name__}: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), value in zip(batch, values):
+            if not future.done():
+                future.set_result(value)
+
+    @abstractmethod
+    async def _store(self, db, rows: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Write rows without committing
+
+        Args:
+            db: Write session
+            rows: Batched rows, in submission order
+
+        Returns:
+            One value per row, handed back to its caller
+        """
+
+
+class ResultWriteBuffer(GroupCommitBuffer):
+    """Group-commits quiz results
+    
+    Every submission is appended to result_history and added to the quiz
+    statistics; the latest one per student and quiz is upserted into the
+    results projection in the same transaction, so the quiz list still
+    reads a single row per quiz.
+    """
+
+    async def submit(
+        self,
+        user_id: int,
+        quiz_id: int,
+        score: int,
+        max_score: int,
+        last_attempt_id: Optional[int] = None
+    ) -> Result:
+        """
+        Queue a result upsert and wait until its batch is committed
+
+        Args:
+            user_id: ID of the student
+            quiz_id: ID of the quiz
+            score: Achieved score
+            max_score: Maximum score
+            last_attempt_id: Highest attempt id the score was computed from,
+                None to take the highest one committed when the batch is written
+
+        Returns:
+            Stored result
+
+        Raises:
+            ValueError: If max_score is not positive or score is out of range
+            SQLAlchemyError: If the result could not be written
+        """
+        if max_score <= 0 or not 0 <= score <= max_score:
+            raise ValueError(f"Invalid result {score}/{max_score} for quiz {quiz_id}")
+        return await self._enqueue({
+            "user_id": user_id,
+            "quiz_id": quiz_id,
+            "score": score,
+            "max_score": max_score,
+            "last_attempt_id": last_attempt_id,
+        })
+
+    async def _store(self, db, rows: List[Dict[str, Any]]) -> List[Result]:
+        # The next submission of the student is scored on the attempts above last_attempt_id
+        unknown = {(row["user_id"], row["quiz_id"]) for row in rows if row["last_attempt_id"] is None}
+        if unknown:
+            last_attempt_ids = await get_last_attempt_ids(db, list(unknown))
+            rows = [
+                {**row, "last_attempt_id": last_attempt_ids.get((row["user_id"], row["quiz_id"]), 0)}
+                if row["last_attempt_id"] is None else row
+                for row in rows
+            ]
+        await append_history(db, rows)
+        await add_results(db, rows)
+        # Several submissions for the same student and quiz: the last one wins
+        unique_rows = {
+            (row["user_id"], row["quiz_id"]): {key: row[key] for key in ("user_id", "quiz_id", "score", "max_score")}
+            for row in rows
+        }
+        results = await upsert_many(db, list(unique_rows.values()))
+        logger.debug(f"Committing {len(unique_rows)} quiz results for {len(rows)} submissions")
+        stored = {(result.user_id, result.quiz_id): result for result in results}
+        return [stored[(row["user_id"], row["quiz_id"])] for row in rows]
+
+
+class AttemptWriteBuffer(GroupCommitBuffer):
+    """Group-commits appended answer attempts"""
+
+    async def record(
+        self,
+        user_id: int,
+        quiz_id: int,
+        question_id: int,
+        answer_id: int,
+        is_correct: bool
+    ) -> None:
+        """
+        Queue an answer attempt and wait until its batch is committed
+
+        Args:
+            user_id: ID of the student
+            quiz_id: ID of the quiz
+            question_id: ID of the answered question
+            answer_id: ID of the selected answer
+            is_correct: Whether the selected answer is correct
+
+        Raises:
+            SQLAlchemyError: If the batch could not be written
+        """
+        await self._enqueue({
+            "user_id": user_id,
+            "quiz_id": quiz_id,
+            "question_id": question_id,
+            "answer_id": answer_id,
+            "is_correct": int(bool(is_correct)),
+        })
+
+    async def record_many(self, user_id: int, quiz_id: int, attempts: List[Tuple[int, int, bool]]) -> None:
+        """
+        Queue the attempts of a whole quiz and wait until they are committed
+
+        Args:
+            user_id: ID of the student
+            quiz_id: ID of the quiz
+            attempts: (question_id, answer_id, is_correct) tuples
+
+        Raises:
+            SQLAlchemyError: If the batch could not be written
+        """
+        await asyncio.gather(*(
+            self.record(user_id, quiz_id, question_id, answer_id, is_correct)
+            for question_id, answer_id, is_correct in attempts
+        ))
+
+    async def _store(self, db, rows: List[Dict[str, Any]]) -> List[None]:
+        await create_attempts(db, rows)
+        return [None] * len(rows)
+
+# Application-wide buffers on the single writer connection
+result_writer = ResultWriteBuffer()
+attempt_writer = AttemptWriteBuffer()
@@ -1,13 +1,19 @@
+import os
 import pytest
 import asyncio
+from contextlib import contextmanager
 from typing import Generator
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
 
+# Rate limiting has dedicated tests, keep the app-wide limiter out of the way
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("BUNDLE_SIGNING_KEY", "test-bundle-signing-key")
+
 from ..models.base import Base
-from ..db import get_db
+from ..db import count_queries, get_db, get_read_db
 from ..main import app
 from ..core.config import settings
 
@@ -67,6 +73,7 @@ async def client(db_session) -> Generator:
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     
     with TestClient(app) as test_client:
         yield test_client
@@ -77,4 +84,23 @@ async def client(db_session) -> Generator:
 @pytest.fixture
 def test_app() -> FastAPI:
     """Get the FastAPI app instance for testing"""
-    return app 
\ No newline at end of file
+    return app 
+
+@pytest.fixture
+def query_budget():
+    """
+    Assert that a block runs at most a given number of SQL statements.
+    Usage:
+        with query_budget(5) as stats:
+            response = await client.get("/api/v1/quizzes/")
+    The statements are listed when the budget is exceeded.
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        with count_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"{stats.count} SQL statements, budget {max_queries}:\n" + "\n".join(stats.statements)
+        )
+
+    return budget
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+"""
+Scripted load generator built on the manual test client.
+
+Virtual students and admins run one of these scenarios against a running
+backend:
+
+- class: every student logs in, lists the quizzes, opens the same published
+  quiz, checks an answer per question (AI explanation) and submits the result.
+- login: every student logs in --repeat times at once (bcrypt bound).
+- admin-edit: admins repeatedly edit and publish the same quiz while the
+  students keep reading the quiz list and the quiz.
+
+Throughput and p50/p95/p99 latency are reported per endpoint. A run can be
+stored as a baseline and later runs compared against it: the exit code is 1
+when an endpoint's p95 or throughput is worse than the baseline by more than
+--tolerance, or its error rate grew.
+
+Run against a local server using the fake AI backend, with rate limiting off
+(it would answer most of a login storm with 429):
+
+    python -m benchmarks.fake_openai --port 8001
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=fake BUNDLE_SIGNING_KEY=dev RATE_LIMIT_ENABLED=false uvicorn app.main:app
+    python -m app.tests.load_test class --students 30 --save-baseline baseline-class.json
+    python -m app.tests.load_test class --students 30 --baseline baseline-class.json
+
+Virtual users log in as --student-username / --admin-username; a {i} in the
+name gives each user its own account (student{i} -> student0, student1, ...).
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from .manual_test_client import APIClient
+
+
+class LoadRecorder:
+    """Collects the duration and status of every request per endpoint"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def __call__(self, endpoint: str, seconds: float, status_code: int) -> None:
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][status_code] += 1
+
+    def report(self, duration: float) -> Dict[str, Dict]:
+        """
+        Summarize the recorded requests
+
+        Args:
+            duration: Wall time of the run in seconds
+
+        Returns:
+            Per endpoint: count, errors (status >= 400 or network error),
+            requests per second, p50/p95/p99 and max in milliseconds and the
+            status code counts
+        """
+        return {
+            endpoint: summarize(latencies, self.statuses[endpoint], duration)
+            for endpoint, latencies in sorted(self.latencies.items())
+        }
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(q / 100 * len(values))) - 1))]
+
+
+def summarize(latencies: List[float], statuses: Dict[int, int], duration: float) -> Dict:
+    """Statistics of one endpoint, latencies in milliseconds"""
+    values = sorted(latencies)
+    errors = sum(count for status, count in statuses.items() if status == 0 or status >= 400)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "rps": len(values) / duration if duration > 0 else 0.0,
+        "p50": percentile(values, 50) * 1000,
+        "p95": percentile(values, 95) * 1000,
+        "p99": percentile(values, 99) * 1000,
+        "max": values[-1] * 1000 if values else 0.0,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def compare(report: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """
+    Compare a run with a baseline
+
+    Args:
+        report: Endpoint statistics of this run
+        baseline: Endpoint statistics of the baseline run
+        tolerance: Allowed relative degradation, e.g. 0.2 for 20%
+
+    Returns:
+        Regressions found, empty if none
+    """
+    regressions = []
+    for endpoint, base in baseline.items():
+        current = report.get(endpoint)
+        if current is None:
+            regressions.append(f"{endpoint}: not called in this run")
+            continue
+        if base["p95"] > 0 and current["p95"] > base["p95"] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p95 {current['p95']:.1f} ms vs {base['p95']:.1f} ms")
+        if base["rps"] > 0 and current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{endpoint}: {current['rps']:.1f} req/s vs {base['rps']:.1f} req/s")
+        base_error_rate = base["errors"] / base["count"] if base["count"] else 0.0
+        error_rate = current["errors"] / current["count"] if current["count"] else 0.0
+        if error_rate > base_error_rate + 0.01:
+            regressions.append(f"{endpoint}: error rate {error_rate:.1%} vs {base_error_rate:.1%}")
+    return regressions
+
+
+def print_report(report: Dict[str, Dict], baseline: Optional[Dict[str, Dict]] = None) -> None:
+    """Print the endpoint statistics as a table, with the baseline p95 if given"""
+    header = f"{'endpoint':<48} {'count':>6} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    if baseline is not None:
+        header += f" {'base p95':>9}"
+    print(header)
+    for endpoint, stats in report.items():
+        line = (
+            f"{endpoint:<48} {stats['count']:>6} {stats['errors']:>5} {stats['rps']:>8.1f} "
+            f"{stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['p99']:>8.1f}"
+        )
+        if baseline is not None:
+            base = baseline.get(endpoint)
+            line += f" {base['p95']:>9.1f}" if base else f" {'-':>9}"
+        print(line)
+    print("(latencies in ms)")
+
+
+class LoadRun:
+    """Virtual users of one run, sharing a connection pool and a recorder"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.recorder = LoadRecorder()
+        self.rng = random.Random(args.seed)
+        self.http = httpx.AsyncClient(
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+        )
+
+    def client(self) -> APIClient:
+        return APIClient(self.args.base_url, client=self.http, on_response=self.recorder, verbose=False)
+
+    async def login(self, pattern: str, password: str, index: int) -> Optional[APIClient]:
+        client = self.client()
+        if await client.login(pattern.format(i=index), password):
+            return client
+        return None
+
+    async def published_quiz(self) -> Dict:
+        """A published quiz of the admin, generated with the AI (fake backend) if there is none"""
+        admin = await self.login(self.args.admin_username, self.args.admin_password, 0)
+        if admin is None:
+            raise RuntimeError("Admin login failed")
+        if self.args.quiz_id:
+            return await admin.get_quiz(self.args.quiz_id)
+
+        quizzes = await admin.get_quizzes(status="published")
+        if isinstance(quizzes, list) and quizzes:
+            return await admin.get_quiz(quizzes[0]["id"])
+
+        levels = await admin.get_levels()
+        quiz = await admin.create_quiz({
+            "title": "Load test quiz",
+            "topic": "Fractions",
+            "question_count": 10,
+            "level_id": levels[0]["id"],
+        }, idempotency_key=str(uuid.uuid4()))
+        if "error" in quiz:
+            raise RuntimeError(f"Could not generate a quiz: {quiz['error']}")
+        return await admin.edit_quiz(quiz["id"], quiz_update(quiz, status="published"))
+
+    async def student_takes_quiz(self, index: int, quiz_id: int) -> None:
+        """class scenario: one student working through the quiz"""
+        await asyncio.sleep(self.rng.uniform(0, self.args.ramp_up))
+        student = await self.login(self.args.student_username, self.args.student_password, index)
+        if student is None:
+            return
+        await student.get_quizzes()
+        quiz = await student.get_quiz(quiz_id)
+        for question in quiz.get("questions", []):
+            await asyncio.sleep(self.rng.uniform(0, self.args.think_time))
+            answer = self.rng.choice(question["answers"])
+            await student.check_answer(quiz_id, question["id"], answer["id"])
+        await student.submit_result(quiz_id, idempotency_key=str(uuid.uuid4()))
+
+    async def user_logs_in(self, index: int) -> None:
+        """login scenario: one user logging in repeatedly"""
+        for _ in range(self.args.repeat):
+            await self.login(self.args.student_username, self.args.student_password, index)
+
+    async def admin_edits(self, index: int, quiz_id: int) -> None:
+        """admin-edit scenario: one admin editing and publishing the quiz"""
+        admin = await self.login(self.args.admin_username, self.args.admin_password, index)
+        if admin is None:
+            return
+        for round_ in range(self.args.repeat):
+            quiz = await admin.get_quiz(quiz_id)
+            if "error" in quiz:
+                continue
+            update = quiz_update(quiz, status="draft")
+            update["title"] = f"Load test quiz (admin {index}, edit {round_})"
+            await admin.edit_quiz(quiz_id, update)
+            await admin.edit_quiz(quiz_id, quiz_update(quiz, status="published"))
+
+    async def student_browses(self, index: int, quiz_id: int, stop: asyncio.Event) -> None:
+        """admin-edit scenario: one student reading while the admins edit"""
+        student = await self.login(self.args.student_username, self.args.student_password, index)
+        if student is None:
+            return
+        while not stop.is_set():
+            await student.get_quizzes()
+            await student.get_quiz(quiz_id)
+            await asyncio.sleep(self.rng.uniform(0, self.args.think_time))
+
+    async def run(self) -> Dict[str, Dict]:
+        """Run the scenario and return the endpoint statistics"""
+        args = self.args
+        try:
+            quiz_id = None
+            if args.scenario in ("class", "admin-edit"):
+                quiz_id = (await self.published_quiz())["id"]
+                # Only the scenario itself is measured
+                self.recorder = LoadRecorder()
+
+            started = time.perf_counter()
+            if args.scenario == "class":
+                await asyncio.gather(*(self.student_takes_quiz(i, quiz_id) for i in range(args.students)))
+            elif args.scenario == "login":
+                await asyncio.gather(*(self.user_logs_in(i) for i in range(args.students)))
+            else:
+                stop = asyncio.Event()
+                readers = [asyncio.create_task(self.student_browses(i, quiz_id, stop)) for i in range(args.students)]
+                await asyncio.gather(*(self.admin_edits(i, quiz_id) for i in range(args.admins)))
+                stop.set()
+                await asyncio.gather(*readers)
+            return self.recorder.report(time.perf_counter() - started)
+        finally:
+            await self.http.aclose()
+
+
+def quiz_update(quiz: Dict, status: str) -> Dict:
+    """QuizUpdate payload keeping the questions and answers of an admin quiz view"""
+    return {
+        "title": quiz["title"],
+        "level_id": quiz["level_id"],
+        "status": status,
+        "questions": [
+            {
+                "id": question["id"],
+                "text": question["text"],
+                "answers": [
+                    {"id": answer["id"], "text": answer["text"], "is_correct": answer["is_correct"]}
+                    for answer in question["answers"]
+                ],
+            }
+            for question in quiz["questions"]
+        ],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenario", choices=["class", "login", "admin-edit"])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--students", type=int, default=30, help="Virtual students")
+    parser.add_argument("--admins", type=int, default=2, help="Virtual admins (admin-edit)")
+    parser.add_argument("--repeat", type=int, default=5, help="Logins per user (login), edits per admin (admin-edit)")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="Seconds over which students start (class)")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Maximum pause between a student's requests")
+    parser.add_argument("--quiz-id", type=int, help="Quiz to use, default the first published quiz")
+    parser.add_argument("--student-username", default="student", help="May contain {i}")
+    parser.add_argument("--student-password", default="student123")
+    parser.add_argument("--admin-username", default="admin", help="May contain {i}")
+    parser.add_argument("--admin-password", default="admin123")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save-baseline", help="Store this run as a baseline JSON file")
+    parser.add_argument("--baseline", help="Compare with a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed degradation against the baseline")
+    args = parser.parse_args()
+
+    report = asyncio.run(LoadRun(args).run())
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        if stored["scenario"] != args.scenario:
+            sys.exit(f"Baseline is of scenario {stored['scenario']}, not {args.scenario}")
+        baseline = stored["endpoints"]
+
+    print(f"Scenario {args.scenario}: {args.students} students, {args.admins} admins")
+    print_report(report, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"scenario": args.scenario, "args": vars(args), "endpoints": report}, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,42 +3,95 @@ import httpx
 import asyncio
 import json
 import sys
-from typing import Dict, Any, Optional
+import time
+from typing import Callable, Dict, Any, List, Optional
 
 
 class APIClient:
-    """Simple HTTP client for testing the Quizzes API endpoint"""
+    """Simple HTTP client for testing the Quizzes API endpoint
     
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    Every call is timed; pass on_response to collect the timings (the load
+    generator in app.tests.load_test does). Pass a shared httpx.AsyncClient
+    to reuse connections between calls instead of opening one per call.
+    """
+    
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        client: Optional[httpx.AsyncClient] = None,
+        on_response: Optional[Callable[[str, float, int], None]] = None,
+        verbose: bool = True
+    ):
+        """
+        Initialize the client
+        
+        Args:
+            base_url: URL of the backend
+            client: Shared HTTP client, a new one per call if None
+            on_response: Called with the endpoint (method and route), the
+                duration in seconds and the status code (0 on a network error)
+            verbose: Print progress and errors
+        """
         self.base_url = base_url
         self.token = None
         self.headers = {"Content-Type": "application/json"}
+        self.client = client
+        self.on_response = on_response
+        self.verbose = verbose
+    
+    def _print(self, message: str) -> None:
+        if self.verbose:
+            print(message)
+    
+    async def _request(self, method: str, route: str, path: Optional[str] = None, timeout: float = 30.0, **kwargs) -> httpx.Response:
+        """
+        Send a request and report its duration
+        
+        Args:
+            method: HTTP method
+            route: Route template, e.g. /api/v1/quizzes/{quiz_id}, used as the endpoint name
+            path: Actual path, defaults to route
+            timeout: Timeout in seconds when no shared client is used
+            **kwargs: Passed to httpx
+            
+        Returns:
+            The response
+        """
+        url = f"{self.base_url}{path or route}"
+        kwargs.setdefault("headers", self.headers)
+        started = time.perf_counter()
+        status_code = 0
+        try:
+            if self.client is not None:
+                response = await self.client.request(method, url, **kwargs)
+            else:
+                async with httpx.AsyncClient(timeout=timeout) as client:
+                    response = await client.request(method, url, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            if self.on_response is not None:
+                self.on_response(f"{method} {route}", time.perf_counter() - started, status_code)
     
     async def login(self, username: str, password: str) -> bool:
         """Login to get authentication token"""
-        url = f"{self.base_url}/api/v1/auth/token"
-        data = {
-            "username": username,
-            "password": password
-        }
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    url, 
-                    data={"username": username, "password": password},
-                    headers={"Content-Type": "application/x-www-form-urlencoded"}
-                )
-                response.raise_for_status()
-                
-                token_data = response.json()
-                self.token = token_data["access_token"]
-                self.headers["Authorization"] = f"Bearer {self.token}"
-                print(f"Login successful for user: {username}")
-                return True
-            except httpx.HTTPStatusError as e:
-                print(f"Login failed: {e}")
-                return False
+        try:
+            response = await self._request(
+                "POST",
+                "/api/v1/auth/token",
+                data={"username": username, "password": password},
+                headers={"Content-Type": "application/x-www-form-urlencoded"}
+            )
+            response.raise_for_status()
+            
+            token_data = response.json()
+            self.token = token_data["access_token"]
+            self.headers["Authorization"] = f"Bearer {self.token}"
+            self._print(f"Login successful for user: {username}")
+            return True
+        except httpx.HTTPStatusError as e:
+            self._print(f"Login failed: {e}")
+            return False
     
     async def get_quizzes(
         self, 
@@ -54,8 +107,6 @@ class APIClient:
             order: Sort order (asc, desc)
             status: Filter by status (draft, published) - admin only
         """
-        url = f"{self.base_url}/api/v1/quizzes/"
-        
         # Build query parameters
         params = {}
         if sort_by:
@@ -65,87 +116,108 @@ class APIClient:
         if status:
             params["status"] = status
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, params=params, headers=self.headers)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                print(f"Error getting quizzes: {e}")
-                return {"error": str(e)}
+        try:
+            response = await self._request("GET", "/api/v1/quizzes/", params=params)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            self._print(f"Error getting quizzes: {e}")
+            return {"error": str(e)}
     
-    async def create_quiz(self, quiz_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_quiz(self, quiz_data: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
         """Create a new quiz with AI generation"""
-        url = f"{self.base_url}/api/v1/quizzes/"
+        headers = dict(self.headers)
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
         
         # Use a longer timeout (120 seconds) for quiz creation since AI generation can take time
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            try:
-                print("Sending request to create quiz. This may take some time due to AI generation...")
-                response = await client.post(
-                    url,
-                    json=quiz_data,
-                    headers=self.headers
-                )
-                print(f"Response status code: {response.status_code}")
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                print(f"Error creating quiz: {e}")
-                if e.response:
-                    print(f"Response: {e.response.text}")
-                return {"error": str(e)}
-            except httpx.ReadTimeout:
-                print("Request timed out. The quiz generation is taking longer than expected.")
-                print("The quiz may still be created in the background.")
-                return {"error": "Request timed out. The operation might still be processing."}
+        try:
+            self._print("Sending request to create quiz. This may take some time due to AI generation...")
+            response = await self._request("POST", "/api/v1/quizzes/", timeout=120.0, json=quiz_data, headers=headers)
+            self._print(f"Response status code: {response.status_code}")
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            self._print(f"Error creating quiz: {e}")
+            if e.response:
+                self._print(f"Response: {e.response.text}")
+            return {"error": str(e)}
+        except httpx.ReadTimeout:
+            self._print("Request timed out. The quiz generation is taking longer than expected.")
+            self._print("The quiz may still be created in the background.")
+            return {"error": "Request timed out. The operation might still be processing."}
     
     async def get_quiz(self, quiz_id: int) -> Dict[str, Any]:
         """Get a specific quiz by ID"""
-        url = f"{self.base_url}/api/v1/quizzes/{quiz_id}"
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=self.headers)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                print(f"Error getting quiz {quiz_id}: {e}")
-                return {"error": str(e)}
+        try:
+            response = await self._request("GET", "/api/v1/quizzes/{quiz_id}", f"/api/v1/quizzes/{quiz_id}")
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            self._print(f"Error getting quiz {quiz_id}: {e}")
+            return {"error": str(e)}
     
     async def edit_quiz(self, quiz_id: int, quiz_data: Dict[str, Any]) -> Dict[str, Any]:
         """Edit an existing quiz by ID"""
-        url = f"{self.base_url}/api/v1/quizzes/{quiz_id}"
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.put(
-                    url,
-                    json=quiz_data,
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                print(f"Error editing quiz {quiz_id}: {e}")
-                if e.response:
-                    print(f"Response: {e.response.text}")
-                return {"error": str(e)}
+        try:
+            response = await self._request(
+                "PUT", "/api/v1/quizzes/{quiz_id}", f"/api/v1/quizzes/{quiz_id}", json=quiz_data
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            self._print(f"Error editing quiz {quiz_id}: {e}")
+            if e.response:
+                self._print(f"Response: {e.response.text}")
+            return {"error": str(e)}
 
     async def delete_quiz(self, quiz_id: int) -> Dict[str, Any]:
         """Delete a quiz by ID"""
-        url = f"{self.base_url}/api/v1/quizzes/{quiz_id}"
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.delete(url, headers=self.headers)
-                response.raise_for_status()
-                return {"success": True, "message": f"Quiz {quiz_id} deleted successfully"}
-            except httpx.HTTPStatusError as e:
-                print(f"Error deleting quiz {quiz_id}: {e}")
-                if e.response:
-                    print(f"Response: {e.response.text}")
-                return {"error": str(e)}
+        try:
+            response = await self._request("DELETE", "/api/v1/quizzes/{quiz_id}", f"/api/v1/quizzes/{quiz_id}")
+            response.raise_for_status()
+            return {"success": True, "message": f"Quiz {quiz_id} deleted successfully"}
+        except httpx.HTTPStatusError as e:
+            self._print(f"Error deleting quiz {quiz_id}: {e}")
+            if e.response:
+                self._print(f"Response: {e.response.text}")
+            return {"error": str(e)}
+    
+    async def check_answer(self, quiz_id: int, question_id: int, answer_id: int) -> Dict[str, Any]:
+        """Check a student's answer; the response includes the AI explanation"""
+        try:
+            response = await self._request(
+                "POST",
+                "/api/v1/quizzes/{quiz_id}/check-answer",
+                f"/api/v1/quizzes/{quiz_id}/check-answer",
+                json={"question_id": question_id, "answer_id": answer_id}
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            self._print(f"Error checking answer for quiz {quiz_id}: {e}")
+            return {"error": str(e)}
+    
+    async def submit_result(self, quiz_id: int, idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """Submit the result of a quiz, scored by the server from the checked answers"""
+        headers = dict(self.headers)
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+        try:
+            response = await self._request(
+                "POST", "/api/v1/quizzes/{quiz_id}/results", f"/api/v1/quizzes/{quiz_id}/results", headers=headers
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            self._print(f"Error submitting result for quiz {quiz_id}: {e}")
+            return {"error": str(e)}
+    
+    async def get_levels(self) -> List[Dict[str, Any]]:
+        """Get the quiz levels"""
+        response = await self._request("GET", "/api/v1/levels/")
+        response.raise_for_status()
+        return response.json()
 
 
 async def main():
@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from httpx import AsyncClient
+from fastapi import status
+
+from ...main import app
+from ...core.security import get_current_active_user
+from ...services.ai_scheduler import AIScheduler
+
+TEST_USER_ADMIN = {
+    "id": 1,
+    "username": "admin",
+    "role": "admin",
+    "is_active": True
+}
+
+TEST_USER_STUDENT = {
+    "id": 2,
+    "username": "student",
+    "role": "student",
+    "is_active": True
+}
+
+@pytest.fixture
+def authenticated_user(request):
+    """
+    Fixture to override the get_current_active_user dependency.
+    Usage: @pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+    """
+    user_data = request.param
+
+    async def override_get_current_active_user():
+        user = MagicMock()
+        user.id = user_data["id"]
+        user.username = user_data["username"]
+        user.role = user_data["role"]
+        user.is_active = user_data["is_active"]
+        return user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    yield
+    app.dependency_overrides.clear()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+async def test_get_ai_metrics(authenticated_user):
+    """Test an admin reading the AI scheduler metrics"""
+    # Arrange
+    scheduler = AIScheduler(capacity=4, lanes={"explanation": 4, "generation": 1})
+    
+    # Act
+    with patch("app.routers.ai.ai_scheduler", scheduler):
+        async with scheduler.slot("generation"):
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                response = await client.get("/api/v1/ai/metrics")
+    
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["capacity"] == 4
+    assert data["running"] == 1
+    assert list(data["lanes"]) == ["explanation", "generation"]
+    assert data["lanes"]["generation"]["running"] == 1
+    assert data["lanes"]["generation"]["started"] == 1
+    assert set(data["routing"]) == {"explanation", "generation"}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
+async def test_get_ai_metrics_forbidden_for_student(authenticated_user):
+    """Test that students cannot read the AI scheduler metrics"""
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/ai/metrics")
+    
+    # Assert
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,198 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from httpx import AsyncClient
+from fastapi import status
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from ...main import app
+from ...core.config import settings
+from ...core.security import get_current_active_user
+from ...crud.quiz import bulk_create_quizzes, get_quiz
+from ...db import create_sqlite_engine, get_read_db, get_sqlite_profile, get_write_db
+from ...models import Base, Level, User
+from ...services.ai_service import AIService
+from ...services.result_writer import attempt_writer, result_writer
+
+ADMIN = MagicMock(id=1, username="admin", role="admin", is_active=True)
+STUDENT = MagicMock(id=2, username="student", role="student", is_active=True)
+
+
+@pytest.fixture
+async def session_factory(tmp_path, monkeypatch):
+    """Real database behind the API with a level, an admin, a student and three quizzes of 20x4 questions"""
+    engine = create_sqlite_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/budget.db",
+        get_sqlite_profile("performance"),
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Level).values(code="IV", description="Klasa IV", level=4))
+        await conn.execute(insert(User), [
+            {"username": "admin", "hashed_password": "x", "role": "admin"},
+            {"username": "student", "hashed_password": "x", "role": "student"},
+        ])
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        await bulk_create_quizzes(db, [
+            {
+                "title": f"Quiz {n}",
+                "level_id": 1,
+                "creator_id": 1,
+                "status": "published",
+                "questions": [
+                    {
+                        "text": f"Question {q} of quiz {n}?",
+                        "answers": [{"text": f"Answer {a}", "is_correct": a == 0} for a in range(4)],
+                    }
+                    for q in range(20)
+                ],
+            }
+            for n in range(3)
+        ])
+        await db.commit()
+
+    async def override_get_db():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_write_db] = override_get_db
+    monkeypatch.setattr(attempt_writer, "session_factory", factory)
+    monkeypatch.setattr(result_writer, "session_factory", factory)
+    yield factory
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+def login(user):
+    """Authenticate the requests as the given user"""
+    async def override_get_current_active_user():
+        return user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+
+
+async def quiz_update(session_factory, questions: int) -> dict:
+    """Update of quiz 1 editing the first questions and all their answers, dropping the rest"""
+    async with session_factory() as db:
+        quiz = await get_quiz(db, 1)
+    return {
+        "title": "Quiz 1 edited",
+        "level_id": 1,
+        "questions": [
+            {
+                "id": question.id,
+                "text": f"{question.text} Edited",
+                "answers": [
+                    {"id": answer.id, "text": f"{answer.text} edited", "is_correct": answer.is_correct}
+                    for answer in question.answers
+                ],
+            }
+            for question in quiz.questions[:questions]
+        ],
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("user", [STUDENT, ADMIN])
+@pytest.mark.parametrize("sort_by", ["level", "title", "updated_at"])
+async def test_list_quizzes_query_budget(session_factory, query_budget, user, sort_by):
+    """Test the quiz list takes one query whatever the number of quizzes"""
+    # Arrange
+    login(user)
+
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        with query_budget(1):
+            response = await client.get(f"/api/v1/quizzes/?sort_by={sort_by}")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_quiz_query_budget(session_factory, query_budget):
+    """Test a quiz with its questions and answers takes three queries"""
+    # Arrange
+    login(ADMIN)
+
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        with query_budget(3):
+            response = await client.get("/api/v1/quizzes/1")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["questions"]) == 20
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("questions", [5, 20])
+async def test_update_quiz_query_budget(session_factory, query_budget, questions):
+    """Test a quiz update takes the same number of queries however many questions and answers change"""
+    # Arrange
+    login(ADMIN)
+    payload = await quiz_update(session_factory, questions)
+
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        with query_budget(14):
+            response = await client.put("/api/v1/quizzes/1", json=payload)
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["questions"]) == questions
+    async with session_factory() as db:
+        quiz = await get_quiz(db, 1)
+    assert quiz.title == "Quiz 1 edited"
+    assert len(quiz.questions) == questions
+    assert all(question.text.endswith("Edited") for question in quiz.questions)
+    assert all(answer.text.endswith("edited") for question in quiz.questions for answer in question.answers)
+
+
+@pytest.mark.asyncio
+async def test_check_answer_and_submit_result_query_budget(session_factory, query_budget):
+    """Test checking an answer and submitting the result take a fixed number of queries"""
+    # Arrange
+    login(STUDENT)
+
+    async def explanation(self, **kwargs):
+        return "Explanation"
+
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        with patch.object(AIService, "generate_explanation", explanation):
+            with query_budget(5):
+                check = await client.post(
+                    "/api/v1/quizzes/1/check-answer", json={"question_id": 1, "answer_id": 1}
+                )
+        with query_budget(4):
+            result = await client.post("/api/v1/quizzes/1/results")
+
+    # Assert
+    assert check.status_code == status.HTTP_200_OK
+    assert check.json()["is_correct"] is True
+    assert result.status_code == status.HTTP_201_CREATED
+    assert (result.json()["score"], result.json()["max_score"]) == (1, 20)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.DEBUG, reason="Query headers are only sent in debug mode")
+async def test_debug_headers_report_queries(session_factory, query_budget):
+    """Test the response headers report the statements of the request"""
+    # Arrange
+    login(ADMIN)
+
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        with query_budget(3) as stats:
+            response = await client.get("/api/v1/quizzes/1")
+
+    # Assert
+    assert response.headers["X-DB-Query-Count"] == str(stats.count)
+    assert float(response.headers["X-DB-Query-Time-Ms"]) > 0
+    assert response.headers["Server-Timing"].startswith("db;dur=")
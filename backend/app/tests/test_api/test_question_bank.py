@@ -0,0 +1,85 @@
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock, ANY
+from httpx import AsyncClient
+from fastapi import status
+
+from ...main import app
+from ...services.quiz_service import QuizService
+from ...core.security import get_current_active_user
+from ...schemas.quiz import BankQuestion
+
+TEST_USER_ADMIN = {
+    "id": 1,
+    "username": "admin",
+    "role": "admin",
+    "is_active": True
+}
+
+TEST_USER_STUDENT = {
+    "id": 2,
+    "username": "student",
+    "role": "student",
+    "is_active": True
+}
+
+@pytest.fixture
+def authenticated_user(request):
+    """
+    Fixture to override the get_current_active_user dependency.
+    Usage: @pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+    """
+    user_data = request.param
+
+    async def override_get_current_active_user():
+        user = MagicMock()
+        user.id = user_data["id"]
+        user.username = user_data["username"]
+        user.role = user_data["role"]
+        user.is_active = user_data["is_active"]
+        return user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    yield
+    app.dependency_overrides.clear()
+
+@pytest.fixture
+def mock_suggest_bank_questions():
+    """Mock the suggest_bank_questions method of QuizService"""
+    with patch.object(QuizService, "suggest_bank_questions", new_callable=AsyncMock) as mock_suggest:
+        yield mock_suggest
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+async def test_suggest_bank_questions_success(authenticated_user, mock_suggest_bank_questions):
+    """Test an admin getting question bank suggestions for a topic"""
+    # Arrange
+    mock_suggest_bank_questions.return_value = [
+        BankQuestion(
+            id=7,
+            quiz_id=2,
+            text="Ile to 1/2 + 1/4?",
+            answers=[{"id": 20, "text": "3/4", "is_correct": True}, {"id": 21, "text": "2/6", "is_correct": False}]
+        )
+    ]
+    
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/quizzes/bank/questions?topic=ułamki&level_id=4&limit=5")
+    
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["id"] == 7
+    assert response.json()[0]["answers"][0]["is_correct"] is True
+    mock_suggest_bank_questions.assert_called_once_with(db=ANY, topic="ułamki", level_id=4, limit=5)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
+async def test_suggest_bank_questions_forbidden(authenticated_user, mock_suggest_bank_questions):
+    """Test students cannot browse the question bank"""
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/quizzes/bank/questions?topic=ułamki&level_id=4")
+    
+    # Assert
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert not mock_suggest_bank_questions.called
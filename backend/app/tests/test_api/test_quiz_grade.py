@@ -0,0 +1,182 @@
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock
+from httpx import AsyncClient
+from fastapi import status, HTTPException
+
+from ...main import app
+from ...services.quiz_service import QuizService
+from ...core.security import get_current_active_student
+from ...schemas.question import QuizGradeResponse, QuestionGrade
+from ...schemas.result import ResultRead
+from ...schemas.quiz import QuizBundle
+
+TEST_USER_STUDENT = {
+    "id": 2,
+    "username": "student",
+    "role": "student",
+    "is_active": True
+}
+
+TEST_GRADE_DATA = {
+    "answers": [
+        {"question_id": 1, "answer_id": 1},
+        {"question_id": 2, "answer_id": 4}
+    ]
+}
+
+@pytest.fixture
+def authenticated_user(request):
+    """
+    Fixture to override the get_current_active_student dependency.
+    Usage: @pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
+    """
+    user_data = request.param
+
+    async def override_get_current_active_user():
+        user = MagicMock()
+        user.id = user_data["id"]
+        user.username = user_data["username"]
+        user.role = user_data["role"]
+        user.is_active = user_data["is_active"]
+        return user
+
+    app.dependency_overrides[get_current_active_student] = override_get_current_active_user
+    yield
+    app.dependency_overrides.clear()
+
+@pytest.fixture
+def mock_grade_quiz():
+    """Mock the grade_quiz method of QuizService"""
+    with patch.object(QuizService, "grade_quiz") as mock_grade:
+        mock_grade.return_value = QuizGradeResponse(
+            quiz_id=1,
+            score=1,
+            max_score=3,
+            questions=[
+                QuestionGrade(question_id=1, answer_id=1, is_correct=True, correct_answer_id=1),
+                QuestionGrade(question_id=2, answer_id=4, is_correct=False, correct_answer_id=3)
+            ],
+            result=ResultRead(
+                id=7, user_id=2, quiz_id=1, score=1, max_score=3,
+                created_at="2023-10-27T14:00:00Z"
+            )
+        )
+        yield mock_grade
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
+async def test_grade_quiz_success(authenticated_user, mock_grade_quiz):
+    """Test grading all answers of a quiz in one request"""
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/v1/quizzes/1/grade", json=TEST_GRADE_DATA)
+    
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["score"] == 1
+    assert body["max_score"] == 3
+    assert [q["is_correct"] for q in body["questions"]] == [True, False]
+    assert body["result"]["id"] == 7
+    
+    # Verify service call
+    kwargs = mock_grade_quiz.call_args.kwargs
+    assert kwargs["quiz_id"] == 1
+    assert [(a.question_id, a.answer_id) for a in kwargs["grade_data"].answers] == [(1, 1), (2, 4)]
+
+@pytest.mark.asyncio
+async def test_grade_quiz_unauthorized():
+    """Test grading without authentication"""
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/v1/quizzes/1/grade", json=TEST_GRADE_DATA)
+    
+    # Assert
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
+async def test_grade_quiz_requires_answers(authenticated_user, mock_grade_quiz):
+    """Test grading with an empty answer list is rejected"""
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/v1/quizzes/1/grade", json={"answers": []})
+    
+    # Assert
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    mock_grade_quiz.assert_not_called()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
+async def test_grade_quiz_not_found(authenticated_user):
+    """Test grading a missing or unpublished quiz"""
+    # Arrange
+    with patch.object(QuizService, "grade_quiz") as mock_grade:
+        mock_grade.side_effect = HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found or not published"
+        )
+        
+        # Act
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post("/api/v1/quizzes/999/grade", json=TEST_GRADE_DATA)
+    
+    # Assert
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
+async def test_get_answer_explanation_success(authenticated_user):
+    """Test fetching the explanation of a graded answer lazily"""
+    # Arrange
+    with patch.object(QuizService, "explain_answer", new_callable=AsyncMock) as mock_explain:
+        mock_explain.return_value = "Because 1/2 = 2/4."
+        
+        # Act
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/api/v1/quizzes/1/questions/2/explanation?answer_id=4")
+    
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"question_id": 2, "answer_id": 4, "explanation": "Because 1/2 = 2/4."}
+    assert mock_explain.call_args.kwargs["answer_id"] == 4
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
+async def test_get_answer_explanation_requires_answer_id(authenticated_user):
+    """Test the selected answer must be given"""
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/quizzes/1/questions/2/explanation")
+    
+    # Assert
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
+async def test_get_quiz_bundle_success(authenticated_user):
+    """Test downloading an offline bundle"""
+    # Arrange
+    bundle = QuizBundle(
+        quiz={
+            "id": 1, "title": "Test Quiz", "status": "published", "level_id": 1,
+            "creator_id": 1, "updated_at": "2023-10-27T14:00:00Z",
+            "questions": [{"id": 1, "text": "Question 1?", "answers": [{"id": 1, "text": "A"}]}]
+        },
+        salt="00ff",
+        answer_hashes={1: "abc"},
+        key_digest="def",
+        issued_at="2023-10-27T14:00:00Z",
+        signature="123"
+    )
+    with patch.object(QuizService, "build_quiz_bundle", new_callable=AsyncMock, return_value=bundle):
+        
+        # Act
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/api/v1/quizzes/1/bundle")
+    
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["answer_hashes"] == {"1": "abc"}
+    assert "is_correct" not in response.text
+
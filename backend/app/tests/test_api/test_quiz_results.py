@@ -1,17 +1,15 @@
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock, ANY
 from httpx import AsyncClient
-from fastapi import status, HTTPException
+from fastapi import status
 from typing import List, Dict, Any
 
 from ...main import app
-from ...services.quiz_service import QuizService
+from ...services.result_writer import result_writer
 from ...models.user import User
-from ...models.quiz import Quiz
-from ...models.question import Question
 from ...models.result import Result
+from ...models.result_history import ResultHistory
 from ...core.security import get_current_active_user
-from ...crud import result as result_crud
 
 # Constants for testing
 TEST_USER_ADMIN = {
@@ -83,68 +81,39 @@ def authenticated_user(request):
     app.dependency_overrides.clear()
 
 @pytest.fixture
-def mock_get_quiz_by_id():
-    """Mock the get_quiz_by_id method of QuizService"""
-    with patch.object(QuizService, "get_quiz_by_id") as mock_get:
-        yield mock_get
+def mock_get_quiz_score():
+    """Mock the server-side scoring query, returns (score, max_score)"""
+    with patch("app.routers.quizzes.get_quiz_score", new_callable=AsyncMock) as mock_score:
+        yield mock_score
 
 @pytest.fixture
-def mock_get_by_user_and_quiz():
-    """Mock the get_by_user_and_quiz method from result_crud"""
-    with patch.object(result_crud, "get_by_user_and_quiz") as mock_get:
-        yield mock_get
-
-@pytest.fixture
-def mock_create_with_owner():
-    """Mock the create_with_owner method from result_crud"""
-    with patch.object(result_crud, "create_with_owner") as mock_create:
-        yield mock_create
-
-@pytest.fixture
-def mock_update():
-    """Mock the update method from result_crud"""
-    with patch.object(result_crud, "update") as mock_update:
-        yield mock_update
+def mock_submit():
+    """Mock the group-commit result buffer"""
+    with patch.object(result_writer, "submit", new_callable=AsyncMock) as mock_submit:
+        yield mock_submit
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
-async def test_submit_quiz_result_create_success(
+async def test_submit_quiz_result_success(
     authenticated_user, 
-    mock_get_quiz_by_id, 
-    mock_get_by_user_and_quiz,
-    mock_create_with_owner
+    mock_get_quiz_score,
+    mock_submit
 ):
-    """Test successful quiz result submission (create new result)"""
+    """Test successful quiz result submission (created or updated by the buffer upsert)"""
     # Arrange
     quiz_id = 1
+    mock_get_quiz_score.return_value = (VALID_RESULT_DATA["score"], len(TEST_QUIZ["questions"]), 12)
     
-    # Mock quiz retrieval
-    quiz = MagicMock(spec=Quiz)
-    quiz.id = TEST_QUIZ["id"]
-    quiz.title = TEST_QUIZ["title"]
-    quiz.questions = []
-    # Add 5 question objects to the quiz
-    for q_data in TEST_QUIZ["questions"]:
-        question = MagicMock(spec=Question)
-        question.id = q_data["id"]
-        question.text = q_data["text"]
-        quiz.questions.append(question)
-    
-    mock_get_quiz_by_id.return_value = quiz
-    
-    # Mock result retrieval (not found)
-    mock_get_by_user_and_quiz.return_value = None
+    # Mock stored result
+    stored_result = MagicMock(spec=Result)
+    stored_result.id = 1
+    stored_result.score = VALID_RESULT_DATA["score"]
+    stored_result.max_score = VALID_RESULT_DATA["max_score"]
+    stored_result.user_id = TEST_USER_STUDENT["id"]
+    stored_result.quiz_id = quiz_id
+    stored_result.created_at = "2023-10-27T14:00:00Z"
     
-    # Mock result creation
-    created_result = MagicMock(spec=Result)
-    created_result.id = 1
-    created_result.score = VALID_RESULT_DATA["score"]
-    created_result.max_score = VALID_RESULT_DATA["max_score"]
-    created_result.user_id = TEST_USER_STUDENT["id"]
-    created_result.quiz_id = quiz_id
-    created_result.created_at = "2023-10-27T14:00:00Z"
-    
-    mock_create_with_owner.return_value = created_result
+    mock_submit.return_value = stored_result
     
     # Act
     async with AsyncClient(app=app, base_url="http://test") as client:
@@ -160,93 +129,52 @@ async def test_submit_quiz_result_create_success(
     assert response.json()["user_id"] == TEST_USER_STUDENT["id"]
     assert response.json()["quiz_id"] == quiz_id
     
-    # Verify service calls
-    mock_get_quiz_by_id.assert_called_once_with(db=ANY, quiz_id=quiz_id)
-    mock_get_by_user_and_quiz.assert_called_once_with(
-        db=ANY, 
-        user_id=TEST_USER_STUDENT["id"], 
-        quiz_id=quiz_id
-    )
-    mock_create_with_owner.assert_called_once_with(
-        db=ANY,
-        obj_in=ANY,
+    # Verify calls
+    mock_get_quiz_score.assert_called_once_with(db=ANY, user_id=TEST_USER_STUDENT["id"], quiz_id=quiz_id)
+    mock_submit.assert_called_once_with(
         user_id=TEST_USER_STUDENT["id"],
-        quiz_id=quiz_id
+        quiz_id=quiz_id,
+        score=VALID_RESULT_DATA["score"],
+        max_score=VALID_RESULT_DATA["max_score"],
+        last_attempt_id=12
     )
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
-async def test_submit_quiz_result_update_success(
+async def test_submit_quiz_result_uses_server_score(
     authenticated_user, 
-    mock_get_quiz_by_id, 
-    mock_get_by_user_and_quiz,
-    mock_update
+    mock_get_quiz_score,
+    mock_submit
 ):
-    """Test successful quiz result submission (update existing result)"""
+    """Test the stored score comes from the recorded attempts, not from the client"""
     # Arrange
     quiz_id = 1
+    mock_get_quiz_score.return_value = (2, len(TEST_QUIZ["questions"]), 0)
     
-    # Mock quiz retrieval
-    quiz = MagicMock(spec=Quiz)
-    quiz.id = TEST_QUIZ["id"]
-    quiz.title = TEST_QUIZ["title"]
-    quiz.questions = []
-    # Add 5 question objects to the quiz
-    for q_data in TEST_QUIZ["questions"]:
-        question = MagicMock(spec=Question)
-        question.id = q_data["id"]
-        question.text = q_data["text"]
-        quiz.questions.append(question)
-    
-    mock_get_quiz_by_id.return_value = quiz
-    
-    # Mock result retrieval (existing result)
-    existing_result = MagicMock(spec=Result)
-    existing_result.id = 1
-    existing_result.score = 3  # Old score
-    existing_result.max_score = 5
-    existing_result.user_id = TEST_USER_STUDENT["id"]
-    existing_result.quiz_id = quiz_id
-    
-    mock_get_by_user_and_quiz.return_value = existing_result
-    
-    # Mock result update
-    updated_result = MagicMock(spec=Result)
-    updated_result.id = 1
-    updated_result.score = VALID_RESULT_DATA["score"]  # New score
-    updated_result.max_score = VALID_RESULT_DATA["max_score"]
-    updated_result.user_id = TEST_USER_STUDENT["id"]
-    updated_result.quiz_id = quiz_id
-    updated_result.created_at = "2023-10-27T14:00:00Z"
-    
-    mock_update.return_value = updated_result
+    stored_result = MagicMock(spec=Result)
+    stored_result.id = 1
+    stored_result.score = 2
+    stored_result.max_score = 5
+    stored_result.user_id = TEST_USER_STUDENT["id"]
+    stored_result.quiz_id = quiz_id
+    stored_result.created_at = "2023-10-27T14:00:00Z"
+    mock_submit.return_value = stored_result
     
     # Act
     async with AsyncClient(app=app, base_url="http://test") as client:
-        response = await client.post(
+        claimed = await client.post(
             f"/api/v1/quizzes/{quiz_id}/results",
-            json=VALID_RESULT_DATA
+            json={"score": 5, "max_score": 5}
         )
+        without_body = await client.post(f"/api/v1/quizzes/{quiz_id}/results")
     
     # Assert
-    assert response.status_code == status.HTTP_201_CREATED
-    assert response.json()["score"] == VALID_RESULT_DATA["score"]
-    assert response.json()["max_score"] == VALID_RESULT_DATA["max_score"]
-    assert response.json()["user_id"] == TEST_USER_STUDENT["id"]
-    assert response.json()["quiz_id"] == quiz_id
-    
-    # Verify service calls
-    mock_get_quiz_by_id.assert_called_once_with(db=ANY, quiz_id=quiz_id)
-    mock_get_by_user_and_quiz.assert_called_once_with(
-        db=ANY, 
-        user_id=TEST_USER_STUDENT["id"], 
-        quiz_id=quiz_id
-    )
-    mock_update.assert_called_once_with(
-        db=ANY,
-        db_obj=existing_result,
-        obj_in=ANY
-    )
+    assert claimed.status_code == status.HTTP_201_CREATED
+    assert claimed.json()["score"] == 2
+    assert without_body.status_code == status.HTTP_201_CREATED
+    for call in mock_submit.call_args_list:
+        assert call.kwargs["score"] == 2
+        assert call.kwargs["max_score"] == 5
 
 @pytest.mark.asyncio
 async def test_submit_quiz_result_unauthorized():
@@ -277,16 +205,11 @@ async def test_submit_quiz_result_forbidden(authenticated_user):
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
-async def test_submit_quiz_result_quiz_not_found(authenticated_user, mock_get_quiz_by_id):
+async def test_submit_quiz_result_quiz_not_found(authenticated_user, mock_get_quiz_score, mock_submit):
     """Test quiz result submission for non-existent quiz"""
     # Arrange
     quiz_id = 999  # Non-existent quiz ID
-    
-    # Mock quiz retrieval (not found)
-    mock_get_quiz_by_id.side_effect = HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"Quiz with id {quiz_id} not found"
-    )
+    mock_get_quiz_score.return_value = None
     
     # Act
     async with AsyncClient(app=app, base_url="http://test") as client:
@@ -298,27 +221,32 @@ async def test_submit_quiz_result_quiz_not_found(authenticated_user, mock_get_qu
     # Assert
     assert response.status_code == status.HTTP_404_NOT_FOUND
     assert "not found" in response.json()["detail"].lower()
+    mock_submit.assert_not_called()
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
-async def test_submit_quiz_result_invalid_score(authenticated_user, mock_get_quiz_by_id):
-    """Test quiz result submission with invalid score (score > max_score)"""
+async def test_submit_quiz_result_quiz_without_questions(authenticated_user, mock_get_quiz_score, mock_submit):
+    """Test quiz result submission for a quiz without questions"""
     # Arrange
     quiz_id = 1
+    mock_get_quiz_score.return_value = (0, 0, 0)
     
-    # Mock quiz retrieval
-    quiz = MagicMock(spec=Quiz)
-    quiz.id = TEST_QUIZ["id"]
-    quiz.title = TEST_QUIZ["title"]
-    quiz.questions = []
-    # Add 5 question objects to the quiz
-    for q_data in TEST_QUIZ["questions"]:
-        question = MagicMock(spec=Question)
-        question.id = q_data["id"]
-        question.text = q_data["text"]
-        quiz.questions.append(question)
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post(f"/api/v1/quizzes/{quiz_id}/results")
     
-    mock_get_quiz_by_id.return_value = quiz
+    # Assert
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()["detail"] == "Quiz has no questions"
+    mock_submit.assert_not_called()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
+async def test_submit_quiz_result_invalid_score(authenticated_user, mock_get_quiz_score, mock_submit):
+    """Test quiz result submission with invalid score (score > max_score)"""
+    # Arrange
+    quiz_id = 1
+    mock_get_quiz_score.return_value = (VALID_RESULT_DATA["score"], len(TEST_QUIZ["questions"]), 0)
     
     # Act
     async with AsyncClient(app=app, base_url="http://test") as client:
@@ -330,27 +258,15 @@ async def test_submit_quiz_result_invalid_score(authenticated_user, mock_get_qui
     # Assert
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
     assert "score cannot be greater than max_score" in response.json()["detail"].lower()
+    mock_submit.assert_not_called()
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
-async def test_submit_quiz_result_invalid_max_score(authenticated_user, mock_get_quiz_by_id):
+async def test_submit_quiz_result_invalid_max_score(authenticated_user, mock_get_quiz_score, mock_submit):
     """Test quiz result submission with invalid max_score (max_score != question_count)"""
     # Arrange
     quiz_id = 1
-    
-    # Mock quiz retrieval
-    quiz = MagicMock(spec=Quiz)
-    quiz.id = TEST_QUIZ["id"]
-    quiz.title = TEST_QUIZ["title"]
-    quiz.questions = []
-    # Add 5 question objects to the quiz
-    for q_data in TEST_QUIZ["questions"]:
-        question = MagicMock(spec=Question)
-        question.id = q_data["id"]
-        question.text = q_data["text"]
-        quiz.questions.append(question)
-    
-    mock_get_quiz_by_id.return_value = quiz
+    mock_get_quiz_score.return_value = (VALID_RESULT_DATA["score"], len(TEST_QUIZ["questions"]), 0)
     
     # Act
     async with AsyncClient(app=app, base_url="http://test") as client:
@@ -362,34 +278,22 @@ async def test_submit_quiz_result_invalid_max_score(authenticated_user, mock_get
     # Assert
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
     assert "max_score must match the number of questions" in response.json()["detail"].lower()
+    mock_submit.assert_not_called()
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
 async def test_submit_quiz_result_server_error(
     authenticated_user, 
-    mock_get_quiz_by_id, 
-    mock_get_by_user_and_quiz
+    mock_get_quiz_score,
+    mock_submit
 ):
     """Test quiz result submission with server error"""
     # Arrange
     quiz_id = 1
+    mock_get_quiz_score.return_value = (VALID_RESULT_DATA["score"], len(TEST_QUIZ["questions"]), 0)
     
-    # Mock quiz retrieval
-    quiz = MagicMock(spec=Quiz)
-    quiz.id = TEST_QUIZ["id"]
-    quiz.title = TEST_QUIZ["title"]
-    quiz.questions = []
-    # Add 5 question objects to the quiz
-    for q_data in TEST_QUIZ["questions"]:
-        question = MagicMock(spec=Question)
-        question.id = q_data["id"]
-        question.text = q_data["text"]
-        quiz.questions.append(question)
-    
-    mock_get_quiz_by_id.return_value = quiz
-    
-    # Mock result retrieval (throws exception)
-    mock_get_by_user_and_quiz.side_effect = Exception("Database connection error")
+    # Mock batch write failure
+    mock_submit.side_effect = Exception("Database connection error")
     
     # Act
     async with AsyncClient(app=app, base_url="http://test") as client:
@@ -400,4 +304,33 @@ async def test_submit_quiz_result_server_error(
     
     # Assert
     assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
-    assert "unexpected error" in response.json()["detail"].lower() 
\ No newline at end of file
+    assert "unexpected error" in response.json()["detail"].lower()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
+async def test_get_quiz_result_history_success(authenticated_user):
+    """Test listing the student's results for a quiz, newest first"""
+    # Arrange
+    quiz_id = 1
+    history = []
+    for entry_id, score in ((2, 4), (1, 2)):
+        entry = MagicMock(spec=ResultHistory)
+        entry.id = entry_id
+        entry.score = score
+        entry.max_score = 5
+        entry.user_id = TEST_USER_STUDENT["id"]
+        entry.quiz_id = quiz_id
+        entry.created_at = "2023-10-27T14:00:00Z"
+        history.append(entry)
+    
+    with patch("app.routers.quizzes.get_history", new_callable=AsyncMock, return_value=history) as mock_history:
+        
+        # Act
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get(f"/api/v1/quizzes/{quiz_id}/results/history?limit=10")
+    
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert [entry["score"] for entry in response.json()] == [4, 2]
+    mock_history.assert_called_once_with(db=ANY, user_id=TEST_USER_STUDENT["id"], quiz_id=quiz_id, limit=10)
+
@@ -0,0 +1,84 @@
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock, ANY
+from httpx import AsyncClient
+from fastapi import status
+
+from ...main import app
+from ...services.quiz_service import QuizService
+from ...core.security import get_current_active_user
+from ...schemas.quiz import QuizSearchHit
+
+TEST_USER_ADMIN = {
+    "id": 1,
+    "username": "admin",
+    "role": "admin",
+    "is_active": True
+}
+
+@pytest.fixture
+def authenticated_user(request):
+    """
+    Fixture to override the get_current_active_user dependency.
+    Usage: @pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+    """
+    user_data = request.param
+
+    async def override_get_current_active_user():
+        user = MagicMock()
+        user.id = user_data["id"]
+        user.username = user_data["username"]
+        user.role = user_data["role"]
+        user.is_active = user_data["is_active"]
+        return user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    yield
+    app.dependency_overrides.clear()
+
+@pytest.fixture
+def mock_search_quizzes():
+    """Mock the search_quizzes method of QuizService"""
+    with patch.object(QuizService, "search_quizzes", new_callable=AsyncMock) as mock_search:
+        yield mock_search
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+async def test_search_quizzes_success(authenticated_user, mock_search_quizzes):
+    """Test searching quizzes with filters and pagination"""
+    # Arrange
+    mock_search_quizzes.return_value = [
+        QuizSearchHit(
+            id=3,
+            title="Ułamki zwykłe",
+            level_id=4,
+            status="draft",
+            updated_at="2023-10-27T14:00:00Z",
+            score=-4.2,
+            matched_in="title",
+            snippet="<mark>Ułamki</mark> zwykłe"
+        )
+    ]
+    
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/quizzes/search?q=ułamki&status=draft&skip=20&limit=10")
+    
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["snippet"] == "<mark>Ułamki</mark> zwykłe"
+    mock_search_quizzes.assert_called_once_with(
+        db=ANY, user=ANY, text="ułamki", status="draft", skip=20, limit=10
+    )
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+@pytest.mark.parametrize("query", ["", "q=", "q=x&limit=0", "q=x&limit=101", "q=x&skip=-1"])
+async def test_search_quizzes_invalid_parameters(authenticated_user, mock_search_quizzes, query):
+    """Test missing search text and out of range pagination are rejected"""
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get(f"/api/v1/quizzes/search?{query}")
+    
+    # Assert
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    mock_search_quizzes.assert_not_called()
@@ -0,0 +1,135 @@
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock, ANY
+from httpx import AsyncClient
+from fastapi import status, HTTPException
+
+from ...main import app
+from ...services.quiz_service import QuizService
+from ...core.security import get_current_active_user
+from ...schemas.quiz import QuizStatsRead, QuizItemAnalysis
+
+TEST_USER_ADMIN = {
+    "id": 1,
+    "username": "admin",
+    "role": "admin",
+    "is_active": True
+}
+
+TEST_USER_STUDENT = {
+    "id": 2,
+    "username": "student",
+    "role": "student",
+    "is_active": True
+}
+
+@pytest.fixture
+def authenticated_user(request):
+    """
+    Fixture to override the get_current_active_user dependency.
+    Usage: @pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+    """
+    user_data = request.param
+
+    async def override_get_current_active_user():
+        user = MagicMock()
+        user.id = user_data["id"]
+        user.username = user_data["username"]
+        user.role = user_data["role"]
+        user.is_active = user_data["is_active"]
+        return user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    yield
+    app.dependency_overrides.clear()
+
+@pytest.fixture
+def mock_get_quiz_stats():
+    """Mock the get_quiz_stats method of QuizService"""
+    with patch.object(QuizService, "get_quiz_stats", new_callable=AsyncMock) as mock_stats:
+        yield mock_stats
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+async def test_get_quiz_stats_success(authenticated_user, mock_get_quiz_stats):
+    """Test an admin reading the statistics of a quiz"""
+    # Arrange
+    mock_get_quiz_stats.return_value = QuizStatsRead(
+        quiz_id=1,
+        attempt_count=4,
+        mean_score=3.5,
+        score_stddev=0.5,
+        mean_percent=70.0,
+        histogram=[0, 0, 0, 0, 0, 0, 2, 0, 2, 0],
+        updated_at="2023-10-27T14:00:00Z"
+    )
+    
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/quizzes/1/stats")
+    
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["attempt_count"] == 4
+    assert response.json()["histogram"][6] == 2
+    mock_get_quiz_stats.assert_called_once_with(db=ANY, quiz_id=1)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
+async def test_get_quiz_stats_forbidden(authenticated_user, mock_get_quiz_stats):
+    """Test students cannot read quiz statistics"""
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/quizzes/1/stats")
+    
+    # Assert
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    mock_get_quiz_stats.assert_not_called()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+async def test_get_quiz_stats_not_found(authenticated_user, mock_get_quiz_stats):
+    """Test statistics of a non-existent quiz"""
+    # Arrange
+    mock_get_quiz_stats.side_effect = HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Quiz not found"
+    )
+    
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/quizzes/999/stats")
+    
+    # Assert
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+async def test_get_item_analysis_success(authenticated_user):
+    """Test an admin reading the item analysis of a quiz"""
+    # Arrange
+    analysis = QuizItemAnalysis(
+        quiz_id=1,
+        attempt_count=3,
+        student_count=2,
+        questions=[{
+            "question_id": 1,
+            "responses": 2,
+            "difficulty": 0.5,
+            "discrimination": None,
+            "answers": [
+                {"answer_id": 1, "is_correct": True, "selection_rate": 0.5},
+                {"answer_id": 2, "is_correct": False, "selection_rate": 0.5}
+            ]
+        }]
+    )
+    with patch.object(QuizService, "get_item_analysis", new_callable=AsyncMock, return_value=analysis) as mock_analysis:
+        
+        # Act
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/api/v1/quizzes/1/item-analysis")
+    
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["questions"][0]["difficulty"] == 0.5
+    mock_analysis.assert_called_once_with(db=ANY, quiz_id=1)
+
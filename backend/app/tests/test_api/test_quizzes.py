@@ -3,13 +3,19 @@ from unittest.mock import AsyncMock, patch, MagicMock, ANY
 from httpx import AsyncClient
 from fastapi import status, HTTPException
 from typing import List
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
 from ...main import app
+from ...db import create_sqlite_engine, get_sqlite_profile
+from ...models import Base
 from ...services.quiz_service import QuizService
 from ...services.ai_quiz_generator import AIGenerationError
 from ...models.user import User
 from ...schemas.quiz import QuizReadList, LastResult
 from ...core.security import get_current_active_user
+from ...services.idempotency import IdempotencyStore
 
 # Constants for testing
 TEST_USER_ADMIN = {
@@ -324,6 +330,41 @@ async def test_create_quiz_unexpected_error(authenticated_user, mock_quiz_servic
     assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
     assert "An unexpected error occurred" in response.json()["detail"]
 
+@pytest.fixture
+async def idempotency_store(tmp_path):
+    """Idempotency store on a fresh database with the test admin"""
+    engine = create_sqlite_engine(f"sqlite+aiosqlite:///{tmp_path}/keys.db", get_sqlite_profile("performance"))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User).values(username="admin", hashed_password="x", role="admin"))
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    store = IdempotencyStore(session_factory=factory, read_session_factory=factory)
+    with patch("app.routers.quizzes.idempotency_store", store):
+        yield store
+    await engine.dispose()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+async def test_create_quiz_idempotent_retry(authenticated_user, mock_quiz_service, idempotency_store):
+    """Test a retry with the same Idempotency-Key returns the stored quiz without generating again"""
+    # Arrange
+    mock_quiz_service.return_value = TEST_GENERATED_QUIZ
+    headers = {"Idempotency-Key": "3f1c-retry"}
+    
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        first = await client.post("/api/v1/quizzes/", json=TEST_QUIZ_DATA, headers=headers)
+        retry = await client.post("/api/v1/quizzes/", json=TEST_QUIZ_DATA, headers=headers)
+        reused = await client.post("/api/v1/quizzes/", json={**TEST_QUIZ_DATA, "topic": "Other"}, headers=headers)
+    
+    # Assert
+    assert first.status_code == retry.status_code == status.HTTP_201_CREATED
+    assert retry.json() == first.json()
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert reused.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    mock_quiz_service.assert_called_once()
+
 @pytest.mark.asyncio
 async def test_create_quiz_unauthorized():
     """Test quiz creation with unauthorized user (no token)"""
@@ -0,0 +1,118 @@
+import pytest
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+from httpx import AsyncClient
+from fastapi import status
+
+from ...main import app
+from ...core.security import get_current_active_user
+
+TEST_USER_ADMIN = {
+    "id": 1,
+    "username": "admin",
+    "role": "admin",
+    "is_active": True
+}
+
+TEST_USER_STUDENT = {
+    "id": 2,
+    "username": "student",
+    "role": "student",
+    "is_active": True
+}
+
+EXPORT_ROWS = [
+    (1, 2, "student", 1, "Test Quiz", "IV", 4, 5, datetime(2024, 9, 1, 8, 30)),
+    (2, 3, "student2", 1, "Test Quiz", "IV", 5, 5, datetime(2024, 9, 2, 8, 30)),
+]
+
+@pytest.fixture
+def authenticated_user(request):
+    """
+    Fixture to override the get_current_active_user dependency.
+    Usage: @pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+    """
+    user_data = request.param
+
+    async def override_get_current_active_user():
+        user = MagicMock()
+        user.id = user_data["id"]
+        user.username = user_data["username"]
+        user.role = user_data["role"]
+        user.is_active = user_data["is_active"]
+        return user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    yield
+    app.dependency_overrides.clear()
+
+@pytest.fixture
+def mock_batches():
+    """Mock the keyset iteration, yields the rows in batches of one"""
+    async def batches(**filters):
+        for row in EXPORT_ROWS:
+            yield [row]
+
+    with patch("app.routers.results.iter_result_batches", side_effect=batches) as mock_iter:
+        yield mock_iter
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+async def test_export_results_csv(authenticated_user, mock_batches):
+    """Test streaming a CSV export with filters"""
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/results/export?quiz_id=1&level_id=4&date_from=2024-09-01T00:00:00")
+    
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="results.csv"'
+    lines = response.text.splitlines()
+    assert lines[0].startswith("result_id,user_id,username")
+    assert lines[1] == "1,2,student,1,Test Quiz,IV,4,5,2024-09-01T08:30:00"
+    assert len(lines) == 3
+    mock_batches.assert_called_once_with(
+        level_id=4, quiz_id=1, date_from=datetime(2024, 9, 1), date_to=None
+    )
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+async def test_export_results_ndjson(authenticated_user, mock_batches):
+    """Test streaming an NDJSON export"""
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/results/export?format=ndjson")
+    
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert len(lines) == 2
+    assert '"submitted_at": "2024-09-02T08:30:00"' in lines[1]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_ADMIN], indirect=True)
+async def test_export_results_invalid_date_range(authenticated_user, mock_batches):
+    """Test an empty date range is rejected before streaming"""
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get(
+            "/api/v1/results/export?date_from=2024-09-02T00:00:00&date_to=2024-09-01T00:00:00"
+        )
+    
+    # Assert
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    mock_batches.assert_not_called()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("authenticated_user", [TEST_USER_STUDENT], indirect=True)
+async def test_export_results_forbidden(authenticated_user, mock_batches):
+    """Test students cannot export results"""
+    # Act
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/results/export")
+    
+    # Assert
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    mock_batches.assert_not_called()
@@ -0,0 +1,198 @@
+import pytest
+from fastapi import FastAPI, status
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient
+
+from ...core.middleware import RateLimiter, RateLimitingMiddleware
+from ...core.security import create_access_token
+
+
+def build_app(rate_limits):
+    """Build a minimal app protected by the rate limiting middleware"""
+    test_app = FastAPI()
+    test_app.add_middleware(RateLimitingMiddleware, rate_limits=rate_limits)
+
+    @test_app.post("/api/v1/quizzes/")
+    async def create_quiz():
+        return {"ok": True}
+
+    @test_app.post("/api/v1/quizzes/{quiz_id}/check-answer")
+    async def check_answer(quiz_id: int):
+        return {"quiz_id": quiz_id}
+
+    @test_app.get("/api/v1/quizzes/{quiz_id}")
+    async def get_quiz(quiz_id: int):
+        return {"quiz_id": quiz_id}
+
+    @test_app.post("/api/v1/quizzes/{quiz_id}/events")
+    async def stream_events(quiz_id: int):
+        async def events():
+            for i in range(3):
+                yield f"data: {i}\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return test_app
+
+
+def test_rate_limiter_allows_burst_then_rejects():
+    """Test that GCRA allows `burst` requests and then asks to wait one interval"""
+    # Arrange
+    limiter = RateLimiter(rate=5, per=60, burst=3)
+
+    # Act
+    allowed = [limiter.check("a", now=100.0) for _ in range(3)]
+    retry_after = limiter.check("a", now=100.0)
+
+    # Assert
+    assert allowed == [0.0, 0.0, 0.0]
+    assert retry_after == pytest.approx(12.0)
+    assert limiter.check("a", now=112.0) == 0.0
+
+
+def test_rate_limiter_keys_are_independent():
+    """Test that one noisy key does not exhaust the budget of another key"""
+    # Arrange
+    limiter = RateLimiter(rate=1, per=60, burst=1)
+
+    # Act / Assert
+    assert limiter.check("noisy", now=0.0) == 0.0
+    assert limiter.check("noisy", now=0.0) > 0
+    assert limiter.check("quiet", now=0.0) == 0.0
+
+
+def test_rate_limiter_enforces_key_cap():
+    """Test that the number of tracked keys never exceeds max_keys"""
+    # Arrange
+    limiter = RateLimiter(rate=1, per=60, burst=1, max_keys=100)
+
+    # Act
+    for i in range(1000):
+        limiter.check(f"client-{i}", now=0.0)
+
+    # Assert
+    assert len(limiter) == 100
+
+
+def test_rate_limiter_evicts_expired_keys():
+    """Test that keys whose theoretical arrival time passed are dropped"""
+    # Arrange
+    limiter = RateLimiter(rate=1, per=1, burst=1)
+    for i in range(10):
+        limiter.check(f"client-{i}", now=0.0)
+
+    # Act
+    limiter.check("late", now=5.0)
+
+    # Assert
+    assert len(limiter) == 1
+
+
+@pytest.mark.asyncio
+async def test_middleware_returns_429_with_retry_after():
+    """Test rejected requests get a 429 response with a Retry-After header"""
+    # Arrange
+    test_app = build_app({"/api/v1/quizzes": {"rate": 1, "per": 60, "burst": 1}})
+
+    # Act
+    async with AsyncClient(app=test_app, base_url="http://test") as client:
+        first = await client.post("/api/v1/quizzes/")
+        second = await client.post("/api/v1/quizzes/")
+
+    # Assert
+    assert first.status_code == status.HTTP_200_OK
+    assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert second.headers["Retry-After"] == "60"
+    assert second.json() == {"detail": "Rate limit exceeded. Please try again later."}
+
+
+@pytest.mark.asyncio
+async def test_middleware_matches_route_templates_and_methods():
+    """Test template rules apply to every quiz ID but only to configured methods"""
+    # Arrange
+    test_app = build_app({
+        "/api/v1/quizzes/{quiz_id}/check-answer": {"rate": 1, "per": 60, "burst": 1, "key": "global"}
+    })
+
+    # Act
+    async with AsyncClient(app=test_app, base_url="http://test") as client:
+        first = await client.post("/api/v1/quizzes/1/check-answer")
+        second = await client.post("/api/v1/quizzes/2/check-answer")
+        unrestricted = [await client.get("/api/v1/quizzes/1") for _ in range(3)]
+
+    # Assert
+    assert first.status_code == status.HTTP_200_OK
+    assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert all(r.status_code == status.HTTP_200_OK for r in unrestricted)
+
+
+def test_middleware_prefix_rules_prefer_longest_prefix():
+    """Test prefix rules and exact rules resolve to the most specific one"""
+    # Arrange
+    middleware = RateLimitingMiddleware(None, rate_limits={
+        "/api/*": {"rate": 100, "per": 60},
+        "/api/v1/quizzes/*": {"rate": 10, "per": 60},
+        "/api/v1/quizzes": {"rate": 5, "per": 60},
+    })
+
+    # Act / Assert
+    assert middleware.match("POST", "/api/v1/quizzes/").pattern == "/api/v1/quizzes"
+    assert middleware.match("POST", "/api/v1/quizzes/7/results").pattern == "/api/v1/quizzes/*"
+    assert middleware.match("POST", "/api/v1/levels").pattern == "/api/*"
+    assert middleware.match("GET", "/api/v1/levels") is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_limits_per_user():
+    """Test authenticated users get separate buckets"""
+    # Arrange
+    test_app = build_app({"/api/v1/quizzes": {"rate": 1, "per": 60, "burst": 1, "key": "user"}})
+    alice = {"Authorization": f"Bearer {create_access_token({'sub': 'alice'})}"}
+    bob = {"Authorization": f"Bearer {create_access_token({'sub': 'bob'})}"}
+
+    # Act
+    async with AsyncClient(app=test_app, base_url="http://test") as client:
+        alice_first = await client.post("/api/v1/quizzes/", headers=alice)
+        alice_second = await client.post("/api/v1/quizzes/", headers=alice)
+        bob_first = await client.post("/api/v1/quizzes/", headers=bob)
+
+    # Assert
+    assert alice_first.status_code == status.HTTP_200_OK
+    assert alice_second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert bob_first.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_middleware_passes_streaming_responses_through():
+    """Test SSE responses stream unchanged through a rate limited path"""
+    # Arrange
+    test_app = build_app({"/api/v1/quizzes/{quiz_id}/events": {"rate": 10, "per": 60, "burst": 10}})
+    chunks = []
+
+    # Act
+    async with AsyncClient(app=test_app, base_url="http://test") as client:
+        async with client.stream("POST", "/api/v1/quizzes/1/events") as response:
+            async for chunk in response.aiter_text():
+                chunks.append(chunk)
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "".join(chunks) == "data: 0\n\ndata: 1\n\ndata: 2\n\n"
+
+
+@pytest.mark.asyncio
+async def test_middleware_skips_non_http_scopes():
+    """Test lifespan and websocket scopes reach the wrapped app untouched"""
+    # Arrange
+    seen = []
+
+    async def inner_app(scope, receive, send):
+        seen.append(scope["type"])
+
+    middleware = RateLimitingMiddleware(inner_app, rate_limits={"/*": {"rate": 1, "per": 60, "key": "global"}})
+
+    # Act
+    await middleware({"type": "lifespan"}, None, None)
+
+    # Assert
+    assert seen == ["lifespan"]
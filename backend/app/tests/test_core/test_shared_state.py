@@ -0,0 +1,163 @@
+import pytest
+from fastapi import FastAPI, status
+from httpx import AsyncClient
+
+from ...core.middleware import RateLimiter, RateLimitingMiddleware
+from ...core.shared_state import (
+    MemoryStateBackend, SQLiteStateBackend, create_state_backend
+)
+
+RATE_LIMITS = {"/api/v1/quizzes": {"rate": 2, "per": 60, "burst": 2, "key": "client"}}
+
+
+def build_worker(backend):
+    """Build one "worker" app whose limiter uses the given backend"""
+    worker = FastAPI()
+    worker.add_middleware(RateLimitingMiddleware, rate_limits=RATE_LIMITS, backend=backend)
+
+    @worker.post("/api/v1/quizzes/")
+    async def create_quiz():
+        return {"ok": True}
+
+    return worker
+
+
+async def post_quiz(worker) -> int:
+    """Send a quiz creation request to a worker and return the status code"""
+    async with AsyncClient(app=worker, base_url="http://test") as client:
+        response = await client.post("/api/v1/quizzes/")
+    return response.status_code
+
+
+@pytest.mark.asyncio
+async def test_workers_with_private_state_multiply_the_limit():
+    """Test the N x limit problem: separate in-process buckets per worker"""
+    # Arrange
+    workers = [build_worker(None), build_worker(None)]
+
+    # Act
+    codes = [await post_quiz(worker) for worker in workers for _ in range(2)]
+
+    # Assert
+    assert codes.count(status.HTTP_200_OK) == 4
+
+
+@pytest.mark.asyncio
+async def test_workers_sharing_memory_backend_enforce_one_limit():
+    """Test two workers sharing the local fake backend enforce the configured limit"""
+    # Arrange
+    backend = MemoryStateBackend()
+    workers = [build_worker(backend), build_worker(backend)]
+
+    # Act
+    codes = [await post_quiz(worker) for worker in workers for _ in range(2)]
+
+    # Assert
+    assert codes == [status.HTTP_200_OK, status.HTTP_200_OK,
+                     status.HTTP_429_TOO_MANY_REQUESTS, status.HTTP_429_TOO_MANY_REQUESTS]
+
+
+@pytest.mark.asyncio
+async def test_workers_sharing_sqlite_file_enforce_one_limit(tmp_path):
+    """Test two workers with their own connections to one SQLite file share buckets"""
+    # Arrange
+    path = str(tmp_path / "state.db")
+    workers = [build_worker(SQLiteStateBackend(path)), build_worker(SQLiteStateBackend(path))]
+
+    # Act
+    codes = [await post_quiz(worker) for worker in workers for _ in range(2)]
+
+    # Assert
+    assert codes.count(status.HTTP_200_OK) == 2
+    assert codes.count(status.HTTP_429_TOO_MANY_REQUESTS) == 2
+
+
+def test_sqlite_backend_rate_limit_returns_retry_after(tmp_path):
+    """Test the SQLite GCRA step reports how long to wait"""
+    # Arrange
+    limiter = RateLimiter(rate=1, per=30, burst=1, backend=SQLiteStateBackend(str(tmp_path / "state.db")))
+
+    # Act
+    first = limiter.check("client:1")
+    second = limiter.check("client:1")
+
+    # Assert
+    assert first == 0.0
+    assert 29 < second <= 30
+
+
+@pytest.mark.parametrize("backend_factory", [
+    lambda tmp_path: MemoryStateBackend(),
+    lambda tmp_path: SQLiteStateBackend(str(tmp_path / "state.db")),
+])
+def test_backend_cache_operations(tmp_path, backend_factory):
+    """Test get/set/delete and TTL handling of cache values"""
+    # Arrange
+    backend = backend_factory(tmp_path)
+
+    # Act
+    backend.set("cache:a", "value-a")
+    backend.set("cache:expired", "gone", ttl=-1)
+    value = backend.get("cache:a")
+    expired = backend.get("cache:expired")
+    backend.delete("cache:a")
+
+    # Assert
+    assert value == "value-a"
+    assert expired is None
+    assert backend.get("cache:a") is None
+
+
+def test_sqlite_backend_values_visible_to_other_connections(tmp_path):
+    """Test a value written by one worker is read by another"""
+    # Arrange
+    path = str(tmp_path / "state.db")
+    writer = SQLiteStateBackend(path)
+    reader = SQLiteStateBackend(path)
+
+    # Act
+    writer.set("cache:levels", "[1, 2, 3]", ttl=60)
+
+    # Assert
+    assert reader.get("cache:levels") == "[1, 2, 3]"
+
+
+def test_first_request_allowed_when_interval_equals_tolerance():
+    """Test a fresh key is never rejected by floating point rounding (burst of 1)"""
+    # Arrange
+    backend = MemoryStateBackend()
+    now = 1000.1507  # now + 60 - 60 rounds above now
+
+    # Act
+    first = backend.rate_limit("key", 60.0, 60.0, now=now)
+    second = backend.rate_limit("key", 60.0, 60.0, now=now)
+
+    # Assert
+    assert first == 0.0
+    assert second == pytest.approx(60.0)
+
+
+def test_memory_backend_evicts_least_recently_used_values():
+    """Test the memory backend keeps at most max_keys cache entries"""
+    # Arrange
+    backend = MemoryStateBackend(max_keys=2)
+
+    # Act
+    backend.set("a", "1")
+    backend.set("b", "2")
+    backend.get("a")
+    backend.set("c", "3")
+
+    # Assert
+    assert backend.get("a") == "1"
+    assert backend.get("b") is None
+    assert backend.get("c") == "3"
+
+
+def test_create_state_backend_from_url(tmp_path):
+    """Test backend selection by URL"""
+    # Act / Assert
+    assert isinstance(create_state_backend("memory://"), MemoryStateBackend)
+    assert isinstance(create_state_backend(f"sqlite:///{tmp_path}/state.db"), SQLiteStateBackend)
+    with pytest.raises(ValueError):
+        create_state_backend("redis://localhost")
@@ -0,0 +1,3 @@
+"""
+Tests for database setup and session management.
+"""
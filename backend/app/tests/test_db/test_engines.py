@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from ...db import create_sqlite_engine, get_sqlite_profile
+from ...models import Base, Level
+
+
+@pytest.fixture
+async def engines(tmp_path):
+    """Writer engine (one connection) and read-only pool on the same file"""
+    url = f"sqlite+aiosqlite:///{tmp_path}/engines.db"
+    # No busy_timeout: any lock contention would fail immediately
+    profile = dict(get_sqlite_profile("performance"), busy_timeout=0)
+    write_engine = create_sqlite_engine(url, profile, pool_size=1, max_overflow=0)
+    read_engine = create_sqlite_engine(url, profile, read_only=True, pool_size=4, max_overflow=0)
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield write_engine, read_engine
+
+    await write_engine.dispose()
+    await read_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_read_engine_rejects_writes(engines):
+    """Test connections from the read pool cannot modify the database"""
+    # Arrange
+    _, read_engine = engines
+
+    # Act / Assert
+    with pytest.raises(OperationalError, match="readonly"):
+        async with read_engine.begin() as conn:
+            await conn.execute(insert(Level).values(code="I", description="Klasa I", level=1))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_queue_for_the_single_writer(engines):
+    """Test concurrent write sessions wait for the writer instead of failing with 'database is locked'"""
+    # Arrange
+    write_engine, read_engine = engines
+    write_session = sessionmaker(bind=write_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def write(i: int):
+        async with write_session() as session:
+            await session.execute(insert(Level).values(code=str(i), description=f"Klasa {i}", level=i))
+            await asyncio.sleep(0)  # let other writers try to get in mid-transaction
+            await session.commit()
+
+    # Act
+    await asyncio.gather(*(write(i) for i in range(20)))
+
+    # Assert
+    async with read_engine.connect() as conn:
+        count = (await conn.execute(select(func.count(Level.id)))).scalar()
+    assert count == 20
+
+
+@pytest.mark.asyncio
+async def test_reads_run_while_writer_transaction_is_open(engines):
+    """Test the read pool is not blocked by an uncommitted write (WAL)"""
+    # Arrange
+    write_engine, read_engine = engines
+
+    # Act
+    async with write_engine.begin() as writer:
+        await writer.execute(insert(Level).values(code="I", description="Klasa I", level=1))
+        async with read_engine.connect() as reader:
+            during = (await reader.execute(select(func.count(Level.id)))).scalar()
+
+    async with read_engine.connect() as reader:
+        after = (await reader.execute(select(func.count(Level.id)))).scalar()
+
+    # Assert
+    assert during == 0
+    assert after == 1
@@ -0,0 +1,111 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from ...crud.generation_cache import get_cached_generation, normalize_topic, store_generation
+from ...db import create_sqlite_engine, get_sqlite_profile
+from ...models import Base, GenerationCache, Level, Quiz, User
+from ...schemas.quiz import QuizCreate
+from ...services.quiz_service import QuizService
+
+QUESTIONS = [{"text": "Ile to 2 × 3?", "answers": [{"text": "6", "is_correct": True}, {"text": "5", "is_correct": False}]}]
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """Session factory on a fresh database with one level"""
+    engine = create_sqlite_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/cache.db",
+        get_sqlite_profile("performance"),
+        pool_size=1,
+        max_overflow=0,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Level).values(code="II", description="Klasa II", level=2))
+
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    await engine.dispose()
+
+
+def test_normalize_topic():
+    """Test case, punctuation and whitespace do not change the key, diacritics do"""
+    # Act & Assert
+    assert normalize_topic("  Tabliczka   MNOŻENIA! ") == "tabliczka mnożenia"
+    assert normalize_topic("Ułamki") == normalize_topic("ułamki.")
+    assert normalize_topic("Ułamki") != normalize_topic("Ulamki")
+
+
+@pytest.mark.asyncio
+async def test_store_and_reuse_generation(session_factory):
+    """Test a stored generation is found for the same key only and counts its hits"""
+    # Arrange
+    async with session_factory() as db:
+        await store_generation(db, "tabliczka mnożenia", 1, 5, "Tabliczka mnożenia", QUESTIONS)
+        await db.commit()
+
+        # Act
+        hit = await get_cached_generation(db, "tabliczka mnożenia", 1, 5)
+        await get_cached_generation(db, "tabliczka mnożenia", 1, 5)
+        other_count = await get_cached_generation(db, "tabliczka mnożenia", 1, 10)
+        await db.commit()
+        entry = (await db.execute(select(GenerationCache))).scalar_one()
+
+    # Assert
+    assert hit == ("Tabliczka mnożenia", QUESTIONS)
+    assert other_count is None
+    assert entry.hit_count == 2
+
+
+@pytest.mark.asyncio
+async def test_store_evicts_least_recently_used(session_factory):
+    """Test the cache keeps at most max_entries entries, dropping the least recently used"""
+    # Arrange
+    async with session_factory() as db:
+        for topic in ("a", "b", "c"):
+            await store_generation(db, topic, 1, 5, topic, QUESTIONS, max_entries=3)
+        await db.commit()
+
+        # Act
+        await store_generation(db, "a", 1, 5, "a, regenerated", QUESTIONS, max_entries=3)
+        await store_generation(db, "d", 1, 5, "d", QUESTIONS, max_entries=3)
+        await db.commit()
+        entries = (await db.execute(select(GenerationCache.topic_key, GenerationCache.title))).tuples().all()
+
+    # Assert
+    assert sorted(entries) == [("a", "a, regenerated"), ("c", "c"), ("d", "d")]
+
+
+@pytest.mark.asyncio
+async def test_create_ai_quiz_stores_generation(session_factory):
+    """Test quiz creation on a real session stores the generation after releasing the writer for the AI call"""
+    # Arrange
+    async with session_factory() as db:
+        await db.execute(insert(User).values(username="admin", hashed_password="x", role="admin"))
+        await db.commit()
+    service = QuizService()
+    service.bank_indexer = MagicMock()
+    generated = [
+        {"text": f"Ile to 2 × {i}?", "answers": [
+            {"text": str(2 * i), "is_correct": True},
+            {"text": str(2 * i + 1), "is_correct": False},
+        ]}
+        for i in range(1, 6)
+    ]
+    service.ai_generator.generate_quiz = AsyncMock(return_value=(generated, "Tabliczka mnożenia"))
+    quiz_data = QuizCreate(title="Mnożenie", level_id=1, topic="Tabliczka mnożenia", question_count=5)
+
+    # Act
+    async with session_factory() as db:
+        response = await service.create_ai_quiz(db, quiz_data, creator_id=1)
+        entry = (await db.execute(select(GenerationCache))).scalar_one()
+        quiz_count = len((await db.execute(select(Quiz.id))).all())
+
+    # Assert
+    assert response.title == "Tabliczka mnożenia"
+    assert len(response.questions) == 5
+    assert (entry.topic_key, entry.level_id, entry.question_count) == ("tabliczka mnożenia", 1, 5)
+    assert quiz_count == 1
@@ -0,0 +1,217 @@
+import io
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from ...crud.generation_cache import get_cached_generation, normalize_topic
+from ...crud.quiz import bulk_create_quizzes
+from ...db import create_sqlite_engine, get_sqlite_profile
+from ...models import Answer, Base, Level, QuestionBucket, QuestionFingerprint, Quiz, User
+from ...schemas.quiz import QuizCreate
+from ...services.question_bank import BankIndexer, find_near_duplicates, index_questions
+from ...services.quiz_service import QuizService
+from ...services.quiz_transfer import import_quizzes
+
+FRACTION = ("Ile to 1/2 + 1/4?", [("3/4", True), ("2/6", False), ("1/8", False)])
+CAPITAL = ("Jakie miasto jest stolicą Polski?", [("Warszawa", True), ("Kraków", False), ("Gdańsk", False)])
+RIVER = ("Najdłuższa rzeka Polski to?", [("Wisła", True), ("Odra", False), ("Warta", False)])
+
+
+def question(text, answers):
+    """Question dict as used by the bulk insert and the AI generator"""
+    return {"text": text, "answers": [{"text": answer, "is_correct": correct} for answer, correct in answers]}
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """Session factory on a fresh database with one level and one admin"""
+    engine = create_sqlite_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/bank.db",
+        get_sqlite_profile("performance"),
+        pool_size=1,
+        max_overflow=0,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Level).values(code="IV", description="Klasa IV", level=4))
+        await conn.execute(insert(User).values(username="admin", hashed_password="x", role="admin"))
+
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    await engine.dispose()
+
+
+async def add_quiz(db, title, quiz_status, *questions):
+    """Insert a quiz with questions given as (text, [(answer, is_correct)])"""
+    await bulk_create_quizzes(db, [{
+        "title": title,
+        "level_id": 1,
+        "creator_id": 1,
+        "status": quiz_status,
+        "questions": [question(text, answers) for text, answers in questions],
+    }])
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_index_covers_published_questions_and_follows_edits(session_factory):
+    """Test only published questions are fingerprinted and edits or unpublishing drop the fingerprint"""
+    # Arrange
+    async with session_factory() as db:
+        await add_quiz(db, "Ułamki", "published", FRACTION, CAPITAL)
+        await add_quiz(db, "Rzeki", "draft", RIVER)
+
+        # Act
+        indexed = await index_questions(db)
+        await db.commit()
+        again = await index_questions(db)
+        before = await find_near_duplicates(db, [question(*FRACTION), question(*RIVER)], threshold=0.7)
+
+        await db.execute(update(Answer).where(Answer.text == "3/4").values(text="0,75"))
+        await db.commit()
+        after_edit = (await db.execute(select(QuestionFingerprint.question_id))).scalars().all()
+        await db.execute(update(Quiz).where(Quiz.title == "Ułamki").values(status="draft"))
+        await db.commit()
+        fingerprints = (await db.execute(select(func.count()).select_from(QuestionFingerprint))).scalar()
+        buckets = (await db.execute(select(func.count()).select_from(QuestionBucket))).scalar()
+
+    # Assert
+    assert (indexed, again) == (2, 0)
+    assert before[0].question_id == 1 and before[0].similarity == 1.0
+    assert before[1] is None
+    assert after_edit == [2]
+    assert (fingerprints, buckets) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_create_ai_quiz_assembles_from_bank(session_factory):
+    """Test selected bank questions are copied and generated duplicates of bank questions replaced"""
+    # Arrange
+    async with session_factory() as db:
+        await add_quiz(db, "Mieszany", "published", FRACTION, CAPITAL, RIVER)
+        await BankIndexer(session_factory=session_factory).run()
+        service = QuizService()
+        service.bank_indexer = MagicMock()
+        service.ai_generator = AsyncMock()
+        reworded_capital = question("Jakie miasto jest stolicą Polski", CAPITAL[1])
+        service.ai_generator.generate_quiz.return_value = (
+            [reworded_capital, question("Ile nóg ma pająk?", [("8", True), ("6", False)])],
+            "Wiedza ogólna"
+        )
+        quiz_data = QuizCreate(
+            title="Wiedza ogólna", topic="Wiedza ogólna", level_id=1, question_count=5, bank_question_ids=[1, 3, 3]
+        )
+
+        # Act
+        response = await service.create_ai_quiz(db, quiz_data, creator_id=1)
+
+    # Assert
+    service.ai_generator.generate_quiz.assert_called_once()
+    assert service.ai_generator.generate_quiz.call_args.args[1] == 3
+    assert [q.text for q in response.questions] == [
+        "Ile to 1/2 + 1/4?", "Najdłuższa rzeka Polski to?", "Jakie miasto jest stolicą Polski?", "Ile nóg ma pająk?"
+    ]
+    assert response.from_bank == 3
+    assert response.missing_questions == 1
+    assert response.status == "draft"
+    service.bank_indexer.schedule.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_bank_indexer_runs_in_background(session_factory):
+    """Test a scheduled run fingerprints all new questions in chunks and a second request during it is coalesced"""
+    # Arrange
+    async with session_factory() as db:
+        await add_quiz(db, "Mieszany", "published", FRACTION, CAPITAL, RIVER)
+    indexer = BankIndexer(session_factory=session_factory, chunk_size=2)
+
+    # Act
+    indexer.schedule()
+    running = indexer._task
+    indexer.schedule()
+    await running
+    async with session_factory() as db:
+        fingerprints = (await db.execute(select(func.count()).select_from(QuestionFingerprint))).scalar()
+
+    # Assert
+    assert indexer._task is running
+    assert fingerprints == 3
+
+
+@pytest.mark.asyncio
+async def test_create_ai_quiz_caches_generation_as_generated(session_factory):
+    """Test bank replacements and dropped repeats do not leak into the cached generation and are reported"""
+    # Arrange
+    async with session_factory() as db:
+        await add_quiz(db, "Stolice", "published", CAPITAL)
+        await BankIndexer(session_factory=session_factory).run()
+        service = QuizService()
+        service.bank_indexer = MagicMock()
+        service.ai_generator = AsyncMock()
+        spider = question("Ile nóg ma pająk?", [("8", True), ("6", False)])
+        generated = [question("Jakie miasto jest stolicą Polski", CAPITAL[1]), spider, spider]
+        service.ai_generator.generate_quiz.return_value = (generated, "Wiedza ogólna")
+        quiz_data = QuizCreate(title="Wiedza ogólna", topic="Wiedza ogólna", level_id=1, question_count=5)
+
+        # Act
+        response = await service.create_ai_quiz(db, quiz_data, creator_id=1)
+        cached = await get_cached_generation(db, topic_key=normalize_topic("Wiedza ogólna"), level_id=1, question_count=5)
+
+    # Assert
+    assert [q.text for q in response.questions] == ["Jakie miasto jest stolicą Polski?", "Ile nóg ma pająk?"]
+    assert (response.from_bank, response.missing_questions) == (1, 3)
+    assert [q["text"] for q in cached[1]] == ["Jakie miasto jest stolicą Polski", "Ile nóg ma pająk?", "Ile nóg ma pająk?"]
+
+
+@pytest.mark.asyncio
+async def test_create_ai_quiz_rejects_questions_outside_bank(session_factory):
+    """Test questions of draft quizzes cannot be taken from the bank"""
+    # Arrange
+    async with session_factory() as db:
+        await add_quiz(db, "Rzeki", "draft", RIVER)
+        quiz_data = QuizCreate(title="Rzeki", topic="Rzeki", level_id=1, question_count=5, bank_question_ids=[1])
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="not in the question bank"):
+            await QuizService().create_ai_quiz(db, quiz_data, creator_id=1)
+
+
+@pytest.mark.asyncio
+async def test_suggest_bank_questions(session_factory):
+    """Test questions of matching published quizzes are offered without near-duplicates"""
+    # Arrange
+    async with session_factory() as db:
+        await add_quiz(db, "Ułamki zwykłe", "published", FRACTION, CAPITAL)
+        await add_quiz(db, "Ułamki powtórka", "published", FRACTION)
+        await add_quiz(db, "Ułamki szkic", "draft", RIVER)
+
+        # Act
+        suggestions = await QuizService().suggest_bank_questions(db, topic="ułamki", level_id=1)
+
+    # Assert
+    assert sorted(q.text for q in suggestions) == ["Ile to 1/2 + 1/4?", "Jakie miasto jest stolicą Polski?"]
+    assert all(len(q.answers) == 3 for q in suggestions)
+
+
+@pytest.mark.asyncio
+async def test_import_counts_near_duplicates(session_factory):
+    """Test an import with check_duplicates counts questions already in the bank"""
+    # Arrange
+    async with session_factory() as db:
+        await add_quiz(db, "Ułamki", "published", FRACTION)
+    lines = io.StringIO("".join(
+        json.dumps({"title": title, "level": "IV", "status": "published", "questions": [question(*q) for q in questions]}) + "\n"
+        for title, questions in [("Powtórka", [FRACTION, CAPITAL]), ("Stolice", [CAPITAL])]
+    ))
+
+    # Act
+    report = await import_quizzes(
+        lines, creator_id=1, chunk_size=1, session_factory=session_factory, check_duplicates=True
+    )
+
+    # Assert
+    assert report.imported == 2
+    assert report.near_duplicates == 2
@@ -0,0 +1,168 @@
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy import insert, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from ...crud.quiz import bulk_create_quizzes
+from ...crud.quiz_search import search_quizzes
+from ...db import create_sqlite_engine, get_sqlite_profile
+from ...models import Answer, Base, Level, Quiz, User
+from ...models.quiz_search import create_search_index
+from ...services.quiz_search import match_expression, search_terms
+from ...services.quiz_service import QuizService
+
+ADMIN = MagicMock(id=1, role="admin")
+STUDENT = MagicMock(id=2, role="student")
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """Session factory on a fresh database with one level and one admin"""
+    engine = create_sqlite_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/search.db",
+        get_sqlite_profile("performance"),
+        pool_size=1,
+        max_overflow=0,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Level).values(code="IV", description="Klasa IV", level=4))
+        await conn.execute(insert(User).values(username="admin", hashed_password="x", role="admin"))
+
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    await engine.dispose()
+
+
+async def add_quizzes(db, *quizzes):
+    """Insert quizzes given as (title, status, [(question, [answers])])"""
+    await bulk_create_quizzes(db, [
+        {
+            "title": title,
+            "level_id": 1,
+            "creator_id": 1,
+            "status": quiz_status,
+            "questions": [
+                {"text": question, "answers": [
+                    {"text": answer, "is_correct": i == 0} for i, answer in enumerate(answers)
+                ]}
+                for question, answers in questions
+            ],
+        }
+        for title, quiz_status, questions in quizzes
+    ])
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_quizzes_with_snippets(session_factory):
+    """Test quizzes are found by title, question and answer text, once each, best first"""
+    # Arrange
+    async with session_factory() as db:
+        await add_quizzes(
+            db,
+            ("Ułamki zwykłe", "published", [("Ile to 1/2 + 1/4?", ["3/4", "2/6"])]),
+            ("Fotosynteza", "published", [("Co zawiera <b>chlorofil</b>?", ["Liście", "Ułamki"])]),
+            ("Kontynenty", "draft", [("Największy kontynent?", ["Azja", "Europa"])]),
+        )
+
+        # Act
+        hits = await QuizService().search_quizzes(db=db, user=ADMIN, text="ułamk")
+        by_answer = await QuizService().search_quizzes(db=db, user=ADMIN, text="azja")
+        escaped = await QuizService().search_quizzes(db=db, user=ADMIN, text="chlorofil")
+
+    # Assert
+    assert [(hit.title, hit.matched_in) for hit in hits] == [("Ułamki zwykłe", "title"), ("Fotosynteza", "answer")]
+    assert hits[0].snippet == "<mark>Ułamki</mark> zwykłe"
+    assert [(hit.title, hit.snippet) for hit in by_answer] == [("Kontynenty", "<mark>Azja</mark>")]
+    assert escaped[0].snippet == "Co zawiera &lt;b&gt;<mark>chlorofil</mark>&lt;/b&gt;?"
+
+
+@pytest.mark.asyncio
+async def test_search_filters_and_paginates(session_factory):
+    """Test students only find published quizzes and skip/limit page over quizzes"""
+    # Arrange
+    async with session_factory() as db:
+        await add_quizzes(db, *[
+            (f"Geometria {i}", "published" if i % 2 else "draft", [("Pole kwadratu?", ["a*a", "2a"])])
+            for i in range(6)
+        ])
+        service = QuizService()
+
+        # Act
+        student = await service.search_quizzes(db=db, user=STUDENT, text="geometria")
+        drafts = await service.search_quizzes(db=db, user=ADMIN, text="geometria", status="draft")
+        pages = [
+            await service.search_quizzes(db=db, user=ADMIN, text="kwadratu", skip=skip, limit=4)
+            for skip in (0, 4)
+        ]
+
+    # Assert
+    assert {hit.status for hit in student} == {"published"} and len(student) == 3
+    assert {hit.status for hit in drafts} == {"draft"} and len(drafts) == 3
+    assert [len(page) for page in pages] == [4, 2]
+    assert len({hit.id for page in pages for hit in page}) == 6
+
+
+@pytest.mark.asyncio
+async def test_index_follows_updates_and_deletes(session_factory):
+    """Test the triggers keep the index in sync with edits and deletes"""
+    # Arrange
+    async with session_factory() as db:
+        await add_quizzes(db, ("Planety", "published", [("Która planeta jest czerwona?", ["Mars", "Wenus"])]))
+        service = QuizService()
+
+        # Act
+        await db.execute(update(Quiz).values(title="Układ Słoneczny"))
+        await db.execute(update(Answer).where(Answer.text == "Mars").values(text="Jowisz"))
+        await db.commit()
+        renamed = await service.search_quizzes(db=db, user=ADMIN, text="słoneczny")
+        old_title = await service.search_quizzes(db=db, user=ADMIN, text="planety")
+        new_answer = await service.search_quizzes(db=db, user=ADMIN, text="jowisz")
+
+        quiz = await db.get(Quiz, 1)
+        await db.delete(quiz)
+        await db.commit()
+        deleted = await service.search_quizzes(db=db, user=ADMIN, text="wenus")
+        rows = (await db.execute(text("SELECT count(*) FROM quiz_search"))).scalar()
+
+    # Assert
+    assert [hit.title for hit in renamed] == ["Układ Słoneczny"]
+    assert old_title == []
+    assert [hit.matched_in for hit in new_answer] == ["answer"]
+    assert deleted == []
+    assert rows == 0
+
+
+@pytest.mark.asyncio
+async def test_new_index_is_filled_from_existing_quizzes(session_factory):
+    """Test creating the index on an existing database indexes the quizzes already there"""
+    # Arrange
+    async with session_factory() as db:
+        await add_quizzes(db, ("Rzeki Polski", "published", [("Najdłuższa rzeka?", ["Wisła", "Odra"])]))
+        await db.execute(text("DROP TABLE quiz_search"))
+        await db.commit()
+
+        # Act
+        connection = await db.connection()
+        await connection.run_sync(lambda sync_conn: create_search_index(Base.metadata, sync_conn))
+        await db.commit()
+        hits = await QuizService().search_quizzes(db=db, user=ADMIN, text="wisła")
+
+    # Assert
+    assert [hit.title for hit in hits] == ["Rzeki Polski"]
+
+
+@pytest.mark.asyncio
+async def test_broad_search_ranks_newest_matches(session_factory):
+    """Test only the newest max_matches index rows are ranked"""
+    # Arrange
+    async with session_factory() as db:
+        await add_quizzes(db, *[(f"Historia {i}", "published", [("Kiedy?", ["966", "1410"])]) for i in range(5)])
+
+        # Act
+        hits = await search_quizzes(db, match_expression(search_terms("historia")), max_matches=2)
+
+    # Assert
+    assert sorted(quiz.title for quiz, _, _, _ in hits) == ["Historia 3", "Historia 4"]
@@ -0,0 +1,75 @@
+import pytest
+import sqlite3
+
+from ...config import settings
+from ...db import (
+    apply_sqlite_profile, check_sqlite_profile, create_sqlite_engine,
+    get_sqlite_profile, verify_sqlite_profile
+)
+
+
+@pytest.mark.asyncio
+async def test_performance_profile_applied_on_connect(tmp_path):
+    """Test every pragma of the performance profile is applied to new connections"""
+    # Arrange
+    profile = get_sqlite_profile("performance")
+    engine = create_sqlite_engine(f"sqlite+aiosqlite:///{tmp_path}/profile.db", profile)
+
+    # Act
+    applied = await verify_sqlite_profile(engine, profile)
+    await engine.dispose()
+
+    # Assert
+    assert applied["journal_mode"] == "wal"
+    assert applied["synchronous"] == 1
+    assert applied["cache_size"] == -64000
+    assert applied["temp_store"] == 2
+    assert applied["busy_timeout"] == 5000
+    assert check_sqlite_profile(applied, profile) == []
+
+
+@pytest.mark.asyncio
+async def test_foreign_keys_enforced_with_any_profile(tmp_path):
+    """Test foreign key enforcement is kept regardless of the profile"""
+    # Arrange
+    engine = create_sqlite_engine(f"sqlite+aiosqlite:///{tmp_path}/fk.db", get_sqlite_profile("default"))
+
+    # Act
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql("PRAGMA foreign_keys")
+        foreign_keys = result.scalar()
+    await engine.dispose()
+
+    # Assert
+    assert foreign_keys == 1
+
+
+def test_check_sqlite_profile_reports_mismatches(tmp_path):
+    """Test deviations are reported, with symbolic values compared by their codes"""
+    # Arrange
+    profile = get_sqlite_profile("performance")
+    conn = sqlite3.connect(str(tmp_path / "default.db"))
+    apply_sqlite_profile(conn, get_sqlite_profile("default"))
+    applied = {
+        pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+        for pragma in profile
+    }
+    conn.close()
+
+    # Act
+    mismatches = check_sqlite_profile(applied, profile)
+    in_memory_mismatches = check_sqlite_profile(applied, profile, in_memory=True)
+
+    # Assert
+    assert any(m.startswith("journal_mode") for m in mismatches)
+    assert any(m.startswith("synchronous") for m in mismatches)
+    assert any(m.startswith("temp_store") for m in mismatches)
+    assert not any(m.startswith("journal_mode") for m in in_memory_mismatches)
+
+
+def test_unknown_profile_rejected():
+    """Test selecting a profile that does not exist fails loudly"""
+    # Act / Assert
+    with pytest.raises(ValueError):
+        get_sqlite_profile("turbo")
+    assert settings.SQLITE_PROFILE in settings.SQLITE_PROFILES
@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from ...crud.quiz_search import search_quizzes
+from ...db import create_sqlite_engine, get_sqlite_profile
+from ...db.synthetic import SyntheticSpec, generate, parse_range
+from ...models import Base
+
+SPEC = SyntheticSpec(seed=7, students=30, admins=2, quizzes=20, questions_min=2, questions_max=4,
+                     results_per_student=5, retakes=0.5, chunk_size=40)
+# quiz_stats is left out, its updated_at is the time of the rebuild
+TABLES = ["users", "levels", "quizzes", "questions", "answers", "results", "result_history"]
+
+
+async def generate_into(path, spec=SPEC):
+    """Generate a dataset into a fresh database and return the engine"""
+    engine = create_sqlite_engine(
+        f"sqlite+aiosqlite:///{path}",
+        get_sqlite_profile("performance"),
+        pool_size=1,
+        max_overflow=0,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    counts = await generate(spec, engine, sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False))
+    return engine, counts
+
+
+async def dump(engine):
+    """All rows of the generated tables, by table"""
+    async with engine.connect() as conn:
+        return {
+            table: (await conn.exec_driver_sql(f"SELECT * FROM {table} ORDER BY 1")).all()
+            for table in TABLES
+        }
+
+
+@pytest.mark.asyncio
+async def test_generate_fills_all_tables_consistently(tmp_path):
+    """Test the dataset has the requested sizes and consistent results, history and statistics"""
+    # Arrange & Act
+    engine, counts = await generate_into(tmp_path / "a.db")
+
+    # Assert
+    async with engine.connect() as conn:
+        scalar = lambda sql: conn.exec_driver_sql(sql)
+        assert (await scalar("SELECT count(*) FROM users")).scalar() == 32
+        assert (await scalar("SELECT count(*) FROM quizzes")).scalar() == 20
+        assert (await scalar("SELECT count(DISTINCT level_id) FROM quizzes")).scalar() > 1
+        assert (await scalar(
+            "SELECT count(*) FROM questions GROUP BY quiz_id HAVING count(*) NOT BETWEEN 2 AND 4"
+        )).first() is None
+        assert (await scalar(
+            "SELECT count(*) FROM questions q WHERE (SELECT sum(is_correct) FROM answers a "
+            "WHERE a.question_id = q.id) != 1"
+        )).scalar() == 0
+        assert (await scalar(
+            "SELECT count(*) FROM results r JOIN quizzes q ON q.id = r.quiz_id "
+            "WHERE q.status != 'published' OR r.score > r.max_score OR r.created_at < q.created_at "
+            "OR r.max_score != (SELECT count(*) FROM questions WHERE quiz_id = q.id)"
+        )).scalar() == 0
+        assert (await scalar("SELECT sum(attempt_count) FROM quiz_stats")).scalar() == counts["result_history"]
+        assert counts["result_history"] > counts["results"] > 0
+        assert (await scalar("SELECT count(*) FROM sqlite_master WHERE type = 'trigger'")).scalar() > 0
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_generate_is_deterministic_by_seed(tmp_path):
+    """Test the same seed gives the same rows and another seed different ones"""
+    # Arrange & Act
+    first, _ = await generate_into(tmp_path / "a.db")
+    second, _ = await generate_into(tmp_path / "b.db")
+    other, _ = await generate_into(tmp_path / "c.db", SyntheticSpec(**{**SPEC.__dict__, "seed": 8}))
+
+    # Assert
+    assert await dump(first) == await dump(second)
+    assert (await dump(first))["questions"] != (await dump(other))["questions"]
+    for engine in (first, second, other):
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_generated_quizzes_are_searchable(tmp_path):
+    """Test the search index is rebuilt after the load"""
+    # Arrange
+    engine, _ = await generate_into(tmp_path / "a.db")
+    async with engine.connect() as conn:
+        title = (await conn.exec_driver_sql(
+            "SELECT title FROM quizzes WHERE status = 'published' ORDER BY id LIMIT 1"
+        )).scalar()
+
+    # Act
+    async with sessionmaker(bind=engine, class_=AsyncSession)() as db:
+        found = await search_quizzes(db, title.split()[0], status="published")
+
+    # Assert
+    assert title in [quiz.title for quiz, *_ in found]
+    await engine.dispose()
+
+
+def test_parse_range():
+    """Test MIN-MAX and single number ranges"""
+    assert parse_range("5-15") == (5, 15)
+    assert parse_range("3") == (3, 3)
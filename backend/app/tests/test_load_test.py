@@ -0,0 +1,66 @@
+import pytest
+
+from .load_test import LoadRecorder, compare, percentile, quiz_update
+
+
+def test_load_recorder_report():
+    """Test throughput, percentiles and errors per endpoint"""
+    # Arrange
+    recorder = LoadRecorder()
+    for ms in range(1, 101):
+        recorder("GET /api/v1/quizzes/", ms / 1000, 200)
+    recorder("POST /api/v1/auth/token", 0.5, 401)
+    recorder("POST /api/v1/auth/token", 0.1, 0)
+    
+    # Act
+    report = recorder.report(duration=10.0)
+    
+    # Assert
+    quizzes = report["GET /api/v1/quizzes/"]
+    assert (quizzes["count"], quizzes["errors"], quizzes["rps"]) == (100, 0, 10.0)
+    assert (quizzes["p50"], quizzes["p95"], quizzes["p99"], quizzes["max"]) == pytest.approx((50, 95, 99, 100))
+    assert report["POST /api/v1/auth/token"]["errors"] == 2
+    assert report["POST /api/v1/auth/token"]["statuses"] == {"0": 1, "401": 1}
+    assert percentile([], 95) == 0.0
+
+
+def test_compare_with_baseline():
+    """Test that slower p95, lower throughput and more errors count as regressions"""
+    # Arrange
+    baseline = {
+        "GET /a": {"count": 100, "errors": 0, "rps": 50.0, "p95": 100.0},
+        "GET /b": {"count": 100, "errors": 0, "rps": 50.0, "p95": 100.0},
+        "GET /c": {"count": 100, "errors": 0, "rps": 50.0, "p95": 100.0},
+    }
+    report = {
+        "GET /a": {"count": 100, "errors": 0, "rps": 45.0, "p95": 115.0},
+        "GET /b": {"count": 100, "errors": 5, "rps": 30.0, "p95": 130.0},
+    }
+    
+    # Act
+    regressions = compare(report, baseline, tolerance=0.2)
+    
+    # Assert
+    assert not any(regression.startswith("GET /a") for regression in regressions)
+    assert len([regression for regression in regressions if regression.startswith("GET /b")]) == 3
+    assert "GET /c: not called in this run" in regressions
+
+
+def test_quiz_update_keeps_questions():
+    """Test the edit payload built from an admin quiz view"""
+    # Arrange
+    quiz = {
+        "id": 1, "title": "Ułamki", "level_id": 2, "status": "draft", "creator_id": 1,
+        "questions": [{"id": 3, "text": "Ile to 1/2 + 1/4?", "quiz_id": 1, "answers": [
+            {"id": 4, "text": "3/4", "is_correct": True, "question_id": 3},
+        ]}],
+    }
+    
+    # Act
+    update = quiz_update(quiz, status="published")
+    
+    # Assert
+    assert update == {
+        "title": "Ułamki", "level_id": 2, "status": "published",
+        "questions": [{"id": 3, "text": "Ile to 1/2 + 1/4?", "answers": [{"id": 4, "text": "3/4", "is_correct": True}]}],
+    }
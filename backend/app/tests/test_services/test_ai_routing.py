@@ -0,0 +1,178 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from ...services.ai_quiz_generator import AIQuizGeneratorService
+from ...services.ai_routing import ModelPrice, ModelRouter, TaskPolicy, parse_models
+
+MODELS = [ModelPrice("large", 2.0, 8.0), ModelPrice("small", 0.4, 1.6)]
+POLICIES = {
+    "explanation": TaskPolicy(p95_target=4.0, max_cost=0.005, base_tokens=150, tokens_per_unit=0),
+    "generation": TaskPolicy(p95_target=60.0, max_cost=0.05, base_tokens=100, tokens_per_unit=200),
+}
+
+
+def _record(router, route, seconds, count=20):
+    """Record the same latency count times"""
+    for _ in range(count):
+        router.record(route, seconds)
+
+
+def test_route_sizes_tokens_to_question_count():
+    """Test that the output limit grows with the number of questions"""
+    # Arrange
+    router = ModelRouter(models=MODELS, policies=POLICIES, window=600)
+    
+    # Act
+    small_quiz = router.route("generation", units=5)
+    large_quiz = router.route("generation", units=20)
+    explanation = router.route("explanation")
+    
+    # Assert
+    assert (small_quiz.model, small_quiz.max_tokens) == ("large", 1100)
+    assert (large_quiz.model, large_quiz.max_tokens) == ("large", 4100)
+    assert (explanation.model, explanation.max_tokens) == ("large", 150)
+
+
+def test_route_skips_model_missing_p95_target():
+    """Test that a model whose p95 latency, scaled to the questions, misses the target is skipped"""
+    # Arrange
+    router = ModelRouter(models=MODELS, policies=POLICIES, window=600)
+    _record(router, router.route("generation", units=10), 40.0)  # 4 s per question
+    
+    # Act
+    five = router.route("generation", units=5)
+    twenty = router.route("generation", units=20)
+    
+    # Assert
+    assert five.model == "large"  # 20 s predicted
+    assert twenty.model == "small"  # 80 s predicted
+
+
+def test_route_uses_fastest_model_when_none_meets_target():
+    """Test the fallback to the model with the lowest p95 latency"""
+    # Arrange
+    router = ModelRouter(models=MODELS, policies=POLICIES, window=600)
+    large = router.route("explanation")
+    _record(router, large, 9.0)
+    small = router.route("explanation")
+    _record(router, small, 6.0)
+    
+    # Act
+    route = router.route("explanation")
+    
+    # Assert
+    assert small.model == "small"
+    assert route.model == "small"
+
+
+def test_route_returns_to_preferred_model_after_window():
+    """Test that latency samples expire, so a recovered model is used again"""
+    # Arrange
+    router = ModelRouter(models=MODELS, policies=POLICIES, window=600)
+    _record(router, router.route("explanation"), 9.0)
+    assert router.route("explanation").model == "small"
+    
+    # Act
+    router.window = 0
+    route = router.route("explanation")
+    
+    # Assert
+    assert route.model == "large"
+    assert router.metrics()["explanation"]["models"]["large"]["samples"] == 0
+
+
+def test_route_skips_failing_model():
+    """Test that fast failures do not count as latency and a failing model is avoided"""
+    # Arrange
+    router = ModelRouter(models=MODELS, policies=POLICIES, window=600)
+    large = router.route("explanation")
+    for _ in range(20):
+        router.record(large, 0.01, failed=True)  # e.g. a wrong model name, rejected at once
+
+    # Act
+    route = router.route("explanation")
+
+    # Assert
+    assert route.model == "small"
+    assert router.p95("large", "explanation") is None
+    assert router.metrics()["explanation"]["models"]["large"]["error_rate"] == 1.0
+
+
+def test_route_keeps_model_with_occasional_errors():
+    """Test that a model failing now and then stays preferred"""
+    # Arrange
+    router = ModelRouter(models=MODELS, policies=POLICIES, window=600)
+    large = router.route("explanation")
+    _record(router, large, 1.0)
+    _record(router, large, 0.01, count=2)
+    for _ in range(2):
+        router.record(large, 0.01, failed=True)
+
+    # Act
+    route = router.route("explanation")
+
+    # Assert
+    assert route.model == "large"
+    assert router.error_rate("large", "explanation") == pytest.approx(2 / 24)
+
+
+def test_route_respects_cost_target():
+    """Test that a model whose worst-case cost exceeds the target is not used"""
+    # Arrange
+    policies = dict(POLICIES, generation=TaskPolicy(60.0, 0.01, 100, 200))
+    router = ModelRouter(models=MODELS, policies=policies, window=600)
+    
+    # Act
+    five = router.route("generation", prompt="x" * 2000, units=5)  # large: about $0.0098
+    ten = router.route("generation", prompt="x" * 2000, units=10)  # large: about $0.0178
+    
+    # Assert
+    assert five.model == "large"
+    assert ten.model == "small"
+
+
+def test_parse_models():
+    """Test parsing of the AI_MODELS setting"""
+    # Act
+    models = parse_models("gpt-4.1:2.0:8.0, gpt-4.1-mini:0.4:1.6")
+    
+    # Assert
+    assert models == [ModelPrice("gpt-4.1", 2.0, 8.0), ModelPrice("gpt-4.1-mini", 0.4, 1.6)]
+    with pytest.raises(ValueError):
+        parse_models("gpt-4.1:2.0")
+
+
+@pytest.mark.asyncio
+async def test_generate_quiz_uses_routed_model_and_records_latency():
+    """Test that quiz generation calls the API with the routed model and token limit"""
+    # Arrange
+    router = ModelRouter(models=MODELS, policies=POLICIES, window=600)
+    service = AIQuizGeneratorService(openai_api_key="test_key")
+    content = json.dumps({
+        "title": "Fractions",
+        "questions": [
+            {
+                "text": f"Question {i}",
+                "answers": [{"text": str(j), "is_correct": j == 0} for j in range(4)]
+            }
+            for i in range(5)
+        ]
+    })
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    service.client = MagicMock()
+    service.client.chat.completions.create = AsyncMock(return_value=response)
+    
+    # Act
+    with patch("app.services.ai_quiz_generator.model_router", router):
+        questions, title = await service.generate_quiz("Fractions", 5, {"code": "IV", "description": "Grade 4"})
+    
+    # Assert
+    assert title == "Fractions"
+    assert len(questions) == 5
+    kwargs = service.client.chat.completions.create.call_args.kwargs
+    assert kwargs["model"] == "large"
+    assert kwargs["max_tokens"] == 1100
+    assert router.metrics()["generation"]["models"]["large"]["samples"] == 1
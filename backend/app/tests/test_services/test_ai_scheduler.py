@@ -0,0 +1,123 @@
+import asyncio
+import pytest
+
+from ...services.ai_scheduler import AIScheduler
+
+
+async def _hold(scheduler, lane, started, release, name):
+    """Take a slot of a lane, record the start and wait for the release event"""
+    async with scheduler.slot(lane):
+        started.append(name)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_queued_explanation_overtakes_queued_generation():
+    """Test that a free slot goes to a queued explanation before earlier queued generations"""
+    # Arrange
+    scheduler = AIScheduler(capacity=1, lanes={"explanation": 1, "generation": 1})
+    started = []
+    release = asyncio.Event()
+    running = asyncio.create_task(_hold(scheduler, "generation", started, release, "gen-1"))
+    await asyncio.sleep(0)
+    queued = [asyncio.create_task(_hold(scheduler, "generation", started, release, "gen-2"))]
+    await asyncio.sleep(0)
+    queued.append(asyncio.create_task(_hold(scheduler, "explanation", started, release, "explain")))
+    await asyncio.sleep(0)
+    
+    # Act
+    release.set()
+    await asyncio.gather(running, *queued)
+    
+    # Assert
+    assert started == ["gen-1", "explain", "gen-2"]
+
+
+@pytest.mark.asyncio
+async def test_generation_cap_keeps_slots_for_explanations():
+    """Test that a batch of generations cannot take the slots of the explanation lane"""
+    # Arrange
+    scheduler = AIScheduler(capacity=3, lanes={"explanation": 3, "generation": 2})
+    started = []
+    release = asyncio.Event()
+    generations = [
+        asyncio.create_task(_hold(scheduler, "generation", started, release, f"gen-{i}")) for i in range(5)
+    ]
+    await asyncio.sleep(0)
+    
+    # Act
+    async with scheduler.slot("explanation"):
+        metrics = scheduler.metrics()
+    release.set()
+    await asyncio.gather(*generations)
+    
+    # Assert
+    assert metrics["running"] == 3
+    assert metrics["lanes"]["generation"]["running"] == 2
+    assert metrics["lanes"]["generation"]["queued"] == 3
+    assert metrics["lanes"]["explanation"]["running"] == 1
+    assert scheduler.metrics()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_keep_a_slot():
+    """Test that a call cancelled while queued leaves the queue and frees nothing twice"""
+    # Arrange
+    scheduler = AIScheduler(capacity=1, lanes={"explanation": 1, "generation": 1})
+    started = []
+    release = asyncio.Event()
+    running = asyncio.create_task(_hold(scheduler, "generation", started, release, "gen-1"))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(_hold(scheduler, "explanation", started, release, "explain"))
+    await asyncio.sleep(0)
+    
+    # Act
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    release.set()
+    await running
+    
+    # Assert
+    assert started == ["gen-1"]
+    metrics = scheduler.metrics()
+    assert metrics["running"] == 0
+    assert metrics["lanes"]["explanation"]["queued"] == 0
+    async with scheduler.slot("explanation"):
+        assert scheduler.metrics()["running"] == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_wait_times():
+    """Test the wait time statistics of a lane"""
+    # Arrange
+    scheduler = AIScheduler(capacity=1, lanes={"explanation": 1})
+    started = []
+    release = asyncio.Event()
+    running = asyncio.create_task(_hold(scheduler, "explanation", started, release, "first"))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(_hold(scheduler, "explanation", started, release, "second"))
+    
+    # Act
+    await asyncio.sleep(0.05)
+    release.set()
+    await asyncio.gather(running, waiting)
+    
+    # Assert
+    lane = scheduler.metrics()["lanes"]["explanation"]
+    assert lane["started"] == 2
+    assert lane["wait_max"] >= 0.05
+    assert lane["wait_p95"] == lane["wait_max"]
+    assert 0 < lane["wait_mean"] < lane["wait_max"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_lane():
+    """Test that an unknown lane is rejected"""
+    # Arrange
+    scheduler = AIScheduler(capacity=1, lanes={"explanation": 1})
+    
+    # Act / Assert
+    with pytest.raises(ValueError):
+        async with scheduler.slot("precompute"):
+            pass
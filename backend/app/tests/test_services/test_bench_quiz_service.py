@@ -0,0 +1,41 @@
+import pytest
+
+from benchmarks.bench_quiz_service import compare, run
+
+
+def report(**medians):
+    """Benchmark report with the given median per hot path, at scale 100"""
+    return {"results": {
+        name: {"100": {"median_ms": median, "p95_ms": median * 2}} for name, median in medians.items()
+    }}
+
+
+def test_compare_reports_slower_and_missing_hot_paths():
+    """Test slowdowns beyond the threshold and the minimum delta count as regressions"""
+    # Arrange
+    baseline = report(get_quiz_by_id=2.0, update_quiz=100.0, check_answer=50.0, get_quizzes=0.2)
+    current = report(get_quiz_by_id=2.4, update_quiz=130.0, get_quizzes=0.4)
+
+    # Act
+    regressions = compare(current, baseline, threshold=0.2, min_delta_ms=0.5)
+
+    # Assert
+    assert regressions == [
+        "update_quiz @ 100: median_ms 130.00 ms vs 100.00 ms (+30%)",
+        "check_answer @ 100: not measured in this run",
+    ]
+    assert compare(current, baseline, threshold=0.5, min_delta_ms=0.5, metric="p95_ms") == [
+        "check_answer @ 100: not measured in this run",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_run_measures_every_hot_path():
+    """Test a small run times every hot path at every scale"""
+    # Act
+    result = await run(scales=[10], rounds=1, seed=1, only=[])
+
+    # Assert
+    assert len(result["results"]) == 11
+    for scales in result["results"].values():
+        assert scales["10"]["median_ms"] > 0
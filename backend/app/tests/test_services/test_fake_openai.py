@@ -0,0 +1,126 @@
+import json
+import random
+import httpx
+import pytest
+from unittest.mock import MagicMock, patch
+from openai import AsyncOpenAI
+
+from benchmarks.fake_openai import FakeConfig, create_app, parse_latency
+from ...services.ai_quiz_generator import AIGenerationError, AIQuizGeneratorService
+from ...services.ai_service import AIService
+
+LEVEL = {"code": "IV", "description": "Grade 4"}
+
+
+def _client(config: FakeConfig) -> AsyncOpenAI:
+    """OpenAI client talking to the fake server in-process"""
+    transport = httpx.ASGITransport(app=create_app(config))
+    return AsyncOpenAI(
+        api_key="fake",
+        base_url="http://fake/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=transport, base_url="http://fake/v1")
+    )
+
+
+def test_services_use_base_url_setting():
+    """Test that both AI services can be pointed at an OpenAI-compatible server"""
+    # Act
+    with patch("app.services.ai_quiz_generator.settings.OPENAI_BASE_URL", "http://127.0.0.1:8001/v1"):
+        generator = AIQuizGeneratorService(openai_api_key="fake")
+        explainer = AIService(openai_api_key="fake")
+    
+    # Assert
+    assert str(generator.client.base_url) == "http://127.0.0.1:8001/v1/"
+    assert str(generator.sync_client.base_url) == "http://127.0.0.1:8001/v1/"
+    assert str(explainer.client.base_url) == "http://127.0.0.1:8001/v1/"
+
+
+@pytest.mark.asyncio
+async def test_generate_quiz_against_fake_server():
+    """Test that quiz generation parses the canned quiz of the fake server"""
+    # Arrange
+    config = FakeConfig()
+    service = AIQuizGeneratorService(openai_api_key="fake")
+    service.client = _client(config)
+    
+    # Act
+    questions, title = await service.generate_quiz("Ułamki zwykłe", 7, LEVEL)
+    
+    # Assert
+    assert title == "Ułamki zwykłe"
+    assert len(questions) == 7
+    assert config.stats == {"calls": 1, "errors": 0, "truncated": 0}
+
+
+@pytest.mark.asyncio
+async def test_generate_explanation_against_fake_server():
+    """Test that explanations are served by the fake server"""
+    # Arrange
+    service = AIService(openai_api_key="fake")
+    service.client = _client(FakeConfig())
+    
+    # Act
+    explanation = await service.generate_explanation(
+        quiz_title="Fractions",
+        quiz_level="Grade 4",
+        question_text="What is 1/2 + 1/4?",
+        correct_answer_text="3/4",
+        student_answer_text="2/6",
+        is_student_correct=False
+    )
+    
+    # Assert
+    assert explanation.startswith("The correct answer follows")
+
+
+@pytest.mark.asyncio
+async def test_fake_server_errors():
+    """Test that configured errors reach the service as failed calls"""
+    # Arrange
+    config = FakeConfig(error_rate=1.0, error_status=429)
+    service = AIQuizGeneratorService(openai_api_key="fake")
+    service.client = _client(config)
+    service.sync_client = MagicMock()
+    service.sync_client.chat.completions.create.side_effect = Exception("offline")
+    
+    # Act / Assert
+    with pytest.raises(AIGenerationError):
+        await service.generate_quiz("Fractions", 5, LEVEL)
+    assert config.stats["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fake_server_streams_and_truncates_at_max_tokens():
+    """Test streamed completions and the cut at max_tokens"""
+    # Arrange
+    client = _client(FakeConfig())
+    messages = [{"role": "user", "content": 'You are an educational quiz generator. Topic: on the topic: "Fractions". Generate 5 questions'}]
+    
+    # Act
+    stream = await client.chat.completions.create(model="gpt-4.1", messages=messages, stream=True)
+    chunks = [chunk async for chunk in stream]
+    truncated = await client.chat.completions.create(model="gpt-4.1", messages=messages, max_tokens=50)
+    
+    # Assert
+    content = "".join(chunk.choices[0].delta.content or "" for chunk in chunks)
+    assert len(json.loads(content)["questions"]) == 5
+    assert chunks[-1].choices[0].finish_reason == "stop"
+    assert truncated.choices[0].finish_reason == "length"
+    assert len(truncated.choices[0].message.content) == 200
+
+
+def test_parse_latency():
+    """Test the latency distributions"""
+    # Arrange
+    rng = random.Random(1)
+    
+    # Act
+    samples = [parse_latency("lognormal:1.0,0.5")(rng) for _ in range(2000)]
+    
+    # Assert
+    assert parse_latency("fixed:0.25")(rng) == 0.25
+    assert 0.2 <= parse_latency("uniform:0.2,0.4")(rng) <= 0.4
+    assert 0.9 < sorted(samples)[1000] < 1.1
+    with pytest.raises(ValueError):
+        parse_latency("normal:1")
@@ -0,0 +1,176 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from ...db import create_sqlite_engine, get_sqlite_profile
+from ...models import Base, IdempotencyKey, User
+from ...services.idempotency import (
+    IdempotencyKeyInProgress, IdempotencyKeyMismatch, IdempotencyStore, request_hash
+)
+
+ENDPOINT = "POST /api/v1/quizzes"
+PAYLOAD = {"topic": "Ułamki", "question_count": 5}
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """Session factory on a fresh database with two users"""
+    engine = create_sqlite_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/idempotency.db",
+        get_sqlite_profile("performance"),
+        pool_size=1,
+        max_overflow=0,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {"username": name, "hashed_password": "x", "role": "admin"} for name in ("admin", "teacher")
+        ])
+
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    await engine.dispose()
+
+
+def make_store(session_factory, **kwargs):
+    """Store on the test database, polling fast"""
+    return IdempotencyStore(
+        session_factory=session_factory, read_session_factory=session_factory, poll_interval=0.01, **kwargs
+    )
+
+
+class Work:
+    """Counting request handler that can be held until released"""
+
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("generation failed")
+        return {"id": self.calls, "title": "Ułamki"}
+
+
+@pytest.mark.asyncio
+async def test_completed_request_is_replayed(session_factory):
+    """Test a retry after completion gets the stored response without running again"""
+    # Arrange
+    store = make_store(session_factory)
+    work = Work()
+
+    # Act
+    first = await store.run(key="k1", user_id=1, endpoint=ENDPOINT, payload=PAYLOAD, work=work)
+    retry = await store.run(key="k1", user_id=1, endpoint=ENDPOINT, payload=PAYLOAD, work=work)
+    other_user = await store.run(key="k1", user_id=2, endpoint=ENDPOINT, payload=PAYLOAD, work=work)
+
+    # Assert
+    assert work.calls == 2
+    assert (first.body, first.replayed) == ({"id": 1, "title": "Ułamki"}, False)
+    assert (retry.body, retry.replayed) == ({"id": 1, "title": "Ułamki"}, True)
+    assert other_user.body["id"] == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_attaches_to_running_request(session_factory):
+    """Test a retry during the work waits for it instead of starting it again"""
+    # Arrange
+    store = make_store(session_factory)
+    work = Work()
+    work.release.clear()
+
+    # Act
+    first = asyncio.create_task(store.run(key="k1", user_id=1, endpoint=ENDPOINT, payload=PAYLOAD, work=work))
+    await asyncio.sleep(0.05)
+    retry = asyncio.create_task(store.run(key="k1", user_id=1, endpoint=ENDPOINT, payload=PAYLOAD, work=work))
+    await asyncio.sleep(0.05)
+    work.release.set()
+    responses = await asyncio.gather(first, retry)
+
+    # Assert
+    assert work.calls == 1
+    assert [response.body["id"] for response in responses] == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_other_request_is_rejected(session_factory):
+    """Test the same key with a different payload raises a mismatch"""
+    # Arrange
+    store = make_store(session_factory)
+    await store.run(key="k1", user_id=1, endpoint=ENDPOINT, payload=PAYLOAD, work=Work())
+
+    # Act & Assert
+    with pytest.raises(IdempotencyKeyMismatch):
+        await store.run(key="k1", user_id=1, endpoint=ENDPOINT, payload={**PAYLOAD, "question_count": 6}, work=Work())
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_key(session_factory):
+    """Test a failed request can be retried with the same key"""
+    # Arrange
+    store = make_store(session_factory)
+    with pytest.raises(RuntimeError):
+        await store.run(key="k1", user_id=1, endpoint=ENDPOINT, payload=PAYLOAD, work=Work(fail=True))
+
+    # Act
+    retry = await store.run(key="k1", user_id=1, endpoint=ENDPOINT, payload=PAYLOAD, work=Work())
+
+    # Assert
+    assert (retry.body["id"], retry.replayed) == (1, False)
+
+
+@pytest.mark.asyncio
+async def test_request_running_in_other_worker(session_factory):
+    """Test a retry polls a key claimed elsewhere and takes over abandoned claims"""
+    # Arrange
+    async with session_factory() as db:
+        await db.execute(insert(IdempotencyKey).values(
+            user_id=1, key="k1", endpoint=ENDPOINT, request_hash=request_hash(ENDPOINT, PAYLOAD),
+            status="in_progress", created_at=datetime.utcnow()
+        ))
+        await db.commit()
+    work = Work()
+
+    # Act
+    with pytest.raises(IdempotencyKeyInProgress):
+        await make_store(session_factory, wait_timeout=0.05).run(
+            key="k1", user_id=1, endpoint=ENDPOINT, payload=PAYLOAD, work=work
+        )
+    taken_over = await make_store(session_factory, lock_timeout=0).run(
+        key="k1", user_id=1, endpoint=ENDPOINT, payload=PAYLOAD, work=work
+    )
+    async with session_factory() as db:
+        stored = (await db.execute(select(IdempotencyKey))).scalar_one()
+
+    # Assert
+    assert work.calls == 1
+    assert taken_over.body["id"] == 1
+    assert stored.status == "completed"
+
+
+@pytest.mark.asyncio
+async def test_expired_keys_are_purged(session_factory):
+    """Test keys older than the TTL are removed and run again"""
+    # Arrange
+    async with session_factory() as db:
+        await db.execute(insert(IdempotencyKey).values(
+            user_id=1, key="old", endpoint=ENDPOINT, request_hash=request_hash(ENDPOINT, PAYLOAD),
+            status="completed", response_body='{"id": 99}', created_at=datetime.utcnow() - timedelta(days=2)
+        ))
+        await db.commit()
+
+    # Act
+    response = await make_store(session_factory, ttl=24 * 60 * 60).run(
+        key="old", user_id=1, endpoint=ENDPOINT, payload=PAYLOAD, work=Work()
+    )
+
+    # Assert
+    assert (response.body["id"], response.replayed) == (1, False)
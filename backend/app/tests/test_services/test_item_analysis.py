@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, patch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...services.item_analysis import ItemAnalysisCache, analyze
+
+# Questions 1-3 with answers 2q-1 (correct) and 2q (wrong)
+ANSWER_KEY = {q: {2 * q - 1: True, 2 * q: False} for q in range(1, 4)}
+
+
+def attempt(attempt_id, user_id, question_id, correct):
+    """Attempt row (id, user_id, question_id, answer_id, is_correct)"""
+    answer_id = 2 * question_id - 1 if correct else 2 * question_id
+    return (attempt_id, user_id, question_id, answer_id, int(correct))
+
+
+def build_rows(responses):
+    """Attempt matrix from {user_id: [correct per question 1-3]}"""
+    rows = []
+    for user_id, answers in responses.items():
+        for question_id, correct in enumerate(answers, start=1):
+            rows.append(attempt(len(rows) + 1, user_id, question_id, correct))
+    return np.array(rows, dtype=np.int64)
+
+
+def test_analyze_matches_reference_statistics():
+    """Test difficulty, corrected point-biserial and selection rates against a direct computation"""
+    # Arrange
+    responses = {1: [1, 1, 1], 2: [1, 1, 0], 3: [1, 0, 0], 4: [0, 0, 0], 5: [1, 0, 1]}
+    matrix = np.array(list(responses.values()), dtype=float)
+
+    # Act
+    analysis = analyze(1, build_rows(responses), ANSWER_KEY)
+
+    # Assert
+    assert (analysis.attempt_count, analysis.student_count) == (15, 5)
+    for j, question in enumerate(analysis.questions):
+        rest = matrix.sum(axis=1) - matrix[:, j]
+        assert question.responses == 5
+        assert question.difficulty == pytest.approx(matrix[:, j].mean())
+        assert question.discrimination == pytest.approx(np.corrcoef(matrix[:, j], rest)[0, 1])
+        correct, wrong = question.answers
+        assert correct.is_correct and correct.selection_rate == pytest.approx(matrix[:, j].mean())
+        assert wrong.selection_rate == pytest.approx(1 - matrix[:, j].mean())
+
+
+def test_analyze_counts_first_attempt_and_current_questions():
+    """Test a correct re-check does not replace the first answer and attempts of removed questions are ignored"""
+    # Arrange
+    rows = np.array([
+        attempt(1, 1, 1, False),
+        attempt(2, 1, 1, True),   # re-check after the correct answer was revealed
+        attempt(3, 2, 1, True),
+        attempt(4, 2, 9, True),   # question 9 was removed
+    ], dtype=np.int64)
+
+    # Act
+    analysis = analyze(1, rows, ANSWER_KEY)
+
+    # Assert
+    first, second, third = analysis.questions
+    assert analysis.attempt_count == 3
+    assert (first.responses, first.difficulty) == (2, 0.5)
+    assert [answer.selection_rate for answer in first.answers] == [0.5, 0.5]
+    assert first.discrimination is None  # no variance in the rest score
+    assert (second.responses, second.difficulty) == (0, None)
+    assert [answer.selection_rate for answer in third.answers] == [None, None]
+
+
+@pytest.mark.asyncio
+async def test_cache_reads_only_new_attempts():
+    """Test later requests fetch just the attempts added since the previous one"""
+    # Arrange
+    cache = ItemAnalysisCache(max_quizzes=2)
+    db = AsyncMock(spec=AsyncSession)
+    first_batch = [attempt(1, 1, 1, True), attempt(2, 1, 2, False)]
+    second_batch = [attempt(3, 2, 1, False)]
+
+    with patch("app.services.item_analysis.get_answer_key", new_callable=AsyncMock) as mock_key, \
+         patch("app.services.item_analysis.get_attempt_watermark", new_callable=AsyncMock) as mock_watermark, \
+         patch("app.services.item_analysis.get_attempt_columns", new_callable=AsyncMock) as mock_columns:
+        mock_key.return_value = ("published", ANSWER_KEY)
+        mock_watermark.side_effect = [(2, 2), (3, 3), (3, 3)]
+        mock_columns.side_effect = [first_batch, second_batch]
+
+        # Act
+        first = await cache.get(db, 1)
+        second = await cache.get(db, 1)
+        unchanged = await cache.get(db, 1)
+
+    # Assert
+    assert [call.kwargs["after_id"] for call in mock_columns.call_args_list] == [0, 2]
+    assert first.attempt_count == 2
+    assert second.attempt_count == 3
+    assert unchanged == second
+
+
+@pytest.mark.asyncio
+async def test_cache_reloads_after_deleted_attempts():
+    """Test the matrix is rebuilt when cached attempts no longer exist"""
+    # Arrange
+    cache = ItemAnalysisCache(max_quizzes=2)
+    db = AsyncMock(spec=AsyncSession)
+    attempts = [attempt(1, 1, 1, True), attempt(2, 2, 1, False), attempt(3, 3, 1, True)]
+
+    with patch("app.services.item_analysis.get_answer_key", new_callable=AsyncMock) as mock_key, \
+         patch("app.services.item_analysis.get_attempt_watermark", new_callable=AsyncMock) as mock_watermark, \
+         patch("app.services.item_analysis.get_attempt_columns", new_callable=AsyncMock) as mock_columns:
+        mock_key.return_value = ("published", ANSWER_KEY)
+        # Student 2 was deleted, then attempt 4 arrived
+        mock_watermark.side_effect = [(3, 3), (3, 4)]
+        mock_columns.side_effect = [attempts, [attempt(4, 4, 1, True)], attempts[::2] + [attempt(4, 4, 1, True)]]
+
+        # Act
+        await cache.get(db, 1)
+        analysis = await cache.get(db, 1)
+
+    # Assert
+    assert mock_columns.call_count == 3
+    assert analysis.student_count == 3
+    assert analysis.questions[0].difficulty == 1.0
+
+
+@pytest.mark.asyncio
+async def test_cache_unknown_quiz():
+    """Test a missing quiz has no item analysis"""
+    # Arrange
+    cache = ItemAnalysisCache()
+
+    with patch("app.services.item_analysis.get_answer_key", new_callable=AsyncMock, return_value=None):
+
+        # Act
+        analysis = await cache.get(AsyncMock(spec=AsyncSession), 999)
+
+    # Assert
+    assert analysis is None
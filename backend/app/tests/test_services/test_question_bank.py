@@ -0,0 +1,81 @@
+import numpy as np
+
+from ...services.question_bank import (
+    LSH_BANDS, MINHASH_PERMUTATIONS, band_buckets, drop_near_duplicates, from_bytes, signature, similarity, to_bytes
+)
+
+ADDITION = {
+    "text": "Ile to 2 + 2?",
+    "answers": [
+        {"text": "4", "is_correct": True},
+        {"text": "5", "is_correct": False},
+        {"text": "3", "is_correct": False},
+    ],
+}
+CAPITAL = {
+    "text": "Jakie miasto jest stolicą Polski?",
+    "answers": [
+        {"text": "Warszawa", "is_correct": True},
+        {"text": "Kraków", "is_correct": False},
+    ],
+}
+
+
+def test_signature_ignores_case_punctuation_and_answer_order():
+    """Test formatting differences and shuffled answers give the same signature"""
+    # Arrange
+    reformatted = {
+        "text": "ILE TO 2+2",
+        "answers": [
+            {"text": "3", "is_correct": False},
+            {"text": "4.", "is_correct": True},
+            {"text": "5", "is_correct": False},
+        ],
+    }
+
+    # Act
+    values = signature(ADDITION)
+
+    # Assert
+    assert values.shape == (MINHASH_PERMUTATIONS,) and values.dtype == np.uint32
+    assert np.array_equal(values, signature(reformatted))
+    assert np.array_equal(from_bytes(to_bytes(values)), values)
+
+
+def test_similarity_separates_rewordings_from_other_questions():
+    """Test a reworded question stays similar, another question and a changed answer key do not"""
+    # Arrange
+    reworded = {**CAPITAL, "text": "Jakie miasto jest stolicą Polski"}
+    other_key = {**CAPITAL, "answers": [{"text": "Warszawa", "is_correct": False}, {"text": "Kraków", "is_correct": True}]}
+    values = signature(CAPITAL)
+
+    # Act
+    scores = similarity(values, np.stack([signature(reworded), signature(ADDITION), signature(other_key)]))
+
+    # Assert
+    assert scores[0] >= 0.9
+    assert scores[1] <= 0.2
+    assert scores[2] < scores[0]
+
+
+def test_band_buckets_are_distinct_per_band():
+    """Test every band has its own bucket and equal signatures share all buckets"""
+    # Act
+    buckets = band_buckets(signature(ADDITION))
+
+    # Assert
+    assert len(set(buckets)) == LSH_BANDS
+    assert buckets == band_buckets(signature(ADDITION))
+    assert not set(buckets) & set(band_buckets(signature(CAPITAL)))
+
+
+def test_drop_near_duplicates_keeps_first_occurrence():
+    """Test repeats are dropped and distinct questions kept in order"""
+    # Arrange
+    repeat = {**ADDITION, "text": "Ile to 2+2?!"}
+
+    # Act
+    kept = drop_near_duplicates([ADDITION, CAPITAL, repeat], threshold=0.7)
+
+    # Assert
+    assert kept == [0, 1]
@@ -0,0 +1,140 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+
+from ...core.config import settings
+from ...services.quiz_service import QuizService
+from ...services.quiz_bundle import answer_hash, answer_key_digest, verify_bundle
+from ...models.quiz import Quiz
+from ...models.question import Question
+from ...models.answer import Answer
+
+def build_quiz(status: str = "published") -> MagicMock:
+    """Quiz with two questions; answers 1 and 4 are correct"""
+    questions = []
+    for question_id, answer_ids, correct_id in ((1, (1, 2), 1), (2, (3, 4), 4)):
+        question = MagicMock(spec=Question)
+        question.id = question_id
+        question.text = f"Question {question_id}?"
+        question.answers = []
+        for answer_id in answer_ids:
+            answer = MagicMock(spec=Answer)
+            answer.id = answer_id
+            answer.text = f"Answer {answer_id}"
+            answer.is_correct = int(answer_id == correct_id)
+            question.answers.append(answer)
+        questions.append(question)
+    
+    quiz = MagicMock(spec=Quiz)
+    quiz.id = 1
+    quiz.title = "Test Quiz"
+    quiz.status = status
+    quiz.level_id = 1
+    quiz.creator_id = 1
+    quiz.updated_at = "2023-10-27T14:00:00"
+    quiz.questions = questions
+    return quiz
+
+@pytest.mark.asyncio
+async def test_bundle_hashes_only_match_correct_answers():
+    """Test the client can check answers offline with the salted hashes"""
+    # Arrange
+    service = QuizService()
+    service.get_quiz_by_id = AsyncMock(return_value=build_quiz())
+    
+    # Act
+    bundle = await service.build_quiz_bundle(AsyncMock(spec=AsyncSession), 1)
+    
+    # Assert
+    assert bundle.answer_hashes[1] == answer_hash(bundle.salt, 1, 1)
+    assert bundle.answer_hashes[2] == answer_hash(bundle.salt, 2, 4)
+    assert bundle.answer_hashes[2] != answer_hash(bundle.salt, 2, 3)
+    # Student view never carries is_correct
+    assert "is_correct" not in bundle.quiz.model_dump_json()
+
+@pytest.mark.asyncio
+async def test_bundle_signature_detects_tampering():
+    """Test the server recognises its own bundles for the quiz they were issued for"""
+    # Arrange
+    service = QuizService()
+    service.get_quiz_by_id = AsyncMock(return_value=build_quiz())
+    bundle = await service.build_quiz_bundle(AsyncMock(spec=AsyncSession), 1)
+    
+    # Act
+    valid = verify_bundle(1, bundle.salt, bundle.key_digest, bundle.signature)
+    other_quiz = verify_bundle(2, bundle.salt, bundle.key_digest, bundle.signature)
+    forged_digest = verify_bundle(1, bundle.salt, answer_key_digest({1: {2: True}}), bundle.signature)
+    unsigned = verify_bundle(1, bundle.salt, bundle.key_digest, None)
+    
+    # Assert
+    assert valid is True
+    assert other_quiz is False
+    assert forged_digest is False
+    assert unsigned is False
+
+def test_bundle_requires_signing_key(monkeypatch):
+    """Test bundles are not signed with an unset key"""
+    # Arrange
+    monkeypatch.setattr(settings, "BUNDLE_SIGNING_KEY", "")
+    
+    # Act / Assert
+    with pytest.raises(RuntimeError):
+        answer_key_digest({1: {1: True}})
+
+@pytest.mark.asyncio
+async def test_bundle_without_signing_key_unavailable(monkeypatch):
+    """Test the bundle download answers 503 instead of failing when no key is configured"""
+    # Arrange
+    monkeypatch.setattr(settings, "BUNDLE_SIGNING_KEY", "")
+    service = QuizService()
+    service.get_quiz_by_id = AsyncMock(return_value=build_quiz())
+    
+    # Act
+    with pytest.raises(HTTPException) as excinfo:
+        await service.build_quiz_bundle(AsyncMock(spec=AsyncSession), 1)
+    
+    # Assert
+    assert excinfo.value.status_code == 503
+    service.get_quiz_by_id.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_bundle_salt_differs_per_download():
+    """Test hashes cannot be reused across bundles"""
+    # Arrange
+    service = QuizService()
+    service.get_quiz_by_id = AsyncMock(return_value=build_quiz())
+    db = AsyncMock(spec=AsyncSession)
+    
+    # Act
+    first = await service.build_quiz_bundle(db, 1)
+    second = await service.build_quiz_bundle(db, 1)
+    
+    # Assert
+    assert first.salt != second.salt
+    assert first.answer_hashes != second.answer_hashes
+    assert first.key_digest == second.key_digest
+
+@pytest.mark.asyncio
+async def test_bundle_of_unpublished_quiz_not_found():
+    """Test drafts cannot be downloaded"""
+    # Arrange
+    service = QuizService()
+    service.get_quiz_by_id = AsyncMock(return_value=build_quiz(status="draft"))
+    
+    # Act
+    with pytest.raises(HTTPException) as excinfo:
+        await service.build_quiz_bundle(AsyncMock(spec=AsyncSession), 1)
+    
+    # Assert
+    assert excinfo.value.status_code == 404
+
+def test_key_digest_changes_with_correct_answer():
+    """Test editing the answer key invalidates bundles built from it"""
+    # Arrange
+    key = {1: {1: True, 2: False}, 2: {3: False, 4: True}}
+    edited = {1: {1: True, 2: False}, 2: {3: True, 4: False}}
+    
+    # Act / Assert
+    assert answer_key_digest(key) == answer_key_digest(dict(reversed(list(key.items()))))
+    assert answer_key_digest(key) != answer_key_digest(edited)
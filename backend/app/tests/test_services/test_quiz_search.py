@@ -0,0 +1,31 @@
+from ...services.quiz_search import make_snippet, match_expression, search_terms
+
+
+def test_match_expression_quotes_terms():
+    """Test user input cannot inject FTS5 syntax and the last word matches as a prefix"""
+    # Act & Assert
+    assert match_expression(search_terms('ułamki AND "NEAR(x')) == '"ułamki" "AND" "NEAR" "x"*'
+    assert match_expression(search_terms("  -*()_  ")) is None
+
+
+def test_snippet_highlights_like_the_index():
+    """Test words match case and diacritics insensitively, the last one as a prefix"""
+    # Act
+    snippet = make_snippet("Żaba <i>skacze</i>, ŻABY skaczą!", search_terms("zaba skac"))
+
+    # Assert
+    assert snippet == "<mark>Żaba</mark> &lt;i&gt;<mark>skacze</mark>&lt;/i&gt;, ŻABY <mark>skaczą</mark>!"
+
+
+def test_snippet_window_around_first_match():
+    """Test long texts are cut to max_tokens words starting just before the first match"""
+    # Arrange
+    text = " ".join(f"w{i}" for i in range(30)) + " koniec."
+
+    # Act
+    middle = make_snippet(text, ["w15"], max_tokens=5)
+    tail = make_snippet(text, ["koniec"], max_tokens=5)
+
+    # Assert
+    assert middle == "…w13 w14 <mark>w15</mark> w16 w17…"
+    assert tail == "…w26 w27 w28 w29 <mark>koniec</mark>."
@@ -38,7 +38,14 @@ def mock_crud():
     with patch("app.services.quiz_service.get_level") as mock_get_level, \
          patch("app.services.quiz_service.create_quiz") as mock_create_quiz, \
          patch("app.services.quiz_service.create_question") as mock_create_question, \
-         patch("app.services.quiz_service.get_quiz") as mock_get_quiz:
+         patch("app.services.quiz_service.get_quiz") as mock_get_quiz, \
+         patch("app.services.quiz_service.bank_indexer") as mock_bank_indexer, \
+         patch("app.services.quiz_service.find_near_duplicates", new_callable=AsyncMock) as mock_find_near_duplicates, \
+         patch("app.services.quiz_service.get_bank_questions", new_callable=AsyncMock) as mock_get_bank_questions:
+        
+        # Empty question bank
+        mock_find_near_duplicates.side_effect = lambda db, questions, **kwargs: [None] * len(questions)
+        mock_get_bank_questions.return_value = []
         
         # Setup mock level
         mock_level = MagicMock()
@@ -79,6 +86,9 @@ def mock_crud():
             "create_quiz": mock_create_quiz,
             "create_question": mock_create_question,
             "get_quiz": mock_get_quiz,
+            "find_near_duplicates": mock_find_near_duplicates,
+            "get_bank_questions": mock_get_bank_questions,
+            "bank_indexer": mock_bank_indexer,
             "mock_level": mock_level,
             "mock_quiz": mock_quiz,
             "mock_question": mock_question,
@@ -424,6 +434,7 @@ async def test_create_ai_quiz_success(mock_db, mock_ai_generator, mock_crud):
     assert mock_crud["create_quiz"].called
     assert mock_crud["create_question"].called
     assert mock_crud["get_quiz"].called
+    mock_crud["bank_indexer"].schedule.assert_called_once()
     
     # Check parameters passed to create_quiz
     mock_crud["create_quiz"].assert_called_once()
@@ -514,6 +525,94 @@ async def test_create_ai_quiz_database_error(mock_db, mock_ai_generator, mock_cr
     with pytest.raises(SQLAlchemyError):
         await service.create_ai_quiz(mock_db, quiz_data, creator_id)
 
+@pytest.fixture
+def mock_generation_cache():
+    """Mock the generation cache and bulk insert used by create_ai_quiz"""
+    with patch("app.services.quiz_service.get_cached_generation", new_callable=AsyncMock) as mock_get, \
+         patch("app.services.quiz_service.store_generation", new_callable=AsyncMock) as mock_store, \
+         patch("app.services.quiz_service.bulk_create_quizzes", new_callable=AsyncMock) as mock_bulk:
+        mock_get.return_value = None
+        mock_bulk.return_value = [1]
+        yield {"get": mock_get, "store": mock_store, "bulk_create": mock_bulk}
+
+CACHED_QUESTIONS = [
+    {"text": "Ile to 1/2 + 1/4?", "answers": [{"text": "3/4", "is_correct": True}, {"text": "2/6", "is_correct": False}]}
+]
+
+@pytest.mark.asyncio
+async def test_create_ai_quiz_reuses_cached_generation(mock_db, mock_ai_generator, mock_crud, mock_generation_cache):
+    """Test a cached generation is cloned into a new draft without calling the AI"""
+    # Arrange
+    service = QuizService()
+    quiz_data = QuizCreate(
+        topic="  Ułamki! ",
+        question_count=5,
+        level_id=1,
+        title="Test Quiz",
+        reuse_if_available=True
+    )
+    mock_generation_cache["get"].return_value = ("Ułamki zwykłe", CACHED_QUESTIONS)
+    
+    # Act
+    result = await service.create_ai_quiz(mock_db, quiz_data, 7)
+    
+    # Assert
+    assert result.from_cache is True
+    mock_generation_cache["get"].assert_called_once_with(mock_db, topic_key="ułamki", level_id=1, question_count=5)
+    mock_generation_cache["bulk_create"].assert_called_once_with(mock_db, [{
+        "title": "Ułamki zwykłe",
+        "level_id": 1,
+        "creator_id": 7,
+        "status": "draft",
+        "questions": CACHED_QUESTIONS,
+    }])
+    mock_db.commit.assert_called_once()
+    assert not mock_ai_generator.generate_quiz.called
+    assert not mock_crud["create_quiz"].called
+    assert not mock_generation_cache["store"].called
+
+@pytest.mark.asyncio
+async def test_create_ai_quiz_stores_generation_on_miss(mock_db, mock_ai_generator, mock_crud, mock_generation_cache):
+    """Test a cache miss generates with the AI and stores the validated questions"""
+    # Arrange
+    service = QuizService()
+    quiz_data = QuizCreate(topic="Ułamki", question_count=5, level_id=1, title="Test Quiz", reuse_if_available=True)
+    mock_ai_generator.generate_quiz.return_value = (CACHED_QUESTIONS, "Ułamki zwykłe")
+    
+    # Act
+    result = await service.create_ai_quiz(mock_db, quiz_data, 7)
+    
+    # Assert
+    assert result.from_cache is False
+    mock_ai_generator.generate_quiz.assert_called_once()
+    mock_generation_cache["store"].assert_called_once_with(
+        mock_db,
+        topic_key="ułamki",
+        level_id=1,
+        question_count=5,
+        title="Ułamki zwykłe",
+        questions_data=CACHED_QUESTIONS
+    )
+
+@pytest.mark.asyncio
+async def test_create_ai_quiz_bypass_cache(mock_db, mock_ai_generator, mock_crud, mock_generation_cache):
+    """Test bypass_cache neither reads nor stores the cache"""
+    # Arrange
+    service = QuizService()
+    quiz_data = QuizCreate(
+        topic="Ułamki", question_count=5, level_id=1, title="Test Quiz",
+        reuse_if_available=True, bypass_cache=True
+    )
+    mock_ai_generator.generate_quiz.return_value = (CACHED_QUESTIONS, "Ułamki zwykłe")
+    
+    # Act
+    await service.create_ai_quiz(mock_db, quiz_data, 7)
+    
+    # Assert
+    mock_ai_generator.generate_quiz.assert_called_once()
+    assert not mock_generation_cache["get"].called
+    assert not mock_generation_cache["store"].called
+
 @pytest.mark.asyncio
 async def test_get_quiz_by_id_success(mock_db):
     """Test getting a quiz by ID successfully"""
@@ -87,8 +87,15 @@ def mock_ai_service():
         instance.generate_explanation = AsyncMock(return_value="This is the explanation")
         yield instance
 
+@pytest.fixture(autouse=True)
+def mock_attempt_writer():
+    """Mock the buffer recording answer attempts"""
+    with patch("app.services.quiz_service.attempt_writer") as mock_writer:
+        mock_writer.record = AsyncMock()
+        yield mock_writer
+
 @pytest.mark.asyncio
-async def test_check_answer_correct(mock_db, mock_student_user, mock_quiz_with_questions, mock_level, mock_ai_service):
+async def test_check_answer_correct(mock_db, mock_student_user, mock_quiz_with_questions, mock_level, mock_ai_service, mock_attempt_writer):
     """Test checking a correct answer"""
     # Arrange
     quiz_service = QuizService()
@@ -122,6 +129,11 @@ async def test_check_answer_correct(mock_db, mock_student_user, mock_quiz_with_q
     args, kwargs = mock_ai_service.generate_explanation.call_args
     assert kwargs["is_student_correct"] == True
     assert kwargs["student_answer_text"] is None  # No wrong answer text needed
+    
+    # Verify the attempt was recorded for scoring
+    mock_attempt_writer.record.assert_called_once_with(
+        user_id=2, quiz_id=1, question_id=1, answer_id=1, is_correct=True
+    )
 
 @pytest.mark.asyncio
 async def test_check_answer_incorrect(mock_db, mock_student_user, mock_quiz_with_questions, mock_level, mock_ai_service):
@@ -0,0 +1,284 @@
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+
+from ...core.config import settings
+from ...services.quiz_service import QuizService, explanation_cache_key
+from ...core.shared_state import MemoryStateBackend
+from ...services.ai_service import EXPLANATION_FAILED
+from ...services.quiz_bundle import answer_key_digest, sign_bundle
+from ...schemas.question import QuizGradeRequest
+from ...models.user import User
+from ...models.answer import Answer
+
+# Question 1: answer 1 correct; question 2: answer 3 correct; question 3: answer 5 correct
+ANSWER_KEY = {
+    1: {1: True, 2: False},
+    2: {3: True, 4: False},
+    3: {5: True, 6: False},
+}
+
+@pytest.fixture
+def mock_db():
+    """Mock database session"""
+    return AsyncMock(spec=AsyncSession)
+
+@pytest.fixture
+def mock_student_user():
+    """Mock student user"""
+    user = MagicMock(spec=User)
+    user.id = 2
+    user.role = "student"
+    return user
+
+@pytest.fixture
+def mock_answer_key():
+    """Mock the answer key query"""
+    with patch("app.services.quiz_service.get_answer_key", new_callable=AsyncMock) as mock_key:
+        mock_key.return_value = ("published", ANSWER_KEY)
+        yield mock_key
+
+@pytest.fixture
+def mock_writers():
+    """Mock the group-commit buffers"""
+    with patch("app.services.quiz_service.attempt_writer") as attempts, \
+         patch("app.services.quiz_service.result_writer") as results:
+        attempts.record_many = AsyncMock()
+        result = MagicMock(id=7, user_id=2, quiz_id=1, score=1, max_score=3, created_at="2023-10-27T14:00:00")
+        results.submit = AsyncMock(return_value=result)
+        yield attempts, results
+
+@pytest.mark.asyncio
+async def test_grade_quiz_grades_in_one_pass(mock_db, mock_student_user, mock_answer_key, mock_writers):
+    """Test answers are graded against the key, unanswered questions count as wrong"""
+    # Arrange
+    attempts, results = mock_writers
+    grade_data = QuizGradeRequest(answers=[
+        {"question_id": 1, "answer_id": 1},
+        {"question_id": 2, "answer_id": 4},
+    ])
+    
+    # Act
+    response = await QuizService().grade_quiz(mock_db, 1, grade_data, mock_student_user)
+    
+    # Assert
+    assert response.score == 1
+    assert response.max_score == 3
+    assert [(q.question_id, q.is_correct, q.correct_answer_id) for q in response.questions] == [
+        (1, True, 1), (2, False, 3)
+    ]
+    attempts.record_many.assert_called_once_with(
+        user_id=2, quiz_id=1, attempts=[(1, 1, True), (2, 4, False)]
+    )
+    results.submit.assert_called_once_with(user_id=2, quiz_id=1, score=1, max_score=3)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("answers", [
+    [{"question_id": 9, "answer_id": 1}],  # question of another quiz
+    [{"question_id": 1, "answer_id": 3}],  # answer of another question
+    [{"question_id": 1, "answer_id": 1}, {"question_id": 1, "answer_id": 2}],  # answered twice
+])
+async def test_grade_quiz_rejects_foreign_answers(mock_db, mock_student_user, mock_answer_key, mock_writers, answers):
+    """Test nothing is stored when an answer does not belong to the quiz"""
+    # Arrange
+    attempts, results = mock_writers
+    
+    # Act
+    with pytest.raises(HTTPException) as excinfo:
+        await QuizService().grade_quiz(mock_db, 1, QuizGradeRequest(answers=answers), mock_student_user)
+    
+    # Assert
+    assert excinfo.value.status_code == 422
+    attempts.record_many.assert_not_called()
+    results.submit.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_grade_quiz_unpublished(mock_db, mock_student_user, mock_answer_key, mock_writers):
+    """Test draft quizzes cannot be graded"""
+    # Arrange
+    mock_answer_key.return_value = ("draft", ANSWER_KEY)
+    grade_data = QuizGradeRequest(answers=[{"question_id": 1, "answer_id": 1}])
+    
+    # Act
+    with pytest.raises(HTTPException) as excinfo:
+        await QuizService().grade_quiz(mock_db, 1, grade_data, mock_student_user)
+    
+    # Assert
+    assert excinfo.value.status_code == 404
+
+@pytest.mark.asyncio
+async def test_grade_quiz_without_questions(mock_db, mock_student_user, mock_answer_key, mock_writers):
+    """Test a quiz without questions cannot be graded and no result is stored"""
+    # Arrange
+    mock_answer_key.return_value = ("published", {})
+    grade_data = QuizGradeRequest(answers=[{"question_id": 1, "answer_id": 1}])
+    attempts, results = mock_writers
+    
+    # Act
+    with pytest.raises(HTTPException) as excinfo:
+        await QuizService().grade_quiz(mock_db, 1, grade_data, mock_student_user)
+    
+    # Assert
+    assert excinfo.value.status_code == 422
+    assert excinfo.value.detail == "Quiz has no questions"
+    results.submit.assert_not_called()
+
+def bundle_receipt(answer_key, quiz_id: int = 1) -> dict:
+    """key_digest, salt and signature of a bundle of the quiz"""
+    key_digest = answer_key_digest(answer_key)
+    return {"key_digest": key_digest, "salt": "00ff", "signature": sign_bundle(quiz_id, "00ff", key_digest)}
+
+@pytest.mark.asyncio
+async def test_grade_quiz_checks_bundle_key_digest(mock_db, mock_student_user, mock_answer_key, mock_writers):
+    """Test offline answers are re-verified against the key the bundle was built from"""
+    # Arrange
+    attempts, _ = mock_writers
+    answers = [{"question_id": 1, "answer_id": 1}]
+    current = QuizGradeRequest(answers=answers, **bundle_receipt(ANSWER_KEY))
+    stale = QuizGradeRequest(answers=answers, **bundle_receipt({1: {1: False, 2: True}}))
+    
+    # Act
+    response = await QuizService().grade_quiz(mock_db, 1, current, mock_student_user)
+    with pytest.raises(HTTPException) as excinfo:
+        await QuizService().grade_quiz(mock_db, 1, stale, mock_student_user)
+    
+    # Assert
+    assert response.score == 1
+    assert excinfo.value.status_code == 409
+    attempts.record_many.assert_called_once()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("receipt", [
+    {"key_digest": answer_key_digest(ANSWER_KEY)},  # unsigned
+    {**bundle_receipt(ANSWER_KEY), "salt": "ff00"},  # signature of another bundle
+    bundle_receipt(ANSWER_KEY, quiz_id=2),  # bundle of another quiz
+])
+async def test_grade_quiz_checks_bundle_signature(mock_db, mock_student_user, mock_answer_key, mock_writers, receipt):
+    """Test offline answers are only accepted with the signature of a bundle issued for the quiz"""
+    # Arrange
+    attempts, results = mock_writers
+    grade_data = QuizGradeRequest(answers=[{"question_id": 1, "answer_id": 1}], **receipt)
+    
+    # Act
+    with pytest.raises(HTTPException) as excinfo:
+        await QuizService().grade_quiz(mock_db, 1, grade_data, mock_student_user)
+    
+    # Assert
+    assert excinfo.value.status_code == 422
+    attempts.record_many.assert_not_called()
+    results.submit.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_grade_quiz_bundle_without_signing_key(mock_db, mock_student_user, mock_answer_key, mock_writers, monkeypatch):
+    """Test only bundle answers need the signing key, online answers are still graded"""
+    # Arrange
+    attempts, _ = mock_writers
+    answers = [{"question_id": 1, "answer_id": 1}]
+    offline = QuizGradeRequest(answers=answers, **bundle_receipt(ANSWER_KEY))
+    monkeypatch.setattr(settings, "BUNDLE_SIGNING_KEY", "")
+    
+    # Act
+    with pytest.raises(HTTPException) as excinfo:
+        await QuizService().grade_quiz(mock_db, 1, offline, mock_student_user)
+    response = await QuizService().grade_quiz(mock_db, 1, QuizGradeRequest(answers=answers), mock_student_user)
+    
+    # Assert
+    assert excinfo.value.status_code == 503
+    assert response.score == 1
+    attempts.record_many.assert_called_once()
+
+@pytest.fixture
+def explanation_context(mock_db):
+    """Mock the light queries used by explain_answer"""
+    row = MagicMock(title="Ułamki", status="published", description="Klasa IV", text="Ile to 1/2 + 1/4?")
+    execute_result = MagicMock()
+    execute_result.first.return_value = row
+    mock_db.execute.return_value = execute_result
+    
+    correct = MagicMock(spec=Answer, id=3, text="3/4", is_correct=1)
+    wrong = MagicMock(spec=Answer, id=4, text="2/6", is_correct=0)
+    with patch("app.services.quiz_service.get_answers_by_question", new_callable=AsyncMock, return_value=[correct, wrong]), \
+         patch("app.services.quiz_service.has_attempt", new_callable=AsyncMock, return_value=True) as mock_has_attempt, \
+         patch("app.services.quiz_service.get_state_backend", return_value=MemoryStateBackend()), \
+         patch("app.services.quiz_service.AIService") as mock_ai:
+        mock_ai.return_value.generate_explanation = AsyncMock(return_value="2/4 + 1/4 = 3/4")
+        yield mock_ai.return_value, mock_has_attempt
+
+@pytest.mark.asyncio
+async def test_explain_answer_generated_once_per_answer(mock_db, mock_student_user, explanation_context):
+    """Test explanations are cached so a class needs one LLM call per answer"""
+    # Arrange
+    ai, _ = explanation_context
+    service = QuizService()
+    
+    # Act
+    first = await service.explain_answer(mock_db, 1, 2, 4, mock_student_user)
+    second = await service.explain_answer(mock_db, 1, 2, 4, mock_student_user)
+    
+    # Assert
+    assert first == second == "2/4 + 1/4 = 3/4"
+    ai.generate_explanation.assert_called_once()
+    kwargs = ai.generate_explanation.call_args.kwargs
+    assert kwargs["is_student_correct"] is False
+    assert kwargs["student_answer_text"] == "2/6"
+
+@pytest.mark.asyncio
+async def test_explain_answer_does_not_cache_failed_generation(mock_db, mock_student_user, explanation_context):
+    """Test a failed LLM call is retried on the next request instead of served from the cache"""
+    # Arrange
+    ai, _ = explanation_context
+    ai.generate_explanation.side_effect = [EXPLANATION_FAILED, "2/4 + 1/4 = 3/4"]
+    service = QuizService()
+    
+    # Act
+    failed = await service.explain_answer(mock_db, 1, 2, 4, mock_student_user)
+    retried = await service.explain_answer(mock_db, 1, 2, 4, mock_student_user)
+    cached = await service.explain_answer(mock_db, 1, 2, 4, mock_student_user)
+    
+    # Assert
+    assert failed == EXPLANATION_FAILED
+    assert retried == cached == "2/4 + 1/4 = 3/4"
+    assert ai.generate_explanation.call_count == 2
+
+@pytest.mark.asyncio
+async def test_explain_answer_requires_attempt(mock_db, mock_student_user, explanation_context):
+    """Test the explanation (which reveals the correct answer) needs a recorded answer"""
+    # Arrange
+    ai, mock_has_attempt = explanation_context
+    mock_has_attempt.return_value = False
+    
+    # Act
+    with pytest.raises(HTTPException) as excinfo:
+        await QuizService().explain_answer(mock_db, 1, 2, 4, mock_student_user)
+    
+    # Assert
+    assert excinfo.value.status_code == 403
+    ai.generate_explanation.assert_not_called()
+
+def test_quiz_edit_drops_stale_explanations():
+    """Test editing a question or its answers removes its cached explanations, other questions keep theirs"""
+    # Arrange
+    def quiz(question_text, answer_text):
+        questions = [
+            MagicMock(id=1, text=question_text, answers=[
+                MagicMock(spec=Answer, id=1, text="3/4", is_correct=1),
+                MagicMock(spec=Answer, id=2, text=answer_text, is_correct=0),
+            ]),
+            MagicMock(id=2, text="Ile to 2 + 2?", answers=[MagicMock(spec=Answer, id=3, text="4", is_correct=1)]),
+        ]
+        return MagicMock(title="Ułamki", level_id=1, questions=questions)
+
+    cache = MemoryStateBackend()
+    before = QuizService._explained_content(quiz("Ile to 1/2 + 1/4?", "2/6"))
+    for question_id, answer_id in ((1, 1), (1, 2), (2, 3)):
+        cache.set(explanation_cache_key(question_id, answer_id), "explanation")
+
+    # Act
+    with patch("app.services.quiz_service.get_state_backend", return_value=cache):
+        QuizService._drop_stale_explanations(before, QuizService._explained_content(quiz("Ile to 1/2 + 1/4?", "1/6")))
+
+    # Assert
+    assert cache.get(explanation_cache_key(1, 1)) is None
+    assert cache.get(explanation_cache_key(1, 2)) is None
+    assert cache.get(explanation_cache_key(2, 3)) == "explanation"
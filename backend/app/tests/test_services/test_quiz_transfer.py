@@ -0,0 +1,120 @@
+import json
+
+import pytest
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from ...db import create_sqlite_engine, get_sqlite_profile
+from ...models import Answer, Base, Level, Question, Quiz, User
+from ...services.quiz_transfer import export_quizzes, import_quizzes
+
+
+def quiz_line(title="Ułamki zwykłe", level="IV", status="published", questions=2, correct=(1,)):
+    """NDJSON line of a quiz with three answers per question"""
+    return json.dumps({
+        "title": title,
+        "level": level,
+        "status": status,
+        "questions": [
+            {
+                "text": f"Pytanie numer {q}?",
+                "answers": [{"text": f"Odpowiedź {a}", "is_correct": a in correct} for a in range(3)],
+            }
+            for q in range(questions)
+        ],
+    }, ensure_ascii=False) + "\n"
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """Session factory on an empty quiz bank with levels and an admin"""
+    engine = create_sqlite_engine(f"sqlite+aiosqlite:///{tmp_path}/bank.db", get_sqlite_profile("performance"))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Level), [
+            {"code": code, "description": f"Klasa {code}", "level": i} for i, code in enumerate(["III", "IV"], start=3)
+        ])
+        await conn.execute(insert(User).values(username="admin", hashed_password="x", role="admin"))
+
+    commits = []
+    event.listen(engine.sync_engine, "commit", lambda conn: commits.append(conn))
+
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    factory.commits = commits
+    yield factory
+
+    await engine.dispose()
+
+
+async def count(factory, model):
+    """Number of rows of a model"""
+    async with factory() as session:
+        return (await session.execute(select(func.count()).select_from(model))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_import_writes_chunks_and_reports_progress(session_factory):
+    """Test valid quizzes are bulk-inserted one transaction per chunk"""
+    # Arrange
+    lines = [quiz_line(title=f"Quiz numer {i}") for i in range(5)]
+    reports = []
+
+    # Act
+    report = await import_quizzes(
+        lines, creator_id=1, chunk_size=2, session_factory=session_factory,
+        progress=lambda r: reports.append(r.imported)
+    )
+
+    # Assert
+    assert (report.imported, report.skipped) == (5, 0)
+    assert reports == [2, 4, 5]
+    assert len(session_factory.commits) == 3
+    assert await count(session_factory, Quiz) == 5
+    assert await count(session_factory, Question) == 10
+    assert await count(session_factory, Answer) == 30
+
+
+@pytest.mark.asyncio
+async def test_import_skips_invalid_lines(session_factory):
+    """Test schema, level and answer key errors are reported per line without stopping the import"""
+    # Arrange
+    lines = [
+        quiz_line(),
+        "{not json\n",
+        quiz_line(level="XII"),
+        quiz_line(correct=(0, 1)),
+        quiz_line(title="A"),
+        "\n",
+        quiz_line(status="archived"),
+        quiz_line(title="Ostatni quiz"),
+    ]
+
+    # Act
+    report = await import_quizzes(lines, creator_id=1, session_factory=session_factory)
+
+    # Assert
+    assert (report.imported, report.skipped) == (2, 5)
+    errors = dict(report.errors)
+    assert sorted(errors) == [2, 3, 4, 5, 7]
+    assert errors[3] == "Unknown level 'XII'"
+    assert errors[4] == "Question 1 must have exactly one correct answer"
+    assert errors[5].startswith("title:")
+    assert errors[7].startswith("status:")
+
+
+@pytest.mark.asyncio
+async def test_export_round_trips_import(session_factory):
+    """Test an exported bank can be imported again unchanged, across keyset batches"""
+    # Arrange
+    lines = [quiz_line(title=f"Quiz numer {i}", level=["III", "IV"][i % 2], status=["draft", "published"][i % 2]) for i in range(5)]
+    await import_quizzes(lines, creator_id=1, session_factory=session_factory)
+
+    # Act
+    chunks = [chunk async for chunk in export_quizzes(batch_size=2, session_factory=session_factory)]
+    published = "".join([chunk async for chunk in export_quizzes(status="published", session_factory=session_factory)])
+
+    # Assert
+    assert len(chunks) == 3
+    assert [json.loads(line) for line in "".join(chunks).splitlines()] == [json.loads(line) for line in lines]
+    assert len(published.splitlines()) == 2
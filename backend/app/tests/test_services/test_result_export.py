@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from ...db import create_sqlite_engine, get_sqlite_profile
+from ...models import Base, Level, Quiz, Result, User
+from ...services.result_export import EXPORT_COLUMNS, iter_result_batches, stream_csv, stream_ndjson
+
+
+@pytest.fixture
+async def read_session(tmp_path):
+    """Session factory on a database with 5 results over two quizzes of different levels"""
+    engine = create_sqlite_engine(f"sqlite+aiosqlite:///{tmp_path}/export.db", get_sqlite_profile("performance"))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Level), [
+            {"code": "I", "description": "Klasa I", "level": 1},
+            {"code": "II", "description": "Klasa II", "level": 2},
+        ])
+        await conn.execute(insert(User), [
+            {"username": f"uczeń{i}", "hashed_password": "x", "role": "student"} for i in range(1, 4)
+        ])
+        await conn.execute(insert(Quiz), [
+            {"title": "Ułamki, część 1", "status": "published", "level_id": 1, "creator_id": 1},
+            {"title": "Geometria", "status": "published", "level_id": 2, "creator_id": 1},
+        ])
+        await conn.execute(insert(Result), [
+            {"user_id": user_id, "quiz_id": quiz_id, "score": user_id, "max_score": 5,
+             "created_at": datetime(2024, 9, day), "updated_at": datetime(2024, 9, day)}
+            for day, (user_id, quiz_id) in enumerate([(1, 1), (2, 1), (3, 1), (1, 2), (2, 2)], start=1)
+        ])
+
+    queries = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, parameters, *args: queries.append((statement, parameters))
+    )
+
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    factory.queries = queries
+    yield factory
+
+    await engine.dispose()
+
+
+async def collect(batches):
+    """Gather all batches of an export"""
+    return [batch async for batch in batches]
+
+
+@pytest.mark.asyncio
+async def test_export_iterates_in_keyset_batches(read_session):
+    """Test all results are read in id order with bounded, seek-based queries"""
+    # Act
+    batches = await collect(iter_result_batches(batch_size=2, session_factory=read_session))
+
+    # Assert
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [row[0] for batch in batches for row in batch] == [1, 2, 3, 4, 5]
+    # Each batch seeks past the last id of the previous one (the OFFSET SQLite renders is always 0)
+    assert all("results.id > ?" in statement for statement, _ in read_session.queries)
+    assert [parameters[0] for _, parameters in read_session.queries] == [0, 2, 4]
+    assert all(parameters[-1] == 0 for _, parameters in read_session.queries)
+
+
+@pytest.mark.asyncio
+async def test_export_filters(read_session):
+    """Test level, quiz and date range filters"""
+    # Act
+    by_level = await collect(iter_result_batches(level_id=2, session_factory=read_session))
+    by_quiz = await collect(iter_result_batches(quiz_id=1, batch_size=2, session_factory=read_session))
+    by_date = await collect(iter_result_batches(
+        date_from=datetime(2024, 9, 2), date_to=datetime(2024, 9, 4), session_factory=read_session
+    ))
+
+    # Assert
+    assert [row[0] for batch in by_level for row in batch] == [4, 5]
+    assert [row[0] for batch in by_quiz for row in batch] == [1, 2, 3]
+    assert [row[0] for batch in by_date for row in batch] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_export_csv_and_ndjson_formats(read_session):
+    """Test both formats carry the same rows, including non-ASCII text and quoting"""
+    # Act
+    csv_text = "".join([chunk async for chunk in stream_csv(iter_result_batches(session_factory=read_session))])
+    ndjson_text = "".join([chunk async for chunk in stream_ndjson(iter_result_batches(session_factory=read_session))])
+
+    # Assert
+    csv_rows = list(csv.DictReader(io.StringIO(csv_text)))
+    json_rows = [json.loads(line) for line in ndjson_text.splitlines()]
+    assert list(csv_rows[0]) == EXPORT_COLUMNS
+    assert len(csv_rows) == len(json_rows) == 5
+    assert csv_rows[0]["quiz_title"] == json_rows[0]["quiz_title"] == "Ułamki, część 1"
+    assert csv_rows[0]["username"] == json_rows[0]["username"] == "uczeń1"
+    assert csv_rows[4]["level"] == json_rows[4]["level"] == "II"
+    assert csv_rows[1]["submitted_at"] == json_rows[1]["submitted_at"] == "2024-09-02T00:00:00"
+    assert json_rows[2]["score"] == 3
+
+
+@pytest.mark.asyncio
+async def test_export_of_empty_selection_has_only_header(read_session):
+    """Test an export without matching rows"""
+    # Act
+    csv_text = "".join([chunk async for chunk in stream_csv(iter_result_batches(quiz_id=999, session_factory=read_session))])
+
+    # Assert
+    assert csv_text.strip() == ",".join(EXPORT_COLUMNS)
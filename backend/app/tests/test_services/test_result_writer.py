@@ -0,0 +1,371 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from ...db import count_queries, create_sqlite_engine, get_sqlite_profile
+from ...crud.answer import get_answer_key
+from ...crud.answer_attempt import get_attempt_columns, get_attempt_watermark, get_quiz_score, has_attempt
+from ...crud.result import get_history
+from ...crud.quiz_stats import get_quiz_stats, rebuild, score_bucket
+from ...db.rebuild_stats import rebuild_stats
+from ...services.quiz_service import QuizService
+from ...models import Answer, AnswerAttempt, Base, Level, Question, Quiz, Result, ResultHistory, User
+from ...services.result_writer import AttemptWriteBuffer, ResultWriteBuffer
+
+STUDENTS = 30
+
+
+@pytest.fixture
+async def write_session(tmp_path):
+    """Session factory on a single-writer engine with students and one quiz"""
+    engine = create_sqlite_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/results.db",
+        get_sqlite_profile("performance"),
+        pool_size=1,
+        max_overflow=0,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Level).values(code="I", description="Klasa I", level=1))
+        await conn.execute(insert(User), [
+            {"username": f"student{i}", "hashed_password": "x", "role": "student"} for i in range(STUDENTS)
+        ])
+        await conn.execute(insert(Quiz).values(title="Ułamki", status="published", level_id=1, creator_id=1))
+        # Questions 1-3, answer 2q-1 is correct and 2q is wrong
+        await conn.execute(insert(Question), [{"text": f"Pytanie {q}", "quiz_id": 1} for q in range(1, 4)])
+        await conn.execute(insert(Answer), [
+            {"text": text, "is_correct": is_correct, "question_id": q}
+            for q in range(1, 4) for text, is_correct in (("dobrze", 1), ("źle", 0))
+        ])
+
+    commits = []
+    event.listen(engine.sync_engine, "commit", lambda conn: commits.append(conn))
+
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    factory.commits = commits
+    yield factory
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_share_one_commit(write_session):
+    """Test a class submitting at once is stored with a single transaction"""
+    # Arrange
+    buffer = ResultWriteBuffer(session_factory=write_session, max_delay=0.01)
+
+    # Act
+    results = await asyncio.gather(*(
+        buffer.submit(user_id=i + 1, quiz_id=1, score=i % 6, max_score=5) for i in range(STUDENTS)
+    ))
+
+    # Assert
+    assert len(write_session.commits) == 1
+    assert [(r.user_id, r.score) for r in results] == [(i + 1, i % 6) for i in range(STUDENTS)]
+    assert all(r.id is not None and r.created_at is not None for r in results)
+
+
+@pytest.mark.asyncio
+async def test_resubmission_updates_existing_result(write_session):
+    """Test a second submission updates the student's result instead of adding one"""
+    # Arrange
+    buffer = ResultWriteBuffer(session_factory=write_session, max_delay=0)
+    first = await buffer.submit(user_id=1, quiz_id=1, score=2, max_score=5)
+
+    # Act
+    second = await buffer.submit(user_id=1, quiz_id=1, score=5, max_score=5)
+
+    # Assert
+    async with write_session() as session:
+        stored = (await session.execute(select(Result))).scalars().all()
+        history = await get_history(session, user_id=1, quiz_id=1)
+    assert second.id == first.id
+    assert [(r.user_id, r.score) for r in stored] == [(1, 5)]
+    assert [entry.score for entry in history] == [5, 2]
+
+
+@pytest.mark.asyncio
+async def test_duplicates_in_one_batch_keep_last_submission(write_session):
+    """Test duplicate (user, quiz) pairs in a batch collapse to the latest score"""
+    # Arrange
+    buffer = ResultWriteBuffer(session_factory=write_session, max_delay=0.01)
+
+    # Act
+    results = await asyncio.gather(
+        buffer.submit(user_id=1, quiz_id=1, score=1, max_score=5),
+        buffer.submit(user_id=1, quiz_id=1, score=4, max_score=5),
+    )
+
+    # Assert
+    async with write_session() as session:
+        history = (await session.execute(select(ResultHistory).order_by(ResultHistory.id))).scalars().all()
+    assert [r.score for r in results] == [4, 4]
+    assert [entry.score for entry in history] == [1, 4]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_split_at_max_batch(write_session):
+    """Test large bursts are written in several transactions of bounded size"""
+    # Arrange
+    buffer = ResultWriteBuffer(session_factory=write_session, max_delay=0.01, max_batch=10)
+
+    # Act
+    await asyncio.gather(*(
+        buffer.submit(user_id=i + 1, quiz_id=1, score=3, max_score=5) for i in range(STUDENTS)
+    ))
+
+    # Assert
+    assert len(write_session.commits) == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_row_fails_only_its_waiter(write_session):
+    """Test a row that cannot be committed fails its own submission and the rest of the batch is stored"""
+    # Arrange
+    buffer = ResultWriteBuffer(session_factory=write_session, max_delay=0.01)
+
+    # Act
+    results = await asyncio.gather(
+        buffer.submit(user_id=1, quiz_id=1, score=3, max_score=5),
+        buffer.submit(user_id=2, quiz_id=999, score=3, max_score=5),  # unknown quiz, FK violation
+        buffer.submit(user_id=3, quiz_id=1, score=4, max_score=5),
+        return_exceptions=True,
+    )
+
+    # Assert
+    assert isinstance(results[1], Exception)
+    assert [(r.user_id, r.score) for r in (results[0], results[2])] == [(1, 3), (3, 4)]
+    async with write_session() as session:
+        assert len((await session.execute(select(Result))).scalars().all()) == 2
+        assert len((await session.execute(select(ResultHistory))).scalars().all()) == 2
+        assert (await get_quiz_stats(session, 1)).attempt_count == 2
+
+
+@pytest.mark.asyncio
+async def test_result_without_max_score_is_rejected(write_session):
+    """Test a result with a zero max_score is refused before it reaches a batch"""
+    # Arrange
+    buffer = ResultWriteBuffer(session_factory=write_session, max_delay=0.01)
+
+    # Act
+    results = await asyncio.gather(
+        buffer.submit(user_id=1, quiz_id=1, score=0, max_score=0),
+        buffer.submit(user_id=2, quiz_id=1, score=2, max_score=3),
+        return_exceptions=True,
+    )
+
+    # Assert
+    assert isinstance(results[0], ValueError)
+    assert results[1].score == 2
+    assert score_bucket(0, 0) == 0
+
+
+async def record(buffer: AttemptWriteBuffer, question_id: int, correct: bool, user_id: int = 1):
+    """Record an attempt of a student on question 1-3 of the quiz"""
+    answer_id = 2 * question_id - 1 if correct else 2 * question_id
+    await buffer.record(
+        user_id=user_id, quiz_id=1, question_id=question_id, answer_id=answer_id, is_correct=correct
+    )
+
+
+@pytest.mark.asyncio
+async def test_score_counts_first_attempt_per_question(write_session):
+    """Test the server score uses the first attempt per question, unanswered questions score 0"""
+    # Arrange
+    buffer = AttemptWriteBuffer(session_factory=write_session, max_delay=0)
+    await record(buffer, question_id=1, correct=False)
+    await record(buffer, question_id=1, correct=True)  # re-checked after the answer was revealed
+    await record(buffer, question_id=2, correct=True)
+    await record(buffer, question_id=3, correct=True, user_id=2)  # another student
+
+    # Act
+    async with write_session() as session:
+        score = await get_quiz_score(session, user_id=1, quiz_id=1)
+        missing = await get_quiz_score(session, user_id=1, quiz_id=999)
+
+    # Assert
+    assert score == (1, 3, 3)
+    assert missing is None
+
+
+@pytest.mark.asyncio
+async def test_retake_in_the_same_second_is_scored_on_its_own_attempts(write_session):
+    """Test two submissions within one second each count only the attempts checked since the previous one"""
+    # Arrange
+    attempts = AttemptWriteBuffer(session_factory=write_session, max_delay=0)
+    results = ResultWriteBuffer(session_factory=write_session, max_delay=0)
+
+    async def take(correct):
+        for question_id in (1, 2, 3):
+            await record(attempts, question_id=question_id, correct=correct)
+        async with write_session() as session:
+            score, max_score, last_attempt_id = await get_quiz_score(session, user_id=1, quiz_id=1)
+        await results.submit(
+            user_id=1, quiz_id=1, score=score, max_score=max_score, last_attempt_id=last_attempt_id
+        )
+        return score
+
+    # Act
+    first = await take(correct=False)
+    retake = await take(correct=True)
+    await record(attempts, question_id=1, correct=False)
+    await results.submit(user_id=1, quiz_id=1, score=0, max_score=3)  # graded, watermark taken on write
+
+    # Assert
+    assert (first, retake) == (0, 3)
+    async with write_session() as session:
+        history = (await session.execute(select(ResultHistory).order_by(ResultHistory.id))).scalars().all()
+    assert [row.last_attempt_id for row in history] == [3, 6, 7]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_attempts_share_one_commit(write_session):
+    """Test answers checked at the same time by a class are appended in one transaction"""
+    # Arrange
+    buffer = AttemptWriteBuffer(session_factory=write_session, max_delay=0.01)
+
+    # Act
+    await asyncio.gather(*(
+        record(buffer, question_id=1, correct=i % 2 == 0, user_id=i + 1) for i in range(STUDENTS)
+    ))
+
+    # Assert
+    async with write_session() as session:
+        attempts = (await session.execute(select(AnswerAttempt))).scalars().all()
+    assert len(write_session.commits) == 1
+    assert len(attempts) == STUDENTS
+
+
+@pytest.mark.asyncio
+async def test_answer_key_and_attempt_lookup(write_session):
+    """Test the light grading queries against a real schema"""
+    # Arrange
+    buffer = AttemptWriteBuffer(session_factory=write_session, max_delay=0)
+    await record(buffer, question_id=2, correct=False)
+
+    # Act
+    async with write_session() as session:
+        key = await get_answer_key(session, quiz_id=1)
+        missing = await get_answer_key(session, quiz_id=999)
+        answered = await has_attempt(session, user_id=1, quiz_id=1, question_id=2, answer_id=4)
+        not_answered = await has_attempt(session, user_id=1, quiz_id=1, question_id=2, answer_id=3)
+
+    # Assert
+    assert key == ("published", {1: {1: True, 2: False}, 2: {3: True, 4: False}, 3: {5: True, 6: False}})
+    assert missing is None
+    assert answered is True
+    assert not_answered is False
+
+
+@pytest.mark.asyncio
+async def test_quiz_stats_follow_every_submission(write_session):
+    """Test statistics are updated in the submission transaction, resubmissions included"""
+    # Arrange
+    buffer = ResultWriteBuffer(session_factory=write_session, max_delay=0.01, max_batch=4)
+    scores = [0, 1, 2, 3, 3, 3]
+
+    # Act
+    await asyncio.gather(*(
+        buffer.submit(user_id=i % 4 + 1, quiz_id=1, score=score, max_score=3) for i, score in enumerate(scores)
+    ))
+    async with write_session() as session:
+        stats = await get_quiz_stats(session, quiz_id=1)
+        response = await QuizService().get_quiz_stats(session, quiz_id=1)
+
+    # Assert
+    assert len(write_session.commits) == 2
+    assert (stats.attempt_count, stats.score_sum, stats.score_sq_sum, stats.max_score_sum) == (6, 12, 32, 18)
+    assert stats.histogram == [1, 0, 0, 1, 0, 0, 1, 0, 0, 3]
+    assert response.mean_score == 2
+    assert response.score_stddev == pytest.approx((32 / 6 - 4) ** 0.5)
+    assert response.mean_percent == pytest.approx(100 * 12 / 18)
+
+
+@pytest.mark.asyncio
+async def test_quiz_stats_of_quiz_without_results(write_session):
+    """Test a quiz nobody took has empty statistics and an unknown quiz has none"""
+    # Act
+    async with write_session() as session:
+        empty = await QuizService().get_quiz_stats(session, quiz_id=1)
+        missing = await get_quiz_stats(session, quiz_id=999)
+
+    # Assert
+    assert empty.attempt_count == 0
+    assert empty.mean_score is None
+    assert empty.histogram == [0] * 10
+    assert missing is None
+
+
+@pytest.mark.asyncio
+async def test_rebuild_matches_incremental_stats(write_session):
+    """Test the rebuild command backfills old results and reproduces the running aggregate"""
+    # Arrange
+    buffer = ResultWriteBuffer(session_factory=write_session, max_delay=0)
+    for user_id, score in ((1, 1), (2, 2), (1, 3)):
+        await buffer.submit(user_id=user_id, quiz_id=1, score=score, max_score=3)
+    async with write_session() as session:
+        incremental = (await get_quiz_stats(session, quiz_id=1)).histogram
+        # A result stored before result_history existed
+        await session.execute(insert(Result).values(user_id=3, quiz_id=1, score=0, max_score=3))
+        await session.commit()
+
+    # Act
+    async with write_session() as session:
+        await rebuild(session, quiz_id=1)
+        await session.commit()
+        rebuilt = (await get_quiz_stats(session, quiz_id=1)).histogram
+    await rebuild_stats(session_factory=write_session)
+    async with write_session() as session:
+        backfilled = await get_quiz_stats(session, quiz_id=1)
+        history_count = len((await session.execute(select(ResultHistory))).scalars().all())
+
+    # Assert
+    assert rebuilt == incremental == [0, 0, 0, 1, 0, 0, 1, 0, 0, 1]
+    assert backfilled.attempt_count == 4
+    assert backfilled.histogram == [1, 0, 0, 1, 0, 0, 1, 0, 0, 1]
+    assert history_count == 4
+
+
+@pytest.mark.asyncio
+async def test_attempt_columns_read_incrementally(write_session):
+    """Test the columnar attempt read used by the item analysis"""
+    # Arrange
+    buffer = AttemptWriteBuffer(session_factory=write_session, max_delay=0)
+    await record(buffer, question_id=1, correct=True)
+    await record(buffer, question_id=2, correct=False, user_id=2)
+    await record(buffer, question_id=3, correct=True, user_id=3)
+
+    # Act
+    async with write_session() as session:
+        watermark = await get_attempt_watermark(session, quiz_id=1)
+        everything = await get_attempt_columns(session, quiz_id=1)
+        newer = await get_attempt_columns(session, quiz_id=1, after_id=1, up_to_id=2)
+        empty = await get_attempt_watermark(session, quiz_id=999)
+
+    # Assert
+    assert watermark == (3, 3)
+    assert everything == [(1, 1, 1, 1, 1), (2, 2, 2, 4, 0), (3, 3, 3, 5, 1)]
+    assert newer == [(2, 2, 2, 4, 0)]
+    assert empty == (0, 0)
+
+
+
+@pytest.mark.asyncio
+async def test_attempt_columns_read_is_counted(write_session):
+    """Test the read on the raw DBAPI cursor shows up in the query counter"""
+    # Arrange
+    buffer = AttemptWriteBuffer(session_factory=write_session, max_delay=0)
+    await record(buffer, question_id=1, correct=True)
+
+    # Act
+    async with write_session() as session:
+        with count_queries() as stats:
+            rows = await get_attempt_columns(session, quiz_id=1)
+
+    # Assert
+    assert rows == [(1, 1, 1, 1, 1)]
+    assert stats.count >= 1
+    assert any("FROM answer_attempts" in statement for statement in stats.statements)
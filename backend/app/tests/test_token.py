@@ -6,7 +6,7 @@ from sqlalchemy.pool import StaticPool
 import pytest_asyncio
 
 from app.main import app
-from app.db import get_db, Base
+from app.db import get_db, get_read_db, Base
 from app.models.user import User
 from app.core.security import get_password_hash
 
@@ -27,6 +27,7 @@ async def override_get_db():
         yield db
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 @pytest_asyncio.fixture()
 async def test_db():
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Item analysis benchmark over a quiz with many recorded answer attempts.
+
+A fresh database file is seeded with one quiz and the given number of
+attempts (students answering every question, some of them twice). The
+benchmark then times the item analysis endpoint logic three ways: a cold
+cache (full columnar read), a warm cache without new attempts and a warm
+cache after a class submitted another round of answers.
+
+Usage:
+    python -m benchmarks.bench_item_analysis [--attempts 100000] [--questions 20] [--rounds 20]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.db import create_sqlite_engine, get_sqlite_profile
+from app.models import Answer, AnswerAttempt, Base, Level, Question, Quiz, User
+from app.services.item_analysis import ItemAnalysisCache
+
+ANSWERS_PER_QUESTION = 4
+CLASS_SIZE = 30
+
+
+async def seed(engine, attempts: int, questions: int) -> int:
+    """Create the schema and insert the quiz with its attempts, returns the number of students"""
+    students = max(attempts // questions, 1)
+    rng = random.Random(0)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Level).values(code="I", description="Klasa I", level=1))
+        await conn.execute(insert(User), [
+            {"username": f"student{i}", "hashed_password": "x", "role": "student"} for i in range(students)
+        ])
+        await conn.execute(insert(Quiz).values(title="Benchmark", status="published", level_id=1, creator_id=1))
+        await conn.execute(insert(Question), [{"text": f"Question {q}", "quiz_id": 1} for q in range(questions)])
+        # Answer 1 of every question is correct
+        await conn.execute(insert(Answer), [
+            {"text": f"Answer {a}", "is_correct": int(a == 0), "question_id": q + 1}
+            for q in range(questions) for a in range(ANSWERS_PER_QUESTION)
+        ])
+        rows = []
+        for i in range(attempts):
+            user_id, question = rng.randrange(students) + 1, rng.randrange(questions)
+            choice = rng.randrange(ANSWERS_PER_QUESTION)
+            rows.append({
+                "user_id": user_id,
+                "quiz_id": 1,
+                "question_id": question + 1,
+                "answer_id": question * ANSWERS_PER_QUESTION + choice + 1,
+                "is_correct": int(choice == 0),
+            })
+        await conn.execute(insert(AnswerAttempt), rows)
+    return students
+
+
+async def add_round(session_factory, questions: int) -> None:
+    """A class answers one more question each"""
+    async with session_factory() as session:
+        await session.execute(insert(AnswerAttempt), [
+            {"user_id": i + 1, "quiz_id": 1, "question_id": i % questions + 1,
+             "answer_id": (i % questions) * ANSWERS_PER_QUESTION + 1, "is_correct": 1}
+            for i in range(CLASS_SIZE)
+        ])
+        await session.commit()
+
+
+async def timed(cache: ItemAnalysisCache, session_factory) -> float:
+    """Run one item analysis with its own session, returns milliseconds"""
+    async with session_factory() as session:
+        started = time.perf_counter()
+        await cache.get(session, 1)
+        return (time.perf_counter() - started) * 1000
+
+
+async def run(attempts: int, questions: int, rounds: int) -> None:
+    """Seed the database and time the three cache states"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_sqlite_engine(f"sqlite+aiosqlite:///{Path(directory)}/bench.db", get_sqlite_profile("performance"))
+        students = await seed(engine, attempts, questions)
+        session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        print(f"{attempts} attempts, {questions} questions, {students} students")
+
+        cold = []
+        for _ in range(rounds):
+            cold.append(await timed(ItemAnalysisCache(), session_factory))
+
+        cache = ItemAnalysisCache()
+        await timed(cache, session_factory)
+        warm = [await timed(cache, session_factory) for _ in range(rounds)]
+
+        incremental = []
+        for _ in range(rounds):
+            await add_round(session_factory, questions)
+            incremental.append(await timed(cache, session_factory))
+
+        for name, samples in (("cold cache", cold), ("warm cache", warm), ("new attempts", incremental)):
+            print(f"{name:>14}: median {statistics.median(samples):7.1f} ms, max {max(samples):7.1f} ms")
+        await engine.dispose()
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attempts", type=int, default=100000, help="Recorded answer attempts")
+    parser.add_argument("--questions", type=int, default=20, help="Questions in the quiz")
+    parser.add_argument("--rounds", type=int, default=20, help="Timed runs per cache state")
+    args = parser.parse_args()
+    asyncio.run(run(args.attempts, args.questions, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Throughput comparison of the rate limiting middleware variants.
+
+Drives the ASGI app directly (no sockets) with a fixed number of concurrent
+clients requesting an unrestricted `GET /api/v1/quizzes/{id}` route and compares:
+
+- no middleware,
+- the previous `BaseHTTPMiddleware` based implementation (same matching rules),
+- the pure ASGI `RateLimitingMiddleware`.
+
+Usage:
+    python -m benchmarks.bench_middleware [--concurrency 50] [--requests 20000]
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.middleware import RateLimitingMiddleware
+
+RATE_LIMITS = {
+    "/api/v1/quizzes": {"rate": 5, "per": 60, "burst": 5},
+    "/api/v1/auth/token": {"rate": 3, "per": 60, "burst": 3, "key": "client"},
+}
+
+
+class BaseHTTPRateLimitingMiddleware(BaseHTTPMiddleware):
+    """Rate limiting on top of BaseHTTPMiddleware, as implemented before the ASGI rewrite"""
+
+    def __init__(self, app, rate_limits=None):
+        super().__init__(app)
+        self.rules = RateLimitingMiddleware(app, rate_limits=rate_limits)
+
+    async def dispatch(self, request, call_next):
+        rule = self.rules.match(request.method, request.url.path)
+        if rule is not None:
+            rule.limiter.check(self.rules.get_key(rule, request.scope))
+        return await call_next(request)
+
+
+def build_app(middleware_class=None) -> FastAPI:
+    """Build an app with a single unrestricted JSON route"""
+    app = FastAPI()
+    if middleware_class is not None:
+        app.add_middleware(middleware_class, rate_limits=RATE_LIMITS)
+
+    @app.get("/api/v1/quizzes/{quiz_id}")
+    async def get_quiz(quiz_id: int):
+        return {"id": quiz_id, "title": "Ułamki", "status": "published"}
+
+    return app
+
+
+async def call(app, path: str) -> int:
+    """Send a single GET request through the ASGI interface"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    status_code = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+
+async def measure(app, concurrency: int, requests: int) -> float:
+    """Return requests per second for the given app"""
+    per_client = requests // concurrency
+
+    async def client(client_id: int):
+        for i in range(per_client):
+            await call(app, f"/api/v1/quizzes/{client_id * per_client + i}")
+
+    # Warm up routing and middleware stack construction
+    await call(app, "/api/v1/quizzes/1")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return per_client * concurrency / elapsed
+
+
+async def run(concurrency: int, requests: int) -> None:
+    """Run all variants and print a comparison table"""
+    variants = [
+        ("no middleware", build_app()),
+        ("BaseHTTPMiddleware", build_app(BaseHTTPRateLimitingMiddleware)),
+        ("pure ASGI", build_app(RateLimitingMiddleware)),
+    ]
+    results = {}
+    for name, app in variants:
+        results[name] = await measure(app, concurrency, requests)
+
+    reference = results["no middleware"]
+    print(f"concurrency={concurrency} requests={requests}")
+    for name, rps in results.items():
+        print(f"{name:<20} {rps:>10,.0f} req/s  ({rps / reference:.0%} of bare app)")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50, help="Number of concurrent clients")
+    parser.add_argument("--requests", type=int, default=20_000, help="Total number of requests per variant")
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
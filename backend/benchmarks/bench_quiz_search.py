@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+Full-text quiz search benchmark over a large quiz bank.
+
+A fresh database file is seeded through the bulk import path (so the
+search index is filled by its triggers) with quizzes of ten questions and
+four answers each. Texts are drawn from a synthetic vocabulary with a
+Zipf-like distribution, so the timed queries cover rare, medium and
+common words, multi-word queries and prefixes.
+
+Usage:
+    python -m benchmarks.bench_quiz_search [--quizzes 100000] [--rounds 50]
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.quiz import bulk_create_quizzes
+from app.db import create_sqlite_engine, get_sqlite_profile
+from app.models import Base, Level, User
+from app.services.quiz_service import QuizService
+
+QUESTIONS_PER_QUIZ = 10
+ANSWERS_PER_QUESTION = 4
+VOCABULARY = 50000
+CHUNK = 1000
+
+CONSONANTS = ["b", "c", "d", "f", "g", "k", "l", "ł", "m", "n", "p", "r", "s", "t", "w", "z"]
+VOWELS = ["a", "e", "i", "o", "u", "y", "ą", "ę"]
+
+
+def make_vocabulary(size: int) -> list:
+    """Distinct random pseudo-words of 2-4 syllables, the most frequent ones first"""
+    rng = random.Random(1)
+    words = {}
+    while len(words) < size:
+        word = "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4)))
+        words.setdefault(word, None)
+    return list(words)
+
+
+async def seed(session_factory, quizzes: int, words: list) -> None:
+    """Insert the quiz bank in chunks through the bulk import path"""
+    rng = random.Random(0)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+
+    def sentence(length: int) -> str:
+        return " ".join(rng.choices(words, cum_weights=cum_weights, k=length))
+
+    for start in range(0, quizzes, CHUNK):
+        chunk = [
+            {
+                "title": sentence(3),
+                "level_id": 1,
+                "creator_id": 1,
+                "status": "published",
+                "questions": [
+                    {
+                        "text": sentence(8),
+                        "answers": [{"text": sentence(2), "is_correct": a == 0} for a in range(ANSWERS_PER_QUESTION)],
+                    }
+                    for _ in range(QUESTIONS_PER_QUIZ)
+                ],
+            }
+            for _ in range(min(CHUNK, quizzes - start))
+        ]
+        async with session_factory() as session:
+            await bulk_create_quizzes(session, chunk)
+            await session.commit()
+
+
+async def timed(service: QuizService, session_factory, query: str) -> float:
+    """Run one search (first page) with its own session, returns milliseconds"""
+    async with session_factory() as session:
+        started = time.perf_counter()
+        await service.search_quizzes(db=session, user=MagicMock(role="admin"), text=query)
+        return (time.perf_counter() - started) * 1000
+
+
+async def run(quizzes: int, rounds: int) -> None:
+    """Seed the database and time searches of different selectivity"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_sqlite_engine(f"sqlite+aiosqlite:///{Path(directory)}/bench.db", get_sqlite_profile("performance"))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(Level).values(code="I", description="Klasa I", level=1))
+            await conn.execute(insert(User).values(username="admin", hashed_password="x", role="admin"))
+        session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        words = make_vocabulary(VOCABULARY)
+        started = time.perf_counter()
+        await seed(session_factory, quizzes, words)
+        async with session_factory() as session:
+            rows = (await session.execute(text("SELECT count(*) FROM quiz_search"))).scalar()
+        print(
+            f"{quizzes} quizzes, {quizzes * QUESTIONS_PER_QUIZ} questions, {rows} index rows "
+            f"(seeded in {time.perf_counter() - started:.1f} s)"
+        )
+
+        queries = {
+            "rare word": words[-1],
+            "medium word": words[500],
+            "two words": f"{words[50]} {words[70]}",
+            "prefix": words[3000][:5],
+            "common word": words[0],
+        }
+        service = QuizService()
+        for name, query in queries.items():
+            await timed(service, session_factory, query)
+            samples = sorted([await timed(service, session_factory, query) for _ in range(rounds)])
+            p95 = samples[int(0.95 * (len(samples) - 1))]
+            print(f"{name:>12} {query!r:>16}: median {statistics.median(samples):7.2f} ms, p95 {p95:7.2f} ms")
+        await engine.dispose()
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quizzes", type=int, default=100000, help="Quizzes in the bank")
+    parser.add_argument("--rounds", type=int, default=50, help="Timed runs per query")
+    args = parser.parse_args()
+    asyncio.run(run(args.quizzes, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks of the QuizService hot paths, with a regression check.
+
+Every scale is a fresh database file filled by the synthetic dataset
+generator (app.db.synthetic) with the given number of quizzes, half as many
+students and 20 results per student, and the question bank is indexed. The
+hot paths are then timed, each call with its own session, as the routers
+call them:
+
+- get_quizzes for a student and an admin, sorted by level, title and updated_at
+- get_quiz_by_id of a published quiz
+- check_answer, with the AI explanation stubbed out
+- update_quiz of a 20-question quiz, changing all 20 questions and 80 answers
+- create_ai_quiz of 10 questions, with the AI generation stubbed out
+- submit_quiz_result (the router function, without an Idempotency-Key)
+
+`run` writes the median, p95, mean and min in ms per hot path and scale to a
+JSON file. `compare` exits with 1 if a hot path of the current file got
+slower than the baseline by more than --threshold (and more than
+--min-delta-ms, which keeps sub-millisecond noise out). Compare runs made on
+the same machine with the same options.
+
+Usage:
+    python -m benchmarks.bench_quiz_service run [--scales 100,1000,10000] [--rounds 30] [--output bench-quiz-service.json]
+    python -m benchmarks.bench_quiz_service compare BASELINE CURRENT [--threshold 0.2] [--min-delta-ms 0.5]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+from unittest.mock import MagicMock, patch
+
+from fastapi import Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, sessionmaker
+
+from app.crud.quiz import bulk_create_quizzes
+from app.db import create_sqlite_engine, get_sqlite_profile
+from app.db.synthetic import SyntheticSpec, generate
+from app.models import Base, Question, Quiz, User
+from app.routers import quizzes as quizzes_router
+from app.schemas.answer import AnswerCheck, AnswerCreateOrUpdate
+from app.schemas.question import QuestionCreateOrUpdate
+from app.schemas.quiz import QuizCreate, QuizUpdate
+from app.services import quiz_service as quiz_service_module
+from app.services.ai_service import AIService
+from app.services.question_bank import index_questions
+from app.services.quiz_service import QuizService
+from app.services.result_writer import AttemptWriteBuffer, ResultWriteBuffer
+from benchmarks.fake_openai import explanation_content, quiz_content
+
+WARMUP = 2
+UPDATE_QUESTIONS = 20
+UPDATE_ANSWERS = 4
+GENERATED_QUESTIONS = 10
+
+
+async def stub_explanation(self, **kwargs) -> str:
+    """AIService.generate_explanation without the AI"""
+    return explanation_content("answered correctly" if kwargs.get("is_student_correct") else "")
+
+
+async def stub_generation(topic: str, question_count: int, level_data: Dict):
+    """AIQuizGeneratorService.generate_quiz without the AI"""
+    content = json.loads(quiz_content(f'Generate {question_count} questions on the topic: "{topic}"'))
+    return content["questions"], content["title"]
+
+
+async def measure(session_factory, call: Callable[[AsyncSession, int], Awaitable], rounds: int) -> Dict[str, float]:
+    """
+    Time a hot path, each call with its own session
+
+    Args:
+        session_factory: Factory for the sessions
+        call: Coroutine function taking the session and the call number
+        rounds: Timed calls, after WARMUP untimed ones
+
+    Returns:
+        Median, p95, mean and min in milliseconds
+    """
+    samples = []
+    for i in range(WARMUP + rounds):
+        async with session_factory() as session:
+            started = time.perf_counter()
+            await call(session, i)
+            elapsed = (time.perf_counter() - started) * 1000
+        if i >= WARMUP:
+            samples.append(elapsed)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "mean_ms": statistics.fmean(samples),
+        "min_ms": samples[0],
+    }
+
+
+async def prepare(engine, session_factory, scale: int, seed: int) -> Dict:
+    """Fill the database and pick the users and quizzes the hot paths work on"""
+    await generate(
+        SyntheticSpec(seed=seed, students=max(scale // 2, 1), admins=5, quizzes=scale, results_per_student=20),
+        engine,
+        session_factory,
+    )
+    async with session_factory() as db:
+        # The bulk load leaves the question bank unindexed
+        await index_questions(db)
+        await db.commit()
+        student_id = (await db.execute(select(User.id).where(User.role == "student").order_by(User.id))).scalars().first()
+        admin_id, level_id = (await db.execute(
+            select(Quiz.creator_id, Quiz.level_id).order_by(Quiz.id).limit(1)
+        )).one()
+        published = (await db.execute(
+            select(Quiz).where(Quiz.status == "published").order_by(Quiz.id).limit(1)
+            .options(selectinload(Quiz.questions).selectinload(Question.answers))
+        )).scalar_one()
+        question = published.questions[0]
+        answer_id = next(answer.id for answer in question.answers if not answer.is_correct)
+
+        quiz_ids = await bulk_create_quizzes(db, [{
+            "title": "Benchmark update",
+            "level_id": level_id,
+            "creator_id": admin_id,
+            "status": "draft",
+            "questions": [
+                {
+                    "text": f"Question {q} of the update benchmark?",
+                    "answers": [{"text": f"Answer {a}", "is_correct": a == 0} for a in range(UPDATE_ANSWERS)],
+                }
+                for q in range(UPDATE_QUESTIONS)
+            ],
+        }])
+        await db.commit()
+        update_quiz = (await db.execute(
+            select(Quiz).where(Quiz.id == quiz_ids[0])
+            .options(selectinload(Quiz.questions).selectinload(Question.answers))
+        )).scalar_one()
+        update_ids = [(q.id, [a.id for a in q.answers]) for q in update_quiz.questions]
+
+    return {
+        "student": MagicMock(id=student_id, role="student"),
+        "admin": MagicMock(id=admin_id, role="admin"),
+        "level_id": level_id,
+        "quiz_id": published.id,
+        "answer_check": AnswerCheck(question_id=question.id, answer_id=answer_id),
+        "update_quiz_id": quiz_ids[0],
+        "update_ids": update_ids,
+    }
+
+
+def update_payload(level_id: int, update_ids: List, i: int) -> QuizUpdate:
+    """Quiz update changing the text of every question and answer"""
+    return QuizUpdate(
+        title=f"Benchmark update {i}",
+        level_id=level_id,
+        status="draft",
+        questions=[
+            QuestionCreateOrUpdate(
+                id=question_id,
+                text=f"Question {q} of the update benchmark, edit {i}?",
+                answers=[
+                    AnswerCreateOrUpdate(id=answer_id, text=f"Answer {a}, edit {i}", is_correct=a == 0)
+                    for a, answer_id in enumerate(answer_ids)
+                ],
+            )
+            for q, (question_id, answer_ids) in enumerate(update_ids)
+        ],
+    )
+
+
+def hot_paths(service: QuizService, data: Dict, rounds: int) -> Dict[str, Callable[[AsyncSession, int], Awaitable]]:
+    """The timed calls, by name"""
+    cases = {}
+    for role in ("student", "admin"):
+        for sort_by in ("level", "title", "updated_at"):
+            cases[f"get_quizzes[{role},{sort_by}]"] = (
+                lambda db, i, user=data[role], sort_by=sort_by: service.get_quizzes(db, user, sort_by=sort_by)
+            )
+    cases["get_quiz_by_id"] = lambda db, i: service.get_quiz_by_id(db, data["quiz_id"])
+    cases["check_answer"] = lambda db, i: service.check_answer(
+        db, data["quiz_id"], data["answer_check"], data["student"]
+    )
+    # Payloads are built up front, request parsing is not part of the hot path
+    updates = [update_payload(data["level_id"], data["update_ids"], i) for i in range(WARMUP + rounds)]
+    cases["update_quiz"] = lambda db, i: service.update_quiz(db, data["update_quiz_id"], updates[i])
+    cases["create_ai_quiz"] = lambda db, i: service.create_ai_quiz(
+        db,
+        QuizCreate(
+            title="Benchmark generation",
+            level_id=data["level_id"],
+            topic=f"Benchmark topic {i}",
+            question_count=GENERATED_QUESTIONS,
+        ),
+        data["admin"].id,
+    )
+    cases["submit_quiz_result"] = lambda db, i: quizzes_router.submit_quiz_result(
+        quiz_id=data["quiz_id"],
+        response=Response(),
+        result_data=None,
+        idempotency_key=None,
+        db=db,
+        current_user=data["student"],
+    )
+    return cases
+
+
+async def run_scale(scale: int, rounds: int, seed: int, only: List[str]) -> Dict[str, Dict[str, float]]:
+    """Benchmark all hot paths on a fresh database of one scale"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_sqlite_engine(f"sqlite+aiosqlite:///{Path(directory)}/bench.db", get_sqlite_profile("performance"))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        started = time.perf_counter()
+        data = await prepare(engine, session_factory, scale, seed)
+        print(f"scale {scale}: seeded in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+
+        # The AIService of QuizService warns about the missing key
+        logging.getLogger("app.services.ai_service").setLevel(logging.ERROR)
+        service = QuizService()
+        service.ai_generator.generate_quiz = stub_generation
+        results = {}
+        with patch.object(AIService, "generate_explanation", stub_explanation), \
+                patch.object(quiz_service_module, "attempt_writer", AttemptWriteBuffer(session_factory)), \
+                patch.object(quizzes_router, "result_writer", ResultWriteBuffer(session_factory)):
+            for name, call in hot_paths(service, data, rounds).items():
+                if only and not any(name.startswith(prefix) for prefix in only):
+                    continue
+                results[name] = await measure(session_factory, call, rounds)
+                print(
+                    f"{name:<32} {scale:>7}: median {results[name]['median_ms']:8.2f} ms, "
+                    f"p95 {results[name]['p95_ms']:8.2f} ms"
+                )
+        await engine.dispose()
+    return results
+
+
+async def run(scales: List[int], rounds: int, seed: int, only: List[str]) -> Dict:
+    """Benchmark every scale, returns the JSON report"""
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for scale in scales:
+        for name, stats in (await run_scale(scale, rounds, seed, only)).items():
+            results.setdefault(name, {})[str(scale)] = stats
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "scales": scales,
+        "rounds": rounds,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float, min_delta_ms: float = 0.5,
+            metric: str = "median_ms") -> List[str]:
+    """
+    Compare a benchmark report with a baseline
+
+    Args:
+        current: Report of this run
+        baseline: Report of the baseline run
+        threshold: Allowed relative slowdown, e.g. 0.2 for 20%
+        min_delta_ms: Slowdowns of at most this many milliseconds are ignored
+        metric: Statistic compared
+
+    Returns:
+        Regressions found, empty if none
+    """
+    regressions = []
+    for name, scales in baseline["results"].items():
+        for scale, base in scales.items():
+            stats = current["results"].get(name, {}).get(scale)
+            if stats is None:
+                regressions.append(f"{name} @ {scale}: not measured in this run")
+                continue
+            delta = stats[metric] - base[metric]
+            if delta > min_delta_ms and stats[metric] > base[metric] * (1 + threshold):
+                regressions.append(
+                    f"{name} @ {scale}: {metric} {stats[metric]:.2f} ms vs {base[metric]:.2f} ms "
+                    f"(+{delta / base[metric]:.0%})"
+                )
+    return regressions
+
+
+def parse_scales(value: str) -> List[int]:
+    """Parse comma-separated quiz counts"""
+    try:
+        scales = [int(scale) for scale in value.split(",") if scale.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid scales '{value}', expected comma-separated quiz counts")
+    if not scales or min(scales) < 1:
+        raise argparse.ArgumentTypeError(f"Invalid scales '{value}', expected comma-separated quiz counts")
+    return scales
+
+
+def main() -> None:
+    """Parse arguments and run or compare benchmarks"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and write the JSON report")
+    run_parser.add_argument("--scales", type=parse_scales, default=[100, 1000, 10000], help="Quizzes in the database, comma-separated")
+    run_parser.add_argument("--rounds", type=int, default=30, help="Timed calls per hot path and scale")
+    run_parser.add_argument("--seed", type=int, default=42, help="Seed of the synthetic dataset")
+    run_parser.add_argument("--only", nargs="*", default=[], help="Only hot paths starting with these names")
+    run_parser.add_argument("--output", "-o", default="bench-quiz-service.json", help="JSON report file")
+
+    compare_parser = commands.add_parser("compare", help="Fail if a hot path regressed against a baseline")
+    compare_parser.add_argument("baseline", help="JSON report of the baseline run")
+    compare_parser.add_argument("current", help="JSON report of the run to check")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Ignore slowdowns up to this many ms")
+    compare_parser.add_argument("--metric", default="median_ms", choices=["median_ms", "p95_ms", "mean_ms", "min_ms"])
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = asyncio.run(run(args.scales, args.rounds, args.seed, args.only))
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report written to {args.output}", file=sys.stderr)
+        return
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    regressions = compare(current, baseline, args.threshold, args.min_delta_ms, args.metric)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%} ({args.metric})")
+
+
+if __name__ == "__main__":
+    main()
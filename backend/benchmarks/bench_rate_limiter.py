@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Benchmark for the GCRA rate limiter with many distinct keys.
+
+Usage:
+    python -m benchmarks.bench_rate_limiter [--keys 100000] [--requests 1000000]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.core.middleware import RateLimiter
+
+
+def run(keys: int, requests: int, max_keys: int, seed: int) -> None:
+    """Run the benchmark and print throughput and memory usage"""
+    rng = random.Random(seed)
+    key_names = [f"client:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(keys)]
+    workload = [key_names[rng.randrange(keys)] for _ in range(requests)]
+
+    tracemalloc.start()
+    limiter = RateLimiter(rate=5, per=60, burst=5, max_keys=max_keys)
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    # Warm up every key once so the dict is at its steady-state size
+    now = time.monotonic()
+    for key in key_names:
+        limiter.check(key, now)
+    warm, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rejected = 0
+    started = time.perf_counter()
+    for key in workload:
+        if limiter.check(key):
+            rejected += 1
+    elapsed = time.perf_counter() - started
+
+    print(f"distinct keys:       {keys}")
+    print(f"max_keys cap:        {max_keys}")
+    print(f"tracked keys:        {len(limiter)}")
+    print(f"memory (tracked):    {(warm - baseline) / 1024 / 1024:.2f} MiB "
+          f"({(warm - baseline) / max(len(limiter), 1):.0f} B/key, peak {(peak - baseline) / 1024 / 1024:.2f} MiB)")
+    print(f"requests:            {requests}")
+    print(f"rejected:            {rejected}")
+    print(f"throughput:          {requests / elapsed:,.0f} checks/s ({elapsed / requests * 1e9:.0f} ns/check)")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=100_000, help="Number of distinct client keys")
+    parser.add_argument("--requests", type=int, default=1_000_000, help="Number of checks to run")
+    parser.add_argument("--max-keys", type=int, default=100_000, help="Limiter key cap")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the workload")
+    args = parser.parse_args()
+    run(args.keys, args.requests, args.max_keys, args.seed)
+
+
+if __name__ == "__main__":
+    main()
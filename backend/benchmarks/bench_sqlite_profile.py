@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+Read/write concurrency benchmark comparing SQLite profiles.
+
+For every profile a fresh database file is seeded with quizzes, questions and
+students. Reader tasks then run the student quiz list query while writer tasks
+upsert quiz results, all at the same time and each with its own session. This
+mirrors a busy lesson where results are saved while classmates browse quizzes.
+
+Usage:
+    python -m benchmarks.bench_sqlite_profile [--readers 20] [--writers 5] [--duration 5]
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.db import create_sqlite_engine, verify_sqlite_profile
+from app.models import Base, Level, Question, Quiz, Result, User
+
+QUIZZES = 200
+QUESTIONS_PER_QUIZ = 10
+STUDENTS = 100
+
+
+async def seed(engine) -> None:
+    """Create the schema and insert the fixture data"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Level), [
+            {"code": str(i), "description": f"Klasa {i}", "level": i} for i in range(1, 9)
+        ])
+        await conn.execute(insert(User), [
+            {"username": f"student{i}", "hashed_password": "x", "role": "student"} for i in range(STUDENTS)
+        ] + [{"username": "admin", "hashed_password": "x", "role": "admin"}])
+        await conn.execute(insert(Quiz), [
+            {"title": f"Quiz {i}", "status": "published", "level_id": i % 8 + 1, "creator_id": STUDENTS + 1}
+            for i in range(QUIZZES)
+        ])
+        await conn.execute(insert(Question), [
+            {"text": f"Question {q} of quiz {i}", "quiz_id": i + 1}
+            for i in range(QUIZZES) for q in range(QUESTIONS_PER_QUIZ)
+        ])
+
+
+async def reader(session_factory, stop_at: float, latencies: list, errors: list, student_id: int) -> None:
+    """Run the student quiz list query in a loop"""
+    question_count = (
+        select(func.count(Question.id)).where(Question.quiz_id == Quiz.id).scalar_subquery()
+    )
+    query = (
+        select(Quiz, question_count, Result)
+        .outerjoin(Result, (Result.quiz_id == Quiz.id) & (Result.user_id == student_id))
+        .where(Quiz.status == "published")
+        .order_by(Quiz.title)
+    )
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        try:
+            async with session_factory() as session:
+                (await session.execute(query)).all()
+            latencies.append(time.perf_counter() - started)
+        except OperationalError as e:
+            errors.append(str(e.orig))
+
+
+async def writer(session_factory, stop_at: float, latencies: list, errors: list, worker_id: int) -> None:
+    """Upsert quiz results in a loop, one transaction per result"""
+    i = 0
+    while time.perf_counter() < stop_at:
+        i += 1
+        statement = sqlite_insert(Result).values(
+            user_id=(worker_id * 7919 + i) % STUDENTS + 1,
+            quiz_id=(worker_id * 104729 + i) % QUIZZES + 1,
+            score=i % QUESTIONS_PER_QUIZ,
+            max_score=QUESTIONS_PER_QUIZ,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "quiz_id"],
+            set_={"score": statement.excluded.score, "updated_at": func.now()},
+        )
+        started = time.perf_counter()
+        try:
+            async with session_factory() as session:
+                await session.execute(statement)
+                await session.commit()
+            latencies.append(time.perf_counter() - started)
+        except OperationalError as e:
+            errors.append(str(e.orig))
+
+
+def summarize(name: str, latencies: list, errors: list, duration: float) -> str:
+    """Format throughput and latency percentiles"""
+    if not latencies:
+        return f"{name:<7} no successful operations, {len(errors)} errors"
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) > 1 else ordered[0]
+    return (
+        f"{name:<7} {len(latencies) / duration:>8,.0f} ops/s  "
+        f"p50 {statistics.median(ordered) * 1000:6.1f} ms  p95 {p95 * 1000:6.1f} ms  "
+        f"errors {len(errors)}"
+    )
+
+
+async def run_profile(name: str, readers: int, writers: int, duration: float, directory: Path) -> None:
+    """Benchmark one profile on a fresh database file"""
+    profile = settings.SQLITE_PROFILES[name]
+    engine = create_sqlite_engine(
+        f"sqlite+aiosqlite:///{directory / f'{name}.db'}",
+        profile,
+        pool_size=readers + writers,
+        max_overflow=0,
+    )
+    await seed(engine)
+    await verify_sqlite_profile(engine, profile)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    read_latencies, read_errors, write_latencies, write_errors = [], [], [], []
+    stop_at = time.perf_counter() + duration
+    await asyncio.gather(
+        *(reader(session_factory, stop_at, read_latencies, read_errors, i % STUDENTS + 1) for i in range(readers)),
+        *(writer(session_factory, stop_at, write_latencies, write_errors, i) for i in range(writers)),
+    )
+    await engine.dispose()
+
+    print(f"profile: {name}")
+    print("  " + summarize("reads", read_latencies, read_errors, duration))
+    print("  " + summarize("writes", write_latencies, write_errors, duration))
+    for error in sorted(set(read_errors + write_errors)):
+        print(f"  error: {error}")
+
+
+async def run(profiles: list, readers: int, writers: int, duration: float) -> None:
+    """Benchmark every requested profile"""
+    with tempfile.TemporaryDirectory() as directory:
+        for name in profiles:
+            await run_profile(name, readers, writers, duration, Path(directory))
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=list(settings.SQLITE_PROFILES), help="Profiles to compare")
+    parser.add_argument("--readers", type=int, default=20, help="Concurrent reader tasks")
+    parser.add_argument("--writers", type=int, default=5, help="Concurrent writer tasks")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per profile")
+    args = parser.parse_args()
+    asyncio.run(run(args.profiles, args.readers, args.writers, args.duration))
+
+
+if __name__ == "__main__":
+    main()
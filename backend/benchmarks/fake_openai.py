@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+"""
+OpenAI-compatible stand-in server for offline performance tests.
+
+Serves `POST /v1/chat/completions` (plain and streaming) with canned content:
+a valid quiz JSON with the requested number of questions for quiz generation
+prompts and a short explanation otherwise. Latency, error rate and seed are
+configurable, so load tests of `check_answer` and `create_ai_quiz` run without
+an API key and can be reproduced.
+
+- Latency of a call is a sample of `--latency` plus `--token-latency` per
+  output token. Streaming responses send the first chunk after the sampled
+  latency and spread the tokens over the rest.
+- `--error-rate` of the calls fail with `--error-status` (500 or 429, the
+  latter with a Retry-After header) after the sampled latency.
+- Output is cut at the request's max_tokens (about 4 characters per token)
+  with finish_reason "length", like the real API.
+- `GET /fake/stats` reports the calls served, failed and truncated.
+
+Point the backend at it with:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+
+Usage:
+    python -m benchmarks.fake_openai [--port 8001] [--latency lognormal:1.0,0.4]
+        [--token-latency 0.01] [--error-rate 0.0] [--error-status 500] [--seed 42]
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+CHARS_PER_TOKEN = 4
+STREAM_CHUNK_TOKENS = 8
+SYLLABLES = [c + v for c in "bdfgklmnprstwz" for v in "aeiou"]
+
+
+@dataclass
+class FakeConfig:
+    """Behaviour of the fake server"""
+    latency: str = "fixed:0"  # fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA (seconds)
+    token_latency: float = 0.0  # seconds per output token
+    error_rate: float = 0.0
+    error_status: int = 500
+    seed: int = 42
+    stats: Dict[str, int] = field(default_factory=lambda: {"calls": 0, "errors": 0, "truncated": 0})
+
+
+def parse_latency(spec: str):
+    """
+    Parse a latency distribution
+
+    Args:
+        spec: fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA, in seconds
+
+    Returns:
+        Function drawing a latency from a random.Random
+
+    Raises:
+        ValueError: If the distribution is unknown or malformed
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",")] if params else []
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) if values[0] > 0 else 0.0
+    raise ValueError(f"Invalid latency '{spec}', expected fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA")
+
+
+def _words(rng: random.Random, count: int) -> str:
+    """Pseudo-words, so canned questions are not near-duplicates of each other"""
+    return " ".join(
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(count)
+    )
+
+
+def quiz_content(prompt: str) -> str:
+    """
+    Valid quiz JSON for a quiz generation prompt, with the requested number of questions
+
+    The texts are derived from the prompt, so the same prompt always gets
+    the same quiz and different prompts get different questions.
+    """
+    count = re.search(r"Generate (\d+) questions", prompt)
+    topic = re.search(r'on the topic: "(.*?)"', prompt)
+    count = int(count.group(1)) if count else 5
+    topic = topic.group(1) if topic else "General knowledge"
+    rng = random.Random(prompt)
+    return json.dumps({
+        "title": topic[:100],
+        "questions": [
+            {
+                "text": f"{topic}: which {_words(rng, 2)} fits {_words(rng, 3)}?",
+                "answers": [
+                    {"text": _words(rng, 2), "is_correct": j == correct}
+                    for j in range(4)
+                ],
+            }
+            for correct in (rng.randrange(4) for _ in range(count))
+        ],
+    }, ensure_ascii=False)
+
+
+def explanation_content(prompt: str) -> str:
+    """Short explanation for an answer explanation prompt"""
+    if "answered correctly" in prompt:
+        return "This answer is correct because it follows directly from the rule the question is about."
+    return (
+        "The correct answer follows from the rule the question is about. "
+        "The chosen answer mixes it up with a similar case, which is a common mistake."
+    )
+
+
+def create_app(config: FakeConfig) -> FastAPI:
+    """
+    Build the fake server
+
+    Args:
+        config: Latency, error and seed settings
+
+    Returns:
+        FastAPI app serving the chat completions API
+    """
+    app = FastAPI(title="Fake OpenAI")
+    rng = random.Random(config.seed)
+    draw_latency = parse_latency(config.latency)
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "gpt-4.1", "object": "model", "owned_by": "fake"}]}
+
+    @app.get("/fake/stats")
+    async def get_stats():
+        return config.stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        config.stats["calls"] += 1
+        messages: List[Dict] = body.get("messages", [])
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        model = body.get("model", "gpt-4.1")
+        latency = draw_latency(rng)
+        failed = rng.random() < config.error_rate
+
+        if failed:
+            config.stats["errors"] += 1
+            await asyncio.sleep(latency)
+            headers = {"Retry-After": "1"} if config.error_status == 429 else {}
+            return JSONResponse(
+                status_code=config.error_status,
+                headers=headers,
+                content={"error": {"message": "Fake upstream error", "type": "server_error", "code": None}}
+            )
+
+        json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+        content = quiz_content(prompt) if json_mode or "quiz generator" in prompt else explanation_content(prompt)
+        finish_reason = "stop"
+        max_tokens = body.get("max_tokens") or body.get("max_completion_tokens")
+        if max_tokens and len(content) > max_tokens * CHARS_PER_TOKEN:
+            content = content[:max_tokens * CHARS_PER_TOKEN]
+            finish_reason = "length"
+            config.stats["truncated"] += 1
+        completion_tokens = max(1, len(content) // CHARS_PER_TOKEN)
+        prompt_tokens = max(1, len(prompt) // CHARS_PER_TOKEN)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream(completion_id, created, model, content, finish_reason, latency, config.token_latency),
+                media_type="text/event-stream"
+            )
+
+        await asyncio.sleep(latency + completion_tokens * config.token_latency)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    return app
+
+
+async def _stream(completion_id, created, model, content, finish_reason, latency, token_latency):
+    """Server-sent events of a streamed completion"""
+    def event(delta: Dict, finish=None) -> str:
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+        }
+        return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+    await asyncio.sleep(latency)
+    yield event({"role": "assistant", "content": ""})
+    step = STREAM_CHUNK_TOKENS * CHARS_PER_TOKEN
+    for start in range(0, len(content), step):
+        await asyncio.sleep(STREAM_CHUNK_TOKENS * token_latency)
+        yield event({"content": content[start:start + step]})
+    yield event({}, finish_reason)
+    yield "data: [DONE]\n\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", default="lognormal:1.0,0.4", help="fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="Seconds per output token")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls that fail")
+    parser.add_argument("--error-status", type=int, default=500, choices=[429, 500, 503])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    parse_latency(args.latency)
+
+    import uvicorn
+
+    config = FakeConfig(
+        latency=args.latency,
+        token_latency=args.token_latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
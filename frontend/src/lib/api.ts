@@ -117,11 +117,12 @@ export const api = {
   
   /**
    * POST request
+   * Dodatkowe nagłówki, np. Idempotency-Key, są dołączane do nagłówków autoryzacji
    */
-  post: async <T>(endpoint: string, data?: any): Promise<T> => {
+  post: async <T>(endpoint: string, data?: any, headers?: Record<string, string>): Promise<T> => {
     const response = await fetch(`${API_BASE_URL}${endpoint}`, {
       method: 'POST',
-      headers: createHeaders(),
+      headers: { ...createHeaders(), ...headers },
       body: data ? JSON.stringify(data) : undefined,
     });
     
@@ -1,4 +1,4 @@
-import { useState, useCallback, useEffect, useMemo } from 'react';
+import { useState, useCallback, useEffect, useMemo, useRef } from 'react';
 import type { 
   QuizListItemDto, 
   QuizListItemVM, 
@@ -126,18 +126,30 @@ export const useAdminQuizzes = () => {
     }
   }, []);
 
+  // Klucz idempotencji ostatniego nieudanego żądania - ponowienie z tymi samymi
+  // danymi nie generuje drugiego quizu, tylko dołącza do trwającego generowania
+  const pendingCreation = useRef<{ payload: string; key: string } | null>(null);
+
   // Tworzenie nowego quizu przez AI
   const createNewQuiz = useCallback(async (data: CreateQuizRequestDto) => {
     try {
       setIsLoading(true);
       setError(null);
       
+      const payload = JSON.stringify(data);
+      if (pendingCreation.current?.payload !== payload) {
+        pendingCreation.current = { payload, key: uuidv4() };
+      }
+      
       // Używamy istniejącego typu QuizListItemDto rozszerzonego o questions
       interface GeneratedQuizDto extends QuizListItemDto {
         questions: QuestionDto[];
       }
       
-      const responseData = await api.post<GeneratedQuizDto>('/quizzes/', data);
+      const responseData = await api.post<GeneratedQuizDto>('/quizzes/', data, {
+        'Idempotency-Key': pendingCreation.current.key,
+      });
+      pendingCreation.current = null;
       
       // Konwersja danych z API do formatu QuizEditorVM
       const quizEditorVM: QuizEditorVM = {
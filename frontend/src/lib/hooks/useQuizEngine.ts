@@ -1,6 +1,7 @@
 import { useState, useEffect } from "react";
 import { useQuery, useMutation } from "@tanstack/react-query";
 import { useNavigate } from "react-router-dom";
+import { v4 as uuidv4 } from "uuid";
 import { api } from "../api";
 import { showErrorToast, formatErrorMessage } from "../toast-utils";
 import type {
@@ -24,6 +25,8 @@ export const useQuizEngine = (quizId: string) => {
   const [selectedAnswerId, setSelectedAnswerId] = useState<number | null>(null);
   const [errorMessage, setErrorMessage] = useState<string | null>(null);
   const [shuffledAnswers, setShuffledAnswers] = useState<AnswerReadStudentDto[]>([]);
+  // Jeden klucz na podejście - ponowione wysłanie wyniku nie dodaje go drugi raz do historii
+  const [resultKey] = useState(() => uuidv4());
 
   // Fetch quiz data
   const quizQuery = useQuery({
@@ -86,7 +89,9 @@ export const useQuizEngine = (quizId: string) => {
   const submitResultMutation = useMutation({
     mutationFn: async (data: ResultCreateDto) => {
       try {
-        return await api.post<void>(`/quizzes/${quizId}/results`, data);
+        return await api.post<void>(`/quizzes/${quizId}/results`, data, {
+          "Idempotency-Key": resultKey,
+        });
       } catch (error) {
         const message = formatErrorMessage(error);
         showErrorToast(`Nie można zapisać wyników: ${message}`);
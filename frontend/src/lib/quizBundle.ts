@@ -0,0 +1,29 @@
+import type { QuizBundleDto } from '../types/quiz';
+
+/**
+ * Hash odpowiedzi w tym samym formacie co backend: sha256("salt:question_id:answer_id")
+ */
+async function hashAnswer(salt: string, questionId: number, answerId: number): Promise<string> {
+  const data = new TextEncoder().encode(`${salt}:${questionId}:${answerId}`);
+  const digest = await crypto.subtle.digest('SHA-256', data);
+  return Array.from(new Uint8Array(digest))
+    .map((byte) => byte.toString(16).padStart(2, '0'))
+    .join('');
+}
+
+/**
+ * Sprawdza odpowiedź lokalnie, bez zapytania do serwera.
+ * Wynik służy tylko do natychmiastowej informacji zwrotnej - ostateczną ocenę
+ * wystawia serwer przez POST /quizzes/{quiz_id}/grade.
+ */
+export async function checkAnswerOffline(
+  bundle: QuizBundleDto,
+  questionId: number,
+  answerId: number
+): Promise<boolean> {
+  const expected = bundle.answer_hashes[String(questionId)];
+  if (!expected) {
+    return false;
+  }
+  return (await hashAnswer(bundle.salt, questionId, answerId)) === expected;
+}
@@ -39,6 +39,15 @@ export interface CreateQuizRequestDto {
   question_count: number;
   level_id: number;
   title: string;
+  reuse_if_available?: boolean;
+  bypass_cache?: boolean;
+  bank_question_ids?: number[]; // pytania z banku, AI generuje tylko brakujące
+}
+
+// Odpowiedź serwera dla GET /quizzes/bank/questions (tylko admin)
+export interface BankQuestionDto extends QuestionDto {
+  id: number;
+  quiz_id: number;
 }
 
 export interface LevelDto {
@@ -48,6 +57,51 @@ export interface LevelDto {
   level: number;
 }
 
+// Element odpowiedzi serwera dla GET /quizzes/search?q=
+export interface QuizSearchHitDto {
+  id: number;
+  title: string;
+  level_id: number;
+  status: 'draft' | 'published';
+  updated_at: string;
+  score: number; // bm25, mniejszy = lepiej dopasowany
+  matched_in: 'title' | 'question' | 'answer';
+  snippet: string; // HTML z escapowanym tekstem, dopasowania w <mark>
+}
+
+// Odpowiedź serwera dla GET /quizzes/{quiz_id}/stats (tylko admin)
+export interface QuizStatsDto {
+  quiz_id: number;
+  attempt_count: number;
+  mean_score: number | null;
+  score_stddev: number | null;
+  mean_percent: number | null;
+  histogram: number[]; // liczba wyników w przedziałach po 10%
+  updated_at: string | null;
+}
+
+// Odpowiedź serwera dla GET /quizzes/{quiz_id}/item-analysis (tylko admin)
+export interface AnswerOptionStatsDto {
+  answer_id: number;
+  is_correct: boolean;
+  selection_rate: number | null;
+}
+
+export interface QuestionItemStatsDto {
+  question_id: number;
+  responses: number;
+  difficulty: number | null;      // odsetek poprawnych odpowiedzi
+  discrimination: number | null;  // korelacja punktowo-dwuseryjna
+  answers: AnswerOptionStatsDto[];
+}
+
+export interface QuizItemAnalysisDto {
+  quiz_id: number;
+  attempt_count: number;
+  student_count: number;
+  questions: QuestionItemStatsDto[];
+}
+
 // Typy ViewModel - na potrzeby widoku
 export interface QuizListItemVM extends Omit<QuizListItemDto, 'level_id'> {
   level: string; // np. "Klasa IV" zamiast ID
@@ -140,6 +194,64 @@ export interface ResultCreateDto {
   max_score: number;
 }
 
+// Odpowiedź serwera dla GET /quizzes/{quiz_id}/results/history (najnowsze pierwsze)
+export interface ResultHistoryItemDto {
+  id: number;
+  user_id: number;
+  quiz_id: number;
+  score: number;
+  max_score: number;
+  created_at: string;
+}
+
+// Ciało żądania dla POST /quizzes/{quiz_id}/grade (tryb egzaminu)
+export interface QuizGradeRequestDto {
+  answers: AnswerCheckRequestDto[];
+  key_digest?: string; // z QuizBundleDto, serwer zwraca 409 gdy klucz się zmienił
+  salt?: string; // z tego samego QuizBundleDto
+  signature?: string; // z tego samego QuizBundleDto, serwer zwraca 422 gdy podpis się nie zgadza
+}
+
+export interface QuestionGradeDto {
+  question_id: number;
+  answer_id: number;
+  is_correct: boolean;
+  correct_answer_id: number;
+}
+
+// Odpowiedź serwera dla POST /quizzes/{quiz_id}/grade
+export interface QuizGradeResponseDto {
+  quiz_id: number;
+  score: number;
+  max_score: number;
+  questions: QuestionGradeDto[];
+  result: {
+    id: number;
+    user_id: number;
+    quiz_id: number;
+    score: number;
+    max_score: number;
+    created_at: string;
+  };
+}
+
+// Odpowiedź serwera dla GET /quizzes/{quiz_id}/questions/{question_id}/explanation?answer_id=
+export interface AnswerExplanationResponseDto {
+  question_id: number;
+  answer_id: number;
+  explanation: string;
+}
+
+// Odpowiedź serwera dla GET /quizzes/{quiz_id}/bundle (quiz offline)
+export interface QuizBundleDto {
+  quiz: QuizReadDetailStudentDto;
+  salt: string;
+  answer_hashes: Record<string, string>; // question_id -> sha256("salt:question_id:answer_id")
+  key_digest: string;
+  issued_at: string;
+  signature: string;
+}
+
 // --- ViewModels for Quiz Taking ---
 
 // Typ określający status wizualny odpowiedzi w UI